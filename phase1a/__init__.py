@@ -7,7 +7,21 @@ using SAM proposals and lightweight mask classification.
 
 __version__ = "0.1.0"
 
-from .client import Phase1AClient
-from .config import Phase1AConfig
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .client import Phase1AClient
+    from .config import Phase1AConfig
 
 __all__ = ["Phase1AClient", "Phase1AConfig", "__version__"]
+
+
+def __getattr__(name: str):
+    """Import the client and config on first access (keeps CLI startup fast)."""
+    if name == "Phase1AClient":
+        from .client import Phase1AClient
+        return Phase1AClient
+    if name == "Phase1AConfig":
+        from .config import Phase1AConfig
+        return Phase1AConfig
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
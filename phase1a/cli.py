@@ -2,23 +2,20 @@
 Phase 1A Command Line Interface
 
 Standalone CLI for running the Phase 1A pipeline.
+
+Only click and the rich console are imported at module level. Commands
+import the client, config and pipeline stages (and with them numpy, PIL,
+shapely, torch, ...) when they run, so ``phase1a --help``, ``info`` and
+``init-config`` start quickly.
 """
 
-import json
 import logging
 import sys
 from pathlib import Path
 from typing import Optional, TYPE_CHECKING
 
 import click
-import numpy as np
 from rich.console import Console
-from rich.logging import RichHandler
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.table import Table
-
-from .client import Phase1AClient
-from .config import Phase1AConfig
 
 if TYPE_CHECKING:
     from .pipeline.interactive import InteractiveSelector, FeatureType
@@ -28,6 +25,8 @@ console = Console()
 
 def setup_logging(verbose: bool = False) -> None:
     """Configure logging with rich handler."""
+    from rich.logging import RichHandler
+    
     level = logging.DEBUG if verbose else logging.INFO
     logging.basicConfig(
         level=level,
@@ -60,6 +59,11 @@ def cli():
     type=click.Path(exists=True, path_type=Path),
     help="JSON file with green center coordinates",
 )
+@click.option(
+    "-t", "--tee-centers",
+    type=click.Path(exists=True, path_type=Path),
+    help="JSON file with tee center coordinates (enables corridor hole assignment)",
+)
 @click.option(
     "-c", "--config",
     type=click.Path(exists=True, path_type=Path),
@@ -76,6 +80,28 @@ def cli():
     default="cuda",
     help="Device to run SAM on (cuda or cpu)",
 )
+@click.option(
+    "--backend",
+    type=click.Choice(["torch", "onnx"]),
+    default="torch",
+    help="SAM runtime: torch (segment-anything) or onnx (ONNX Runtime, see export-onnx)",
+)
+@click.option(
+    "--onnx-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory with exported ONNX models (default: the checkpoint's directory)",
+)
+@click.option(
+    "--quantized",
+    is_flag=True,
+    help="Use int8 quantized ONNX models",
+)
+@click.option(
+    "--sam-server",
+    "use_server",
+    is_flag=True,
+    help="Use a running `phase1a sam-server` instead of loading the model",
+)
 @click.option(
     "--high-threshold",
     type=float,
@@ -88,6 +114,24 @@ def cli():
     default=0.5,
     help="Low confidence threshold (below = discard)",
 )
+@click.option(
+    "--export-backend",
+    type=click.Choice(["cairosvg", "raster"]),
+    default=None,
+    help="PNG overlay renderer: cairosvg (render SVG) or raster (direct, no cairo)",
+)
+@click.option(
+    "--tiles",
+    type=click.Choice(["xyz", "dzi"]),
+    default=None,
+    help="Export a tile pyramid (XYZ or DeepZoom) instead of one overlay PNG",
+)
+@click.option(
+    "--tile-size",
+    type=int,
+    default=256,
+    help="Tile size in pixels for --tiles",
+)
 @click.option(
     "-v", "--verbose",
     is_flag=True,
@@ -102,11 +146,19 @@ def run(
     image: Path,
     output: Path,
     green_centers: Optional[Path],
+    tee_centers: Optional[Path],
     config: Optional[Path],
     checkpoint: Optional[Path],
     device: str,
+    backend: str,
+    onnx_dir: Optional[Path],
+    quantized: bool,
+    use_server: bool,
     high_threshold: float,
     low_threshold: float,
+    export_backend: Optional[str],
+    tiles: Optional[str],
+    tile_size: int,
     verbose: bool,
     no_export_intermediates: bool,
 ):
@@ -117,6 +169,10 @@ def run(
     """
     setup_logging(verbose)
     
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from .client import Phase1AClient
+    from .config import Phase1AConfig
+    
     # Load or create config
     if config:
         if config.suffix in (".yml", ".yaml"):
@@ -135,13 +191,29 @@ def run(
     if green_centers:
         cfg.green_centers_file = green_centers
     
+    if tee_centers:
+        cfg.tee_centers_file = tee_centers
+    
     if checkpoint:
         cfg.sam.checkpoint_path = str(checkpoint)
     
     cfg.sam.device = device
+    cfg.sam.backend = backend
+    cfg.sam.quantized = quantized
+    if use_server:
+        cfg.sam.use_server = True
+    if onnx_dir:
+        cfg.sam.onnx_dir = str(onnx_dir)
     cfg.thresholds.high = high_threshold
     cfg.thresholds.low = low_threshold
     
+    if export_backend:
+        cfg.export.backend = export_backend
+    
+    if tiles:
+        cfg.export.tile_layout = tiles
+        cfg.export.tile_size = tile_size
+    
     # Run pipeline
     console.print("\n[bold blue]Phase 1A Pipeline[/bold blue]")
     console.print(f"Input:  {image}")
@@ -191,8 +263,7 @@ def run(
 @click.option(
     "--checkpoint",
     type=click.Path(exists=True, path_type=Path),
-    required=True,
-    help="SAM model checkpoint path",
+    help="SAM model checkpoint path (required for the torch backend)",
 )
 @click.option(
     "--model-type",
@@ -200,6 +271,28 @@ def run(
     default="vit_h",
     help="SAM model variant",
 )
+@click.option(
+    "--backend",
+    type=click.Choice(["torch", "onnx"]),
+    default="torch",
+    help="SAM runtime: torch (segment-anything) or onnx (ONNX Runtime, see export-onnx)",
+)
+@click.option(
+    "--onnx-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory with exported ONNX models (default: the checkpoint's directory)",
+)
+@click.option(
+    "--quantized",
+    is_flag=True,
+    help="Use int8 quantized ONNX models",
+)
+@click.option(
+    "--sam-server",
+    "use_server",
+    is_flag=True,
+    help="Use a running `phase1a sam-server` instead of loading the model",
+)
 @click.option(
     "--points-per-side",
     type=int,
@@ -214,8 +307,12 @@ def run(
 def generate_masks(
     image: Path,
     output: Path,
-    checkpoint: Path,
+    checkpoint: Optional[Path],
     model_type: str,
+    backend: str,
+    onnx_dir: Optional[Path],
+    quantized: bool,
+    use_server: bool,
     points_per_side: int,
     verbose: bool,
 ):
@@ -226,6 +323,7 @@ def generate_masks(
     """
     setup_logging(verbose)
     
+    from rich.progress import Progress, SpinnerColumn, TextColumn
     from .pipeline.masks import MaskGenerator
     
     console.print("\n[bold blue]Generating Masks[/bold blue]")
@@ -235,8 +333,12 @@ def generate_masks(
     try:
         generator = MaskGenerator(
             model_type=model_type,
-            checkpoint_path=str(checkpoint),
+            checkpoint_path=str(checkpoint) if checkpoint else None,
             points_per_side=points_per_side,
+            backend=backend,
+            onnx_dir=str(onnx_dir) if onnx_dir else None,
+            quantized=quantized,
+            use_server=use_server,
         )
         
         with Progress(
@@ -261,22 +363,210 @@ def generate_masks(
         sys.exit(1)
 
 
+@cli.command("export-onnx")
+@click.option(
+    "--checkpoint",
+    type=click.Path(exists=True, path_type=Path),
+    required=True,
+    help="SAM model checkpoint path",
+)
+@click.option(
+    "--model-type",
+    type=click.Choice(["vit_h", "vit_l", "vit_b"]),
+    default="vit_h",
+    help="SAM model variant",
+)
+@click.option(
+    "-o", "--output",
+    type=click.Path(file_okay=False, path_type=Path),
+    help="Output directory (default: the checkpoint's directory)",
+)
+@click.option(
+    "--quantize",
+    is_flag=True,
+    help="Also write int8 dynamically quantized models",
+)
+@click.option(
+    "-v", "--verbose",
+    is_flag=True,
+    help="Enable verbose output",
+)
+def export_onnx(
+    checkpoint: Path,
+    model_type: str,
+    output: Optional[Path],
+    quantize: bool,
+    verbose: bool,
+):
+    """
+    Export SAM to ONNX models for the onnx backend (CPU-only machines).
+    
+    Use the models with --backend onnx (and --quantized for int8).
+    """
+    setup_logging(verbose)
+    
+    from .pipeline.sam_onnx import export_onnx as export_sam_onnx
+    
+    output = output or checkpoint.parent
+    
+    console.print("\n[bold blue]Exporting SAM to ONNX[/bold blue]")
+    console.print(f"Model:  {model_type} ({checkpoint})")
+    console.print(f"Output: {output}\n")
+    
+    try:
+        encoder_path, decoder_path = export_sam_onnx(
+            model_type, str(checkpoint), output, quantize=quantize
+        )
+        console.print(f"[green]✓ Encoder: {encoder_path}[/green]")
+        console.print(f"[green]✓ Decoder: {decoder_path}[/green]")
+        
+    except Exception as e:
+        console.print(f"\n[red]Error: {e}[/red]")
+        if verbose:
+            console.print_exception()
+        sys.exit(1)
+
+
+@cli.command("sam-server")
+@click.option(
+    "--checkpoint",
+    type=click.Path(exists=True, path_type=Path),
+    required=True,
+    help="SAM model checkpoint path",
+)
+@click.option(
+    "--model-type",
+    type=click.Choice(["vit_h", "vit_l", "vit_b"]),
+    default="vit_h",
+    help="SAM model variant",
+)
+@click.option(
+    "--device",
+    type=click.Choice(["cuda", "cpu"]),
+    default="cuda",
+    help="Device for SAM inference",
+)
+@click.option(
+    "--backend",
+    type=click.Choice(["torch", "onnx"]),
+    default="torch",
+    help="SAM runtime: torch (segment-anything) or onnx (ONNX Runtime, see export-onnx)",
+)
+@click.option(
+    "--onnx-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory with exported ONNX models (default: the checkpoint's directory)",
+)
+@click.option(
+    "--quantized",
+    is_flag=True,
+    help="Use int8 quantized ONNX models",
+)
+@click.option(
+    "-a", "--address",
+    help="Unix socket path or host:port to listen on (default: per-user socket in "
+         "$XDG_RUNTIME_DIR/phase1a or the temp dir)",
+)
+@click.option(
+    "--allow-remote",
+    is_flag=True,
+    help="Allow listening on a non-loopback host:port (clients need PHASE1A_SAM_AUTHKEY)",
+)
+@click.option(
+    "--cache-size",
+    type=int,
+    default=16,
+    help="Number of image embeddings to keep in memory",
+)
+@click.option(
+    "-v", "--verbose",
+    is_flag=True,
+    help="Enable verbose output",
+)
+def sam_server(
+    checkpoint: Path,
+    model_type: str,
+    device: str,
+    backend: str,
+    onnx_dir: Optional[Path],
+    quantized: bool,
+    address: Optional[str],
+    allow_remote: bool,
+    cache_size: int,
+    verbose: bool,
+):
+    """
+    Keep a SAM model loaded and serve it to other phase1a commands.
+    
+    While the server runs, `run`, `select` and `generate-masks` given
+    --sam-server (and Phase1AClient with sam.use_server) use it instead of
+    loading the checkpoint themselves. Set PHASE1A_SAM_SERVER when using a
+    non-default --address. Clients authenticate with a random key kept in
+    the server's private runtime directory, or PHASE1A_SAM_AUTHKEY.
+    """
+    setup_logging(verbose)
+    
+    from .pipeline.sam_server import SAMServer
+    
+    server = SAMServer(
+        model_type=model_type,
+        checkpoint_path=str(checkpoint),
+        device=device,
+        address=address,
+        cache_size=cache_size,
+        backend=backend,
+        onnx_dir=str(onnx_dir) if onnx_dir else None,
+        quantized=quantized,
+        allow_remote=allow_remote,
+    )
+    
+    console.print("\n[bold blue]SAM Server[/bold blue]")
+    console.print(f"Model:   {model_type} ({checkpoint})")
+    console.print(f"Address: {server.address}\n")
+    
+    try:
+        server.start()
+        console.print("[green]✓ Model loaded, waiting for requests (Ctrl+C to stop)[/green]")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Stopping SAM server[/dim]")
+    except Exception as e:
+        console.print(f"\n[red]Error: {e}[/red]")
+        if verbose:
+            console.print_exception()
+        sys.exit(1)
+    finally:
+        server.close()
+
+
 @cli.command()
-@click.argument("svg_path", type=click.Path(exists=True, path_type=Path))
+@click.argument("svg_paths", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path))
 @click.option(
     "-o", "--output",
     type=click.Path(path_type=Path),
-    help="Output PNG path (default: same name as SVG)",
+    help="Output PNG path, or output directory for batches (default: next to each SVG)",
 )
 @click.option(
     "-w", "--width",
     type=int,
-    help="Output width (default: from SVG)",
+    help="Output width (default: from SVG; applies to every SVG of a batch)",
 )
 @click.option(
     "-h", "--height",
     type=int,
-    help="Output height (default: from SVG)",
+    help="Output height (default: from SVG; applies to every SVG of a batch)",
+)
+@click.option(
+    "-s", "--size",
+    "sizes",
+    multiple=True,
+    help="Batch output width, or 'full' (repeatable, e.g. -s 256 -s 1024 -s full)",
+)
+@click.option(
+    "-j", "--jobs",
+    type=int,
+    default=None,
+    help="Parallel export processes for batches (default: CPU count)",
 )
 @click.option(
     "-v", "--verbose",
@@ -284,21 +574,33 @@ def generate_masks(
     help="Enable verbose output",
 )
 def export_png(
-    svg_path: Path,
+    svg_paths: tuple,
     output: Optional[Path],
     width: Optional[int],
     height: Optional[int],
+    sizes: tuple,
+    jobs: Optional[int],
     verbose: bool,
 ):
     """
     Export SVG to PNG overlay (standalone).
     
-    SVG_PATH: Path to input SVG file
+    SVG_PATHS: Path(s) to input SVG files. Several SVGs and/or --size
+    options are rendered as a batch across a process pool; -w/-h then
+    set the size of every render and cannot be combined with --size.
     """
     setup_logging(verbose)
     
+    if sizes and (width or height):
+        raise click.UsageError("-w/--width and -h/--height cannot be combined with --size")
+    
+    if len(svg_paths) > 1 or sizes:
+        _export_png_batch(svg_paths, output, sizes, jobs, verbose, width, height)
+        return
+    
     from .pipeline.export import PNGExporter
     
+    svg_path = svg_paths[0]
     if output is None:
         output = svg_path.with_suffix(".png")
     
@@ -319,6 +621,82 @@ def export_png(
         sys.exit(1)
 
 
+def _export_png_batch(
+    svg_paths: tuple,
+    output_dir: Optional[Path],
+    sizes: tuple,
+    jobs: Optional[int],
+    verbose: bool,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> None:
+    """Render a batch of SVGs/sizes in parallel and print per-file timing."""
+    from rich.progress import Progress, SpinnerColumn, TextColumn
+    from rich.table import Table
+    from .pipeline.export import batch_jobs, export_svgs_to_png
+    
+    widths = [width] if width else []
+    for size in sizes or (() if width else ("full",)):
+        if size == "full":
+            widths.append(None)
+        elif size.isdigit():
+            widths.append(int(size))
+        else:
+            raise click.BadParameter(
+                f"expected a width or 'full', got '{size}'", param_hint="--size"
+            )
+    
+    export_jobs = batch_jobs(svg_paths, output_dir, widths)
+    for job in export_jobs:
+        job.height = height
+    
+    console.print("\n[bold blue]Exporting PNG batch[/bold blue]")
+    console.print(f"SVGs: {len(svg_paths)}, renders: {len(export_jobs)}\n")
+    
+    try:
+        with Progress(
+            SpinnerColumn(),
+            TextColumn("[progress.description]{task.description}"),
+            console=console,
+        ) as progress:
+            task = progress.add_task("Exporting...", total=len(export_jobs))
+            results = export_svgs_to_png(
+                export_jobs,
+                max_workers=jobs,
+                on_result=lambda result: progress.advance(task),
+            )
+    except Exception as e:
+        console.print(f"\n[red]Error: {e}[/red]")
+        if verbose:
+            console.print_exception()
+        sys.exit(1)
+    
+    table = Table(title="Export Results")
+    table.add_column("SVG")
+    table.add_column("PNG")
+    table.add_column("Time", justify="right")
+    table.add_column("Status")
+    
+    for result in results:
+        table.add_row(
+            str(result.job.svg_path),
+            str(result.job.output_path),
+            f"{result.seconds:.2f}s",
+            "[green]✓[/green]" if result.ok else f"[red]{result.error}[/red]",
+        )
+    
+    console.print(table)
+    
+    failed = sum(not result.ok for result in results)
+    total = sum(result.seconds for result in results)
+    console.print(
+        f"\nRendered {len(results) - failed}/{len(results)} PNGs "
+        f"({total:.2f}s of render time)"
+    )
+    if failed:
+        sys.exit(1)
+
+
 @cli.command()
 @click.option(
     "-o", "--output",
@@ -336,6 +714,8 @@ def init_config(output: Path, format: str):
     """
     Generate a default configuration file.
     """
+    from .config import Phase1AConfig
+    
     config = Phase1AConfig()
     
     if format == "yaml":
@@ -354,11 +734,15 @@ def validate(output_dir: Path):
     
     OUTPUT_DIR: Path to Phase 1A output directory
     """
+    from rich.table import Table
+    from .pipeline import serialization
+    
     console.print("\n[bold blue]Validating Output[/bold blue]")
     console.print(f"Directory: {output_dir}\n")
     
     svg_path = output_dir / "course.svg"
     png_path = output_dir / "exports" / "overlay.png"
+    tiles_dir = output_dir / "exports" / "tiles"
     metadata_dir = output_dir / "metadata"
     
     # Run checks
@@ -373,14 +757,15 @@ def validate(output_dir: Path):
     # PNG exists
     if png_path.exists():
         checks.append(("PNG overlay exists", True, str(png_path)))
+    elif tiles_dir.exists():
+        checks.append(("PNG overlay exists", True, str(tiles_dir)))
     else:
         checks.append(("PNG overlay exists", False, "exports/overlay.png not found"))
     
     # Classifications
-    classifications_path = metadata_dir / "classifications.json"
+    classifications_path = serialization.resolve(metadata_dir / "classifications.json")
     if classifications_path.exists():
-        with open(classifications_path) as f:
-            classifications = json.load(f)
+        classifications = serialization.load(classifications_path)
         
         classes = set(c["class"] for c in classifications)
         checks.append(("Has classifications", True, f"{len(classifications)} masks"))
@@ -453,6 +838,7 @@ def info():
     console.print("[bold]Usage:[/bold]")
     console.print("  phase1a run satellite.png --checkpoint sam_vit_h.pth")
     console.print("  phase1a generate-masks image.png --checkpoint sam.pth")
+    console.print("  phase1a sam-server --checkpoint sam_vit_h.pth")
     console.print("  phase1a export-png course.svg -o overlay.png")
     console.print("  phase1a validate ./output")
 
@@ -468,8 +854,7 @@ def info():
 @click.option(
     "--checkpoint",
     type=click.Path(exists=True, path_type=Path),
-    required=True,
-    help="SAM model checkpoint path",
+    help="SAM model checkpoint path (required for the torch backend)",
 )
 @click.option(
     "--selections",
@@ -488,6 +873,50 @@ def info():
     default="cuda",
     help="Device to run SAM on (cuda or cpu)",
 )
+@click.option(
+    "--backend",
+    type=click.Choice(["torch", "onnx"]),
+    default="torch",
+    help="SAM runtime: torch (segment-anything) or onnx (ONNX Runtime, see export-onnx)",
+)
+@click.option(
+    "--onnx-dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Directory with exported ONNX models (default: the checkpoint's directory)",
+)
+@click.option(
+    "--quantized",
+    is_flag=True,
+    help="Use int8 quantized ONNX models",
+)
+@click.option(
+    "--sam-server",
+    "use_server",
+    is_flag=True,
+    help="Use a running `phase1a sam-server` instead of loading the model",
+)
+@click.option(
+    "--two-level",
+    is_flag=True,
+    help="Refine clicks on large images with a native-resolution crop encode",
+)
+@click.option(
+    "--superpixels",
+    type=click.Choice(["slic", "felzenszwalb"]),
+    help="Clicks select superpixels instead of running SAM (shift+click for SAM); "
+         "computed in the background and cached in OUTPUT/superpixels",
+)
+@click.option(
+    "--undo-memory",
+    type=int,
+    default=64,
+    help="Memory cap in MB for the undo/redo history (0 disables undo)",
+)
+@click.option(
+    "--fresh",
+    is_flag=True,
+    help="Discard the autosaved session for this image instead of resuming it",
+)
 @click.option(
     "-v", "--verbose",
     is_flag=True,
@@ -496,10 +925,18 @@ def info():
 def select(
     image: Path,
     output: Path,
-    checkpoint: Path,
+    checkpoint: Optional[Path],
     selections: Optional[Path],
     model_type: str,
     device: str,
+    backend: str,
+    onnx_dir: Optional[Path],
+    quantized: bool,
+    use_server: bool,
+    two_level: bool,
+    superpixels: Optional[str],
+    undo_memory: int,
+    fresh: bool,
     verbose: bool,
 ):
     """
@@ -523,7 +960,9 @@ def select(
     """
     setup_logging(verbose)
     
+    import numpy as np
     from PIL import Image
+    from .pipeline import serialization
     from .pipeline.masks import MaskGenerator
     from .pipeline.interactive import InteractiveSelector, FeatureType
     
@@ -535,17 +974,51 @@ def select(
         # Load image
         image_array = np.array(Image.open(image).convert("RGB"))
         
+        # Every operation is journaled under OUTPUT/session for resuming
+        from .pipeline.session import SessionJournal
+        journal = SessionJournal.for_image(output, image_array)
+        if fresh:
+            journal.clear()
+        
         # Initialize mask generator for point-based selection
         console.print("[cyan]Initializing SAM model for point-based mask generation...[/cyan]")
         generator = MaskGenerator(
             model_type=model_type,
-            checkpoint_path=str(checkpoint),
+            checkpoint_path=str(checkpoint) if checkpoint else None,
             device=device,
+            backend=backend,
+            onnx_dir=str(onnx_dir) if onnx_dir else None,
+            quantized=quantized,
+            use_server=use_server,
+            two_level=two_level,
+            embedding_dir=str(journal.embedding_dir),
         )
         
         # Initialize point-based selector
         from .pipeline.point_selector import PointBasedSelector
-        selector = PointBasedSelector(image_array, generator)
+        if superpixels:
+            from .pipeline.superpixels import precompute
+            # Until the background segmentation finishes, clicks use SAM
+            superpixel_index = precompute(image_array, output / "superpixels", superpixels)
+            if not superpixel_index.done():
+                console.print(f"[cyan]Computing {superpixels} superpixels in the background...[/cyan]")
+            selector = PointBasedSelector(
+                image_array, generator, strategy="superpixel", superpixels=superpixel_index,
+                history_bytes=undo_memory * 1024 * 1024,
+            )
+        else:
+            selector = PointBasedSelector(image_array, generator, history_bytes=undo_memory * 1024 * 1024)
+        
+        # Restore the previous session on this image, if any
+        try:
+            resumed = selector.resume(journal)
+        except ValueError as e:
+            console.print(f"[red]Cannot resume session: {e}[/red]")
+            console.print("[dim]Run with --fresh to start over[/dim]")
+            sys.exit(1)
+        if resumed:
+            console.print(f"[green]✓ Resumed session: {len(selector.generated_masks)} masks, "
+                          f"{len(journal.completed)} features done[/green]")
         
         console.print("[green]✓ Ready for interactive selection[/green]")
         console.print("[dim]Click on the image to mark feature locations. SAM will find the area around each click.[/dim]\n")
@@ -557,7 +1030,7 @@ def select(
             console.print("[red]matplotlib is required for interactive selection[/red]")
             sys.exit(1)
         else:
-            _interactive_point_mode(console, selector, image_array)
+            _interactive_point_mode(console, selector, image_array, journal)
         
         # Save selections and generated masks
         output.mkdir(parents=True, exist_ok=True)
@@ -572,8 +1045,7 @@ def select(
                 for hole, selection in selector.get_all_selections().items()
             }
         }
-        with open(selections_path, "w") as f:
-            json.dump(selections_data, f, indent=2)
+        serialization.dump(selections_data, selections_path)
         console.print(f"\n[green]✓ Saved selections to {selections_path}[/green]")
         
         # Save generated masks
@@ -582,7 +1054,7 @@ def select(
             masks_dir.mkdir(parents=True, exist_ok=True)
             from .pipeline.masks import MaskGenerator
             # Create a temporary generator just for saving
-            temp_gen = MaskGenerator(checkpoint_path=str(checkpoint))
+            temp_gen = MaskGenerator(checkpoint_path=str(checkpoint) if checkpoint else None)
             temp_gen.save_masks(list(selector.generated_masks.values()), masks_dir)
             console.print(f"[green]✓ Saved {len(selector.generated_masks)} generated masks to {masks_dir}[/green]")
         
@@ -590,17 +1062,25 @@ def select(
         green_centers = selector.extract_green_centers()
         if green_centers:
             green_centers_path = metadata_dir / "green_centers.json"
-            with open(green_centers_path, "w") as f:
-                json.dump(green_centers, f, indent=2)
+            serialization.dump(green_centers, green_centers_path)
             console.print(f"[green]✓ Extracted and saved green centers to {green_centers_path}[/green]")
             console.print(f"[dim]   Found green centers for {len(green_centers)} holes[/dim]")
         else:
             console.print("[yellow]⚠ No green centers extracted (no green selections found)[/yellow]")
         
+        # Extract and save tee centers for tee→green corridor assignment
+        tee_centers = selector.extract_tee_centers()
+        if tee_centers:
+            tee_centers_path = metadata_dir / "tee_centers.json"
+            serialization.dump(tee_centers, tee_centers_path)
+            console.print(f"[green]✓ Extracted and saved tee centers to {tee_centers_path}[/green]")
+        
         console.print("\n[bold green]Selection complete![/bold green]")
         console.print(f"[dim]Next: Use these selections with the pipeline[/dim]")
         if green_centers:
             console.print(f"[dim]   Green centers saved to: {green_centers_path}[/dim]")
+        journal.close()
+        console.print(f"[dim]Session kept in {journal.directory} (--fresh to start over)[/dim]")
         
     except Exception as e:
         console.print(f"\n[red]Error: {e}[/red]")
@@ -609,8 +1089,13 @@ def select(
         sys.exit(1)
 
 
-def _interactive_point_mode(console, selector, image_array):
-    """Interactive point-based selection using matplotlib clicking."""
+def _interactive_point_mode(console, selector, image_array, journal=None):
+    """
+    Interactive point-based selection using matplotlib clicking.
+    
+    Features the session journal marks done are skipped, and finished
+    features are journaled.
+    """
     from .pipeline.visualize import InteractiveMaskSelector
     from .pipeline.interactive import FeatureType
     import matplotlib.pyplot as plt
@@ -636,6 +1121,10 @@ def _interactive_point_mode(console, selector, image_array):
         ]
         
         for feature_type, feature_name in feature_types:
+            if journal is not None and (hole, feature_type.value) in journal.completed:
+                console.print(f"[dim]Hole {hole} {feature_name}: done in a previous session[/dim]")
+                continue
+            
             console.print(f"\n[cyan]Click on {feature_name} for hole {hole}[/cyan]")
             console.print("[dim]Click on the image where you see the {feature_name}. You can click multiple times.[/dim]")
             console.print("[dim]Press Enter/Space or click 'Done' when finished[/dim]")
@@ -691,6 +1180,9 @@ def _interactive_point_mode(console, selector, image_array):
                     pass
                 plt.pause(0.2)  # Longer pause to reduce CPU and prevent "not responding"
             
+            # Masks still being generated in the background belong to this feature
+            interactive.wait_for_pending()
+            
             # Get selected masks (already assigned via click_to_mask)
             selected_ids = interactive.get_selected_mask_ids()
             
@@ -698,6 +1190,9 @@ def _interactive_point_mode(console, selector, image_array):
                 console.print(f"[green]✓ Marked {len(selected_ids)} {feature_name} location(s)[/green]")
             else:
                 console.print(f"[dim]No {feature_name} marked[/dim]")
+            
+            if journal is not None:
+                journal.log_done(hole, feature_type.value)
     
     # Close window at the very end (after all holes/features are done)
     if interactive is not None and interactive.fig is not None:
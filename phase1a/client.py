@@ -5,7 +5,6 @@ Main client class that orchestrates the complete Phase 1A pipeline.
 Can be used as a library or via CLI.
 """
 
-import json
 import logging
 from dataclasses import dataclass, field
 from pathlib import Path
@@ -26,7 +25,10 @@ from .pipeline import (
     SVGGenerator,
     SVGCleaner,
     PNGExporter,
+    RasterExporter,
+    TiledExporter,
 )
+from .pipeline import serialization
 from .pipeline.masks import MaskData
 from .pipeline.features import MaskFeatures
 from .pipeline.classify import Classification
@@ -64,6 +66,7 @@ class PipelineState:
     polygons: List[PolygonFeature] = field(default_factory=list)
     assignments_by_hole: Dict[int, List[HoleAssignment]] = field(default_factory=dict)
     svg_content: Optional[str] = None
+    svg_path: Optional[Path] = None  # Set once the SVG has been streamed to disk
     
     completed_stages: List[PipelineStage] = field(default_factory=list)
 
@@ -121,6 +124,8 @@ class Phase1AClient:
         self._svg_generator: Optional[SVGGenerator] = None
         self._svg_cleaner: Optional[SVGCleaner] = None
         self._png_exporter: Optional[PNGExporter] = None
+        self._raster_exporter: Optional[RasterExporter] = None
+        self._overlay_image: Optional[np.ndarray] = None  # Last raster render
         
         # Setup logging
         if self.config.verbose:
@@ -180,6 +185,13 @@ class Phase1AClient:
         
         return self.state.images
     
+    def _metadata_path(self, filename: str) -> Path:
+        """Path of a metadata intermediate in the configured format."""
+        return serialization.with_format(
+            self.output_dir / "metadata" / filename,
+            self.config.intermediate_format,
+        )
+    
     def _load_green_centers(self) -> Optional[List[Dict]]:
         """Load green centers if available."""
         if self.config.green_centers_file is None:
@@ -191,8 +203,20 @@ class Phase1AClient:
             )
             return None
         
-        with open(self.config.green_centers_file) as f:
-            return json.load(f)
+        return serialization.load(self.config.green_centers_file)
+    
+    def _load_tee_centers(self) -> Optional[List[Dict]]:
+        """Load tee centers if available."""
+        if self.config.tee_centers_file is None:
+            return None
+        
+        if not self.config.tee_centers_file.exists():
+            logger.warning(
+                f"Tee centers file not found: {self.config.tee_centers_file}"
+            )
+            return None
+        
+        return serialization.load(self.config.tee_centers_file)
     
     # =========================================================================
     # Pipeline Stages
@@ -216,6 +240,11 @@ class Phase1AClient:
                 pred_iou_thresh=self.config.sam.pred_iou_thresh,
                 stability_score_thresh=self.config.sam.stability_score_thresh,
                 min_mask_region_area=self.config.sam.min_mask_region_area,
+                use_server=self.config.sam.use_server,
+                server_address=self.config.sam.server_address,
+                backend=self.config.sam.backend,
+                onnx_dir=self.config.sam.onnx_dir,
+                quantized=self.config.sam.quantized,
             )
         
         image = self._load_image()
@@ -224,7 +253,9 @@ class Phase1AClient:
         # Save if configured
         if self.config.export_intermediates:
             masks_dir = self.output_dir / "masks"
-            self._mask_generator.save_masks(self.state.masks, masks_dir)
+            self._mask_generator.save_masks(
+                self.state.masks, masks_dir, format=self.config.intermediate_format
+            )
         
         self.state.completed_stages.append(PipelineStage.MASKS)
         logger.info(f"Generated {len(self.state.masks)} masks")
@@ -265,7 +296,7 @@ class Phase1AClient:
         
         # Save if configured
         if self.config.export_intermediates:
-            features_path = self.output_dir / "metadata" / "mask_features.json"
+            features_path = self._metadata_path("mask_features.json")
             self._feature_extractor.save_features(self.state.features, features_path)
         
         self.state.completed_stages.append(PipelineStage.FEATURES)
@@ -294,7 +325,7 @@ class Phase1AClient:
         
         # Save if configured
         if self.config.export_intermediates:
-            classifications_path = self.output_dir / "metadata" / "classifications.json"
+            classifications_path = self._metadata_path("classifications.json")
             self._classifier.save_classifications(
                 self.state.classifications, classifications_path
             )
@@ -332,6 +363,7 @@ class Phase1AClient:
                 self.state.review,
                 self.state.discarded,
                 reviews_dir,
+                format=self.config.intermediate_format,
             )
         
         self.state.completed_stages.append(PipelineStage.GATE)
@@ -365,7 +397,11 @@ class Phase1AClient:
         # Save if configured
         if self.config.export_intermediates:
             polygons_dir = self.output_dir / "polygons"
-            self._polygon_generator.save_polygons(self.state.polygons, polygons_dir)
+            self._polygon_generator.save_polygons(
+                self.state.polygons,
+                polygons_dir,
+                geojson=self.config.polygon.export_geojson,
+            )
         
         self.state.completed_stages.append(PipelineStage.POLYGONS)
         
@@ -384,9 +420,15 @@ class Phase1AClient:
             raise ValueError("No polygons available. Run generate_polygons() first.")
         
         green_centers = self._load_green_centers()
+        tee_centers = self._load_tee_centers()
         
         if self._hole_assigner is None:
-            self._hole_assigner = HoleAssigner(green_centers=green_centers)
+            self._hole_assigner = HoleAssigner(
+                green_centers=green_centers,
+                max_distance=self.config.holes.max_distance,
+                tee_centers=tee_centers,
+                corridor_width=self.config.holes.corridor_width,
+            )
         
         self.state.assignments_by_hole = self._hole_assigner.assign_all(
             self.state.polygons
@@ -394,7 +436,7 @@ class Phase1AClient:
         
         # Save if configured
         if self.config.export_intermediates:
-            assignments_path = self.output_dir / "metadata" / "hole_assignments.json"
+            assignments_path = self._metadata_path("hole_assignments.json")
             self._hole_assigner.save_assignments(
                 self.state.assignments_by_hole, assignments_path
             )
@@ -431,22 +473,30 @@ class Phase1AClient:
                 colors=self.config.svg.colors,
                 opacity=self.config.svg.opacity,
                 palette_path=palette_path,
+                precision=self.config.svg.precision,
+                path_mode=self.config.svg.path_mode,
+                curve_tolerance=self.config.svg.curve_tolerance,
+                cache_layers=self.config.svg.cache_layers,
             )
         
         self.state.svg_content = self._svg_generator.generate(
             self.state.assignments_by_hole
         )
+        self.state.svg_path = None
         
         self.state.completed_stages.append(PipelineStage.SVG)
         
         return self.state.svg_content
     
-    def cleanup_svg(self) -> str:
+    def cleanup_svg(self) -> Path:
         """
         Stage 8: Clean and optimize SVG geometry.
         
+        The cleaned SVG is streamed straight to ``course.svg`` rather than
+        being held in memory as a string.
+        
         Returns:
-            Updated SVG content
+            Path to the saved SVG
         """
         logger.info("Stage 8: Cleaning SVG geometry...")
         
@@ -462,32 +512,74 @@ class Phase1AClient:
         cleaned_assignments = self._svg_cleaner.clean(self.state.assignments_by_hole)
         self.state.assignments_by_hole = cleaned_assignments
         
-        # Regenerate SVG with cleaned geometry
-        self.state.svg_content = self._svg_generator.generate(cleaned_assignments)
-        
-        # Save SVG
+        # Regenerate SVG with cleaned geometry, streaming it to disk
         svg_path = self.output_dir / "course.svg"
-        with open(svg_path, "w") as f:
-            f.write(self.state.svg_content)
-        
-        logger.info(f"Saved SVG to {svg_path}")
+        self._svg_generator.save(cleaned_assignments, svg_path)
+        self.state.svg_path = svg_path
+        self.state.svg_content = None  # Stale: superseded by the cleaned SVG
         
         self.state.completed_stages.append(PipelineStage.CLEANUP)
         
-        return self.state.svg_content
+        return svg_path
     
     def export_png(self) -> Path:
         """
         Stage 9: Export SVG to PNG overlay.
         
+        With ``config.export.backend == "raster"`` the hole assignments are
+        rasterized directly instead of rendering the SVG with cairosvg.
+        With ``config.export.tile_layout`` set, a tile pyramid is written to
+        ``exports/tiles`` instead of a single PNG (always raster-rendered).
+        
         Returns:
-            Path to exported PNG
+            Path to exported PNG (or the tile root / ``.dzi`` descriptor)
         """
         logger.info("Stage 9: Exporting PNG...")
         
-        if self.state.svg_content is None:
+        if self.state.svg_content is None and self.state.svg_path is None:
             raise ValueError("No SVG content. Run generate_svg() first.")
         
+        exports_dir = self.output_dir / "exports"
+        exports_dir.mkdir(parents=True, exist_ok=True)
+        png_path = exports_dir / "overlay.png"
+        
+        export_config = self.config.export
+        if export_config.tile_layout is not None:
+            tiled_exporter = TiledExporter(
+                RasterExporter.from_generator(self._svg_generator),
+                tile_size=export_config.tile_size,
+                layout=export_config.tile_layout,
+                max_workers=export_config.tile_workers,
+            )
+            tiles_path = tiled_exporter.export(
+                self.state.assignments_by_hole, exports_dir / "tiles"
+            )
+            self.state.completed_stages.append(PipelineStage.EXPORT)
+            return tiles_path
+        
+        backend = export_config.backend
+        if backend == "raster":
+            if self._raster_exporter is None:
+                self._raster_exporter = RasterExporter.from_generator(self._svg_generator)
+            
+            # With cached SVG layers, only the area of changed layers is redrawn
+            image = None
+            dirty_bounds = self._svg_generator.take_dirty_bounds()
+            if self._overlay_image is not None and self._svg_generator.cache_layers:
+                image = self._overlay_image
+                if dirty_bounds is not None:
+                    self._raster_exporter.rerender(
+                        image, self.state.assignments_by_hole, dirty_bounds
+                    )
+            
+            self._overlay_image = self._raster_exporter.export(
+                self.state.assignments_by_hole, png_path, image=image
+            )
+            self.state.completed_stages.append(PipelineStage.EXPORT)
+            return png_path
+        if backend != "cairosvg":
+            raise ValueError(f"Unknown export backend: {backend}")
+        
         # Determine dimensions from image
         image = self._load_image()
         height, width = image.shape[:2]
@@ -499,16 +591,12 @@ class Phase1AClient:
             )
         
         # Save SVG first if not already saved
-        svg_path = self.output_dir / "course.svg"
+        svg_path = self.state.svg_path or self.output_dir / "course.svg"
         if not svg_path.exists():
             with open(svg_path, "w") as f:
                 f.write(self.state.svg_content)
         
         # Export PNG
-        exports_dir = self.output_dir / "exports"
-        exports_dir.mkdir(parents=True, exist_ok=True)
-        png_path = exports_dir / "overlay.png"
-        
         self._png_exporter.export(svg_path, png_path)
         
         self.state.completed_stages.append(PipelineStage.EXPORT)
@@ -568,10 +656,11 @@ class Phase1AClient:
         """
         svg_path = self.output_dir / "course.svg"
         png_path = self.output_dir / "exports" / "overlay.png"
+        tiles_dir = self.output_dir / "exports" / "tiles"
         
         checks = {
             "SVG exists": svg_path.exists(),
-            "PNG exists": png_path.exists(),
+            "PNG exists": png_path.exists() or tiles_dir.exists(),
             "Has hole assignments": len(self.state.assignments_by_hole) > 0,
             "Has polygons": len(self.state.polygons) > 0,
         }
@@ -618,9 +707,13 @@ class Phase1AClient:
         )
         return self.state.classifications
     
-    def load_polygons(self, polygons_dir: Path) -> List[PolygonFeature]:
-        """Load polygons from a previous run."""
-        self.state.polygons = PolygonGenerator.load_polygons(polygons_dir)
+    def load_polygons(
+        self,
+        polygons_dir: Path,
+        bbox: Optional[tuple] = None,
+    ) -> List[PolygonFeature]:
+        """Load polygons from a previous run (optionally only within bbox)."""
+        self.state.polygons = PolygonGenerator.load_polygons(polygons_dir, bbox=bbox)
         return self.state.polygons
     
     def reset(self) -> None:
@@ -6,7 +6,6 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Optional, List
 import json
-import yaml
 
 
 @dataclass
@@ -26,6 +25,11 @@ class SAMConfig:
     pred_iou_thresh: float = 0.88
     stability_score_thresh: float = 0.95
     min_mask_region_area: int = 100
+    use_server: bool = False  # Use a running `phase1a sam-server` if reachable
+    server_address: Optional[str] = None  # Socket path or host:port (None = default)
+    backend: str = "torch"  # "torch" or "onnx" (ONNX Runtime, for CPU-only nodes)
+    onnx_dir: Optional[str] = None  # Exported ONNX models (None = checkpoint's directory)
+    quantized: bool = False  # Use int8 quantized ONNX models
 
 
 @dataclass
@@ -34,6 +38,14 @@ class PolygonConfig:
     simplify_tolerance: float = 2.0
     min_area: float = 50.0
     buffer_distance: float = 0.0
+    export_geojson: bool = False  # Also write GeoJSON next to polygons.bin
+
+
+@dataclass
+class HoleConfig:
+    """Configuration for hole assignment."""
+    max_distance: float = 1000.0  # Max distance to nearest green (fallback)
+    corridor_width: float = 120.0  # Width of tee→green corridors in pixels
 
 
 @dataclass
@@ -42,6 +54,10 @@ class SVGConfig:
     width: int = 4096
     height: int = 4096
     opacity: float = 0.5  # Fill opacity for paths (matching RockRidge reference)
+    precision: int = 4  # Decimal places for path coordinates
+    path_mode: str = "relative"  # "relative", "absolute" or "auto" (shortest per ring)
+    curve_tolerance: Optional[float] = None  # Bezier fit tolerance in pixels (None = lines)
+    cache_layers: bool = True  # Only rebuild hole layers whose geometry changed
     
     # OPCD color palette (lowercase hex, matching reference SVG)
     colors: dict = field(default_factory=lambda: {
@@ -57,6 +73,15 @@ class SVGConfig:
     })
 
 
+@dataclass
+class ExportConfig:
+    """Configuration for PNG overlay export."""
+    backend: str = "cairosvg"  # "cairosvg" (render course.svg) or "raster" (direct OpenCV)
+    tile_layout: Optional[str] = None  # "xyz" or "dzi" tile pyramid instead of one PNG
+    tile_size: int = 256
+    tile_workers: Optional[int] = None  # Tile render processes (None = CPU count)
+
+
 @dataclass
 class Phase1AConfig:
     """Main configuration for Phase 1A pipeline."""
@@ -65,17 +90,21 @@ class Phase1AConfig:
     input_image: Optional[Path] = None
     input_images: Optional[List[Path]] = None  # Multiple images of same topography for better accuracy
     green_centers_file: Optional[Path] = None
+    tee_centers_file: Optional[Path] = None  # Enables tee→green corridor hole assignment
     output_dir: Path = field(default_factory=lambda: Path("phase1a_output"))
     
     # Sub-configurations
     thresholds: ThresholdConfig = field(default_factory=ThresholdConfig)
     sam: SAMConfig = field(default_factory=SAMConfig)
     polygon: PolygonConfig = field(default_factory=PolygonConfig)
+    holes: HoleConfig = field(default_factory=HoleConfig)
     svg: SVGConfig = field(default_factory=SVGConfig)
+    export: ExportConfig = field(default_factory=ExportConfig)
     
     # Pipeline options
     skip_review: bool = True
     export_intermediates: bool = True
+    intermediate_format: str = "json"  # "json" or "msgpack" (compact binary, needs msgspec)
     verbose: bool = False
     
     def __post_init__(self):
@@ -86,11 +115,15 @@ class Phase1AConfig:
             self.input_images = [Path(img) for img in self.input_images]
         if self.green_centers_file is not None:
             self.green_centers_file = Path(self.green_centers_file)
+        if self.tee_centers_file is not None:
+            self.tee_centers_file = Path(self.tee_centers_file)
         self.output_dir = Path(self.output_dir)
     
     @classmethod
     def from_yaml(cls, path: Path) -> "Phase1AConfig":
         """Load configuration from a YAML file."""
+        import yaml
+        
         with open(path) as f:
             data = yaml.safe_load(f)
         return cls._from_dict(data)
@@ -112,8 +145,12 @@ class Phase1AConfig:
             data["sam"] = SAMConfig(**data["sam"])
         if "polygon" in data:
             data["polygon"] = PolygonConfig(**data["polygon"])
+        if "holes" in data:
+            data["holes"] = HoleConfig(**data["holes"])
         if "svg" in data:
             data["svg"] = SVGConfig(**data["svg"])
+        if "export" in data:
+            data["export"] = ExportConfig(**data["export"])
         return cls(**data)
     
     def to_dict(self) -> dict:
@@ -122,6 +159,7 @@ class Phase1AConfig:
             "input_image": str(self.input_image) if self.input_image else None,
             "input_images": [str(img) for img in self.input_images] if self.input_images else None,
             "green_centers_file": str(self.green_centers_file) if self.green_centers_file else None,
+            "tee_centers_file": str(self.tee_centers_file) if self.tee_centers_file else None,
             "output_dir": str(self.output_dir),
             "thresholds": {
                 "high": self.thresholds.high,
@@ -135,25 +173,48 @@ class Phase1AConfig:
                 "pred_iou_thresh": self.sam.pred_iou_thresh,
                 "stability_score_thresh": self.sam.stability_score_thresh,
                 "min_mask_region_area": self.sam.min_mask_region_area,
+                "use_server": self.sam.use_server,
+                "server_address": self.sam.server_address,
+                "backend": self.sam.backend,
+                "onnx_dir": self.sam.onnx_dir,
+                "quantized": self.sam.quantized,
             },
             "polygon": {
                 "simplify_tolerance": self.polygon.simplify_tolerance,
                 "min_area": self.polygon.min_area,
                 "buffer_distance": self.polygon.buffer_distance,
+                "export_geojson": self.polygon.export_geojson,
+            },
+            "holes": {
+                "max_distance": self.holes.max_distance,
+                "corridor_width": self.holes.corridor_width,
             },
             "svg": {
                 "width": self.svg.width,
                 "height": self.svg.height,
                 "opacity": self.svg.opacity,
+                "precision": self.svg.precision,
+                "path_mode": self.svg.path_mode,
+                "curve_tolerance": self.svg.curve_tolerance,
+                "cache_layers": self.svg.cache_layers,
                 "colors": self.svg.colors,
             },
+            "export": {
+                "backend": self.export.backend,
+                "tile_layout": self.export.tile_layout,
+                "tile_size": self.export.tile_size,
+                "tile_workers": self.export.tile_workers,
+            },
             "skip_review": self.skip_review,
             "export_intermediates": self.export_intermediates,
+            "intermediate_format": self.intermediate_format,
             "verbose": self.verbose,
         }
     
     def to_yaml(self, path: Path) -> None:
         """Save configuration to YAML file."""
+        import yaml
+        
         with open(path, "w") as f:
             yaml.dump(self.to_dict(), f, default_flow_style=False)
     
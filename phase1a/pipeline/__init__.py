@@ -10,18 +10,60 @@ Each module corresponds to a stage in the Phase 1A pipeline:
 6. holes - Hole assignment
 7. svg - SVG generation and cleanup
 8. export - PNG export
+
+Stages are imported on first attribute access, so importing this package
+(or one light submodule such as ``serialization``) does not pull in
+matplotlib, OpenCV or torch.
 """
 
-from .masks import MaskGenerator
-from .features import FeatureExtractor
-from .classify import MaskClassifier
-from .gating import ConfidenceGate
-from .polygons import PolygonGenerator
-from .holes import HoleAssigner
-from .svg import SVGGenerator, SVGCleaner
-from .export import PNGExporter
-from .interactive import InteractiveSelector, HoleSelection, FeatureType
-from .point_selector import PointBasedSelector
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .masks import MaskGenerator
+    from .features import FeatureExtractor
+    from .classify import MaskClassifier
+    from .gating import ConfidenceGate
+    from .polygons import PolygonGenerator
+    from .holes import HoleAssigner
+    from .svg import SVGGenerator, SVGCleaner
+    from .export import PNGExporter, RasterExporter, TiledExporter
+    from .interactive import InteractiveSelector, HoleSelection, FeatureType
+    from .point_selector import PointBasedSelector
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    "MaskGenerator": "masks",
+    "FeatureExtractor": "features",
+    "MaskClassifier": "classify",
+    "ConfidenceGate": "gating",
+    "PolygonGenerator": "polygons",
+    "HoleAssigner": "holes",
+    "SVGGenerator": "svg",
+    "SVGCleaner": "svg",
+    "PNGExporter": "export",
+    "RasterExporter": "export",
+    "TiledExporter": "export",
+    "InteractiveSelector": "interactive",
+    "HoleSelection": "interactive",
+    "FeatureType": "interactive",
+    "PointBasedSelector": "point_selector",
+}
+
+
+def __getattr__(name: str):
+    """Import a stage class from its submodule on first access."""
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
 
 __all__ = [
     "MaskGenerator",
@@ -33,6 +75,8 @@ __all__ = [
     "SVGGenerator",
     "SVGCleaner",
     "PNGExporter",
+    "RasterExporter",
+    "TiledExporter",
     "InteractiveSelector",
     "HoleSelection",
     "FeatureType",
@@ -4,7 +4,6 @@ Mask Classification Module
 Classifies masks into feature types based on extracted features.
 """
 
-import json
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
@@ -13,6 +12,7 @@ import logging
 
 import numpy as np
 
+from . import serialization
 from .features import MaskFeatures
 
 logger = logging.getLogger(__name__)
@@ -310,21 +310,19 @@ class MaskClassifier:
         classifications: List[Classification],
         output_path: Path,
     ) -> None:
-        """Save classifications to JSON file."""
+        """Save classifications to JSON (or MessagePack, by suffix) file."""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         data = [c.to_dict() for c in classifications]
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        serialization.dump(data, output_path)
         
         logger.info(f"Saved classifications to {output_path}")
     
     @staticmethod
     def load_classifications(path: Path) -> List[Classification]:
-        """Load classifications from JSON file."""
-        with open(path) as f:
-            data = json.load(f)
+        """Load classifications from JSON (or MessagePack) file."""
+        data = serialization.load(path)
         
         classifications = []
         for item in data:
@@ -0,0 +1,309 @@
+"""
+Bezier Curve Fitting Module
+
+Fits cubic Bezier curves to polyline rings using Schneider's algorithm
+("An Algorithm for Automatically Fitting Digitized Curves", Graphics Gems).
+
+Used by SVGGenerator to emit smooth ``c`` path segments instead of one
+``l`` segment per vertex, so paths need far fewer nodes for the same shape.
+"""
+
+from typing import List, Optional
+
+import numpy as np
+
+# Newton-Raphson reparameterization attempts before splitting a segment
+MAX_REPARAMETERIZE_ITERATIONS = 4
+
+
+def _normalize(v: np.ndarray) -> np.ndarray:
+    """Normalize a 2D vector (zero vectors are returned unchanged)."""
+    length = np.hypot(v[0], v[1])
+    if length == 0:
+        return v
+    return v / length
+
+
+def _bernstein(u: np.ndarray) -> np.ndarray:
+    """Cubic Bernstein basis evaluated at parameters u, shape (N, 4)."""
+    mu = 1.0 - u
+    return np.stack([mu ** 3, 3 * u * mu ** 2, 3 * u ** 2 * mu, u ** 3], axis=1)
+
+
+def _evaluate(bezier: np.ndarray, u: np.ndarray) -> np.ndarray:
+    """Evaluate a cubic Bezier (4, 2) at parameters u, shape (N, 2)."""
+    return _bernstein(u) @ bezier
+
+
+def _chord_length_parameterize(points: np.ndarray) -> np.ndarray:
+    """Assign parameter values to points using relative chord length."""
+    lengths = np.hypot(*np.diff(points, axis=0).T)
+    u = np.concatenate([[0.0], np.cumsum(lengths)])
+    if u[-1] == 0:
+        return np.linspace(0.0, 1.0, len(points))
+    return u / u[-1]
+
+
+def _generate_bezier(
+    points: np.ndarray,
+    u: np.ndarray,
+    tangent_left: np.ndarray,
+    tangent_right: np.ndarray,
+) -> np.ndarray:
+    """
+    Least-squares fit of the two inner control points along fixed tangents.
+
+    Returns:
+        Control points array of shape (4, 2)
+    """
+    first, last = points[0], points[-1]
+    basis = _bernstein(u)
+
+    a_left = basis[:, 1:2] * tangent_left
+    a_right = basis[:, 2:3] * tangent_right
+
+    c00 = np.sum(a_left * a_left)
+    c01 = np.sum(a_left * a_right)
+    c11 = np.sum(a_right * a_right)
+
+    tmp = points - (
+        np.outer(basis[:, 0] + basis[:, 1], first)
+        + np.outer(basis[:, 2] + basis[:, 3], last)
+    )
+    x0 = np.sum(a_left * tmp)
+    x1 = np.sum(a_right * tmp)
+
+    det = c00 * c11 - c01 * c01
+    if det != 0:
+        alpha_left = (x0 * c11 - x1 * c01) / det
+        alpha_right = (c00 * x1 - c01 * x0) / det
+    else:
+        alpha_left = alpha_right = 0.0
+
+    # Fall back to the Wu/Barsky heuristic for degenerate solutions
+    segment_length = np.hypot(*(last - first))
+    epsilon = 1.0e-6 * segment_length
+    if alpha_left < epsilon or alpha_right < epsilon:
+        alpha_left = alpha_right = segment_length / 3.0
+
+    return np.array([
+        first,
+        first + tangent_left * alpha_left,
+        last + tangent_right * alpha_right,
+        last,
+    ])
+
+
+def _reparameterize(
+    bezier: np.ndarray,
+    points: np.ndarray,
+    u: np.ndarray,
+) -> np.ndarray:
+    """One Newton-Raphson step improving every parameter value at once."""
+    d1 = 3 * np.diff(bezier, axis=0)
+    d2 = 2 * np.diff(d1, axis=0)
+
+    mu = 1.0 - u
+    q = _evaluate(bezier, u)
+    q1 = np.outer(mu ** 2, d1[0]) + np.outer(2 * u * mu, d1[1]) + np.outer(u ** 2, d1[2])
+    q2 = np.outer(mu, d2[0]) + np.outer(u, d2[1])
+
+    diff = q - points
+    numerator = np.sum(diff * q1, axis=1)
+    denominator = np.sum(q1 * q1, axis=1) + np.sum(diff * q2, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        step = np.where(denominator != 0, numerator / denominator, 0.0)
+
+    return u - step
+
+
+def _max_error(
+    bezier: np.ndarray,
+    points: np.ndarray,
+    u: np.ndarray,
+    measured: np.ndarray,
+) -> tuple:
+    """
+    Largest squared distance between the measured points and the curve.
+
+    Returns:
+        Tuple of (max_squared_error, split_index); split_index is always a
+        measured interior point so recursion makes progress
+    """
+    interior = np.flatnonzero(measured[1:-1]) + 1
+    if len(interior) == 0:
+        return 0.0, len(points) // 2
+    errors = np.sum((_evaluate(bezier, u[interior]) - points[interior]) ** 2, axis=1)
+    worst = int(np.argmax(errors))
+    return float(errors[worst]), int(interior[worst])
+
+
+def _fit_cubic(
+    points: np.ndarray,
+    tangent_left: np.ndarray,
+    tangent_right: np.ndarray,
+    error: float,
+    segments: List[np.ndarray],
+    measured: np.ndarray,
+) -> None:
+    """
+    Recursively fit cubic segments to points, appending to segments.
+
+    All points shape the least-squares fit, but only those flagged in
+    measured (the ring's own vertices) have to be within the error.
+    """
+    if len(points) == 2:
+        dist = np.hypot(*(points[1] - points[0])) / 3.0
+        segments.append(np.array([
+            points[0],
+            points[0] + tangent_left * dist,
+            points[1] + tangent_right * dist,
+            points[1],
+        ]))
+        return
+
+    u = _chord_length_parameterize(points)
+    bezier = _generate_bezier(points, u, tangent_left, tangent_right)
+    max_error, split = _max_error(bezier, points, u, measured)
+    if max_error < error:
+        segments.append(bezier)
+        return
+
+    # Close enough to try improving the parameterization before splitting
+    if max_error < error * 4:
+        for _ in range(MAX_REPARAMETERIZE_ITERATIONS):
+            u = _reparameterize(bezier, points, u)
+            bezier = _generate_bezier(points, u, tangent_left, tangent_right)
+            max_error, split = _max_error(bezier, points, u, measured)
+            if max_error < error:
+                segments.append(bezier)
+                return
+
+    # Split at the point of maximum error and fit each half
+    tangent_center = _normalize(points[split - 1] - points[split + 1])
+    _fit_cubic(
+        points[:split + 1], tangent_left, tangent_center, error, segments, measured[:split + 1]
+    )
+    _fit_cubic(
+        points[split:], -tangent_center, tangent_right, error, segments, measured[split:]
+    )
+
+
+def _densify(points: np.ndarray, spacing: float) -> tuple:
+    """
+    Insert evenly spaced points along each edge of a polyline.
+
+    Returns:
+        Tuple of (dense_points, vertex_index) where vertex_index[i] is the
+        position of original vertex i in dense_points
+    """
+    edges = np.diff(points, axis=0)
+    lengths = np.hypot(edges[:, 0], edges[:, 1])
+    counts = np.maximum(np.ceil(lengths / spacing).astype(int), 1)
+
+    vertex_index = np.concatenate([[0], np.cumsum(counts)])
+    edge_of = np.repeat(np.arange(len(edges)), counts)
+    t = (np.arange(len(edge_of)) - vertex_index[edge_of]) / counts[edge_of]
+
+    dense = points[edge_of] + edges[edge_of] * t[:, None]
+    return np.vstack([dense, points[-1:]]), vertex_index
+
+
+def _corner_indices(points: np.ndarray, corner_angle: float) -> np.ndarray:
+    """Indices of closed-ring vertices whose turning angle exceeds corner_angle."""
+    incoming = points[:-1] - np.roll(points[:-1], 1, axis=0)
+    outgoing = np.roll(points[:-1], -1, axis=0) - points[:-1]
+
+    cross = incoming[:, 0] * outgoing[:, 1] - incoming[:, 1] * outgoing[:, 0]
+    dot = np.sum(incoming * outgoing, axis=1)
+    turning = np.abs(np.degrees(np.arctan2(cross, dot)))
+
+    return np.flatnonzero(turning > corner_angle)
+
+
+def fit_ring(
+    coords: np.ndarray,
+    tolerance: float,
+    corner_angle: float = 60.0,
+) -> Optional[np.ndarray]:
+    """
+    Fit a closed ring with a chain of cubic Bezier segments.
+
+    Edges are densified so the least-squares fit follows the whole
+    polyline, but the error is only measured at the ring's own vertices:
+    a simplified ring is already within the simplification tolerance of
+    the true outline, and tracking its straight edges too would need
+    more curve segments than the ring has lines. Vertices that
+    turn more sharply than corner_angle are kept as curve endpoints with
+    one-sided tangents; elsewhere the curve stays smooth, including across
+    the ring's closing point.
+
+    Args:
+        coords: (N, 2) closed ring coordinates (first point == last point)
+        tolerance: Maximum distance in pixels between ring vertices and curve
+        corner_angle: Turning angle in degrees above which a vertex is a corner
+
+    Returns:
+        Array of shape (K, 4, 2) with the control points of each segment,
+        or None if the ring is too short to fit
+    """
+    points = np.asarray(coords, dtype=float)
+
+    # Drop consecutive duplicates; they break tangent estimation
+    keep = np.concatenate([[True], np.any(np.diff(points, axis=0) != 0, axis=1)])
+    points = points[keep]
+    if len(points) < 4:
+        return None
+
+    corners = _corner_indices(points, corner_angle)
+    dense, vertex_index = _densify(points, spacing=max(tolerance, 0.5))
+    measured = np.zeros(len(dense), dtype=bool)
+    measured[vertex_index] = True
+    error = tolerance ** 2
+
+    segments: List[np.ndarray] = []
+
+    if len(corners) == 0:
+        seam_tangent = _normalize(dense[1] - dense[-2])
+        _fit_cubic(dense, seam_tangent, -seam_tangent, error, segments, measured)
+        return np.stack(segments)
+
+    # Rotate the ring so it starts at the first corner, then fit each
+    # corner-to-corner piece independently
+    start = vertex_index[corners[0]]
+    ring = np.vstack([dense[start:-1], dense[:start + 1]])
+    ring_measured = np.concatenate([measured[start:-1], measured[:start + 1]])
+    breaks = np.append((vertex_index[corners] - start) % (len(dense) - 1), len(ring) - 1)
+
+    for begin, end in zip(breaks[:-1], breaks[1:]):
+        piece = ring[begin:end + 1]
+        _fit_cubic(
+            piece,
+            _normalize(piece[1] - piece[0]),
+            _normalize(piece[-2] - piece[-1]),
+            error,
+            segments,
+            ring_measured[begin:end + 1],
+        )
+
+    return np.stack(segments)
+
+
+def fit_rings(
+    rings: List[np.ndarray],
+    tolerance: float,
+    corner_angle: float = 60.0,
+) -> List[Optional[np.ndarray]]:
+    """
+    Fit cubic Bezier chains to several closed rings, one fit_ring() each.
+
+    Args:
+        rings: List of (N, 2) closed ring coordinate arrays
+        tolerance: Maximum distance in pixels between ring vertices and curve
+        corner_angle: Turning angle in degrees above which a vertex is a corner
+
+    Returns:
+        List of (K, 4, 2) control point arrays (None where a ring is too short)
+    """
+    return [fit_ring(ring, tolerance, corner_angle) for ring in rings]
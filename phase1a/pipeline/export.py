@@ -2,12 +2,40 @@
 PNG Export Module
 
 Renders SVG to PNG overlay image.
+
+Two backends are available:
+- PNGExporter: renders an SVG document with cairosvg
+- RasterExporter: rasterizes hole assignment geometries directly with
+  OpenCV, skipping SVG serialization and parsing
+
+TiledExporter builds an XYZ or DeepZoom tile pyramid on top of the raster
+backend for overlays too large to render as a single PNG.
+
+export_svgs_to_png renders batches of SVGs (or several sizes of each)
+across a process pool.
 """
 
+import io
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import (
+    Any, BinaryIO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple,
+    TYPE_CHECKING,
+)
 import logging
 
+import numpy as np
+
+if TYPE_CHECKING:
+    from .holes import HoleAssignment
+    from .svg import SVGGenerator
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,6 +46,9 @@ class PNGExporter:
     Resolution matches satellite image or defined scale.
     """
     
+    # Streamed SVG documents larger than this are spooled to disk
+    SPOOL_MAX_SIZE = 16 * 1024 * 1024
+    
     def __init__(
         self,
         width: Optional[int] = None,
@@ -39,19 +70,14 @@ class PNGExporter:
         self.background_color = background_color
         self.dpi = dpi
     
-    def export(
-        self,
-        svg_path: Path,
-        output_path: Path,
-    ) -> None:
+    def _render(self, output_path: Path, **source) -> None:
         """
-        Export SVG to PNG.
+        Render an SVG source to PNG with cairosvg.
         
         Args:
-            svg_path: Path to input SVG
             output_path: Path to output PNG
+            **source: cairosvg input argument (url, bytestring or file_obj)
         """
-        svg_path = Path(svg_path)
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -66,7 +92,7 @@ class PNGExporter:
         
         # Build export options
         kwargs = {
-            "url": str(svg_path),
+            **source,
             "write_to": str(output_path),
             "dpi": self.dpi,
         }
@@ -85,6 +111,20 @@ class PNGExporter:
         
         logger.info(f"Exported PNG to {output_path}")
     
+    def export(
+        self,
+        svg_path: Path,
+        output_path: Path,
+    ) -> None:
+        """
+        Export SVG to PNG.
+        
+        Args:
+            svg_path: Path to input SVG
+            output_path: Path to output PNG
+        """
+        self._render(output_path, url=str(Path(svg_path)))
+    
     def export_from_string(
         self,
         svg_content: str,
@@ -97,38 +137,47 @@ class PNGExporter:
             svg_content: SVG content as string
             output_path: Path to output PNG
         """
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        try:
-            import cairosvg
-        except ImportError:
-            logger.error(
-                "cairosvg is required for PNG export. "
-                "Install with: pip install cairosvg"
-            )
-            raise
-        
-        # Build export options
-        kwargs = {
-            "bytestring": svg_content.encode("utf-8"),
-            "write_to": str(output_path),
-            "dpi": self.dpi,
-        }
-        
-        if self.width is not None:
-            kwargs["output_width"] = self.width
-        
-        if self.height is not None:
-            kwargs["output_height"] = self.height
+        self._render(output_path, bytestring=svg_content.encode("utf-8"))
+    
+    def export_from_stream(
+        self,
+        svg_stream: BinaryIO,
+        output_path: Path,
+    ) -> None:
+        """
+        Export SVG read from a binary file-like object to PNG.
         
-        if self.background_color is not None:
-            kwargs["background_color"] = self.background_color
+        Args:
+            svg_stream: Binary file-like object positioned at the SVG start
+            output_path: Path to output PNG
+        """
+        self._render(output_path, file_obj=svg_stream)
+    
+    def export_from_generator(
+        self,
+        generator: "SVGGenerator",
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+        output_path: Path,
+    ) -> None:
+        """
+        Stream SVG from a generator straight into the PNG renderer.
         
-        # Export
-        cairosvg.svg2png(**kwargs)
+        The SVG is written once, as UTF-8 bytes, into a spooled temporary
+        file (kept in memory up to SPOOL_MAX_SIZE, then on disk) instead
+        of being built as a string and re-encoded.
         
-        logger.info(f"Exported PNG to {output_path}")
+        Args:
+            generator: SVGGenerator used to write the document
+            assignments_by_hole: Dictionary mapping holes to assignments
+            output_path: Path to output PNG
+        """
+        with tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MAX_SIZE) as spool:
+            text = io.TextIOWrapper(spool, encoding="utf-8", newline="")
+            generator.write(assignments_by_hole, text)
+            text.flush()
+            text.detach()
+            spool.seek(0)
+            self.export_from_stream(spool, output_path)
     
     def get_dimensions(self, svg_path: Path) -> Tuple[int, int]:
         """
@@ -155,6 +204,589 @@ class PNGExporter:
         return width, height
 
 
+class RasterExporter:
+    """
+    Export hole assignments to PNG by rasterizing geometries directly.
+    
+    Produces the same overlay as rendering the generated SVG with
+    PNGExporter (same OPCD palette, per-path opacity, layer and path
+    order, source-over blending) without building or parsing SVG text.
+    Each path is filled with cv2.fillPoly (anti-aliased, sub-pixel
+    precision) and blended only inside its own bounding box.
+    """
+    
+    # Fractional bits used for sub-pixel vertex coordinates in fillPoly
+    SHIFT = 4
+    
+    # Pixels rasterized beyond each clipped bounding box edge, then cropped
+    CLIP_MARGIN = 2
+    
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        colors: Dict[str, str],
+        opacity: float = 0.5,
+        output_width: Optional[int] = None,
+        output_height: Optional[int] = None,
+        background_color: Optional[str] = None,
+    ):
+        """
+        Initialize the raster exporter.
+        
+        Args:
+            width: Geometry coordinate space width (SVG width)
+            height: Geometry coordinate space height (SVG height)
+            colors: Feature class to hex color mapping (SVGGenerator.colors)
+            opacity: Fill opacity for every path
+            output_width: Output width (None = width)
+            output_height: Output height (None = height)
+            background_color: Background hex color (None = transparent)
+        """
+        self.width = width
+        self.height = height
+        self.colors = colors
+        self.opacity = opacity
+        self.output_width = output_width or width
+        self.output_height = output_height or height
+        self.background_color = background_color
+    
+    @classmethod
+    def from_generator(
+        cls,
+        generator: "SVGGenerator",
+        **kwargs,
+    ) -> "RasterExporter":
+        """Create a raster exporter matching an SVGGenerator's size and palette."""
+        return cls(
+            width=generator.width,
+            height=generator.height,
+            colors=generator.colors,
+            opacity=generator.opacity,
+            **kwargs,
+        )
+    
+    @staticmethod
+    def _hex_to_rgb(color: str) -> np.ndarray:
+        """Convert '#rrggbb' to a float RGB array in [0, 1]."""
+        color = color.lstrip("#")
+        return np.array([int(color[i:i + 2], 16) for i in (0, 2, 4)]) / 255.0
+    
+    def _color_for(self, feature_class: str) -> str:
+        """Fill color for a feature class (same fallback as SVGGenerator)."""
+        return self.colors.get(feature_class, self.colors.get("ignore", "#cccccc"))
+    
+    def _coverage(
+        self,
+        geometry: Any,
+        scale: Tuple[float, float],
+        region: Tuple[int, int, int, int],
+    ) -> Optional[Tuple[np.ndarray, int, int]]:
+        """
+        Rasterize a geometry into an anti-aliased coverage mask.
+        
+        Args:
+            geometry: Shapely Polygon or MultiPolygon in SVG coordinates
+            scale: (sx, sy) from SVG coordinates to output pixels
+            region: (x, y, width, height) output-pixel window being rendered
+        
+        Returns:
+            Tuple of (coverage in [0, 1], x0, y0) for the bounding box
+            clipped to the region (x0, y0 relative to the region), or None
+            if the geometry is empty or outside the region
+        """
+        import cv2
+        import shapely
+        from shapely.geometry import Polygon, MultiPolygon
+        
+        if not isinstance(geometry, (Polygon, MultiPolygon)) or geometry.is_empty:
+            return None
+        
+        sx, sy = scale
+        rx, ry, rw, rh = region
+        minx, miny, maxx, maxy = geometry.bounds
+        x0 = max(int(np.floor(minx * sx)) - 1 - rx, 0)
+        y0 = max(int(np.floor(miny * sy)) - 1 - ry, 0)
+        x1 = min(int(np.ceil(maxx * sx)) + 1 - rx, rw)
+        y1 = min(int(np.ceil(maxy * sy)) + 1 - ry, rh)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        
+        # Anti-aliasing differs along the image border, so rasterize with a
+        # margin and crop; tiles then match the full render exactly
+        m = self.CLIP_MARGIN
+        
+        rings = shapely.get_rings(shapely.get_parts(geometry))
+        coords, ring_index = shapely.get_coordinates(rings, return_index=True)
+        
+        # Scale to output pixels, shift into the bbox, fixed-point for fillPoly
+        # (pixel centers are at +0.5 in SVG space, at integers in OpenCV)
+        fixed = np.round(
+            ((coords * (sx, sy)) - (rx + x0 - m, ry + y0 - m) - 0.5) * (1 << self.SHIFT)
+        ).astype(np.int32)
+        contours = np.split(fixed, np.flatnonzero(np.diff(ring_index)) + 1)
+        
+        mask = np.zeros((y1 - y0 + 2 * m, x1 - x0 + 2 * m), dtype=np.uint8)
+        cv2.fillPoly(mask, contours, 255, lineType=cv2.LINE_AA, shift=self.SHIFT)
+        mask = mask[m:-m, m:-m]
+        
+        return mask.astype(np.float32) / 255.0, x0, y0
+    
+    @property
+    def scale(self) -> Tuple[float, float]:
+        """Scale factors from SVG coordinates to output pixels."""
+        return (
+            self.output_width / self.width,
+            self.output_height / self.height,
+        )
+    
+    def paths(
+        self,
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+    ) -> List[Tuple[Any, str]]:
+        """
+        Flatten hole assignments into paths in SVG drawing order.
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            
+        Returns:
+            List of (geometry, feature_class) tuples, bottom layer first
+        """
+        from .svg import SVGGenerator
+        
+        return [
+            (assignment.polygon.geometry, assignment.polygon.feature_class)
+            for hole in SVGGenerator.HOLE_ORDER
+            for assignment in assignments_by_hole.get(hole, [])
+        ]
+    
+    def render_paths(
+        self,
+        paths: List[Tuple[Any, str]],
+        region: Optional[Tuple[int, int, int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Render paths (see paths()) to an RGBA image.
+        
+        Args:
+            paths: List of (geometry, feature_class) tuples, bottom layer first
+            region: (x, y, width, height) output-pixel window to render
+                (None = the whole output)
+            
+        Returns:
+            RGBA uint8 array of shape (height, width, 4) for the region
+        """
+        if region is None:
+            region = (0, 0, self.output_width, self.output_height)
+        _, _, region_width, region_height = region
+        
+        # Straight (non-premultiplied) RGBA canvas in [0, 1]
+        canvas = np.zeros((region_height, region_width, 4), dtype=np.float32)
+        if self.background_color is not None:
+            canvas[..., :3] = self._hex_to_rgb(self.background_color)
+            canvas[..., 3] = 1.0
+        
+        scale = self.scale
+        
+        for geometry, feature_class in paths:
+            rasterized = self._coverage(geometry, scale, region)
+            if rasterized is None:
+                continue
+            
+            coverage, x0, y0 = rasterized
+            h, w = coverage.shape
+            target = canvas[y0:y0 + h, x0:x0 + w]
+            
+            # Source-over compositing, restricted to the path's bbox
+            src_alpha = coverage * self.opacity
+            dst_alpha = target[..., 3]
+            out_alpha = src_alpha + dst_alpha * (1.0 - src_alpha)
+            
+            src_rgb = self._hex_to_rgb(self._color_for(feature_class))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                out_rgb = (
+                    src_rgb * src_alpha[..., None]
+                    + target[..., :3] * (dst_alpha * (1.0 - src_alpha))[..., None]
+                ) / out_alpha[..., None]
+            
+            drawn = src_alpha > 0
+            target[..., :3] = np.where(drawn[..., None], out_rgb, target[..., :3])
+            target[..., 3] = out_alpha
+        
+        return np.round(canvas * 255.0).astype(np.uint8)
+    
+    def render(
+        self,
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+        region: Optional[Tuple[int, int, int, int]] = None,
+    ) -> np.ndarray:
+        """
+        Render hole assignments to an RGBA image.
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            region: (x, y, width, height) output-pixel window to render
+                (None = the whole output)
+            
+        Returns:
+            RGBA uint8 array of shape (output_height, output_width, 4), or
+            of the region's shape
+        """
+        return self.render_paths(self.paths(assignments_by_hole), region)
+    
+    def rerender(
+        self,
+        image: np.ndarray,
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+        bounds: Tuple[float, float, float, float],
+    ) -> np.ndarray:
+        """
+        Re-render only a dirty area of a previous render, in place.
+        
+        Region renders are pixel-identical to the full render, so the
+        result matches render(assignments_by_hole) when bounds cover every
+        geometry that changed (old and new, e.g. from
+        SVGGenerator.take_dirty_bounds()).
+        
+        Args:
+            image: RGBA image returned by render() for earlier assignments
+            assignments_by_hole: Current hole assignments
+            bounds: (minx, miny, maxx, maxy) dirty area in SVG coordinates
+            
+        Returns:
+            The updated image
+        """
+        sx, sy = self.scale
+        minx, miny, maxx, maxy = bounds
+        
+        # Anti-aliased edges reach one pixel beyond the geometry bounds
+        x0 = max(int(np.floor(minx * sx)) - 1, 0)
+        y0 = max(int(np.floor(miny * sy)) - 1, 0)
+        x1 = min(int(np.ceil(maxx * sx)) + 1, self.output_width)
+        y1 = min(int(np.ceil(maxy * sy)) + 1, self.output_height)
+        if x1 <= x0 or y1 <= y0:
+            return image
+        
+        image[y0:y1, x0:x1] = self.render(
+            assignments_by_hole, region=(x0, y0, x1 - x0, y1 - y0)
+        )
+        
+        logger.debug(f"Re-rendered dirty region {x1 - x0}x{y1 - y0} at ({x0}, {y0})")
+        return image
+    
+    def export(
+        self,
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+        output_path: Path,
+        image: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Render hole assignments and save as PNG.
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            output_path: Path to output PNG
+            image: Up-to-date render to save (e.g. after rerender());
+                None renders from scratch
+            
+        Returns:
+            The saved RGBA image
+        """
+        from PIL import Image
+        
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        if image is None:
+            image = self.render(assignments_by_hole)
+        Image.fromarray(image, mode="RGBA").save(output_path)
+        
+        logger.info(f"Exported PNG to {output_path}")
+        return image
+
+
+# Per-process state for tile workers, set by _init_tile_worker
+_tile_worker: Dict[str, Any] = {}
+
+
+def _init_tile_worker(exporter: RasterExporter, paths: List[Tuple[Any, str]]) -> None:
+    """Receive the exporter and paths once per worker process."""
+    from shapely import STRtree
+    
+    _tile_worker["exporter"] = exporter
+    _tile_worker["paths"] = paths
+    _tile_worker["tree"] = STRtree([geometry for geometry, _ in paths])
+
+
+def _save_tile(image: np.ndarray, tile_path: Path, tile_size: Optional[int]) -> None:
+    """Save an RGBA tile, padding it to tile_size x tile_size if given."""
+    from PIL import Image
+    
+    if tile_size is not None and image.shape[:2] != (tile_size, tile_size):
+        padded = np.zeros((tile_size, tile_size, 4), dtype=np.uint8)
+        padded[:image.shape[0], :image.shape[1]] = image
+        image = padded
+    
+    tile_path.parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(image, mode="RGBA").save(tile_path)
+
+
+def _render_tile(
+    region: Tuple[int, int, int, int],
+    tile_path: Path,
+    pad_to: Optional[int],
+) -> None:
+    """Render one full-resolution tile, drawing only the paths it touches."""
+    from shapely.geometry import box
+    
+    exporter: RasterExporter = _tile_worker["exporter"]
+    paths = _tile_worker["paths"]
+    
+    x, y, w, h = region
+    sx, sy = exporter.scale
+    window = box((x - 1) / sx, (y - 1) / sy, (x + w + 1) / sx, (y + h + 1) / sy)
+    
+    # Query in draw order so overlapping paths still blend bottom-up
+    hits = np.sort(_tile_worker["tree"].query(window, predicate="intersects"))
+    
+    image = exporter.render_paths([paths[i] for i in hits], region)
+    _save_tile(image, tile_path, pad_to)
+
+
+def _downsample_tile(
+    children: List[Tuple[Optional[Path], int, int]],
+    size: Tuple[int, int],
+    tile_path: Path,
+    pad_to: Optional[int],
+) -> None:
+    """
+    Build a tile from up to four child tiles of the next finer level.
+    
+    Args:
+        children: (child_path or None, x offset, y offset) within the 2x block
+        size: (width, height) of the resulting tile
+        tile_path: Where to save the tile
+        pad_to: Pad the tile to this square size (None = no padding)
+    """
+    from PIL import Image
+    
+    width, height = size
+    block = np.zeros((2 * height, 2 * width, 4), dtype=np.float32)
+    for child_path, x, y in children:
+        if child_path is None or not child_path.exists():
+            continue
+        child = np.asarray(Image.open(child_path).convert("RGBA"), dtype=np.float32)
+        child = child[:block.shape[0] - y, :block.shape[1] - x]
+        block[y:y + child.shape[0], x:x + child.shape[1]] = child
+    
+    # Box filter in premultiplied space so transparent pixels don't darken
+    block[..., :3] *= block[..., 3:] / 255.0
+    pooled = block.reshape(height, 2, width, 2, 4).mean(axis=(1, 3))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pooled[..., :3] = np.where(
+            pooled[..., 3:] > 0, pooled[..., :3] * 255.0 / pooled[..., 3:], 0.0
+        )
+    
+    _save_tile(np.round(pooled).astype(np.uint8), tile_path, pad_to)
+
+
+class TiledExporter:
+    """
+    Export hole assignments as a tile pyramid instead of one large PNG.
+    
+    The finest level is rendered tile by tile with RasterExporter (each
+    tile only draws the paths that intersect it); every coarser level is
+    downsampled 2x from the level above. Tiles are produced in parallel
+    worker processes and written straight to disk, so memory use is
+    bounded by a few tiles per worker rather than the full overlay.
+    
+    Layouts:
+        xyz: ``<output_dir>/{z}/{x}/{y}.png`` with square tiles (edge tiles
+            padded with transparency), zoom 0 = whole overlay in one tile,
+            plus a ``tiles.json`` describing the pyramid
+        dzi: DeepZoom ``<name>.dzi`` descriptor and
+            ``<name>_files/{level}/{col}_{row}.png`` down to a 1x1 level
+    """
+    
+    LAYOUTS = ("xyz", "dzi")
+    
+    def __init__(
+        self,
+        exporter: RasterExporter,
+        tile_size: int = 256,
+        layout: str = "xyz",
+        max_workers: Optional[int] = None,
+    ):
+        """
+        Initialize the tiled exporter.
+        
+        Args:
+            exporter: Raster exporter defining size, palette and opacity
+            tile_size: Tile width and height in pixels
+            layout: Pyramid layout, "xyz" or "dzi"
+            max_workers: Worker processes (None = CPU count, 1 = in-process)
+        """
+        if layout not in self.LAYOUTS:
+            raise ValueError(
+                f"Invalid tile layout '{layout}', expected one of {self.LAYOUTS}"
+            )
+        
+        self.exporter = exporter
+        self.tile_size = tile_size
+        self.layout = layout
+        self.max_workers = max_workers or os.cpu_count() or 1
+    
+    def level_sizes(self) -> List[Tuple[int, int]]:
+        """
+        Pixel size of each pyramid level, finest (full resolution) first.
+        
+        Returns:
+            List of (width, height) tuples
+        """
+        width, height = self.exporter.output_width, self.exporter.output_height
+        
+        if self.layout == "dzi":
+            count = math.ceil(math.log2(max(width, height, 1))) + 1
+        else:
+            count = max(math.ceil(math.log2(max(width, height) / self.tile_size)), 0) + 1
+        
+        return [
+            (math.ceil(width / 2 ** k), math.ceil(height / 2 ** k))
+            for k in range(count)
+        ]
+    
+    def _grid(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        """Number of (columns, rows) of tiles for a level size."""
+        return (math.ceil(size[0] / self.tile_size), math.ceil(size[1] / self.tile_size))
+    
+    def _tile_path(
+        self,
+        root: Path,
+        level: int,
+        col: int,
+        row: int,
+    ) -> Path:
+        """Path of a tile; level counts from 0 = finest."""
+        top = len(self.level_sizes()) - 1
+        if self.layout == "dzi":
+            return root / str(top - level) / f"{col}_{row}.png"
+        return root / str(top - level) / str(col) / f"{row}.png"
+    
+    def _write_metadata(self, output_dir: Path, name: str) -> Path:
+        """Write the pyramid descriptor and return the path clients open."""
+        width, height = self.exporter.output_width, self.exporter.output_height
+        
+        if self.layout == "dzi":
+            dzi_path = output_dir / f"{name}.dzi"
+            dzi_path.write_text(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" '
+                f'TileSize="{self.tile_size}" Overlap="0" Format="png">'
+                f'<Size Width="{width}" Height="{height}"/></Image>\n'
+            )
+            return dzi_path
+        
+        with open(output_dir / "tiles.json", "w") as f:
+            json.dump({
+                "layout": self.layout,
+                "tile_size": self.tile_size,
+                "width": width,
+                "height": height,
+                "min_zoom": 0,
+                "max_zoom": len(self.level_sizes()) - 1,
+            }, f, indent=2)
+        return output_dir
+    
+    def export(
+        self,
+        assignments_by_hole: Dict[int, List["HoleAssignment"]],
+        output_dir: Path,
+        name: str = "overlay",
+    ) -> Path:
+        """
+        Render hole assignments into a tile pyramid.
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            output_dir: Directory to write the pyramid into
+            name: Base name of the DeepZoom descriptor (dzi layout only)
+            
+        Returns:
+            Path to the ``.dzi`` file (dzi) or the tile root directory (xyz)
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        root = output_dir / f"{name}_files" if self.layout == "dzi" else output_dir
+        
+        ts = self.tile_size
+        pad_to = ts if self.layout == "xyz" else None
+        sizes = self.level_sizes()
+        paths = self.exporter.paths(assignments_by_hole)
+        
+        # Finest level: rendered from geometry
+        width, height = sizes[0]
+        cols, rows = self._grid(sizes[0])
+        render_jobs = [
+            (
+                (col * ts, row * ts, min(ts, width - col * ts), min(ts, height - row * ts)),
+                self._tile_path(root, 0, col, row),
+                pad_to,
+            )
+            for col in range(cols)
+            for row in range(rows)
+        ]
+        
+        # Coarser levels: each tile downsampled from its 2x2 children
+        downsample_levels = []
+        for level in range(1, len(sizes)):
+            width, height = sizes[level]
+            cols, rows = self._grid(sizes[level])
+            child_cols, child_rows = self._grid(sizes[level - 1])
+            jobs = []
+            for col in range(cols):
+                for row in range(rows):
+                    children = [
+                        (
+                            self._tile_path(root, level - 1, 2 * col + dx, 2 * row + dy)
+                            if 2 * col + dx < child_cols and 2 * row + dy < child_rows
+                            else None,
+                            dx * ts,
+                            dy * ts,
+                        )
+                        for dx in (0, 1)
+                        for dy in (0, 1)
+                    ]
+                    size = (min(ts, width - col * ts), min(ts, height - row * ts))
+                    jobs.append((children, size, self._tile_path(root, level, col, row), pad_to))
+            downsample_levels.append(jobs)
+        
+        if self.max_workers == 1:
+            _init_tile_worker(self.exporter, paths)
+            for job in render_jobs:
+                _render_tile(*job)
+            for jobs in downsample_levels:
+                for job in jobs:
+                    _downsample_tile(*job)
+        else:
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=_init_tile_worker,
+                initargs=(self.exporter, paths),
+            ) as executor:
+                list(executor.map(_render_tile, *zip(*render_jobs)))
+                # Levels depend on each other; tiles within a level don't
+                for jobs in downsample_levels:
+                    list(executor.map(_downsample_tile, *zip(*jobs)))
+        
+        tile_count = len(render_jobs) + sum(len(jobs) for jobs in downsample_levels)
+        logger.info(
+            f"Exported {tile_count} tiles in {len(sizes)} levels to {output_dir}"
+        )
+        
+        return self._write_metadata(output_dir, name)
+
+
 def export_svg_to_png(
     svg_path: Path,
     output_path: Path,
@@ -172,3 +804,123 @@ def export_svg_to_png(
     """
     exporter = PNGExporter(width=width, height=height)
     exporter.export(svg_path, output_path)
+
+
+@dataclass
+class ExportJob:
+    """One SVG to PNG render in a batch."""
+    svg_path: Path
+    output_path: Path
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+@dataclass
+class ExportResult:
+    """Outcome and timing of one ExportJob."""
+    job: ExportJob
+    seconds: float
+    error: Optional[str] = None
+    
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _run_export_job(job: ExportJob) -> ExportResult:
+    """Render one job, capturing failures instead of raising."""
+    start = time.perf_counter()
+    try:
+        export_svg_to_png(job.svg_path, job.output_path, job.width, job.height)
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return ExportResult(job=job, seconds=time.perf_counter() - start, error=error)
+
+
+def batch_jobs(
+    svg_paths: Sequence[Path],
+    output_dir: Optional[Path] = None,
+    widths: Optional[Sequence[Optional[int]]] = None,
+) -> List[ExportJob]:
+    """
+    Build export jobs for many SVGs and/or many sizes of each.
+    
+    Outputs are named ``<stem>.png`` for full size and ``<stem>_<width>.png``
+    for scaled renders (height follows the SVG aspect ratio).
+    
+    Args:
+        svg_paths: Input SVG files
+        output_dir: Directory for PNGs (None = next to each SVG)
+        widths: Output widths, None entries meaning full size
+            (None = full size only)
+            
+    Returns:
+        List of ExportJob, grouped by SVG
+    """
+    jobs = []
+    for svg_path in svg_paths:
+        svg_path = Path(svg_path)
+        target_dir = Path(output_dir) if output_dir is not None else svg_path.parent
+        for width in widths or [None]:
+            name = svg_path.stem if width is None else f"{svg_path.stem}_{width}"
+            jobs.append(ExportJob(svg_path, target_dir / f"{name}.png", width=width))
+    return jobs
+
+
+def export_svgs_to_png(
+    jobs: Iterable[ExportJob],
+    max_workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    on_result: Optional[Callable[[ExportResult], None]] = None,
+) -> List[ExportResult]:
+    """
+    Render many SVG to PNG jobs across a process pool.
+    
+    cairosvg is single-threaded, so each job runs in its own worker
+    process. Jobs are pulled lazily from the iterable and at most
+    max_pending are in flight at once, so large batches don't queue
+    every job (and its result) up front. A failing job is reported in
+    its ExportResult and does not stop the batch.
+    
+    Args:
+        jobs: Jobs to render (may be a generator)
+        max_workers: Worker processes (None = CPU count, 1 = in-process)
+        max_pending: Maximum submitted-but-unfinished jobs
+            (None = 2 * max_workers)
+        on_result: Called with each result as it completes
+        
+    Returns:
+        List of ExportResult in job order
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+    
+    results: Dict[int, ExportResult] = {}
+    
+    def finish(index: int, result: ExportResult) -> None:
+        results[index] = result
+        if result.ok:
+            logger.info(f"Exported {result.job.output_path} in {result.seconds:.2f}s")
+        else:
+            logger.warning(f"Failed to export {result.job.svg_path}: {result.error}")
+        if on_result is not None:
+            on_result(result)
+    
+    if max_workers == 1:
+        for index, job in enumerate(jobs):
+            finish(index, _run_export_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            pending = {}
+            for index, job in enumerate(jobs):
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(pending.pop(future), future.result())
+                pending[executor.submit(_run_export_job, job)] = index
+            
+            for future in as_completed(pending):
+                finish(pending[future], future.result())
+    
+    return [results[index] for index in sorted(results)]
@@ -5,7 +5,6 @@ Extracts color, texture, shape, and context features from masks
 for classification.
 """
 
-import json
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Dict, Optional, Any
@@ -14,6 +13,8 @@ import logging
 import numpy as np
 from PIL import Image
 
+from . import serialization
+
 logger = logging.getLogger(__name__)
 
 
@@ -414,21 +415,19 @@ class FeatureExtractor:
         features_list: List[MaskFeatures],
         output_path: Path,
     ) -> None:
-        """Save features to JSON file."""
+        """Save features to JSON (or MessagePack, by suffix) file."""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         data = [f.to_dict() for f in features_list]
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        serialization.dump(data, output_path)
         
         logger.info(f"Saved features to {output_path}")
     
     @staticmethod
     def load_features(features_path: Path) -> List[MaskFeatures]:
-        """Load features from JSON file."""
-        with open(features_path) as f:
-            data = json.load(f)
+        """Load features from JSON (or MessagePack) file."""
+        data = serialization.load(features_path)
         
         features_list = []
         for item in data:
@@ -4,13 +4,13 @@ Confidence Gating Module
 Routes classified masks based on confidence thresholds.
 """
 
-import json
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from typing import List, Tuple
 import logging
 
+from . import serialization
 from .classify import Classification, FeatureClass
 
 logger = logging.getLogger(__name__)
@@ -128,6 +128,7 @@ class ConfidenceGate:
         review: List[GatedMask],
         discarded: List[GatedMask],
         output_dir: Path,
+        format: str = "json",
     ) -> None:
         """
         Save gating results to files.
@@ -137,24 +138,31 @@ class ConfidenceGate:
             review: List of masks for review
             discarded: List of discarded masks
             output_dir: Directory to save results
+            format: File format, "json" or "msgpack"
         """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
         
         # Save accepted
         accepted_data = [g.to_dict() for g in accepted]
-        with open(output_dir / "accepted.json", "w") as f:
-            json.dump(accepted_data, f, indent=2)
+        serialization.dump(
+            accepted_data,
+            serialization.with_format(output_dir / "accepted.json", format),
+        )
         
         # Save review queue
         review_data = [g.to_dict() for g in review]
-        with open(output_dir / "review_queue.json", "w") as f:
-            json.dump(review_data, f, indent=2)
+        serialization.dump(
+            review_data,
+            serialization.with_format(output_dir / "review_queue.json", format),
+        )
         
         # Save discarded
         discarded_data = [g.to_dict() for g in discarded]
-        with open(output_dir / "discarded.json", "w") as f:
-            json.dump(discarded_data, f, indent=2)
+        serialization.dump(
+            discarded_data,
+            serialization.with_format(output_dir / "discarded.json", format),
+        )
         
         logger.info(f"Saved gating results to {output_dir}")
     
@@ -163,8 +171,7 @@ class ConfidenceGate:
         """Load accepted masks from saved results."""
         from .classify import Classification, FeatureClass
         
-        with open(output_dir / "accepted.json") as f:
-            data = json.load(f)
+        data = serialization.load(Path(output_dir) / "accepted.json")
         
         accepted = []
         for item in data:
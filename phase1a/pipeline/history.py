@@ -0,0 +1,313 @@
+"""
+Edit History Module
+
+Undo/redo for PointBasedSelector. Each edit stores only what changed:
+added or removed masks as bit-packed crops to their bounding box, edited
+masks as a bit-packed XOR diff cropped to the changed pixels, and the
+before/after feature lists of the holes whose selection changed. A mask
+edit therefore costs about area/8 bytes instead of a full-frame array,
+and the history drops its oldest edits past a memory cap.
+
+Edits convert to and from JSON-compatible dicts (to_dict()/from_dict())
+for the session journal, see session.py.
+"""
+
+import base64
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+from .masks import MaskData
+
+logger = logging.getLogger(__name__)
+
+# Default memory cap for the undo/redo history
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+@dataclass
+class PackedMask:
+    """Boolean mask cropped to its bounding box and packed to one bit per pixel."""
+    shape: Tuple[int, int]  # (height, width) of the full frame
+    box: Tuple[int, int, int, int]  # (y0, y1, x0, x1), exclusive ends
+    bits: np.ndarray
+    
+    @classmethod
+    def pack(cls, mask: np.ndarray) -> "PackedMask":
+        """Pack a full-frame boolean mask."""
+        rows = np.flatnonzero(mask.any(axis=1))
+        if len(rows) == 0:
+            return cls(mask.shape, (0, 0, 0, 0), np.zeros(0, dtype=np.uint8))
+        cols = np.flatnonzero(mask[rows[0]:rows[-1] + 1].any(axis=0))
+        box = (int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1)
+        y0, y1, x0, x1 = box
+        return cls(mask.shape, box, np.packbits(mask[y0:y1, x0:x1]))
+    
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+    
+    def crop(self) -> np.ndarray:
+        """The mask within its box."""
+        y0, y1, x0, x1 = self.box
+        count = (y1 - y0) * (x1 - x0)
+        return np.unpackbits(self.bits, count=count).reshape(y1 - y0, x1 - x0).astype(bool)
+    
+    def unpack(self) -> np.ndarray:
+        """The full-frame mask."""
+        mask = np.zeros(self.shape, dtype=bool)
+        y0, y1, x0, x1 = self.box
+        mask[y0:y1, x0:x1] = self.crop()
+        return mask
+    
+    def xor(self, mask: np.ndarray) -> np.ndarray:
+        """A copy of ``mask`` with this mask's pixels flipped."""
+        result = mask.copy()
+        y0, y1, x0, x1 = self.box
+        result[y0:y1, x0:x1] ^= self.crop()
+        return result
+    
+    def to_dict(self) -> dict:
+        """Export to dictionary (bits deflated and base64-encoded)."""
+        return {
+            "box": list(self.box),
+            "bits": base64.b64encode(zlib.compress(self.bits.tobytes(), 1)).decode("ascii"),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, shape: Tuple[int, int]) -> "PackedMask":
+        """Load from dictionary; ``shape`` is the full frame's (height, width)."""
+        bits = np.frombuffer(zlib.decompress(base64.b64decode(data["bits"])), dtype=np.uint8)
+        return cls(tuple(shape), tuple(data["box"]), bits)
+
+
+def _metadata(mask_data: Optional[MaskData]) -> Optional[dict]:
+    """MaskData fields other than the mask array."""
+    if mask_data is None:
+        return None
+    return {
+        "id": mask_data.id,
+        "area": mask_data.area,
+        "bbox": mask_data.bbox,
+        "predicted_iou": mask_data.predicted_iou,
+        "stability_score": mask_data.stability_score,
+        "moments": mask_data.moments,
+    }
+
+
+def _tuple(values: Optional[list]) -> Optional[tuple]:
+    return tuple(values) if values is not None else None
+
+
+@dataclass
+class MaskChange:
+    """
+    Change to one generated mask.
+    
+    ``before``/``after`` hold the mask metadata (None where the mask does
+    not exist). ``pixels`` is the whole mask for an addition or removal,
+    else the XOR of the old and new masks.
+    """
+    mask_id: str
+    before: Optional[dict]
+    after: Optional[dict]
+    pixels: PackedMask
+    
+    @classmethod
+    def between(cls, old: Optional[MaskData], new: Optional[MaskData]) -> "MaskChange":
+        """Record the change from ``old`` to ``new`` (either may be None)."""
+        if old is None:
+            pixels = PackedMask.pack(new.mask)
+        elif new is None:
+            pixels = PackedMask.pack(old.mask)
+        else:
+            pixels = PackedMask.pack(old.mask ^ new.mask)
+        mask_id = (new or old).id
+        return cls(mask_id, _metadata(old), _metadata(new), pixels)
+    
+    def apply(self, masks: Dict[str, MaskData], forward: bool) -> None:
+        """Move ``masks`` to the state after (forward) or before this change."""
+        source, target = (self.before, self.after) if forward else (self.after, self.before)
+        if target is None:
+            masks.pop(self.mask_id, None)
+            return
+        if source is None:
+            mask = self.pixels.unpack()
+        else:
+            mask = self.pixels.xor(masks[self.mask_id].mask)
+        masks[self.mask_id] = MaskData(mask=mask, **target)
+    
+    def to_dict(self) -> dict:
+        """Export to dictionary."""
+        return {
+            "id": self.mask_id,
+            "before": self.before,
+            "after": self.after,
+            "pixels": self.pixels.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, shape: Tuple[int, int]) -> "MaskChange":
+        """Load from dictionary."""
+        before, after = (
+            dict(meta, bbox=tuple(meta["bbox"]), moments=_tuple(meta.get("moments")))
+            if meta is not None else None
+            for meta in (data["before"], data["after"])
+        )
+        return cls(data["id"], before, after, PackedMask.from_dict(data["pixels"], shape))
+
+
+# Per-hole feature lists: (greens, tees, fairways, bunkers, water, rough)
+SelectionState = Tuple[Tuple[str, ...], ...]
+
+
+@dataclass
+class Edit:
+    """One undoable operation on a PointBasedSelector."""
+    label: str
+    masks: List[MaskChange] = field(default_factory=list)
+    # Hole -> (before, after) feature lists; None where the hole had no selection
+    selections: Dict[int, Tuple[Optional[SelectionState], Optional[SelectionState]]] = field(default_factory=dict)
+    # Superpixel region -> (before, after) labels; None where the region did not exist
+    regions: Dict[str, Tuple[Optional[FrozenSet[int]], Optional[FrozenSet[int]]]] = field(default_factory=dict)
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the edit."""
+        total = sum(change.pixels.nbytes + 200 for change in self.masks)
+        total += 100 * (len(self.selections) + len(self.regions))
+        total += sum(8 * len(labels or ()) for pair in self.regions.values() for labels in pair)
+        return total
+    
+    def __bool__(self) -> bool:
+        return bool(self.masks or self.selections or self.regions)
+    
+    @property
+    def added(self) -> List[str]:
+        """Mask IDs the edit creates."""
+        return [change.mask_id for change in self.masks if change.before is None]
+    
+    @property
+    def removed(self) -> List[str]:
+        """Mask IDs the edit deletes."""
+        return [change.mask_id for change in self.masks if change.after is None]
+    
+    def to_dict(self) -> dict:
+        """Export to dictionary."""
+        return {
+            "label": self.label,
+            "masks": [change.to_dict() for change in self.masks],
+            "selections": {
+                str(hole): [
+                    [list(ids) for ids in state] if state is not None else None
+                    for state in states
+                ]
+                for hole, states in self.selections.items()
+            },
+            "regions": {
+                mask_id: [sorted(labels) if labels is not None else None for labels in pair]
+                for mask_id, pair in self.regions.items()
+            },
+        }
+    
+    @classmethod
+    def from_dict(cls, data: dict, shape: Tuple[int, int]) -> "Edit":
+        """Load from dictionary; ``shape`` is the image's (height, width)."""
+        return cls(
+            label=data["label"],
+            masks=[MaskChange.from_dict(change, shape) for change in data["masks"]],
+            selections={
+                int(hole): tuple(
+                    tuple(tuple(ids) for ids in state) if state is not None else None
+                    for state in states
+                )
+                for hole, states in data["selections"].items()
+            },
+            regions={
+                mask_id: tuple(frozenset(labels) if labels is not None else None for labels in pair)
+                for mask_id, pair in data["regions"].items()
+            },
+        )
+
+
+class EditHistory:
+    """
+    Undo and redo stacks of Edits under a memory cap.
+    
+    Recording an edit clears the redo stack. When the recorded edits exceed
+    ``max_bytes`` the oldest are dropped; the newest edit is always kept.
+    """
+    
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize the history.
+        
+        Args:
+            max_bytes: Memory cap for recorded edits; 0 disables the history
+        """
+        self.max_bytes = max_bytes
+        self._undo: Deque[Edit] = deque()
+        self._redo: List[Edit] = []
+        self._nbytes = 0
+    
+    @property
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+    
+    @property
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the undo and redo stacks."""
+        return self._nbytes
+    
+    def __len__(self) -> int:
+        return len(self._undo)
+    
+    def record(self, edit: Edit) -> None:
+        """Push a new edit, dropping the redo stack and edits past the cap."""
+        self._nbytes -= sum(e.nbytes for e in self._redo)
+        self._redo.clear()
+        if self.max_bytes <= 0:
+            return
+        self._undo.append(edit)
+        self._nbytes += edit.nbytes
+        self.trim()
+    
+    def trim(self) -> None:
+        """Drop the oldest undo edits until the history fits max_bytes."""
+        if self.max_bytes <= 0:
+            self.clear()
+            return
+        while self._nbytes > self.max_bytes and len(self._undo) > 1:
+            dropped = self._undo.popleft()
+            self._nbytes -= dropped.nbytes
+            logger.debug(f"History over {self.max_bytes} bytes, dropped '{dropped.label}'")
+    
+    def pop_undo(self) -> Optional[Edit]:
+        """Take the newest edit to undo; it moves to the redo stack."""
+        if not self._undo:
+            return None
+        edit = self._undo.pop()
+        self._redo.append(edit)
+        return edit
+    
+    def pop_redo(self) -> Optional[Edit]:
+        """Take the most recently undone edit; it moves back to the undo stack."""
+        if not self._redo:
+            return None
+        edit = self._redo.pop()
+        self._undo.append(edit)
+        return edit
+    
+    def clear(self) -> None:
+        """Forget all edits."""
+        self._undo.clear()
+        self._redo.clear()
+        self._nbytes = 0
@@ -2,16 +2,25 @@
 Hole Assignment Module
 
 Assigns polygons to golf course holes based on spatial relationships.
+
+When tee locations are known, each hole gets a corridor geometry running
+from its tee(s) to its green(s). Corridors are indexed in an STRtree and
+polygons are assigned by overlap with them; nearest green center is only
+used as a fallback for polygons outside every corridor.
 """
 
-import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Any, List, Dict, Optional, Tuple
 import logging
 
 import numpy as np
+import shapely
+from shapely.geometry import MultiPoint
+from shapely.geometry.base import BaseGeometry
+from shapely.strtree import STRtree
 
+from . import serialization
 from .polygons import PolygonFeature
 
 logger = logging.getLogger(__name__)
@@ -25,6 +34,21 @@ class GreenCenter:
     y: float
 
 
+@dataclass
+class TeeCenter:
+    """A tee box center point for a hole."""
+    hole: int
+    x: float
+    y: float
+
+
+@dataclass
+class HoleCorridor:
+    """Playing corridor of a hole, from its tee(s) to its green(s)."""
+    hole: int
+    geometry: BaseGeometry
+
+
 @dataclass
 class HoleAssignment:
     """A polygon with its assigned hole number."""
@@ -47,8 +71,8 @@ class HoleAssigner:
     Assign polygons to golf course holes.
     
     Uses:
-    - Nearest green center (primary method)
-    - Spatial clustering fallback
+    - Tee→green corridor overlap (primary method, when tee centers are given)
+    - Nearest green center (fallback)
     
     Each polygon belongs to exactly one hole.
     Special holes:
@@ -63,6 +87,8 @@ class HoleAssigner:
         self,
         green_centers: Optional[List[Dict]] = None,
         max_distance: float = 1000.0,
+        tee_centers: Optional[List[Dict]] = None,
+        corridor_width: float = 120.0,
     ):
         """
         Initialize the hole assigner.
@@ -70,6 +96,9 @@ class HoleAssigner:
         Args:
             green_centers: List of green centers [{hole, x, y}, ...]
             max_distance: Maximum distance from green center for assignment
+            tee_centers: List of tee centers [{hole, x, y}, ...]; a hole may
+                have several entries (one per tee box)
+            corridor_width: Width of the tee→green corridor in pixels
         """
         self.green_centers = []
         if green_centers:
@@ -80,91 +109,276 @@ class HoleAssigner:
                     y=gc["y"],
                 ))
         
+        self.tee_centers = []
+        if tee_centers:
+            for tc in tee_centers:
+                self.tee_centers.append(TeeCenter(
+                    hole=tc["hole"],
+                    x=tc["x"],
+                    y=tc["y"],
+                ))
+        
         self.max_distance = max_distance
+        self.corridor_width = corridor_width
+        
+        self.corridors = self._build_corridors()
+        self._corridor_tree = (
+            STRtree([c.geometry for c in self.corridors])
+            if self.corridors else None
+        )
     
-    def _get_polygon_centroid(self, polygon: PolygonFeature) -> Tuple[float, float]:
-        """Get centroid of a polygon."""
-        centroid = polygon.geometry.centroid
-        return (centroid.x, centroid.y)
-    
-    def _find_nearest_green(
-        self,
-        polygon: PolygonFeature,
-    ) -> Tuple[Optional[int], Optional[float]]:
+    @classmethod
+    def from_selections(
+        cls,
+        selections: Dict[int, Any],
+        masks: Dict[str, Any],
+        **kwargs,
+    ) -> "HoleAssigner":
         """
-        Find the nearest green center to a polygon.
+        Create an assigner from interactive hole selections.
+        
+        Tee and green centers are taken from the centroids of the masks
+        listed in each ``HoleSelection.tees`` / ``HoleSelection.greens``.
         
+        Args:
+            selections: Dictionary mapping hole number to HoleSelection
+            masks: Dictionary mapping mask ID to MaskData
+            **kwargs: Extra arguments passed to the constructor
+            
         Returns:
-            Tuple of (hole_number, distance) or (None, None) if none found
+            HoleAssigner with corridors for every hole that has a tee and green
         """
-        if not self.green_centers:
-            return None, None
+        green_centers = []
+        tee_centers = []
+        
+        for hole in sorted(selections):
+            selection = selections[hole]
+            
+            # One combined (area-weighted) center per green, one per tee box
+            sum_x = sum_y = total = 0.0
+            for mask_id in selection.greens:
+                if mask_id not in masks:
+                    continue
+                ys, xs = np.nonzero(masks[mask_id].mask)
+                sum_x += xs.sum()
+                sum_y += ys.sum()
+                total += len(xs)
+            if total > 0:
+                green_centers.append({
+                    "hole": hole,
+                    "x": float(sum_x / total),
+                    "y": float(sum_y / total),
+                })
+            
+            for mask_id in selection.tees:
+                if mask_id not in masks:
+                    continue
+                ys, xs = np.nonzero(masks[mask_id].mask)
+                if len(xs) > 0:
+                    tee_centers.append({
+                        "hole": hole,
+                        "x": float(xs.mean()),
+                        "y": float(ys.mean()),
+                    })
         
-        centroid = self._get_polygon_centroid(polygon)
+        return cls(green_centers=green_centers, tee_centers=tee_centers, **kwargs)
+    
+    def _build_corridors(self) -> List[HoleCorridor]:
+        """
+        Build one corridor per hole that has both a tee and a green.
         
-        min_distance = float("inf")
-        nearest_hole = None
+        The corridor is the convex hull of the hole's tee and green points,
+        buffered by half the corridor width.
+        """
+        points_by_hole: Dict[int, List[Tuple[float, float]]] = {}
+        tee_holes = set()
+        green_holes = set()
         
+        for tc in self.tee_centers:
+            points_by_hole.setdefault(tc.hole, []).append((tc.x, tc.y))
+            tee_holes.add(tc.hole)
         for gc in self.green_centers:
-            distance = np.sqrt(
-                (centroid[0] - gc.x) ** 2 +
-                (centroid[1] - gc.y) ** 2
-            )
-            
-            if distance < min_distance:
-                min_distance = distance
-                nearest_hole = gc.hole
+            points_by_hole.setdefault(gc.hole, []).append((gc.x, gc.y))
+            green_holes.add(gc.hole)
         
-        if min_distance <= self.max_distance:
-            return nearest_hole, min_distance
+        corridors = []
+        for hole in sorted(tee_holes & green_holes):
+            hull = MultiPoint(points_by_hole[hole]).convex_hull
+            corridors.append(HoleCorridor(
+                hole=hole,
+                geometry=hull.buffer(self.corridor_width / 2),
+            ))
         
-        return None, None
+        return corridors
     
-    def assign(self, polygon: PolygonFeature) -> HoleAssignment:
+    def _assign_by_corridor(
+        self,
+        geometries: np.ndarray,
+    ) -> np.ndarray:
         """
-        Assign a single polygon to a hole.
+        Assign geometries to the corridor they overlap most.
+        
+        Ties are broken by the lower hole number so results are
+        deterministic regardless of corridor order.
         
-        Args:
-            polygon: PolygonFeature to assign
-            
         Returns:
-            HoleAssignment with hole number
+            Array of hole numbers, -1 where no corridor overlaps
         """
-        feature_class = polygon.feature_class
+        holes = np.full(len(geometries), -1, dtype=np.int64)
+        if self._corridor_tree is None or len(geometries) == 0:
+            return holes
         
-        # Cart paths go to hole 98
-        if feature_class == "cart_path":
-            return HoleAssignment(
-                polygon=polygon,
-                hole=self.CART_PATH_HOLE,
-            )
+        geom_idx, corridor_idx = self._corridor_tree.query(
+            geometries, predicate="intersects"
+        )
+        if len(geom_idx) == 0:
+            return holes
         
-        # Very large polygons might be course boundaries
-        if polygon.geometry.area > 1000000:  # Arbitrary threshold
-            return HoleAssignment(
-                polygon=polygon,
-                hole=self.OUTER_MESH_HOLE,
-            )
+        corridor_geoms = self._corridor_tree.geometries
+        corridor_holes = np.array([c.hole for c in self.corridors])
+        overlap = shapely.area(shapely.intersection(
+            geometries[geom_idx], corridor_geoms[corridor_idx]
+        ))
+        candidate_holes = corridor_holes[corridor_idx]
         
-        # Try nearest green center
-        hole, distance = self._find_nearest_green(polygon)
+        # Sort by geometry, then largest overlap, then lowest hole number
+        order = np.lexsort((candidate_holes, -overlap, geom_idx))
+        sorted_geoms = geom_idx[order]
+        _, first = np.unique(sorted_geoms, return_index=True)
+        holes[sorted_geoms[first]] = candidate_holes[order][first]
         
-        if hole is not None:
-            return HoleAssignment(
+        return holes
+    
+    def _find_nearest_greens(
+        self,
+        geometries: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest green center to each geometry's centroid.
+        
+        Returns:
+            Tuple of (hole_numbers, distances); hole is -1 where no green
+            center is within max_distance
+        """
+        holes = np.full(len(geometries), -1, dtype=np.int64)
+        distances = np.full(len(geometries), np.nan)
+        if not self.green_centers or len(geometries) == 0:
+            return holes, distances
+        
+        centroids = shapely.get_coordinates(shapely.centroid(geometries))
+        greens = np.array([(gc.x, gc.y) for gc in self.green_centers])
+        green_holes = np.array([gc.hole for gc in self.green_centers])
+        
+        dist = np.hypot(
+            centroids[:, None, 0] - greens[None, :, 0],
+            centroids[:, None, 1] - greens[None, :, 1],
+        )
+        nearest = np.argmin(dist, axis=1)
+        min_distance = dist[np.arange(len(geometries)), nearest]
+        
+        within = min_distance <= self.max_distance
+        holes[within] = green_holes[nearest[within]]
+        distances[within] = min_distance[within]
+        
+        return holes, distances
+    
+    def _distances_to_green(
+        self,
+        geometries: np.ndarray,
+        holes: np.ndarray,
+    ) -> np.ndarray:
+        """Distance from each geometry's centroid to its hole's green center."""
+        distances = np.full(len(geometries), np.nan)
+        if not self.green_centers or len(geometries) == 0:
+            return distances
+        
+        green_by_hole = {}
+        for gc in self.green_centers:
+            green_by_hole.setdefault(gc.hole, (gc.x, gc.y))
+        
+        centroids = shapely.get_coordinates(shapely.centroid(geometries))
+        for i, hole in enumerate(holes):
+            if hole in green_by_hole:
+                gx, gy = green_by_hole[hole]
+                distances[i] = np.hypot(centroids[i, 0] - gx, centroids[i, 1] - gy)
+        
+        return distances
+    
+    def _assign_batch(
+        self,
+        polygons: List[PolygonFeature],
+    ) -> List[HoleAssignment]:
+        """Assign a batch of polygons, preserving input order."""
+        assignments: List[Optional[HoleAssignment]] = [None] * len(polygons)
+        pending = []
+        
+        for i, polygon in enumerate(polygons):
+            # Cart paths go to hole 98
+            if polygon.feature_class == "cart_path":
+                assignments[i] = HoleAssignment(
+                    polygon=polygon,
+                    hole=self.CART_PATH_HOLE,
+                )
+            # Very large polygons might be course boundaries
+            elif polygon.geometry.area > 1000000:  # Arbitrary threshold
+                assignments[i] = HoleAssignment(
+                    polygon=polygon,
+                    hole=self.OUTER_MESH_HOLE,
+                )
+            else:
+                pending.append(i)
+        
+        if not pending:
+            return assignments
+        
+        geometries = np.array(
+            [polygons[i].geometry for i in pending], dtype=object
+        )
+        
+        # Corridor overlap first, nearest green for everything left over
+        corridor_holes = self._assign_by_corridor(geometries)
+        corridor_distances = self._distances_to_green(geometries, corridor_holes)
+        nearest_holes, nearest_distances = self._find_nearest_greens(geometries)
+        
+        for j, i in enumerate(pending):
+            polygon = polygons[i]
+            if corridor_holes[j] >= 0:
+                hole = int(corridor_holes[j])
+                distance = corridor_distances[j]
+            elif nearest_holes[j] >= 0:
+                hole = int(nearest_holes[j])
+                distance = nearest_distances[j]
+            else:
+                # Fallback: assign to outer mesh
+                logger.warning(
+                    f"Could not assign polygon {polygon.id} to a hole, "
+                    f"using outer mesh (hole {self.OUTER_MESH_HOLE})"
+                )
+                assignments[i] = HoleAssignment(
+                    polygon=polygon,
+                    hole=self.OUTER_MESH_HOLE,
+                )
+                continue
+            
+            assignments[i] = HoleAssignment(
                 polygon=polygon,
                 hole=hole,
-                distance_to_green=distance,
+                distance_to_green=None if np.isnan(distance) else float(distance),
             )
         
-        # Fallback: assign to outer mesh
-        logger.warning(
-            f"Could not assign polygon {polygon.id} to a hole, "
-            f"using outer mesh (hole {self.OUTER_MESH_HOLE})"
-        )
-        return HoleAssignment(
-            polygon=polygon,
-            hole=self.OUTER_MESH_HOLE,
-        )
+        return assignments
+    
+    def assign(self, polygon: PolygonFeature) -> HoleAssignment:
+        """
+        Assign a single polygon to a hole.
+        
+        Args:
+            polygon: PolygonFeature to assign
+            
+        Returns:
+            HoleAssignment with hole number
+        """
+        return self._assign_batch([polygon])[0]
     
     def assign_all(
         self,
@@ -173,6 +387,9 @@ class HoleAssigner:
         """
         Assign all polygons to holes.
         
+        Corridor and nearest-green queries are run once for the whole
+        batch rather than per polygon.
+        
         Args:
             polygons: List of PolygonFeature objects
             
@@ -181,8 +398,7 @@ class HoleAssigner:
         """
         assignments_by_hole: Dict[int, List[HoleAssignment]] = {}
         
-        for polygon in polygons:
-            assignment = self.assign(polygon)
+        for assignment in self._assign_batch(polygons):
             hole = assignment.hole
             
             if hole not in assignments_by_hole:
@@ -216,8 +432,7 @@ class HoleAssigner:
         for hole, assignments in assignments_by_hole.items():
             data[str(hole)] = [a.to_dict() for a in assignments]
         
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        serialization.dump(data, output_path)
         
         logger.info(f"Saved hole assignments to {output_path}")
     
@@ -232,5 +447,4 @@ class HoleAssigner:
             {"hole": 2, "x": 1320, "y": 610}
         ]
         """
-        with open(path) as f:
-            return json.load(f)
+        return serialization.load(path)
@@ -5,7 +5,6 @@ Provides interactive hole-by-hole feature selection workflow.
 Users click on masks to assign them to features for each hole.
 """
 
-import json
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
@@ -14,7 +13,8 @@ import logging
 
 import numpy as np
 
-from .masks import MaskData
+from . import serialization
+from .masks import MaskData, centroid, mask_moments
 from .classify import FeatureClass
 
 logger = logging.getLogger(__name__)
@@ -85,6 +85,124 @@ class HoleSelection:
         )
 
 
+class MaskIndex:
+    """
+    Spatial index over masks for hit testing.
+    
+    Keeps a label map holding, for every pixel, the first mask (in
+    insertion order) covering it, and a table of mask bounding boxes.
+    Point lookups read the label map; region queries compare against all
+    bounding boxes in one vectorized test. Adding or removing a mask only
+    touches its bounding box.
+    """
+    
+    def __init__(self, shape: Tuple[int, int]):
+        """
+        Initialize an empty index.
+        
+        Args:
+            shape: (height, width) of the image the masks belong to
+        """
+        self.shape = tuple(shape[:2])
+        # 0 = no mask, otherwise slot + 1
+        self._labels = np.zeros(self.shape, dtype=np.uint16)
+        # (x_min, y_min, x_max, y_max), inclusive; empty masks get -1s
+        self._bboxes = np.empty((0, 4), dtype=np.int64)
+        self._alive = np.empty(0, dtype=bool)
+        self._ids: List[str] = []
+        self._masks: List[Optional[np.ndarray]] = []
+        self._slots: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def __contains__(self, mask_id: str) -> bool:
+        return mask_id in self._slots
+    
+    def add(self, mask_data: MaskData) -> None:
+        """Add a mask behind all masks already in the index."""
+        if mask_data.id in self._slots:
+            self.remove(mask_data.id)
+        
+        height, width = self.shape
+        mask = mask_data.mask[:height, :width]
+        slot = len(self._ids)
+        if slot + 1 > np.iinfo(self._labels.dtype).max:
+            self._labels = self._labels.astype(np.uint32)
+        
+        rows = np.flatnonzero(mask.any(axis=1))
+        cols = np.flatnonzero(mask.any(axis=0))
+        mask_moments(mask_data)  # cached for extract_green_centers()
+        if len(rows) == 0:
+            bbox = (-1, -1, -1, -1)
+        else:
+            bbox = (int(cols[0]), int(rows[0]), int(cols[-1]), int(rows[-1]))
+        
+        self._ids.append(mask_data.id)
+        self._masks.append(mask)
+        self._slots[mask_data.id] = slot
+        self._bboxes = np.vstack([self._bboxes, np.array([bbox], dtype=np.int64)])
+        self._alive = np.append(self._alive, len(rows) > 0)
+        
+        if len(rows) > 0:
+            window = self._window(bbox)
+            region = self._labels[window]
+            region[(region == 0) & mask[window]] = slot + 1
+    
+    def remove(self, mask_id: str) -> None:
+        """Remove a mask, uncovering the masks behind it."""
+        slot = self._slots.pop(mask_id, None)
+        if slot is None:
+            return
+        
+        was_alive = self._alive[slot]
+        self._alive[slot] = False
+        self._masks[slot] = None
+        if not was_alive:
+            return
+        
+        bbox = tuple(self._bboxes[slot])
+        region = self._labels[self._window(bbox)]
+        region[region == slot + 1] = 0
+        
+        # Pixels freed inside the box go to the first remaining mask covering them
+        for other in self._query(*bbox):
+            other_bbox = tuple(self._bboxes[other])
+            x0, y0 = max(bbox[0], other_bbox[0]), max(bbox[1], other_bbox[1])
+            x1, y1 = min(bbox[2], other_bbox[2]), min(bbox[3], other_bbox[3])
+            window = (slice(y0, y1 + 1), slice(x0, x1 + 1))
+            sub = self._labels[window]
+            sub[(sub == 0) & self._masks[other][window]] = other + 1
+    
+    def at(self, x: int, y: int) -> Optional[str]:
+        """ID of the first mask covering a pixel, or None."""
+        height, width = self.shape
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        label = int(self._labels[y, x])
+        return self._ids[label - 1] if label else None
+    
+    def in_region(self, x1: int, y1: int, x2: int, y2: int) -> List[str]:
+        """IDs of masks whose bounding box overlaps a region (inclusive)."""
+        return [self._ids[slot] for slot in self._query(x1, y1, x2, y2)]
+    
+    def _query(self, x1: int, y1: int, x2: int, y2: int) -> np.ndarray:
+        """Slots of live masks overlapping a box, in insertion order."""
+        b = self._bboxes
+        hits = (
+            self._alive
+            & (b[:, 2] >= x1) & (b[:, 0] <= x2)
+            & (b[:, 3] >= y1) & (b[:, 1] <= y2)
+        )
+        return np.flatnonzero(hits)
+    
+    @staticmethod
+    def _window(bbox: tuple) -> tuple:
+        """Label map slices for an inclusive bounding box."""
+        x0, y0, x1, y1 = bbox
+        return slice(y0, y1 + 1), slice(x0, x1 + 1)
+
+
 class InteractiveSelector:
     """
     Interactive selector for hole-by-hole feature assignment.
@@ -119,11 +237,42 @@ class InteractiveSelector:
         self.image = image
         self.selections: Dict[int, HoleSelection] = {}
         self._mask_id_to_index = {mask.id: i for i, mask in enumerate(masks)}
+        self._index: Optional[MaskIndex] = None  # Built on first query
+    
+    @property
+    def index(self) -> MaskIndex:
+        """Spatial index over the masks (built on first use)."""
+        if self._index is None:
+            self._index = MaskIndex(self.image.shape[:2])
+            for mask_data in self.masks.values():
+                self._index.add(mask_data)
+        return self._index
+    
+    def add_mask(self, mask_data: MaskData) -> None:
+        """
+        Add a candidate mask (behind existing masks for hit testing).
+        
+        Use this and remove_mask() rather than changing ``masks`` directly
+        so the spatial index stays in sync.
+        """
+        self.masks.pop(mask_data.id, None)
+        self.masks[mask_data.id] = mask_data
+        self._mask_id_to_index.setdefault(mask_data.id, len(self._mask_id_to_index))
+        if self._index is not None:
+            self._index.add(mask_data)
+    
+    def remove_mask(self, mask_id: str) -> None:
+        """Remove a candidate mask."""
+        self.masks.pop(mask_id, None)
+        if self._index is not None:
+            self._index.remove(mask_id)
     
     def get_mask_at_point(self, x: int, y: int) -> Optional[str]:
         """
         Find mask ID at a given point.
         
+        Overlapping masks resolve to the earliest one added.
+        
         Args:
             x: X coordinate
             y: Y coordinate
@@ -131,11 +280,7 @@ class InteractiveSelector:
         Returns:
             Mask ID if found, None otherwise
         """
-        for mask_id, mask_data in self.masks.items():
-            mask = mask_data.mask
-            if y < mask.shape[0] and x < mask.shape[1] and mask[y, x]:
-                return mask_id
-        return None
+        return self.index.at(x, y)
     
     def get_masks_in_region(
         self,
@@ -152,21 +297,7 @@ class InteractiveSelector:
         Returns:
             List of mask IDs in the region
         """
-        mask_ids = []
-        for mask_id, mask_data in self.masks.items():
-            mask = mask_data.mask
-            # Check if mask overlaps with region
-            y_coords, x_coords = np.where(mask)
-            if len(y_coords) > 0:
-                mask_min_x, mask_max_x = x_coords.min(), x_coords.max()
-                mask_min_y, mask_max_y = y_coords.min(), y_coords.max()
-                
-                # Check overlap
-                if not (mask_max_x < x1 or mask_min_x > x2 or
-                       mask_max_y < y1 or mask_min_y > y2):
-                    mask_ids.append(mask_id)
-        
-        return mask_ids
+        return self.index.in_region(x1, y1, x2, y2)
     
     def select_for_hole(
         self,
@@ -224,7 +355,9 @@ class InteractiveSelector:
         Extract green center coordinates from selected green masks.
         
         For each hole with green selections, calculates the centroid
-        of all selected green masks to determine the green center.
+        of all selected green masks to determine the green center. The
+        centroid comes from the masks' moments (see mask_moments()),
+        cached when the masks are indexed, so no pixel data is read.
         
         Returns:
             List of green center dictionaries [{hole, x, y}, ...]
@@ -232,41 +365,23 @@ class InteractiveSelector:
         green_centers = []
         
         for hole, selection in self.selections.items():
-            if not selection.greens:
-                continue
-            
-            # Calculate centroid of all green masks for this hole
-            all_x_coords = []
-            all_y_coords = []
-            
-            for mask_id in selection.greens:
-                if mask_id not in self.masks:
-                    continue
-                
-                mask_data = self.masks[mask_id]
-                mask = mask_data.mask
-                
-                # Get coordinates of all pixels in the mask
-                y_coords, x_coords = np.where(mask)
-                if len(y_coords) > 0:
-                    all_x_coords.extend(x_coords.tolist())
-                    all_y_coords.extend(y_coords.tolist())
-            
-            if len(all_x_coords) > 0:
-                # Calculate centroid
-                center_x = float(np.mean(all_x_coords))
-                center_y = float(np.mean(all_y_coords))
-                
+            # Centroid of all green masks for this hole
+            center = centroid([
+                mask_moments(self.masks[mask_id])
+                for mask_id in selection.greens
+                if mask_id in self.masks
+            ])
+            if center is not None:
                 green_centers.append({
                     "hole": hole,
-                    "x": center_x,
-                    "y": center_y,
+                    "x": center[0],
+                    "y": center[1],
                 })
         
         return green_centers
     
     def save_selections(self, output_path: Path) -> None:
-        """Save selections to JSON file."""
+        """Save selections to JSON (or MessagePack, by suffix) file."""
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
@@ -277,16 +392,14 @@ class InteractiveSelector:
             }
         }
         
-        with open(output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        serialization.dump(data, output_path)
         
         logger.info(f"Saved selections to {output_path}")
     
     @classmethod
     def load_selections(cls, selections_path: Path) -> Dict[int, HoleSelection]:
-        """Load selections from JSON file."""
-        with open(selections_path) as f:
-            data = json.load(f)
+        """Load selections from JSON (or MessagePack) file."""
+        data = serialization.load(selections_path)
         
         selections = {}
         for hole_str, hole_data in data.get("selections", {}).items():
@@ -304,10 +417,10 @@ class InteractiveSelector:
         """
         summary = {}
         for mask_id, mask_data in self.masks.items():
-            y_coords, x_coords = np.where(mask_data.mask)
-            if len(y_coords) > 0:
-                centroid_x = int(x_coords.mean())
-                centroid_y = int(y_coords.mean())
+            center = centroid([mask_moments(mask_data)])
+            if center is not None:
+                centroid_x = int(center[0])
+                centroid_y = int(center[1])
                 
                 summary[mask_id] = {
                     "area": mask_data.area,
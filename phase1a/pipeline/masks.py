@@ -3,19 +3,47 @@ Mask Generation Module
 
 Generates candidate masks using SAM (Segment Anything Model)
 automatic mask generation.
+
+With ``use_server`` enabled MaskGenerator uses a running SAM server
+(``phase1a sam-server``, see sam_server.py) instead of loading the model
+in-process. The
+``onnx`` backend runs exported (optionally int8) models with ONNX Runtime
+for CPU-only machines, see sam_onnx.py.
+
+SAM encodes every image at 1024px on its longest side. With ``two_level``
+enabled, point masks on larger images are refined by re-encoding a
+native-resolution crop around the first (downscaled) proposal.
+
+With ``embedding_dir`` set, image and crop embeddings are also written
+to disk, so a later session on the same image (see session.py) skips the
+encoder. Files are named by the model file's identity too, so they are
+not reused after the checkpoint or ONNX model changes.
 """
 
-import json
-from dataclasses import dataclass
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple
 import logging
 
 import numpy as np
 from PIL import Image
 
+from . import serialization
+
 logger = logging.getLogger(__name__)
 
+# SAM's encoder input size (longest side)
+SAM_INPUT_SIZE = 1024
+
+# Refinement crops are aligned to this grid so nearby clicks share embeddings
+CROP_GRID = 256
+
+# Smallest refinement crop side in pixels; smaller crops lose SAM's context
+CROP_MIN_SIZE = 512
+
 
 @dataclass
 class MaskData:
@@ -26,6 +54,8 @@ class MaskData:
     bbox: tuple  # (x, y, w, h)
     predicted_iou: float
     stability_score: float
+    # (area, sum of x, sum of y) over the mask's pixels, see mask_moments()
+    moments: Optional[Tuple[int, int, int]] = field(default=None, repr=False, compare=False)
     
     def to_dict(self) -> dict:
         """Export metadata to dictionary (excludes mask array)."""
@@ -38,6 +68,211 @@ class MaskData:
         }
 
 
+def mask_moments(mask_data: MaskData) -> Tuple[int, int, int]:
+    """
+    Pixel count and coordinate sums of a mask, cached on the MaskData.
+    
+    Selectors call this when a mask is created or merged, so centroids
+    (sum_x / area, sum_y / area) of any set of masks can later be taken
+    from the cache without touching pixel data.
+    
+    Args:
+        mask_data: Mask to measure
+        
+    Returns:
+        Tuple (area, sum_x, sum_y)
+    """
+    if mask_data.moments is None:
+        cols = np.count_nonzero(mask_data.mask, axis=0)
+        rows = np.count_nonzero(mask_data.mask, axis=1)
+        mask_data.moments = (
+            int(cols.sum()),
+            int(cols @ np.arange(len(cols))),
+            int(rows @ np.arange(len(rows))),
+        )
+    return mask_data.moments
+
+
+def centroid(moments: List[Tuple[int, int, int]]) -> Optional[Tuple[float, float]]:
+    """
+    Centroid (x, y) of the pixels of several masks from their moments.
+    
+    Pixels covered by more than one mask count once per mask, as when
+    averaging the masks' concatenated pixel coordinates.
+    
+    Returns:
+        (x, y), or None if the masks are empty
+    """
+    area = sum(m[0] for m in moments)
+    if area == 0:
+        return None
+    return sum(m[1] for m in moments) / area, sum(m[2] for m in moments) / area
+
+
+class RegionGrower:
+    """
+    Color-constrained region growing from a seed polygon.
+    
+    Grows 8-connected, one pixel ring per step, through pixels whose LAB
+    distance to the seed's mean color is within a tolerance, for at most
+    ``growth_limit`` steps. Everything that does not depend on the slider
+    values is computed once: the seed color statistics and the per-pixel
+    color distance field. For each tolerance the step at which every pixel
+    was reached is kept, so a new growth limit is a threshold and a new
+    sensitivity only grows the fields it has not seen before.
+    
+    All work happens in a window around the seed, padded by the largest
+    growth limit requested so far.
+    """
+    
+    # Step value for pixels not (yet) reached
+    UNREACHED = np.iinfo(np.uint16).max
+    
+    def __init__(
+        self,
+        image_lab: np.ndarray,
+        seed_mask: np.ndarray,
+        center: tuple,
+        growth_limit: int = 50,
+        cache_size: int = 8,
+    ):
+        """
+        Initialize the grower and sample the seed colors.
+        
+        Args:
+            image_lab: Image in LAB color space (H, W, 3)
+            seed_mask: Binary seed region (H, W)
+            center: (x, y) point whose connected component is kept
+            growth_limit: Initial window padding in pixels
+            cache_size: Number of tolerances whose step fields are kept
+        """
+        self.image_lab = image_lab
+        self.seed_mask = seed_mask.astype(bool)
+        self.center = center
+        self.cache_size = cache_size
+        
+        seed_ys, seed_xs = np.nonzero(self.seed_mask)
+        self.seed_area = len(seed_ys)
+        self._seed_bounds = (seed_ys.min(), seed_ys.max() + 1, seed_xs.min(), seed_xs.max() + 1)
+        
+        # Reference colors from inside the polygon
+        sample_indices = np.random.choice(self.seed_area, min(100, self.seed_area), replace=False)
+        sample_colors = image_lab[seed_ys[sample_indices], seed_xs[sample_indices]]
+        self.mean_color = np.mean(sample_colors, axis=0)
+        
+        # Color variance in the seed region
+        color_dists = np.sqrt(np.sum((sample_colors - self.mean_color) ** 2, axis=1))
+        self.color_std = float(np.std(color_dists)) if len(color_dists) > 1 else 5.0
+        
+        self._fields: OrderedDict = OrderedDict()
+        self._set_window(growth_limit)
+    
+    def tolerance(self, color_sensitivity: float) -> float:
+        """
+        Color tolerance in LAB for a sensitivity slider value.
+        
+        Sensitivity 0 = strict (an adaptive base from the seed's color
+        variance), 1 = loose (base + 15).
+        """
+        base_tolerance = 3.0 + self.color_std * 0.5
+        tolerance_range = 15.0
+        return base_tolerance + color_sensitivity * tolerance_range
+    
+    def grow(self, color_sensitivity: float, growth_limit: int) -> np.ndarray:
+        """
+        Grow the seed and keep the connected component containing the center.
+        
+        Args:
+            color_sensitivity: 0.0 = strict, 1.0 = loose
+            growth_limit: Maximum pixels to grow from the seed boundary
+            
+        Returns:
+            Binary mask (H, W)
+        """
+        from scipy import ndimage
+        
+        if growth_limit > self.reach:
+            self._set_window(growth_limit)
+        
+        color_tolerance = self.tolerance(color_sensitivity)
+        steps = self._steps(color_tolerance, growth_limit)
+        grown = steps <= growth_limit
+        
+        logger.info(f"Region growing: added {int(grown.sum()) - self.seed_area} pixels "
+                   f"(tolerance={color_tolerance:.1f} LAB, growth_limit={growth_limit}px)")
+        
+        # Keep only the connected component containing the center
+        y0, y1, x0, x1 = self.window
+        center_x, center_y = self.center
+        labeled_array, num_features = ndimage.label(grown)
+        if num_features > 1:
+            center_label = labeled_array[center_y - y0, center_x - x0]
+            if center_label > 0:
+                grown = labeled_array == center_label
+            else:
+                # Center not in mask, find largest component
+                component_sizes = ndimage.sum(grown, labeled_array, range(1, num_features + 1))
+                grown = labeled_array == np.argmax(component_sizes) + 1
+        
+        mask = np.zeros(self.seed_mask.shape, dtype=bool)
+        mask[y0:y1, x0:x1] = grown
+        return mask
+    
+    def _set_window(self, reach: int) -> None:
+        """Recompute the window and color distance field for a new padding."""
+        height, width = self.seed_mask.shape
+        sy0, sy1, sx0, sx1 = self._seed_bounds
+        self.reach = reach
+        self.window = (
+            max(0, sy0 - reach), min(height, sy1 + reach),
+            max(0, sx0 - reach), min(width, sx1 + reach),
+        )
+        y0, y1, x0, x1 = self.window
+        self.color_distance = np.sqrt(
+            np.sum((self.image_lab[y0:y1, x0:x1] - self.mean_color) ** 2, axis=2)
+        )
+        self._seed_window = self.seed_mask[y0:y1, x0:x1]
+        self._fields.clear()
+    
+    def _steps(self, color_tolerance: float, growth_limit: int) -> np.ndarray:
+        """
+        Steps at which window pixels join the region, up to ``growth_limit``.
+        
+        Equivalent to a breadth-first flood from the seed boundary: each
+        step adds the allowed pixels 8-adjacent to the region.
+        """
+        import cv2
+        
+        key = round(color_tolerance, 6)
+        field = self._fields.get(key)
+        if field is None:
+            allowed = (self.color_distance <= color_tolerance).astype(np.uint8)
+            steps = np.full(allowed.shape, self.UNREACHED, dtype=np.uint16)
+            steps[self._seed_window] = 0
+            region = self._seed_window.astype(np.uint8)
+            # [allowed, steps, region, steps grown, frontier exhausted]
+            field = [allowed, steps, region, 0, False]
+            self._fields[key] = field
+            while len(self._fields) > self.cache_size:
+                self._fields.popitem(last=False)
+        else:
+            self._fields.move_to_end(key)
+        
+        allowed, steps, region, level, exhausted = field
+        kernel = np.ones((3, 3), dtype=np.uint8)
+        while level < growth_limit and not exhausted:
+            grown = cv2.dilate(region, kernel) & allowed
+            added = grown > region
+            level += 1
+            if not added.any():
+                exhausted = True
+                break
+            steps[added] = level
+            region |= grown
+        field[3], field[4] = level, exhausted
+        return steps
+
+
 class MaskGenerator:
     """
     Generate candidate masks using SAM automatic mask generation.
@@ -56,6 +291,14 @@ class MaskGenerator:
         stability_score_thresh: float = 0.95,
         min_mask_region_area: int = 100,
         point_mask_box_size: Optional[int] = None,  # Box size for point-based masks
+        use_server: bool = False,
+        server_address: Optional[str] = None,
+        backend: str = "torch",
+        onnx_dir: Optional[str] = None,
+        quantized: bool = False,
+        two_level: bool = False,
+        embedding_cache_size: int = 8,
+        embedding_dir: Optional[str] = None,
     ):
         """
         Initialize the mask generator.
@@ -68,6 +311,19 @@ class MaskGenerator:
             pred_iou_thresh: Predicted IoU threshold for filtering
             stability_score_thresh: Stability score threshold
             min_mask_region_area: Minimum mask area in pixels
+            use_server: Use a running SAM server when one is reachable
+                (opt-in; only the user's own servers are trusted)
+            server_address: SAM server socket path or ``host:port``
+                (default: $PHASE1A_SAM_SERVER, then the default socket)
+            backend: 'torch' (segment-anything) or 'onnx' (ONNX Runtime)
+            onnx_dir: Directory with exported ONNX models (default: the
+                checkpoint's directory, else ``checkpoints``)
+            quantized: Use the int8 quantized ONNX models
+            two_level: Refine point masks on images larger than SAM's input
+                size by re-encoding a native-resolution crop
+            embedding_cache_size: Number of image/crop embeddings to keep
+            embedding_dir: Directory to persist embeddings in (in-process
+                predictors only; the SAM server keeps its own cache)
         """
         self.model_type = model_type
         self.checkpoint_path = checkpoint_path
@@ -77,6 +333,14 @@ class MaskGenerator:
         self.stability_score_thresh = stability_score_thresh
         self.min_mask_region_area = min_mask_region_area
         self.point_mask_box_size = point_mask_box_size
+        self.use_server = use_server
+        self.server_address = server_address
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.quantized = quantized
+        self.two_level = two_level
+        self.embedding_cache_size = embedding_cache_size
+        self.embedding_dir = embedding_dir
         
         # Size preference: 0.0 = tightest/smallest masks, 1.0 = largest masks
         # Default 0.6 = current behavior (SAM's smallest mask from 3 candidates)
@@ -96,12 +360,29 @@ class MaskGenerator:
         self._sam = None
         self._mask_generator = None
         self._predictor = None
+        self._embeddings: OrderedDict = OrderedDict()
+        self._image_keys = None  # ImageKeyCache, see _image_key()
+        self._server_identity = None  # Model identity of a connected server
+        
+        # Reused while the user tunes sliders on the same outline
+        self._lab = None  # (image key, LAB image)
+        self._grower = None  # (outline key, RegionGrower)
+        self._outline_candidate = None  # (outline key, (SAM mask, score))
     
     def _load_model(self) -> None:
-        """Lazy-load SAM model."""
+        """Lazy-load SAM model (or connect to a SAM server)."""
         if self._sam is not None:
             return
         
+        if self.backend == "onnx":
+            self._load_onnx_model()
+            return
+        if self.backend != "torch":
+            raise ValueError(f"Unknown SAM backend '{self.backend}', expected 'torch' or 'onnx'")
+        
+        if self.use_server and self._connect_server():
+            return
+        
         try:
             import torch
             from segment_anything import sam_model_registry, SamAutomaticMaskGenerator, SamPredictor
@@ -135,12 +416,305 @@ class MaskGenerator:
         
         logger.info("SAM model loaded successfully")
     
+    def _load_onnx_model(self) -> None:
+        """Load exported SAM encoder/decoder models with ONNX Runtime."""
+        from .sam_onnx import OnnxAutomaticMaskGenerator, OnnxSamPredictor
+        
+        encoder_path, decoder_path = self._onnx_model_paths()
+        self._predictor = OnnxSamPredictor.from_files(encoder_path, decoder_path, device=self.device)
+        self._sam = self._predictor
+        self._mask_generator = OnnxAutomaticMaskGenerator(
+            self._predictor,
+            points_per_side=self.points_per_side,
+            pred_iou_thresh=self.pred_iou_thresh,
+            stability_score_thresh=self.stability_score_thresh,
+            min_mask_region_area=self.min_mask_region_area,
+        )
+        
+        logger.info(f"SAM ONNX model loaded ({self.model_type}"
+                    f"{', int8' if self.quantized else ''})")
+    
+    def _onnx_model_paths(self) -> Tuple[Path, Path]:
+        """Encoder and decoder ONNX files for this generator's settings."""
+        from .sam_onnx import onnx_model_paths
+        
+        if self.onnx_dir is not None:
+            onnx_dir = Path(self.onnx_dir)
+        elif self.checkpoint_path is not None:
+            onnx_dir = Path(self.checkpoint_path).parent
+        else:
+            onnx_dir = Path("checkpoints")
+        return onnx_model_paths(onnx_dir, self.model_type, self.quantized)
+    
+    def _model_identity(self) -> Optional[tuple]:
+        """
+        Identity of the model file that computes embeddings.
+        
+        The image encoder's (or checkpoint's) path, size and modification
+        time, so persisted embeddings are not reused after the model is
+        replaced or another one is configured. When connected to a SAM
+        server, the identity the server reported for its model.
+        """
+        if self._server_identity is not None:
+            return self._server_identity
+        if self.backend == "onnx":
+            path = self._onnx_model_paths()[0]
+        elif self.checkpoint_path is not None:
+            path = Path(self.checkpoint_path)
+        else:
+            return None
+        path = path.resolve()
+        try:
+            info = path.stat()
+        except OSError:
+            return (str(path),)
+        return (str(path), info.st_size, info.st_mtime_ns)
+    
+    def _connect_server(self) -> bool:
+        """
+        Use a running SAM server for this generator's model.
+        
+        The server must run the same model type and, if a checkpoint is
+        configured, the same checkpoint file.
+        
+        Returns:
+            True if connected
+        """
+        from .sam_server import connect
+        
+        client = connect(
+            self.server_address,
+            model_type=self.model_type,
+            model_identity=self._model_identity(),
+        )
+        if client is None:
+            return False
+        
+        self._server_identity = client.info.get("model_identity")
+        self._sam = client
+        self._predictor = client.predictor()
+        self._mask_generator = client.automatic_generator(
+            points_per_side=self.points_per_side,
+            pred_iou_thresh=self.pred_iou_thresh,
+            stability_score_thresh=self.stability_score_thresh,
+            min_mask_region_area=self.min_mask_region_area,
+        )
+        
+        logger.info(f"Using SAM server at {client.address}")
+        return True
+    
+    def _image_key(self, image: np.ndarray) -> str:
+        """Content hash of an image, only computed for arrays not seen recently."""
+        if self._image_keys is None:
+            from .sam_server import ImageKeyCache
+            self._image_keys = ImageKeyCache()
+        return self._image_keys(image)
+    
+    def _set_image(self, image: np.ndarray, key: Any = None) -> None:
+        """
+        Make an image current on the predictor, reusing cached embeddings.
+        
+        Args:
+            image: RGB image (H, W, 3)
+            key: Cache key (default: content hash of the image)
+        """
+        predictor = self._predictor
+        if not hasattr(predictor, "features"):
+            # Remote predictors: the SAM server caches embeddings
+            predictor.set_image(image)
+            return
+        
+        if key is None:
+            key = self._image_key(image)
+        
+        embedding = self._embeddings.get(key)
+        if embedding is None:
+            embedding = self._load_embedding(key)
+            if embedding is None:
+                predictor.set_image(image)
+                embedding = (predictor.features, predictor.original_size, predictor.input_size)
+                self._save_embedding(key, embedding)
+            self._embeddings[key] = embedding
+            while len(self._embeddings) > self.embedding_cache_size:
+                self._embeddings.popitem(last=False)
+        
+        self._embeddings.move_to_end(key)
+        # The predictor may have encoded something else since (e.g. the
+        # ONNX automatic generator shares it), so compare the features
+        if predictor.features is not embedding[0]:
+            predictor.features, predictor.original_size, predictor.input_size = embedding
+            predictor.is_image_set = True
+    
+    def _embedding_path(self, key: Any) -> Optional[Path]:
+        """File for a persisted embedding, or None without embedding_dir."""
+        if self.embedding_dir is None:
+            return None
+        # Embeddings differ between models, so they are part of the name
+        name = repr((self.backend, self.model_type, self.quantized, self._model_identity(), key))
+        digest = hashlib.blake2b(name.encode(), digest_size=16).hexdigest()
+        return Path(self.embedding_dir) / f"{digest}.npz"
+    
+    def _save_embedding(self, key: Any, embedding: tuple) -> None:
+        """Write an embedding to embedding_dir (errors are only logged)."""
+        path = self._embedding_path(key)
+        if path is None:
+            return
+        features, original_size, input_size = embedding
+        if hasattr(features, "cpu"):
+            features = features.cpu().numpy()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary name first so readers never see a partial file
+            tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.npz")
+            np.savez(
+                tmp_path,
+                features=features,
+                original_size=np.asarray(original_size),
+                input_size=np.asarray(input_size),
+            )
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not save embedding to {path}: {e}")
+    
+    def _load_embedding(self, key: Any) -> Optional[tuple]:
+        """Read an embedding written by _save_embedding(), if there is one."""
+        path = self._embedding_path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            with np.load(path) as data:
+                features = data["features"]
+                original_size = tuple(int(v) for v in data["original_size"])
+                input_size = tuple(int(v) for v in data["input_size"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable embedding {path}: {e}")
+            return None
+        if self.backend == "torch":
+            import torch
+            features = torch.from_numpy(features).to(self.device)
+        logger.debug(f"Loaded embedding from {path}")
+        return features, original_size, input_size
+    
+    def _lab_image(self, image: np.ndarray, key: Any = None) -> np.ndarray:
+        """
+        Convert an image to LAB, caching the most recent conversion.
+        
+        Args:
+            image: RGB image (H, W, 3)
+            key: Cache key (default: content hash of the image)
+        """
+        from skimage import color as skcolor
+        
+        if key is None:
+            key = self._image_key(image)
+        
+        if self._lab is None or self._lab[0] != key:
+            self._lab = (key, skcolor.rgb2lab(image))
+        return self._lab[1]
+    
+    def _crop_window(self, proposal: np.ndarray) -> Optional[tuple]:
+        """
+        Native-resolution crop around a mask proposal.
+        
+        The window is the proposal's bounding box plus a 25% margin, at
+        least CROP_MIN_SIZE wide and aligned to CROP_GRID.
+        
+        Args:
+            proposal: Binary mask from the full-image encode
+            
+        Returns:
+            (x0, y0, x1, y1), or None if the crop would not be encoded at a
+            meaningfully higher resolution than the full image
+        """
+        height, width = proposal.shape
+        longest = max(height, width)
+        if longest <= SAM_INPUT_SIZE:
+            return None
+        
+        ys, xs = np.nonzero(proposal)
+        if len(xs) == 0:
+            return None
+        
+        window = []
+        for low, high, size in ((xs.min(), xs.max() + 1, width), (ys.min(), ys.max() + 1, height)):
+            margin = max((high - low) // 4, (CROP_MIN_SIZE - (high - low) + 1) // 2, 0)
+            start = max(0, (low - margin) // CROP_GRID * CROP_GRID)
+            end = min(size, -(-(high + margin) // CROP_GRID) * CROP_GRID)
+            window.append((int(start), int(end)))
+        (x0, x1), (y0, y1) = window
+        
+        # Only refine when the crop is encoded at least 1.5x finer
+        if max(x1 - x0, y1 - y0) * 1.5 > longest:
+            return None
+        return x0, y0, x1, y1
+    
+    def _refine_in_crop(
+        self,
+        image: np.ndarray,
+        key: str,
+        proposal: np.ndarray,
+        point: tuple,
+        label: int,
+    ) -> Optional[tuple]:
+        """
+        Re-decode a point mask from a native-resolution crop embedding.
+        
+        The proposal's bounding box (padded by the full-image downscale
+        factor) and the click point are used as prompts on the crop. Crop
+        embeddings are cached like full images, keyed by image and window.
+        
+        Args:
+            image: RGB image (H, W, 3)
+            key: Content hash of the image
+            proposal: Selected mask from the full-image encode
+            point: Click point (x, y) in image coordinates
+            label: Point label (1 = foreground, 0 = background)
+            
+        Returns:
+            (mask, score) in image coordinates, or None to keep the proposal
+        """
+        window = self._crop_window(proposal)
+        if window is None:
+            return None
+        x0, y0, x1, y1 = window
+        
+        self._set_image(np.ascontiguousarray(image[y0:y1, x0:x1]), key=(key, window))
+        
+        ys, xs = np.nonzero(proposal)
+        pad = -(-max(image.shape[:2]) // SAM_INPUT_SIZE)
+        box = np.array([
+            max(xs.min() - pad, x0) - x0,
+            max(ys.min() - pad, y0) - y0,
+            min(xs.max() + 1 + pad, x1) - x0,
+            min(ys.max() + 1 + pad, y1) - y0,
+        ])
+        x, y = point
+        masks, scores, _ = self._predictor.predict(
+            point_coords=np.array([[x - x0, y - y0]]),
+            point_labels=np.array([label]),
+            box=box,
+            multimask_output=False,
+        )
+        
+        crop_mask = masks[0]
+        if not crop_mask.any() or (label == 1 and not crop_mask[int(y) - y0, int(x) - x0]):
+            logger.debug("Crop refinement lost the click point; keeping proposal")
+            return None
+        
+        mask = np.zeros(proposal.shape, dtype=bool)
+        mask[y0:y1, x0:x1] = crop_mask
+        
+        logger.debug(f"Refined point mask in crop {window}: "
+                    f"area {int(proposal.sum())} -> {int(mask.sum())}")
+        return mask, float(scores[0])
+    
     def _refine_mask_by_color(
         self,
         image: np.ndarray,
         mask: np.ndarray,
         sample_points: List[tuple],
         color_tolerance: float = 30.0,
+        key: Any = None,
     ) -> np.ndarray:
         """
         Refine a mask by keeping only pixels with similar color to sample points,
@@ -151,17 +725,17 @@ class MaskGenerator:
             mask: Binary mask to refine
             sample_points: List of (x, y) points to sample color from
             color_tolerance: Maximum color distance (in LAB space) to include
+            key: LAB cache key (default: content hash of the image)
             
         Returns:
             Refined binary mask
         """
-        from skimage import color as skcolor
         from scipy import ndimage
         
         height, width = image.shape[:2]
         
         # Convert image to LAB color space (better for perceptual color difference)
-        image_lab = skcolor.rgb2lab(image)
+        image_lab = self._lab_image(image, key)
         
         # Sample colors from the center region (inside drawn outline)
         sample_colors = []
@@ -182,16 +756,11 @@ class MaskGenerator:
         # For each pixel in the mask, check color distance
         color_mask = np.zeros_like(mask)
         
-        # Get all mask pixel coordinates
-        mask_ys, mask_xs = np.where(mask)
-        
-        for y, x in zip(mask_ys, mask_xs):
-            pixel_lab = image_lab[y, x]
-            # Euclidean distance in LAB space
-            color_dist = np.sqrt(np.sum((pixel_lab - mean_color) ** 2))
-            
-            if color_dist <= color_tolerance:
-                color_mask[y, x] = True
+        # Euclidean distance in LAB space for all mask pixels
+        mask_ys, mask_xs = np.nonzero(mask)
+        color_dist = np.sqrt(np.sum((image_lab[mask_ys, mask_xs] - mean_color) ** 2, axis=1))
+        keep = color_dist <= color_tolerance
+        color_mask[mask_ys[keep], mask_xs[keep]] = True
         
         # Keep only the connected component containing the center point
         # This removes disjoint areas with similar color
@@ -243,22 +812,34 @@ class MaskGenerator:
         height, width = mask.shape
         image_scale = max(width, height) / 1000.0
         
+        blur_size = max(3, int(5 * image_scale))
+        if blur_size % 2 == 0:
+            blur_size += 1
+        kernel_size = max(3, int(5 * image_scale))
+        if kernel_size % 2 == 0:
+            kernel_size += 1
+        
+        # Work in the mask's bounding box, padded so the blurs and closing
+        # below see the same empty surroundings as on the full image
+        x, y, w, h = cv2.boundingRect(mask.astype(np.uint8))
+        if w == 0 or h == 0:
+            return mask
+        margin = 2 * (blur_size + kernel_size) + 4
+        y0, y1 = max(0, y - margin), min(height, y + h + margin)
+        x0, x1 = max(0, x - margin), min(width, x + w + margin)
+        full_mask = mask
+        mask = mask[y0:y1, x0:x1]
+        
         mask_uint8 = mask.astype(np.uint8) * 255
         original_area = np.sum(mask)
         
         # Step 1: Apply Gaussian blur to smooth jagged pixel edges
-        blur_size = max(3, int(5 * image_scale))
-        if blur_size % 2 == 0:
-            blur_size += 1
         blurred = cv2.GaussianBlur(mask_uint8, (blur_size, blur_size), 0)
         
         # Re-threshold - use a lower threshold to ensure we don't lose edge pixels
         _, smoothed = cv2.threshold(blurred, 100, 255, cv2.THRESH_BINARY)
         
         # Step 2: Morphological closing to fill any small gaps
-        kernel_size = max(3, int(5 * image_scale))
-        if kernel_size % 2 == 0:
-            kernel_size += 1
         kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (kernel_size, kernel_size))
         closed = cv2.morphologyEx(smoothed, cv2.MORPH_CLOSE, kernel)
         
@@ -266,7 +847,7 @@ class MaskGenerator:
         contours, _ = cv2.findContours(closed, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
         if len(contours) == 0:
-            return mask
+            return full_mask
         
         # Get the largest contour
         largest_contour = max(contours, key=cv2.contourArea)
@@ -283,7 +864,7 @@ class MaskGenerator:
             smoothed_contour = cv2.approxPolyDP(largest_contour, epsilon, True)
         
         # Create final mask from smoothed contour
-        final_mask = np.zeros((height, width), dtype=np.uint8)
+        final_mask = np.zeros(mask.shape, dtype=np.uint8)
         cv2.fillPoly(final_mask, [smoothed_contour], 255)
         
         # Step 5: Ensure all original mask pixels are covered
@@ -306,42 +887,31 @@ class MaskGenerator:
         
         logger.debug(f"Polygon smoothing: {original_area} -> {np.sum(final_mask > 0)} pixels")
         
-        return final_mask > 0
+        result = np.zeros((height, width), dtype=bool)
+        result[y0:y1, x0:x1] = final_mask > 0
+        return result
     
-    def generate_from_outline(
+    def _select_outline_mask(
         self,
         image: np.ndarray,
-        outline_points: List[tuple],  # List of (x, y) points from drawn outline
-        color_tolerance: Optional[float] = None,  # Color tolerance in LAB space (lower = stricter)
-    ) -> Optional[MaskData]:
+        key: Any,
+        outline_points: List[tuple],
+        xs: List[int],
+        ys: List[int],
+    ) -> Optional[tuple]:
         """
-        Generate a mask from a drawn outline (circle/polygon).
-        
-        The outline provides hints to SAM, then the mask is refined by color:
-        1. SAM generates candidate mask from outline hints
-        2. Mask is clipped to only include pixels with similar color to the drawn area
+        Prompt SAM with an outline and pick the mask that best matches it.
         
         Args:
-            image: Input image as numpy array (H, W, 3) in RGB format
-            outline_points: List of (x, y) coordinates forming the drawn outline
-            color_tolerance: Max color distance in LAB space (lower = stricter)
+            image: RGB image (H, W, 3)
+            key: Embedding cache key for the image
+            outline_points: Drawn outline points
+            xs, ys: Outline coordinates clamped to the image
             
         Returns:
-            MaskData object or None if generation fails
+            (mask, score) or None if SAM returned no masks
         """
-        if len(outline_points) < 3:
-            logger.warning("Need at least 3 points to form an outline")
-            return None
-        
-        self._load_model()
-        
         height, width = image.shape[:2]
-        
-        # Convert outline points to integers and clamp to image bounds
-        xs = [int(max(0, min(width - 1, p[0]))) for p in outline_points]
-        ys = [int(max(0, min(height - 1, p[1]))) for p in outline_points]
-        
-        # Calculate center point
         center_x = int(np.mean(xs))
         center_y = int(np.mean(ys))
         
@@ -363,7 +933,7 @@ class MaskGenerator:
         input_labels = np.array(input_labels)
         
         # Set image for predictor
-        self._predictor.set_image(image)
+        self._set_image(image, key)
         
         # Strategy 1: Try with just points (no box) - let SAM find natural boundaries
         masks_no_box, scores_no_box, _ = self._predictor.predict(
@@ -476,8 +1046,58 @@ class MaskGenerator:
                 best_combined_score = combined
                 best_idx = i
         
-        mask = all_masks[best_idx]
-        score = float(all_scores[best_idx])
+        return all_masks[best_idx], float(all_scores[best_idx])
+    
+    def generate_from_outline(
+        self,
+        image: np.ndarray,
+        outline_points: List[tuple],  # List of (x, y) points from drawn outline
+        color_tolerance: Optional[float] = None,  # Color tolerance in LAB space (lower = stricter)
+    ) -> Optional[MaskData]:
+        """
+        Generate a mask from a drawn outline (circle/polygon).
+        
+        The outline provides hints to SAM, then the mask is refined by color:
+        1. SAM generates candidate mask from outline hints
+        2. Mask is clipped to only include pixels with similar color to the drawn area
+        
+        Args:
+            image: Input image as numpy array (H, W, 3) in RGB format
+            outline_points: List of (x, y) coordinates forming the drawn outline
+            color_tolerance: Max color distance in LAB space (lower = stricter)
+            
+        Returns:
+            MaskData object or None if generation fails
+        """
+        if len(outline_points) < 3:
+            logger.warning("Need at least 3 points to form an outline")
+            return None
+        
+        self._load_model()
+        
+        height, width = image.shape[:2]
+        
+        # Convert outline points to integers and clamp to image bounds
+        xs = [int(max(0, min(width - 1, p[0]))) for p in outline_points]
+        ys = [int(max(0, min(height - 1, p[1]))) for p in outline_points]
+        
+        # Calculate center point
+        center_x = int(np.mean(xs))
+        center_y = int(np.mean(ys))
+        
+        # SAM's candidate depends only on the outline, so it is kept for
+        # re-refining at other color tolerances
+        key = self._image_key(image)
+        outline_key = (key, tuple(zip(xs, ys)), self.size_preference)
+        if self._outline_candidate is not None and self._outline_candidate[0] == outline_key:
+            mask, score = self._outline_candidate[1]
+            logger.debug("Reusing SAM candidate for outline")
+        else:
+            candidate = self._select_outline_mask(image, key, outline_points, xs, ys)
+            if candidate is None:
+                return None
+            self._outline_candidate = (outline_key, candidate)
+            mask, score = candidate
         
         # CRITICAL: Refine mask by color - only keep pixels with similar color to drawn area
         # Sample colors from inside the drawn outline (center + some outline points)
@@ -493,7 +1113,7 @@ class MaskGenerator:
         effective_tolerance = color_tolerance if color_tolerance is not None else self.color_tolerance
         
         original_area = np.sum(mask)
-        mask = self._refine_mask_by_color(image, mask, sample_points, effective_tolerance)
+        mask = self._refine_mask_by_color(image, mask, sample_points, effective_tolerance, key)
         refined_area = np.sum(mask)
         
         logger.info(f"Color refinement: {original_area} -> {refined_area} pixels "
@@ -689,6 +1309,9 @@ class MaskGenerator:
         3. Grow outward pixel-by-pixel, adding pixels with similar colors
         4. Stop when reaching growth_limit or color threshold
         
+        Calling again with the same image and polygon reuses the seed colors
+        and growth fields (see RegionGrower), so slider previews are cheap.
+        
         Args:
             image: Input image as numpy array (H, W, 3) in RGB format
             outline_points: List of (x, y) coordinates forming the seed polygon
@@ -700,9 +1323,6 @@ class MaskGenerator:
             MaskData object or None if generation fails
         """
         import cv2
-        from skimage import color as skcolor
-        from scipy import ndimage
-        from collections import deque
         
         if len(outline_points) < 3:
             logger.warning("Need at least 3 points to form a polygon")
@@ -718,113 +1338,45 @@ class MaskGenerator:
         center_x = int(np.mean(xs))
         center_y = int(np.mean(ys))
         
-        # Step 1: Create seed mask from the drawn polygon
-        seed_mask = np.zeros((height, width), dtype=np.uint8)
-        polygon_points = np.array([[x, y] for x, y in zip(xs, ys)], dtype=np.int32)
-        cv2.fillPoly(seed_mask, [polygon_points], 255)
-        
-        seed_area = np.sum(seed_mask > 0)
-        if seed_area < 10:
-            logger.warning(f"Seed polygon too small ({seed_area} pixels)")
-            return None
-        
-        logger.info(f"Seed polygon: {seed_area} pixels, center=({center_x},{center_y})")
-        
-        # Step 2: Convert image to LAB color space for perceptual color distance
-        image_lab = skcolor.rgb2lab(image)
-        
-        # Step 3: Sample reference colors from inside the polygon
-        seed_ys, seed_xs = np.where(seed_mask > 0)
-        sample_indices = np.random.choice(len(seed_ys), min(100, len(seed_ys)), replace=False)
-        sample_colors = [image_lab[seed_ys[i], seed_xs[i]] for i in sample_indices]
-        mean_color = np.mean(sample_colors, axis=0)
-        
-        # Calculate color variance in the seed region
-        color_dists = [np.sqrt(np.sum((c - mean_color) ** 2)) for c in sample_colors]
-        color_std = np.std(color_dists) if len(color_dists) > 1 else 5.0
-        
-        # Step 4: Calculate color tolerance based on sensitivity slider
-        # sensitivity 0 = strict (base_tol), sensitivity 1 = loose (base_tol + 15)
-        # Also factor in the color variance in the seed region
-        base_tolerance = 3.0 + color_std * 0.5  # Adaptive base
-        tolerance_range = 15.0
-        color_tolerance = base_tolerance + color_sensitivity * tolerance_range
-        
-        logger.info(f"Color tolerance: {color_tolerance:.1f} LAB (sensitivity={color_sensitivity:.2f}, seed_std={color_std:.1f})")
-        
-        # Step 5: Region growing using BFS from polygon boundary
-        # Start from boundary pixels of the seed, grow outward
-        grown_mask = seed_mask.copy()
-        
-        # Find boundary pixels of seed (pixels in seed that have a non-seed neighbor)
-        kernel = np.ones((3, 3), dtype=np.uint8)
-        dilated = cv2.dilate(seed_mask, kernel, iterations=1)
-        boundary = dilated - seed_mask
-        
-        # Initialize queue with boundary pixels
-        # Each item is (y, x, distance_from_seed)
-        queue = deque()
-        boundary_ys, boundary_xs = np.where(boundary > 0)
-        for by, bx in zip(boundary_ys, boundary_xs):
-            queue.append((by, bx, 1))
-        
-        # Track visited pixels and their distance
-        visited = np.zeros((height, width), dtype=bool)
-        visited[seed_mask > 0] = True
-        
-        # 8-connected neighbors
-        neighbors = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        
-        pixels_added = 0
-        pixels_rejected = 0
-        
-        while queue:
-            y, x, dist = queue.popleft()
-            
-            # Skip if already visited or beyond growth limit
-            if visited[y, x] or dist > growth_limit:
-                continue
+        # The grower keeps its seed statistics and distance fields, so
+        # re-growing the same polygon with other slider values is cheap
+        key = self._image_key(image)
+        outline_key = (key, tuple(zip(xs, ys)))
+        if self._grower is not None and self._grower[0] == outline_key:
+            grower = self._grower[1]
+        else:
+            # Step 1: Create seed mask from the drawn polygon
+            seed_mask = np.zeros((height, width), dtype=np.uint8)
+            polygon_points = np.array([[x, y] for x, y in zip(xs, ys)], dtype=np.int32)
+            cv2.fillPoly(seed_mask, [polygon_points], 255)
             
-            visited[y, x] = True
+            seed_area = np.sum(seed_mask > 0)
+            if seed_area < 10:
+                logger.warning(f"Seed polygon too small ({seed_area} pixels)")
+                return None
             
-            # Check color similarity
-            pixel_lab = image_lab[y, x]
-            color_dist = np.sqrt(np.sum((pixel_lab - mean_color) ** 2))
+            logger.info(f"Seed polygon: {seed_area} pixels, center=({center_x},{center_y})")
             
-            if color_dist <= color_tolerance:
-                # Add to grown mask
-                grown_mask[y, x] = 255
-                pixels_added += 1
-                
-                # Add unvisited neighbors to queue
-                for dy, dx in neighbors:
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < height and 0 <= nx < width and not visited[ny, nx]:
-                        queue.append((ny, nx, dist + 1))
-            else:
-                pixels_rejected += 1
+            # Steps 2-3: Sample reference colors from inside the polygon (LAB
+            # space, for perceptual color distance)
+            grower = RegionGrower(
+                self._lab_image(image, key), seed_mask > 0, (center_x, center_y), growth_limit
+            )
+            self._grower = (outline_key, grower)
         
-        logger.info(f"Region growing: added {pixels_added} pixels, rejected {pixels_rejected} "
-                   f"(growth_limit={growth_limit}px)")
+        seed_area = grower.seed_area
+        logger.info(f"Color tolerance: {grower.tolerance(color_sensitivity):.1f} LAB "
+                   f"(sensitivity={color_sensitivity:.2f}, seed_std={grower.color_std:.1f})")
         
-        # Step 6: Keep only the connected component containing the center
-        labeled_array, num_features = ndimage.label(grown_mask)
-        if num_features > 1:
-            center_label = labeled_array[center_y, center_x]
-            if center_label > 0:
-                grown_mask = (labeled_array == center_label).astype(np.uint8) * 255
-            else:
-                # Center not in mask, find largest component
-                component_sizes = ndimage.sum(grown_mask > 0, labeled_array, range(1, num_features + 1))
-                largest_label = np.argmax(component_sizes) + 1
-                grown_mask = (labeled_array == largest_label).astype(np.uint8) * 255
+        # Steps 4-6: Grow outward from the polygon boundary and keep the
+        # connected component containing the center
+        grown_mask = grower.grow(color_sensitivity, growth_limit)
         
         # Step 7: Optional edge smoothing
         if smooth_edges:
-            grown_mask = self._smooth_mask_edges(grown_mask > 0).astype(np.uint8) * 255
+            grown_mask = self._smooth_mask_edges(grown_mask)
         
-        # Convert to boolean mask
-        final_mask = grown_mask > 0
+        final_mask = grown_mask
         mask_area = int(np.sum(final_mask))
         
         if mask_area < self.min_mask_region_area:
@@ -890,7 +1442,8 @@ class MaskGenerator:
             return None
         
         # Set image for predictor
-        self._predictor.set_image(image)
+        key = self._image_key(image)
+        self._set_image(image, key)
         
         # Generate mask from point
         input_point = np.array([[x, y]])
@@ -969,6 +1522,11 @@ class MaskGenerator:
         
         logger.debug(f"Selected mask {best_idx}: score={score:.3f}")
         
+        if self.two_level:
+            refined = self._refine_in_crop(image, key, mask, (x, y), label)
+            if refined is not None:
+                mask, score = refined
+        
         # Convert to MaskData
         mask_area = int(np.sum(mask))
         if mask_area < self.min_mask_region_area:
@@ -1051,6 +1609,7 @@ class MaskGenerator:
         self,
         masks: List[MaskData],
         output_dir: Path,
+        format: str = "json",
     ) -> None:
         """
         Save masks to disk.
@@ -1058,6 +1617,7 @@ class MaskGenerator:
         Args:
             masks: List of MaskData objects
             output_dir: Directory to save masks
+            format: Metadata file format, "json" or "msgpack"
         """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -1068,10 +1628,9 @@ class MaskGenerator:
             mask_img = Image.fromarray((mask_data.mask * 255).astype(np.uint8))
             mask_img.save(mask_path)
             
-            # Save metadata as JSON
-            meta_path = output_dir / f"{mask_data.id}.json"
-            with open(meta_path, "w") as f:
-                json.dump(mask_data.to_dict(), f, indent=2)
+            # Save metadata
+            meta_path = serialization.with_format(output_dir / f"{mask_data.id}.json", format)
+            serialization.dump(mask_data.to_dict(), meta_path)
         
         logger.info(f"Saved {len(masks)} masks to {output_dir}")
     
@@ -1080,6 +1639,9 @@ class MaskGenerator:
         """
         Load masks from disk.
         
+        A mask saved in several metadata formats over time is loaded once,
+        from its most recently written metadata file.
+        
         Args:
             masks_dir: Directory containing saved masks
             
@@ -1089,9 +1651,15 @@ class MaskGenerator:
         masks_dir = Path(masks_dir)
         masks = []
         
-        for meta_path in sorted(masks_dir.glob("*.json")):
-            with open(meta_path) as f:
-                meta = json.load(f)
+        newest = {}
+        for suffix in serialization.FORMATS.values():
+            for path in masks_dir.glob(f"*{suffix}"):
+                current = newest.get(path.stem)
+                if current is None or path.stat().st_mtime_ns > current.stat().st_mtime_ns:
+                    newest[path.stem] = path
+        
+        for meta_path in sorted(newest.values()):
+            meta = serialization.load(meta_path)
             
             mask_path = masks_dir / f"{meta['id']}.png"
             mask_img = Image.open(mask_path)
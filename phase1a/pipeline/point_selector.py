@@ -3,17 +3,72 @@ Point-based Interactive Selection Module
 
 Allows users to click on the image to mark feature locations.
 The tool then uses SAM to generate masks around those points.
+
+With the ``superpixel`` strategy, clicks instead select superpixels from a
+precomputed over-segmentation (see superpixels.py) and merge them into
+one region per feature, and SAM only runs when explicitly requested.
+
+Every mask operation is recorded in an undo/redo history of compact
+deltas (see history.py) and, with a session journal attached, autosaved
+(see session.py).
 """
 
+import functools
+import inspect
+import sys
 import numpy as np
-from typing import List, Dict, Optional, Tuple
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Set, Tuple, Union
 import logging
 
-from .masks import MaskGenerator, MaskData, merge_masks
+from .masks import MaskGenerator, MaskData, centroid, mask_moments, merge_masks
 from .interactive import InteractiveSelector, HoleSelection, FeatureType
+from .superpixels import SuperpixelIndex
+from .history import DEFAULT_MAX_BYTES, Edit, EditHistory, MaskChange
 
 logger = logging.getLogger(__name__)
 
+# HoleSelection feature lists, in a fixed order
+FEATURE_LISTS = ("greens", "tees", "fairways", "bunkers", "water", "rough")
+
+
+def _undoable(method):
+    """Record a PointBasedSelector method's changes as one history edit."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._recording:
+            # Called from another undoable method, which records it
+            return method(self, *args, **kwargs)
+        before = self._snapshot()
+        self._recording = True
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self._recording = False
+            edit = self._diff(method.__name__, before)
+            if edit:
+                self.history.record(edit)
+                if self.journal is not None:
+                    prompt = _prompt(method, self, args, kwargs)
+                    self.journal.log_edit(edit, prompt, self._mask_count)
+    return wrapper
+
+
+def _prompt(method, self, args, kwargs) -> dict:
+    """JSON-compatible arguments of an undoable call, for the journal."""
+    bound = inspect.signature(method).bind(self, *args, **kwargs)
+    bound.apply_defaults()
+    prompt = {}
+    for name, value in bound.arguments.items():
+        if name == "self":
+            continue
+        if isinstance(value, FeatureType):
+            value = value.value
+        elif isinstance(value, MaskData):
+            value = value.id
+        prompt[name] = value
+    return prompt
+
 
 class PointBasedSelector:
     """
@@ -23,12 +78,26 @@ class PointBasedSelector:
     1. User clicks on image at a location (e.g., green, fairway, bunker, tee)
     2. Tool uses SAM to generate mask around that point
     3. Mask is assigned to the selected feature type for the current hole
+    
+    Each operation can be undone and redone (undo()/redo()). Merges
+    replace their source masks, which only the history keeps.
+    
+    Strategies for clicks:
+    - ``sam``: every click runs SAM
+    - ``superpixel``: clicks toggle superpixels in the current region;
+      SAM runs only for click_to_mask(..., use_sam=True) or until the
+      superpixel index is ready
     """
     
+    STRATEGIES = ("sam", "superpixel")
+    
     def __init__(
         self,
         image: np.ndarray,
         mask_generator: MaskGenerator,
+        strategy: str = "sam",
+        superpixels: Union[SuperpixelIndex, Future, None] = None,
+        history_bytes: int = DEFAULT_MAX_BYTES,
     ):
         """
         Initialize point-based selector.
@@ -36,31 +105,78 @@ class PointBasedSelector:
         Args:
             image: Source image (H, W, 3) in RGB
             mask_generator: MaskGenerator instance for generating masks from points
+            strategy: Click strategy, 'sam' or 'superpixel'
+            superpixels: Superpixel index for the image, or a Future resolving
+                to its cache file (see superpixels.precompute())
+            history_bytes: Memory cap for the undo/redo history (0 disables it)
         """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown click strategy: {strategy}")
+        
         self.image = image
         self.mask_generator = mask_generator
+        self.strategy = strategy
+        self.superpixels = superpixels
         self.selections: Dict[int, HoleSelection] = {}
         self.generated_masks: Dict[str, MaskData] = {}  # Track generated masks
+        
+        # Superpixel regions: mask ID -> labels, and the region clicks extend
+        self._region_labels: Dict[str, Set[int]] = {}
+        self._active_region: Optional[Tuple[int, FeatureType, str]] = None
+        
+        # Undo/redo; IDs keep counting so undone masks never share an ID
+        self.history = EditHistory(history_bytes)
+        self._recording = False
+        self._mask_count = 0
+        
+        # Session journal for autosave (see resume())
+        self.journal = None
+    
+    @property
+    def superpixel_index(self) -> Optional[SuperpixelIndex]:
+        """The superpixel index, or None while it is still being computed."""
+        if isinstance(self.superpixels, Future):
+            if not self.superpixels.done():
+                return None
+            try:
+                self.superpixels = SuperpixelIndex.load(self.superpixels.result())
+                logger.info(f"Superpixel index ready ({self.superpixels.count} superpixels)")
+            except Exception as e:
+                logger.error(f"Superpixel computation failed, using SAM for clicks: {e}")
+                self.superpixels = None
+        return self.superpixels
     
+    @_undoable
     def click_to_mask(
         self,
         x: int,
         y: int,
         hole: int,
         feature_type: FeatureType,
+        use_sam: bool = False,
     ) -> Optional[MaskData]:
         """
         Generate a mask from a click point and assign it to a feature type.
         
+        With the superpixel strategy (once its index is ready) the click
+        toggles a superpixel in the current region instead, see
+        click_to_region().
+        
         Args:
             x: X coordinate of click
             y: Y coordinate of click
             hole: Hole number (1-18)
             feature_type: Type of feature (green, fairway, bunker, tee)
+            use_sam: Use SAM whatever the strategy
             
         Returns:
             Generated MaskData or None if generation failed
         """
+        if self.strategy == "superpixel" and not use_sam:
+            if self.superpixel_index is not None:
+                return self.click_to_region(x, y, hole, feature_type)
+            logger.info("Superpixels not ready yet, using SAM")
+        
         logger.info(f"Generating mask from point ({x}, {y}) for hole {hole}, {feature_type.value}")
         
         # Generate mask from point using SAM
@@ -75,11 +191,11 @@ class PointBasedSelector:
             return None
         
         # Create unique ID for this mask
-        mask_id = f"{feature_type.value}_{hole}_{len(self.generated_masks):04d}"
+        mask_id = self._new_mask_id(f"{feature_type.value}_{hole}")
         mask_data.id = mask_id
         
         # Store generated mask
-        self.generated_masks[mask_id] = mask_data
+        self._store_mask(mask_data)
         
         # Add to selections
         if hole not in self.selections:
@@ -112,6 +228,96 @@ class PointBasedSelector:
         logger.info(f"Generated mask {mask_id} with area {mask_data.area}")
         return mask_data
     
+    @_undoable
+    def click_to_region(
+        self,
+        x: int,
+        y: int,
+        hole: int,
+        feature_type: FeatureType,
+    ) -> Optional[MaskData]:
+        """
+        Toggle the superpixel under a click in the current region.
+        
+        Clicks for the same hole and feature extend one region mask until
+        new_region() is called or the hole/feature changes. Clicking a
+        superpixel already in the region removes it, and a region that
+        becomes empty is removed.
+        
+        Args:
+            x: X coordinate of click
+            y: Y coordinate of click
+            hole: Hole number (1-18)
+            feature_type: Type of feature (green, fairway, bunker, tee)
+            
+        Returns:
+            The region's MaskData, or None if the click was outside the
+            image or emptied the region
+        """
+        index = self.superpixel_index
+        if index is None:
+            raise RuntimeError("Superpixel index is not available")
+        
+        label = index.at(x, y)
+        if label is None:
+            logger.warning(f"Click outside image bounds: ({x}, {y})")
+            return None
+        
+        # Continue the active region if it is for this feature and still exists
+        active = self._active_region
+        if active is not None and active[:2] == (hole, feature_type) and active[2] in self.generated_masks:
+            mask_id = active[2]
+        else:
+            mask_id = self._new_mask_id(f"{feature_type.value}_{hole}_region")
+            self._region_labels[mask_id] = set()
+            self._active_region = (hole, feature_type, mask_id)
+        
+        labels = self._region_labels[mask_id]
+        if label in labels:
+            labels.remove(label)
+        else:
+            labels.add(label)
+        
+        if hole not in self.selections:
+            self.selections[hole] = HoleSelection(hole=hole)
+        selection = self.selections[hole]
+        
+        if not labels:
+            # Region emptied - drop it
+            self.generated_masks.pop(mask_id, None)
+            self._remove_from_selection(selection, feature_type, mask_id)
+            del self._region_labels[mask_id]
+            self._active_region = None
+            logger.info(f"Removed empty region {mask_id}")
+            return None
+        
+        mask = index.mask(labels)
+        y_coords, x_coords = np.nonzero(mask)
+        mask_data = MaskData(
+            id=mask_id,
+            mask=mask,
+            area=len(y_coords),
+            bbox=(
+                int(x_coords.min()),
+                int(y_coords.min()),
+                int(x_coords.max() - x_coords.min()),
+                int(y_coords.max() - y_coords.min()),
+            ),
+            predicted_iou=1.0,  # Not from SAM, user-guided
+            stability_score=1.0,
+            moments=(len(y_coords), int(x_coords.sum()), int(y_coords.sum())),
+        )
+        self._store_mask(mask_data)
+        self._add_to_selection(selection, feature_type, mask_id)
+        
+        logger.info(f"Region {mask_id}: {len(labels)} superpixels, area {mask_data.area}")
+        return mask_data
+    
+    def new_region(self) -> None:
+        """Make the next superpixel click start a new region."""
+        self._active_region = None
+    
+    @_undoable
     def draw_to_mask(
         self,
         outline_points: List[tuple],
@@ -156,11 +362,11 @@ class PointBasedSelector:
             return None
         
         # Create unique ID for this mask
-        mask_id = f"{feature_type.value}_{hole}_{len(self.generated_masks):04d}"
+        mask_id = self._new_mask_id(f"{feature_type.value}_{hole}")
         mask_data.id = mask_id
         
         # Store generated mask
-        self.generated_masks[mask_id] = mask_data
+        self._store_mask(mask_data)
         
         # Add to selections
         if hole not in self.selections:
@@ -193,6 +399,7 @@ class PointBasedSelector:
         logger.info(f"Generated mask {mask_id} with area {mask_data.area}")
         return mask_data
     
+    @_undoable
     def fill_polygon_to_mask(
         self,
         outline_points: List[tuple],
@@ -247,11 +454,11 @@ class PointBasedSelector:
         print(f"[FILL] Generated mask with area {mask_data.area} pixels")
         
         # Create unique ID for this mask
-        mask_id = f"{feature_type.value}_{hole}_fill_{len(self.generated_masks):04d}"
+        mask_id = self._new_mask_id(f"{feature_type.value}_{hole}_fill")
         mask_data.id = mask_id
         
         # Store generated mask
-        self.generated_masks[mask_id] = mask_data
+        self._store_mask(mask_data)
         
         # Add to selections
         if hole not in self.selections:
@@ -276,6 +483,7 @@ class PointBasedSelector:
         logger.info(f"Generated filled polygon mask {mask_id} with area {mask_data.area}")
         return mask_data
 
+    @_undoable
     def grow_from_polygon(
         self,
         outline_points: List[tuple],
@@ -335,11 +543,11 @@ class PointBasedSelector:
         print(f"[GROW] Generated mask with area {mask_data.area} pixels")
         
         # Create unique ID for this mask
-        mask_id = f"{feature_type.value}_{hole}_grow_{len(self.generated_masks):04d}"
+        mask_id = self._new_mask_id(f"{feature_type.value}_{hole}_grow")
         mask_data.id = mask_id
         
         # Store generated mask
-        self.generated_masks[mask_id] = mask_data
+        self._store_mask(mask_data)
         
         # Add to selections
         if hole not in self.selections:
@@ -351,6 +559,7 @@ class PointBasedSelector:
         logger.info(f"Generated grown mask {mask_id} with area {mask_data.area}")
         return mask_data
 
+    @_undoable
     def fill_and_merge(
         self,
         outline_points: List[tuple],
@@ -396,9 +605,9 @@ class PointBasedSelector:
         if existing_mask_id is None or existing_mask_id not in self.generated_masks:
             print(f"[FILL+MERGE] No existing mask to merge - creating standalone fill")
             # Create unique ID
-            mask_id = f"{feature_type.value}_{hole}_fill_{len(self.generated_masks):04d}"
+            mask_id = self._new_mask_id(f"{feature_type.value}_{hole}_fill")
             fill_mask.id = mask_id
-            self.generated_masks[mask_id] = fill_mask
+            self._store_mask(fill_mask)
             
             # Add to selections
             if hole not in self.selections:
@@ -421,22 +630,206 @@ class PointBasedSelector:
             return None
         
         # Create new ID for merged mask
-        merged_id = f"{feature_type.value}_{hole}_merged_{len(self.generated_masks):04d}"
+        merged_id = self._new_mask_id(f"{feature_type.value}_{hole}_merged")
         merged.id = merged_id
         
         # Store merged mask
-        self.generated_masks[merged_id] = merged
+        self._store_mask(merged)
         
         # Update selections: remove old mask ID, add merged
         if hole in self.selections:
             selection = self.selections[hole]
             self._remove_from_selection(selection, feature_type, existing_mask_id)
             self._add_to_selection(selection, feature_type, merged_id)
+        self._discard_unselected([existing_mask_id])
         
         print(f"[FILL+MERGE] Created merged mask: {merged_id} ({merged.area} pixels)")
         logger.info(f"Fill merged into {merged_id}: {existing_mask.area} + {fill_mask.area} -> {merged.area}")
         return merged
     
+    @_undoable
+    def replace_mask(self, mask_data: MaskData) -> bool:
+        """
+        Replace a generated mask with a new version under the same ID.
+        
+        Selections refer to masks by ID, so they are unchanged. Used to
+        commit a slider preview of an existing mask.
+        
+        Args:
+            mask_data: New mask; its ID must be a generated mask
+        
+        Returns:
+            True if the mask was replaced
+        """
+        if mask_data.id not in self.generated_masks:
+            logger.warning(f"Cannot replace unknown mask {mask_data.id}")
+            return False
+        self._store_mask(mask_data)
+        logger.info(f"Replaced mask {mask_data.id} (area {mask_data.area})")
+        return True
+    
+    def undo(self) -> Optional[Edit]:
+        """
+        Undo the most recent operation.
+        
+        Returns:
+            The undone Edit, or None if there was nothing to undo
+        """
+        edit = self.history.pop_undo()
+        if edit is None:
+            logger.info("Nothing to undo")
+            return None
+        self._apply_edit(edit, forward=False)
+        if self.journal is not None:
+            self.journal.log_undo()
+        logger.info(f"Undid {edit.label}")
+        return edit
+    
+    def redo(self) -> Optional[Edit]:
+        """
+        Redo the most recently undone operation.
+        
+        Returns:
+            The redone Edit, or None if there was nothing to redo
+        """
+        edit = self.history.pop_redo()
+        if edit is None:
+            logger.info("Nothing to redo")
+            return None
+        self._apply_edit(edit, forward=True)
+        if self.journal is not None:
+            self.journal.log_redo()
+        logger.info(f"Redid {edit.label}")
+        return edit
+    
+    def resume(self, journal) -> int:
+        """
+        Restore a previous session from its journal and keep journaling.
+        
+        Replays the journaled edits, so masks, selections and the undo
+        history come back without running SAM. Later operations are
+        appended to the same journal.
+        
+        Args:
+            journal: SessionJournal for this image
+            
+        Returns:
+            Number of operations replayed
+        """
+        cap = self.history.max_bytes
+        # Replay with an unbounded history so undo/redo records always
+        # find their edit, then apply the cap
+        self.history.max_bytes = sys.maxsize
+        count = 0
+        try:
+            for record in journal.records():
+                kind = record["type"]
+                if kind == "edit":
+                    edit = Edit.from_dict(record["edit"], self.image.shape[:2])
+                    self._apply_edit(edit, forward=True)
+                    self.history.record(edit)
+                    self._mask_count = max(self._mask_count, record["mask_count"])
+                elif kind in ("undo", "redo"):
+                    forward = kind == "redo"
+                    edit = self.history.pop_redo() if forward else self.history.pop_undo()
+                    if edit is None:
+                        logger.warning(f"Journal {kind} without an edit, skipping")
+                        continue
+                    self._apply_edit(edit, forward=forward)
+                else:
+                    continue  # Not a mask operation (e.g. a finished feature)
+                count += 1
+        finally:
+            self.history.max_bytes = cap
+            self.history.trim()
+        
+        self.journal = journal
+        logger.info(f"Resumed {len(self.generated_masks)} masks from {count} journaled operations")
+        return count
+    
+    def _store_mask(self, mask_data: MaskData) -> None:
+        """Add or replace a generated mask, caching its moments for centroids."""
+        mask_moments(mask_data)
+        self.generated_masks[mask_data.id] = mask_data
+    
+    def _new_mask_id(self, prefix: str) -> str:
+        """Next unused mask ID with the given prefix."""
+        mask_id = f"{prefix}_{self._mask_count:04d}"
+        self._mask_count += 1
+        return mask_id
+    
+    def _snapshot(self) -> tuple:
+        """State that undoable operations change (masks by reference)."""
+        return (
+            dict(self.generated_masks),
+            {hole: self._selection_state(selection) for hole, selection in self.selections.items()},
+            {mask_id: frozenset(labels) for mask_id, labels in self._region_labels.items()},
+        )
+    
+    @staticmethod
+    def _selection_state(selection: HoleSelection) -> tuple:
+        return tuple(tuple(getattr(selection, name)) for name in FEATURE_LISTS)
+    
+    def _diff(self, label: str, before: tuple) -> Edit:
+        """Edit from a _snapshot() to the current state."""
+        masks, selections, regions = before
+        edit = Edit(label)
+        
+        for mask_id in list(masks) + [i for i in self.generated_masks if i not in masks]:
+            old = masks.get(mask_id)
+            new = self.generated_masks.get(mask_id)
+            if old is not new:
+                edit.masks.append(MaskChange.between(old, new))
+        
+        for hole in set(selections) | set(self.selections):
+            old_state = selections.get(hole)
+            new_state = self._selection_state(self.selections[hole]) if hole in self.selections else None
+            if old_state != new_state:
+                edit.selections[hole] = (old_state, new_state)
+        
+        for mask_id in set(regions) | set(self._region_labels):
+            old_labels = regions.get(mask_id)
+            new_labels = self._region_labels.get(mask_id)
+            new_labels = frozenset(new_labels) if new_labels is not None else None
+            if old_labels != new_labels:
+                edit.regions[mask_id] = (old_labels, new_labels)
+        
+        return edit
+    
+    def _apply_edit(self, edit: Edit, forward: bool) -> None:
+        """Move the state to after (forward) or before an edit."""
+        side = 1 if forward else 0
+        
+        for change in edit.masks:
+            change.apply(self.generated_masks, forward)
+        
+        for hole, states in edit.selections.items():
+            state = states[side]
+            if state is None:
+                self.selections.pop(hole, None)
+                continue
+            selection = self.selections.setdefault(hole, HoleSelection(hole=hole))
+            for name, mask_ids in zip(FEATURE_LISTS, state):
+                setattr(selection, name, list(mask_ids))
+        
+        for mask_id, labels in edit.regions.items():
+            if labels[side] is None:
+                self._region_labels.pop(mask_id, None)
+            else:
+                self._region_labels[mask_id] = set(labels[side])
+    
+    def _discard_unselected(self, mask_ids: List[str]) -> None:
+        """Drop masks that no hole selection refers to any more."""
+        selected = {
+            mask_id
+            for selection in self.selections.values()
+            for name in FEATURE_LISTS
+            for mask_id in getattr(selection, name)
+        }
+        for mask_id in mask_ids:
+            if mask_id not in selected and self.generated_masks.pop(mask_id, None) is not None:
+                self._region_labels.pop(mask_id, None)
+    
     def _add_to_selection(self, selection: HoleSelection, feature_type: FeatureType, mask_id: str):
         """Helper to add a mask ID to the appropriate feature list."""
         if feature_type == FeatureType.GREEN:
@@ -473,6 +866,7 @@ class PointBasedSelector:
         elif feature_type == FeatureType.ROUGH and mask_id in selection.rough:
             selection.rough.remove(mask_id)
 
+    @_undoable
     def merge_selected_masks(
         self,
         mask_ids: List[str],
@@ -519,11 +913,11 @@ class PointBasedSelector:
             return None
         
         # Create unique ID for merged mask
-        merged_id = f"{feature_type.value}_{hole}_merged_{len(self.generated_masks):04d}"
+        merged_id = self._new_mask_id(f"{feature_type.value}_{hole}_merged")
         merged_mask.id = merged_id
         
         # Store the merged mask
-        self.generated_masks[merged_id] = merged_mask
+        self._store_mask(merged_mask)
         
         # Update selections: remove old mask IDs, add merged mask ID
         if hole in self.selections:
@@ -553,8 +947,8 @@ class PointBasedSelector:
             # Add the merged mask ID
             feature_list.append(merged_id)
         
-        # Optionally: remove old masks from generated_masks
-        # (keeping them for now in case user wants to undo)
+        # The history keeps the merged masks for undo
+        self._discard_unselected(mask_ids)
         
         logger.info(f"Created merged mask {merged_id} with area {merged_mask.area}")
         return merged_mask
@@ -575,41 +969,53 @@ class PointBasedSelector:
         """
         Extract green center coordinates from selected green masks.
         
+        Centroids come from the masks' cached moments (see mask_moments()),
+        so no pixel data is read.
+        
         Returns:
             List of green center dictionaries [{hole, x, y}, ...]
         """
         green_centers = []
         
         for hole, selection in self.selections.items():
-            if not selection.greens:
-                continue
-            
-            # Calculate centroid of all green masks for this hole
-            all_x_coords = []
-            all_y_coords = []
-            
-            for mask_id in selection.greens:
-                if mask_id not in self.generated_masks:
-                    continue
-                
-                mask_data = self.generated_masks[mask_id]
-                mask = mask_data.mask
-                
-                # Get coordinates of all pixels in the mask
-                y_coords, x_coords = np.where(mask)
-                if len(y_coords) > 0:
-                    all_x_coords.extend(x_coords.tolist())
-                    all_y_coords.extend(y_coords.tolist())
-            
-            if len(all_x_coords) > 0:
-                # Calculate centroid
-                center_x = float(np.mean(all_x_coords))
-                center_y = float(np.mean(all_y_coords))
-                
+            # Centroid of all green masks for this hole
+            center = centroid([
+                mask_moments(self.generated_masks[mask_id])
+                for mask_id in selection.greens
+                if mask_id in self.generated_masks
+            ])
+            if center is not None:
                 green_centers.append({
                     "hole": hole,
-                    "x": center_x,
-                    "y": center_y,
+                    "x": center[0],
+                    "y": center[1],
                 })
         
         return green_centers
+
+    def extract_tee_centers(self) -> List[Dict]:
+        """
+        Extract tee center coordinates from selected tee masks.
+        
+        Each tee mask yields its own entry, so holes with several tee
+        boxes produce several centers.
+        
+        Returns:
+            List of tee center dictionaries [{hole, x, y}, ...]
+        """
+        tee_centers = []
+        
+        for hole, selection in self.selections.items():
+            for mask_id in selection.tees:
+                if mask_id not in self.generated_masks:
+                    continue
+                
+                center = centroid([mask_moments(self.generated_masks[mask_id])])
+                if center is not None:
+                    tee_centers.append({
+                        "hole": hole,
+                        "x": center[0],
+                        "y": center[1],
+                    })
+        
+        return tee_centers
@@ -2,18 +2,183 @@
 Polygon Generation Module
 
 Converts binary masks to clean polygon geometries.
+
+Polygons are stored in a single columnar binary file (``polygons.bin``):
+WKB geometries plus id/class/confidence/bounds/properties columns, read
+through a memory map so bounding-box queries only decode matching rows.
+GeoJSON is available as an opt-in export.
 """
 
 import json
+import struct
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Union
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
 import logging
 
 import numpy as np
 
+from . import serialization
+
 logger = logging.getLogger(__name__)
 
+# Columnar polygon store
+STORE_FILENAME = "polygons.bin"
+STORE_MAGIC = b"P1AGEOM\x00"
+STORE_VERSION = 1
+_STORE_PREAMBLE = struct.Struct("<8sII")  # magic, version, header length
+_STORE_ALIGN = 8
+
+
+def _pack_strings(values: Sequence[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack byte strings into (offsets, blob) columns."""
+    lengths = np.fromiter((len(v) for v in values), dtype=np.int64, count=len(values))
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    blob = np.frombuffer(b"".join(values), dtype=np.uint8)
+    return offsets, blob
+
+
+def write_polygon_store(polygons: List["PolygonFeature"], path: Path) -> None:
+    """
+    Write polygons to a columnar binary store.
+    
+    Layout: preamble (magic, version, header length), a JSON header with
+    the row count and each column's dtype/shape/offset, then the raw
+    8-byte aligned column arrays. Geometries are stored as WKB.
+    
+    Args:
+        polygons: Polygons to store
+        path: Output file path
+    """
+    import shapely
+    
+    geometries = [p.geometry for p in polygons]
+    wkb = shapely.to_wkb(geometries) if polygons else []
+    bounds = (
+        shapely.bounds(geometries) if polygons else np.empty((0, 4))
+    ).astype(np.float64)
+    
+    wkb_offsets, wkb_blob = _pack_strings(list(wkb))
+    id_offsets, id_blob = _pack_strings([p.id.encode() for p in polygons])
+    class_offsets, class_blob = _pack_strings([p.feature_class.encode() for p in polygons])
+    prop_offsets, prop_blob = _pack_strings([
+        serialization.dumps(p.properties, compact=True) for p in polygons
+    ])
+    
+    columns = {
+        "bounds": bounds,
+        "confidence": np.array([p.confidence for p in polygons], dtype=np.float64),
+        "wkb_offsets": wkb_offsets,
+        "wkb": wkb_blob,
+        "id_offsets": id_offsets,
+        "id": id_blob,
+        "class_offsets": class_offsets,
+        "class": class_blob,
+        "properties_offsets": prop_offsets,
+        "properties": prop_blob,
+    }
+    
+    # Column offsets are relative to the start of the data section
+    layout = {}
+    position = 0
+    for name, array in columns.items():
+        layout[name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": position,
+        }
+        position += -(-array.nbytes // _STORE_ALIGN) * _STORE_ALIGN
+    
+    header = json.dumps({"count": len(polygons), "columns": layout}).encode()
+    header += b" " * (-(_STORE_PREAMBLE.size + len(header)) % _STORE_ALIGN)
+    
+    path = Path(path)
+    with open(path, "wb") as f:
+        f.write(_STORE_PREAMBLE.pack(STORE_MAGIC, STORE_VERSION, len(header)))
+        f.write(header)
+        for array in columns.values():
+            data = np.ascontiguousarray(array).tobytes()
+            f.write(data)
+            f.write(b"\x00" * (-len(data) % _STORE_ALIGN))
+
+
+def read_polygon_store(
+    path: Path,
+    bbox: Optional[Tuple[float, float, float, float]] = None,
+) -> List["PolygonFeature"]:
+    """
+    Read polygons from a columnar binary store.
+    
+    The file is memory-mapped; with a bbox only the bounds column is
+    scanned and only the WKB and attributes of matching rows are read
+    and decoded.
+    
+    Args:
+        path: Store file path
+        bbox: Optional (minx, miny, maxx, maxy) filter; polygons whose
+            bounds intersect it are returned
+            
+    Returns:
+        List of PolygonFeature objects in stored order
+    """
+    import shapely
+    
+    path = Path(path)
+    data = np.memmap(path, dtype=np.uint8, mode="r")
+    
+    magic, version, header_length = _STORE_PREAMBLE.unpack_from(data)
+    if magic != STORE_MAGIC:
+        raise ValueError(f"Not a polygon store: {path}")
+    if version != STORE_VERSION:
+        raise ValueError(f"Unsupported polygon store version {version}: {path}")
+    
+    start = _STORE_PREAMBLE.size
+    header = json.loads(bytes(data[start:start + header_length]))
+    base = start + header_length
+    
+    def column(name: str) -> np.ndarray:
+        spec = header["columns"][name]
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"]))
+        offset = base + spec["offset"]
+        return data[offset:offset + count * dtype.itemsize].view(dtype).reshape(spec["shape"])
+    
+    def strings(name: str, rows: np.ndarray) -> List[bytes]:
+        offsets = column(f"{name}_offsets")
+        starts = offsets[rows].tolist()
+        ends = offsets[rows + 1].tolist()
+        blob = memoryview(column(name))
+        return [bytes(blob[a:b]) for a, b in zip(starts, ends)]
+    
+    rows = np.arange(header["count"])
+    if bbox is not None and len(rows):
+        bounds = column("bounds")
+        minx, miny, maxx, maxy = bbox
+        rows = np.flatnonzero(
+            (bounds[:, 0] <= maxx) & (bounds[:, 2] >= minx)
+            & (bounds[:, 1] <= maxy) & (bounds[:, 3] >= miny)
+        )
+    
+    geometries = shapely.from_wkb(strings("wkb", rows)) if len(rows) else []
+    confidence = column("confidence")
+    
+    return [
+        PolygonFeature(
+            id=id_.decode(),
+            feature_class=cls.decode(),
+            confidence=float(confidence[i]),
+            geometry=geometry,
+            properties=serialization.loads(props),
+        )
+        for i, id_, cls, props, geometry in zip(
+            rows,
+            strings("id", rows),
+            strings("class", rows),
+            strings("properties", rows),
+            geometries,
+        )
+    ]
+
 
 @dataclass
 class PolygonFeature:
@@ -211,13 +376,38 @@ class PolygonGenerator:
         self,
         polygons: List[PolygonFeature],
         output_dir: Path,
+        geojson: bool = False,
     ) -> None:
         """
-        Save polygons as individual GeoJSON files.
+        Save polygons to the columnar store (``polygons.bin``).
         
         Args:
             polygons: List of PolygonFeature objects
             output_dir: Directory to save polygons
+            geojson: Also export GeoJSON (see export_geojson)
+        """
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        
+        write_polygon_store(polygons, output_dir / STORE_FILENAME)
+        
+        if geojson:
+            self.export_geojson(polygons, output_dir)
+        
+        logger.info(f"Saved {len(polygons)} polygons to {output_dir}")
+    
+    @staticmethod
+    def export_geojson(
+        polygons: List[PolygonFeature],
+        output_dir: Path,
+    ) -> None:
+        """
+        Export polygons as individual GeoJSON files plus a combined
+        ``all_features.geojson`` FeatureCollection.
+        
+        Args:
+            polygons: List of PolygonFeature objects
+            output_dir: Directory to save GeoJSON files
         """
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -226,8 +416,7 @@ class PolygonGenerator:
             geojson = polygon.to_geojson()
             output_path = output_dir / f"feature_{polygon.id}.geojson"
             
-            with open(output_path, "w") as f:
-                json.dump(geojson, f, indent=2)
+            serialization.dump(geojson, output_path)
         
         # Also save combined GeoJSON
         feature_collection = {
@@ -235,62 +424,74 @@ class PolygonGenerator:
             "features": [p.to_geojson() for p in polygons],
         }
         
-        with open(output_dir / "all_features.geojson", "w") as f:
-            json.dump(feature_collection, f, indent=2)
+        serialization.dump(feature_collection, output_dir / "all_features.geojson")
         
-        logger.info(f"Saved {len(polygons)} polygons to {output_dir}")
+        logger.info(f"Exported {len(polygons)} polygons as GeoJSON to {output_dir}")
     
     @staticmethod
-    def load_polygons(polygons_dir: Path) -> List[PolygonFeature]:
+    def _feature_from_geojson(feature: dict) -> PolygonFeature:
+        """Create a PolygonFeature from a GeoJSON Feature."""
+        from shapely.geometry import shape
+        
+        return PolygonFeature(
+            id=feature["id"],
+            feature_class=feature["properties"]["class"],
+            confidence=feature["properties"]["confidence"],
+            geometry=shape(feature["geometry"]),
+            properties={
+                k: v for k, v in feature["properties"].items()
+                if k not in ("class", "confidence")
+            },
+        )
+    
+    @staticmethod
+    def load_polygons(
+        polygons_dir: Path,
+        bbox: Optional[Tuple[float, float, float, float]] = None,
+    ) -> List[PolygonFeature]:
         """
-        Load polygons from GeoJSON files.
+        Load polygons from the columnar store, or from GeoJSON files
+        written by earlier versions.
         
         Args:
-            polygons_dir: Directory containing GeoJSON files
+            polygons_dir: Directory containing ``polygons.bin`` or GeoJSON files
+            bbox: Optional (minx, miny, maxx, maxy) filter; only polygons
+                whose bounds intersect it are returned
             
         Returns:
             List of PolygonFeature objects
         """
-        from shapely.geometry import shape
-        
         polygons_dir = Path(polygons_dir)
+        
+        store_path = polygons_dir / STORE_FILENAME
+        if store_path.exists():
+            polygons = read_polygon_store(store_path, bbox=bbox)
+            logger.info(f"Loaded {len(polygons)} polygons from {store_path}")
+            return polygons
+        
         polygons = []
         
         # Try loading combined file first
         combined_path = polygons_dir / "all_features.geojson"
         if combined_path.exists():
-            with open(combined_path) as f:
-                fc = json.load(f)
+            fc = serialization.load(combined_path)
             
             for feature in fc["features"]:
-                polygon = PolygonFeature(
-                    id=feature["id"],
-                    feature_class=feature["properties"]["class"],
-                    confidence=feature["properties"]["confidence"],
-                    geometry=shape(feature["geometry"]),
-                    properties={
-                        k: v for k, v in feature["properties"].items()
-                        if k not in ("class", "confidence")
-                    },
-                )
-                polygons.append(polygon)
+                polygons.append(PolygonGenerator._feature_from_geojson(feature))
         else:
             # Load individual files
             for geojson_path in sorted(polygons_dir.glob("feature_*.geojson")):
-                with open(geojson_path) as f:
-                    feature = json.load(f)
+                feature = serialization.load(geojson_path)
                 
-                polygon = PolygonFeature(
-                    id=feature["id"],
-                    feature_class=feature["properties"]["class"],
-                    confidence=feature["properties"]["confidence"],
-                    geometry=shape(feature["geometry"]),
-                    properties={
-                        k: v for k, v in feature["properties"].items()
-                        if k not in ("class", "confidence")
-                    },
-                )
-                polygons.append(polygon)
+                polygons.append(PolygonGenerator._feature_from_geojson(feature))
+        
+        if bbox is not None:
+            from shapely.geometry import box
+            
+            query = box(*bbox)
+            polygons = [
+                p for p in polygons if box(*p.geometry.bounds).intersects(query)
+            ]
         
         logger.info(f"Loaded {len(polygons)} polygons from {polygons_dir}")
         return polygons
@@ -0,0 +1,570 @@
+"""
+ONNX Runtime SAM Backend Module
+
+Runs SAM with ONNX Runtime instead of PyTorch, for CPU-only machines.
+
+export_onnx() converts a SAM checkpoint into an image encoder and a
+prompt decoder model, optionally with dynamic int8 quantization (about
+4x smaller and 2-3x faster on CPU, at a small accuracy cost).
+OnnxSamPredictor and OnnxAutomaticMaskGenerator have the interfaces of
+segment-anything's SamPredictor and SamAutomaticMaskGenerator, so
+MaskGenerator uses them unchanged (``backend="onnx"``).
+
+Smaller SAM variants (``vit_b``: 91M parameters vs 636M for ``vit_h``)
+are selected with the usual model_type.
+
+Exporting needs torch and segment-anything; inference needs only
+onnxruntime.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Tuple
+import logging
+
+import numpy as np
+from PIL import Image
+
+from .sam_server import ImageKeyCache
+
+logger = logging.getLogger(__name__)
+
+# SAM preprocessing constants (segment_anything.modeling.Sam)
+IMAGE_SIZE = 1024
+PIXEL_MEAN = np.array([123.675, 116.28, 103.53], dtype=np.float32)
+PIXEL_STD = np.array([58.395, 57.12, 57.375], dtype=np.float32)
+MASK_INPUT_SIZE = 256
+
+
+def onnx_model_paths(
+    onnx_dir: Path,
+    model_type: str,
+    quantized: bool = False,
+) -> Tuple[Path, Path]:
+    """
+    Encoder and decoder file paths for a model variant.
+    
+    Returns:
+        Tuple of (encoder_path, decoder_path)
+    """
+    suffix = ".quant.onnx" if quantized else ".onnx"
+    onnx_dir = Path(onnx_dir)
+    return (
+        onnx_dir / f"sam_{model_type}_encoder{suffix}",
+        onnx_dir / f"sam_{model_type}_decoder{suffix}",
+    )
+
+
+def export_onnx(
+    model_type: str,
+    checkpoint_path: str,
+    output_dir: Path,
+    quantize: bool = False,
+    opset: int = 17,
+) -> Tuple[Path, Path]:
+    """
+    Export a SAM checkpoint to ONNX encoder and decoder models.
+    
+    Args:
+        model_type: SAM model variant ('vit_h', 'vit_l', 'vit_b')
+        checkpoint_path: Path to SAM checkpoint file
+        output_dir: Directory for the .onnx files
+        quantize: Also write int8 dynamically quantized models
+        opset: ONNX opset version
+    
+    Returns:
+        Tuple of (encoder_path, decoder_path) of the exported models
+        (the quantized ones if quantize is set)
+    """
+    try:
+        import torch
+        from segment_anything import sam_model_registry
+        from segment_anything.utils.onnx import SamOnnxModel
+    except ImportError:
+        raise ImportError(
+            "torch and segment-anything are required to export ONNX models. "
+            "Install with: pip install -e \".[sam]\""
+        )
+    
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    encoder_path, decoder_path = onnx_model_paths(output_dir, model_type)
+    
+    logger.info(f"Loading SAM model ({model_type}) from {checkpoint_path}")
+    sam = sam_model_registry[model_type](checkpoint=checkpoint_path)
+    sam.eval()
+    
+    logger.info(f"Exporting image encoder to {encoder_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            sam.image_encoder,
+            torch.randn(1, 3, IMAGE_SIZE, IMAGE_SIZE),
+            str(encoder_path),
+            input_names=["image"],
+            output_names=["image_embeddings"],
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    
+    # All four mask tokens are returned; predict() slices them like SamPredictor
+    decoder = SamOnnxModel(sam, return_single_mask=False)
+    embed_dim = sam.prompt_encoder.embed_dim
+    embed_size = sam.prompt_encoder.image_embedding_size
+    dummy_inputs = {
+        "image_embeddings": torch.randn(1, embed_dim, *embed_size),
+        "point_coords": torch.randint(0, IMAGE_SIZE, (1, 5, 2), dtype=torch.float),
+        "point_labels": torch.randint(0, 4, (1, 5), dtype=torch.float),
+        "mask_input": torch.randn(1, 1, MASK_INPUT_SIZE, MASK_INPUT_SIZE),
+        "has_mask_input": torch.tensor([1], dtype=torch.float),
+        "orig_im_size": torch.tensor([1500, 2250], dtype=torch.float),
+    }
+    
+    logger.info(f"Exporting prompt decoder to {decoder_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            decoder,
+            tuple(dummy_inputs.values()),
+            str(decoder_path),
+            input_names=list(dummy_inputs),
+            output_names=["masks", "iou_predictions", "low_res_masks"],
+            # Several prompts per run share the one image embedding
+            dynamic_axes={
+                "point_coords": {0: "num_prompts", 1: "num_points"},
+                "point_labels": {0: "num_prompts", 1: "num_points"},
+            },
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+    
+    if not quantize:
+        return encoder_path, decoder_path
+    
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    
+    quant_paths = onnx_model_paths(output_dir, model_type, quantized=True)
+    for source, target in zip((encoder_path, decoder_path), quant_paths):
+        logger.info(f"Quantizing {source.name} to int8")
+        quantize_dynamic(
+            str(source),
+            str(target),
+            weight_type=QuantType.QUInt8,
+            # vit_h weights exceed the 2 GB protobuf limit
+            use_external_data_format=source == encoder_path,
+        )
+    
+    return quant_paths
+
+
+def preprocess_shape(height: int, width: int, long_side: int = IMAGE_SIZE) -> Tuple[int, int]:
+    """Size of an image resized so its longest side is long_side (ResizeLongestSide)."""
+    scale = long_side / max(height, width)
+    return int(height * scale + 0.5), int(width * scale + 0.5)
+
+
+def preprocess_image(image: np.ndarray) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """
+    Resize, normalize and pad an RGB image like SamPredictor.set_image.
+    
+    Returns:
+        Tuple of (encoder input of shape (1, 3, 1024, 1024), resized (h, w))
+    """
+    height, width = image.shape[:2]
+    input_size = preprocess_shape(height, width)
+    
+    resized = Image.fromarray(image).resize(input_size[::-1], Image.BILINEAR)
+    normalized = (np.asarray(resized, dtype=np.float32) - PIXEL_MEAN) / PIXEL_STD
+    
+    padded = np.zeros((IMAGE_SIZE, IMAGE_SIZE, 3), dtype=np.float32)
+    padded[:input_size[0], :input_size[1]] = normalized
+    return padded.transpose(2, 0, 1)[None], input_size
+
+
+def prompt_inputs(
+    original_size: Tuple[int, int],
+    input_size: Tuple[int, int],
+    point_coords: Optional[np.ndarray] = None,
+    point_labels: Optional[np.ndarray] = None,
+    box: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decoder point inputs for point and box prompts.
+    
+    Coordinates are scaled to the resized image. Box corners become points
+    labelled 2 and 3; without a box a padding point labelled -1 is added,
+    as SAM's prompt encoder does.
+    
+    Returns:
+        Tuple of (coords (1, N, 2), labels (1, N)) as float32
+    """
+    scale = np.array(
+        [input_size[1] / original_size[1], input_size[0] / original_size[0]],
+        dtype=np.float32,
+    )
+    coords = [np.zeros((0, 2), dtype=np.float32)]
+    labels = [np.zeros(0, dtype=np.float32)]
+    
+    if point_coords is not None:
+        coords.append(np.asarray(point_coords, dtype=np.float32).reshape(-1, 2) * scale)
+        labels.append(np.asarray(point_labels, dtype=np.float32).reshape(-1))
+    
+    if box is not None:
+        coords.append(np.asarray(box, dtype=np.float32).reshape(2, 2) * scale)
+        labels.append(np.array([2, 3], dtype=np.float32))
+    else:
+        coords.append(np.zeros((1, 2), dtype=np.float32))
+        labels.append(np.array([-1], dtype=np.float32))
+    
+    return np.concatenate(coords)[None], np.concatenate(labels)[None]
+
+
+def box_nms(boxes: np.ndarray, scores: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Non-maximum suppression of (x0, y0, x1, y1) boxes.
+    
+    Returns:
+        Indices of kept boxes, highest score first
+    """
+    order = np.argsort(-scores, kind="stable")
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    keep = []
+    
+    while len(order) > 0:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        
+        x0 = np.maximum(boxes[best, 0], boxes[rest, 0])
+        y0 = np.maximum(boxes[best, 1], boxes[rest, 1])
+        x1 = np.minimum(boxes[best, 2], boxes[rest, 2])
+        y1 = np.minimum(boxes[best, 3], boxes[rest, 3])
+        inter = np.clip(x1 - x0, 0, None) * np.clip(y1 - y0, 0, None)
+        iou = inter / np.maximum(areas[best] + areas[rest] - inter, 1e-9)
+        order = rest[iou <= threshold]
+    
+    return np.array(keep, dtype=int)
+
+
+def _batches_prompts(decoder) -> bool:
+    """Whether a decoder session takes several prompts per run."""
+    for node in decoder.get_inputs():
+        if node.name == "point_coords":
+            return not isinstance(node.shape[0], int)
+    return False
+
+
+class OnnxSamPredictor:
+    """
+    SamPredictor interface on ONNX Runtime sessions.
+    
+    The current image embedding lives in the same attributes SamPredictor
+    uses (features, original_size, input_size, is_image_set), so
+    SAMServer's embedding cache works with either predictor.
+    """
+    
+    mask_threshold = 0.0
+    
+    def __init__(self, encoder, decoder):
+        """
+        Initialize the predictor.
+        
+        Args:
+            encoder: onnxruntime.InferenceSession of the image encoder
+            decoder: onnxruntime.InferenceSession of the prompt decoder
+        """
+        self.encoder = encoder
+        self.decoder = decoder
+        # Decoders exported before the prompt axis was dynamic take one
+        self.batch_prompts = _batches_prompts(decoder)
+        self._image_keys = ImageKeyCache()
+        self.reset_image()
+    
+    @classmethod
+    def from_files(
+        cls,
+        encoder_path: Path,
+        decoder_path: Path,
+        device: str = "cpu",
+        num_threads: Optional[int] = None,
+    ) -> "OnnxSamPredictor":
+        """
+        Create a predictor from exported model files.
+        
+        Args:
+            encoder_path: Path to the encoder .onnx file
+            decoder_path: Path to the decoder .onnx file
+            device: 'cuda' to use the CUDA execution provider when available
+            num_threads: Intra-op threads (None = ONNX Runtime default)
+        """
+        for path in (encoder_path, decoder_path):
+            if not Path(path).exists():
+                raise FileNotFoundError(
+                    f"ONNX model not found: {path}. "
+                    "Create it with: phase1a export-onnx --checkpoint <sam.pth>"
+                )
+        
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "onnxruntime is required for the ONNX SAM backend. "
+                "Install with: pip install -e \".[onnx]\""
+            )
+        
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        
+        providers = ["CPUExecutionProvider"]
+        if device == "cuda":
+            providers.insert(0, "CUDAExecutionProvider")
+        
+        logger.info(f"Loading ONNX SAM models {encoder_path.name}, {decoder_path.name}")
+        return cls(
+            ort.InferenceSession(str(encoder_path), options, providers=providers),
+            ort.InferenceSession(str(decoder_path), options, providers=providers),
+        )
+    
+    def reset_image(self) -> None:
+        """Forget the current image embedding."""
+        self.features = None
+        self.original_size = None
+        self.input_size = None
+        self.is_image_set = False
+        self._encoded = None
+    
+    def set_image(self, image: np.ndarray) -> None:
+        """
+        Encode an RGB image (skipped if it is the image already set).
+        
+        Args:
+            image: Image array (H, W, 3) in RGB format
+        """
+        key = self._image_keys(image)
+        # features may have been swapped in from a cache since the last encode
+        if self._encoded is not None and self._encoded == (key, id(self.features)):
+            return
+        
+        encoder_input, input_size = preprocess_image(image)
+        (self.features,) = self.encoder.run(None, {"image": encoder_input})
+        self.original_size = tuple(image.shape[:2])
+        self.input_size = input_size
+        self.is_image_set = True
+        self._encoded = (key, id(self.features))
+    
+    def _decode(
+        self,
+        point_coords: Optional[np.ndarray],
+        point_labels: Optional[np.ndarray],
+        box: Optional[np.ndarray],
+        mask_input: Optional[np.ndarray],
+        output_size: Tuple[int, int],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Run the decoder; returns all four mask tokens' logits at output_size."""
+        coords, labels = prompt_inputs(
+            self.original_size, self.input_size, point_coords, point_labels, box
+        )
+        if mask_input is None:
+            mask_input = np.zeros((1, 1, MASK_INPUT_SIZE, MASK_INPUT_SIZE), dtype=np.float32)
+            has_mask_input = np.zeros(1, dtype=np.float32)
+        else:
+            mask_input = np.asarray(mask_input, dtype=np.float32).reshape(
+                1, 1, MASK_INPUT_SIZE, MASK_INPUT_SIZE
+            )
+            has_mask_input = np.ones(1, dtype=np.float32)
+        
+        masks, scores, low_res = self.decoder.run(None, {
+            "image_embeddings": self.features,
+            "point_coords": coords,
+            "point_labels": labels,
+            "mask_input": mask_input,
+            "has_mask_input": has_mask_input,
+            "orig_im_size": np.array(output_size, dtype=np.float32),
+        })
+        return masks[0], scores[0], low_res[0]
+    
+    def _decode_points(
+        self,
+        points: np.ndarray,
+        output_size: Tuple[int, int],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decode one foreground point prompt per row of points in one run.
+        
+        Needs a decoder with a dynamic prompt axis (see batch_prompts).
+        
+        Returns:
+            Tuple of (logits (B, 4, H, W) at output_size, scores (B, 4))
+        """
+        prompts = [
+            prompt_inputs(self.original_size, self.input_size, point[None], np.ones(1))
+            for point in points
+        ]
+        masks, scores, _ = self.decoder.run(None, {
+            "image_embeddings": self.features,
+            "point_coords": np.concatenate([coords for coords, _ in prompts]),
+            "point_labels": np.concatenate([labels for _, labels in prompts]),
+            "mask_input": np.zeros((1, 1, MASK_INPUT_SIZE, MASK_INPUT_SIZE), dtype=np.float32),
+            "has_mask_input": np.zeros(1, dtype=np.float32),
+            "orig_im_size": np.array(output_size, dtype=np.float32),
+        })
+        return masks, scores
+    
+    def predict(
+        self,
+        point_coords: Optional[np.ndarray] = None,
+        point_labels: Optional[np.ndarray] = None,
+        box: Optional[np.ndarray] = None,
+        mask_input: Optional[np.ndarray] = None,
+        multimask_output: bool = True,
+        return_logits: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Predict masks for prompts on the current image (see SamPredictor.predict).
+        
+        Returns:
+            Tuple of (masks (C, H, W), scores (C,), low-res logits (C, 256, 256))
+        """
+        if not self.is_image_set:
+            raise RuntimeError("An image must be set with set_image() before mask prediction.")
+        
+        masks, scores, low_res = self._decode(
+            point_coords, point_labels, box, mask_input, self.original_size
+        )
+        
+        # Token 0 is the single-mask output, tokens 1-3 the multimask outputs
+        tokens = slice(1, None) if multimask_output else slice(0, 1)
+        masks, scores, low_res = masks[tokens], scores[tokens], low_res[tokens]
+        
+        if not return_logits:
+            masks = masks > self.mask_threshold
+        return masks, scores, low_res
+
+
+class OnnxAutomaticMaskGenerator:
+    """
+    SamAutomaticMaskGenerator interface on an OnnxSamPredictor.
+    
+    Prompts SAM with a grid of points over the whole image, keeps masks
+    that pass the predicted IoU and stability thresholds and removes
+    duplicates with box NMS. Unlike segment-anything's generator it uses
+    a single crop and drops (rather than cleans up) masks smaller than
+    min_mask_region_area. Grid points are decoded points_per_batch at a
+    time when the decoder allows it (models exported by export_onnx()).
+    """
+    
+    def __init__(
+        self,
+        predictor: OnnxSamPredictor,
+        points_per_side: int = 32,
+        pred_iou_thresh: float = 0.88,
+        stability_score_thresh: float = 0.95,
+        stability_score_offset: float = 1.0,
+        box_nms_thresh: float = 0.7,
+        min_mask_region_area: int = 0,
+        points_per_batch: int = 64,
+    ):
+        self.predictor = predictor
+        self.points_per_side = points_per_side
+        self.pred_iou_thresh = pred_iou_thresh
+        self.stability_score_thresh = stability_score_thresh
+        self.stability_score_offset = stability_score_offset
+        self.box_nms_thresh = box_nms_thresh
+        self.min_mask_region_area = min_mask_region_area
+        self.points_per_batch = points_per_batch
+    
+    def point_grid(self, height: int, width: int) -> np.ndarray:
+        """Grid of prompt points in image coordinates, shape (N, 2)."""
+        offset = 1 / (2 * self.points_per_side)
+        steps = np.linspace(offset, 1 - offset, self.points_per_side)
+        xs, ys = np.meshgrid(steps * width, steps * height)
+        return np.stack([xs.ravel(), ys.ravel()], axis=1)
+    
+    def _candidates(
+        self,
+        point: np.ndarray,
+        logits: np.ndarray,
+        scores: np.ndarray,
+    ) -> List[tuple]:
+        """
+        Multimask outputs of one grid point that pass the thresholds.
+        
+        Returns:
+            List of (logits, score, stability, point, (x0, y0, x1, y1))
+        """
+        candidates = []
+        for mask_logits, score in zip(logits[1:], scores[1:]):
+            if score < self.pred_iou_thresh:
+                continue
+            
+            high = np.count_nonzero(mask_logits > self.stability_score_offset)
+            low = np.count_nonzero(mask_logits > -self.stability_score_offset)
+            stability = high / low if low else 0.0
+            if stability < self.stability_score_thresh:
+                continue
+            
+            ys, xs = np.nonzero(mask_logits > self.predictor.mask_threshold)
+            if len(xs) == 0:
+                continue
+            # A copy, so the batch's other outputs can be freed
+            candidates.append((
+                mask_logits.copy(), float(score), float(stability), point,
+                (xs.min(), ys.min(), xs.max() + 1, ys.max() + 1),
+            ))
+        return candidates
+    
+    def generate(self, image: np.ndarray) -> List[dict]:
+        """
+        Generate masks for an image.
+        
+        Returns:
+            List of dicts with segmentation, area, bbox (x, y, w, h),
+            predicted_iou, stability_score and point_coords
+        """
+        predictor = self.predictor
+        predictor.set_image(image)
+        height, width = image.shape[:2]
+        
+        # Decode at the resized resolution and upscale only the kept masks
+        candidates = []
+        grid = self.point_grid(height, width)
+        batch = self.points_per_batch if predictor.batch_prompts else 1
+        for start in range(0, len(grid), batch):
+            points = grid[start:start + batch]
+            logits, scores = predictor._decode_points(points, predictor.input_size)
+            for point, point_logits, point_scores in zip(points, logits, scores):
+                candidates.extend(self._candidates(point, point_logits, point_scores))
+        
+        if not candidates:
+            return []
+        
+        keep = box_nms(
+            np.array([c[4] for c in candidates], dtype=np.float32),
+            np.array([c[1] for c in candidates]),
+            self.box_nms_thresh,
+        )
+        
+        import cv2
+        
+        results = []
+        for index in keep:
+            mask_logits, score, stability, point, _ = candidates[index]
+            segmentation = cv2.resize(
+                mask_logits, (width, height), interpolation=cv2.INTER_LINEAR
+            ) > predictor.mask_threshold
+            
+            area = int(np.count_nonzero(segmentation))
+            if area == 0 or area < self.min_mask_region_area:
+                continue
+            
+            ys, xs = np.nonzero(segmentation)
+            results.append({
+                "segmentation": segmentation,
+                "area": area,
+                "bbox": [int(xs.min()), int(ys.min()),
+                         int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)],
+                "predicted_iou": score,
+                "stability_score": stability,
+                "point_coords": [point.tolist()],
+            })
+        
+        logger.debug(f"ONNX automatic generation: {len(candidates)} candidates, "
+                     f"{len(results)} masks")
+        return results
@@ -0,0 +1,665 @@
+"""
+SAM Model Server Module
+
+Keeps a SAM model loaded in a long-lived process and serves image encode
+and mask decode requests to other phase1a processes over a Unix socket
+(or a localhost TCP port), so ``phase1a select``/``run`` sessions do not
+reload the checkpoint every time.
+
+Image embeddings are cached on the server by image content, so clicking
+on an image that any client already encoded skips the ViT encoder.
+
+Start a server with ``phase1a sam-server --checkpoint sam_vit_h.pth``.
+MaskGenerator uses it when asked to (``use_server=True``, see connect())
+and falls back to loading the model in-process when no server is running.
+
+Messages are pickled (multiprocessing.connection), so both ends must
+trust each other. The socket and a random auth key (mode 0600) live in
+a private per-user directory (see runtime_dir()), clients only connect
+to sockets owned by their user, and TCP servers listen on loopback
+unless remote clients are explicitly allowed.
+"""
+
+import hashlib
+import ipaddress
+import os
+import secrets
+import socket
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+from multiprocessing.connection import Client, Connection, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Environment variables for the server address and auth key
+ADDRESS_ENV = "PHASE1A_SAM_SERVER"
+AUTHKEY_ENV = "PHASE1A_SAM_AUTHKEY"
+
+Address = Union[str, Tuple[str, int]]
+
+
+def runtime_dir() -> Path:
+    """
+    Private per-user directory for the server socket and auth key.
+    
+    ``$XDG_RUNTIME_DIR/phase1a`` where available, else
+    ``<temp dir>/phase1a-<uid>``. It is created with mode 0700; an
+    existing directory must be owned by the user and closed to others,
+    so other users cannot plant a socket or key in it.
+    
+    Raises:
+        RuntimeError: If the directory is not private
+    """
+    base = os.environ.get("XDG_RUNTIME_DIR")
+    if base:
+        path = Path(base) / "phase1a"
+    else:
+        path = Path(tempfile.gettempdir()) / f"phase1a-{os.getuid()}"
+    try:
+        path.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} is not a private directory owned by this user")
+    return path
+
+
+def default_address() -> str:
+    """Default Unix socket path of the SAM server."""
+    return str(runtime_dir() / "sam.sock")
+
+
+def parse_address(address: str) -> Address:
+    """
+    Parse a server address.
+    
+    Args:
+        address: ``host:port`` for TCP, anything else is a Unix socket path
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and host and port.isdigit():
+        return (host, int(port))
+    return address
+
+
+def is_loopback(host: str) -> bool:
+    """Whether every address ``host`` resolves to is a loopback address."""
+    try:
+        infos = socket.getaddrinfo(host, None)
+    except socket.gaierror:
+        return False
+    return all(ipaddress.ip_address(info[4][0].split("%")[0]).is_loopback for info in infos)
+
+
+def _authkey(create: bool = False) -> Optional[bytes]:
+    """
+    Auth key shared by the server and its clients.
+    
+    $PHASE1A_SAM_AUTHKEY if set, else a random key kept in
+    ``runtime_dir()/authkey`` (mode 0600) and generated by the first
+    server to start.
+    
+    Args:
+        create: Generate the key file if it does not exist
+    
+    Returns:
+        The key, or None if there is none and ``create`` is False
+    """
+    key = os.environ.get(AUTHKEY_ENV)
+    if key:
+        return key.encode()
+    
+    path = runtime_dir() / "authkey"
+    if create:
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(32))
+    try:
+        return path.read_text().strip().encode() or None
+    except FileNotFoundError:
+        return None
+
+
+def image_key(image: np.ndarray) -> str:
+    """Content hash identifying an image in the embedding cache."""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((image.shape, image.dtype.str)).encode())
+    digest.update(memoryview(image).cast("B"))
+    return digest.hexdigest()
+
+
+class ImageKeyCache:
+    """
+    image_key() of recently seen image arrays, looked up by identity.
+    
+    Hashing a large image takes tens to hundreds of milliseconds, and the
+    same array is passed for every prompt on an image, so only arrays not
+    seen recently are hashed. Arrays must not be modified in place while
+    cached.
+    """
+    
+    def __init__(self, size: int = 2):
+        """
+        Initialize the cache.
+        
+        Args:
+            size: Arrays remembered (e.g. a full image and its current crop)
+        """
+        self.size = size
+        self._entries: List[Tuple[np.ndarray, str]] = []
+    
+    def __call__(self, image: np.ndarray) -> str:
+        for i, (cached, key) in enumerate(self._entries):
+            if cached is image:
+                self._entries.insert(0, self._entries.pop(i))
+                return key
+        
+        key = image_key(image)
+        self._entries.insert(0, (image, key))
+        del self._entries[self.size:]
+        return key
+
+
+def pack_masks(masks: np.ndarray) -> Tuple[bytes, tuple]:
+    """Bit-pack boolean masks for transfer (8x smaller than bool arrays)."""
+    masks = np.asarray(masks, dtype=bool)
+    return np.packbits(masks, axis=-1).tobytes(), masks.shape
+
+
+def unpack_masks(data: bytes, shape: tuple) -> np.ndarray:
+    """Inverse of pack_masks()."""
+    packed_shape = tuple(shape[:-1]) + ((shape[-1] + 7) // 8,)
+    packed = np.frombuffer(data, dtype=np.uint8).reshape(packed_shape)
+    return np.unpackbits(packed, axis=-1, count=shape[-1]).astype(bool)
+
+
+class SAMServer:
+    """
+    Serve a SAM model to phase1a processes.
+    
+    One model and predictor are shared by all connections; requests are
+    handled on a thread per connection and run on the model one at a time.
+    """
+    
+    def __init__(
+        self,
+        model_type: str = "vit_h",
+        checkpoint_path: Optional[str] = None,
+        device: str = "cuda",
+        address: Optional[str] = None,
+        cache_size: int = 16,
+        backend: str = "torch",
+        onnx_dir: Optional[str] = None,
+        quantized: bool = False,
+        allow_remote: bool = False,
+    ):
+        """
+        Initialize the server (the model is loaded by start()).
+        
+        Args:
+            model_type: SAM model variant ('vit_h', 'vit_l', 'vit_b')
+            checkpoint_path: Path to SAM checkpoint file
+            device: Device to run inference on ('cuda' or 'cpu')
+            address: Unix socket path or ``host:port`` (default: default_address())
+            cache_size: Number of image embeddings to keep in memory
+            backend: 'torch' or 'onnx' (see MaskGenerator)
+            onnx_dir: Directory with exported ONNX models
+            quantized: Use the int8 quantized ONNX models
+            allow_remote: Allow a TCP address other than loopback. Clients
+                then need the key via $PHASE1A_SAM_AUTHKEY, and messages
+                travel unencrypted.
+        """
+        self.model_type = model_type
+        self.checkpoint_path = checkpoint_path
+        self.device = device
+        self.address = address or default_address()
+        self.cache_size = cache_size
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.quantized = quantized
+        self.allow_remote = allow_remote
+        
+        self.hits = 0
+        self.misses = 0
+        
+        self._sam = None
+        self._predictor = None
+        self._mask_generators: Dict[tuple, Any] = {}
+        self._embeddings: "OrderedDict[str, tuple]" = OrderedDict()
+        self._current_key: Optional[str] = None
+        self._lock = threading.Lock()
+        self._listener: Optional[Listener] = None
+        self._closed = threading.Event()
+    
+    def _generator(self):
+        """In-process MaskGenerator for the served model (loads it lazily)."""
+        from .masks import MaskGenerator
+        
+        return MaskGenerator(
+            model_type=self.model_type,
+            checkpoint_path=self.checkpoint_path,
+            device=self.device,
+            use_server=False,
+            backend=self.backend,
+            onnx_dir=self.onnx_dir,
+            quantized=self.quantized,
+        )
+    
+    def _load_model(self) -> None:
+        """Load SAM and create the shared predictor."""
+        generator = self._generator()
+        generator._load_model()
+        self._sam = generator._sam
+        self._predictor = generator._predictor
+    
+    def _automatic_generator(self, params: dict) -> Any:
+        """SamAutomaticMaskGenerator for a parameter set, sharing the model."""
+        key = tuple(sorted(params.items()))
+        if key not in self._mask_generators:
+            if self.backend == "onnx":
+                from .sam_onnx import OnnxAutomaticMaskGenerator
+                
+                self._mask_generators[key] = OnnxAutomaticMaskGenerator(self._predictor, **params)
+            else:
+                from segment_anything import SamAutomaticMaskGenerator
+                
+                self._mask_generators[key] = SamAutomaticMaskGenerator(model=self._sam, **params)
+        return self._mask_generators[key]
+    
+    # -------------------------------------------------------------------------
+    # Embedding cache
+    # -------------------------------------------------------------------------
+    
+    def _get_embedding(self) -> tuple:
+        """Snapshot of the predictor's current image embedding."""
+        predictor = self._predictor
+        return (predictor.features, predictor.original_size, predictor.input_size)
+    
+    def _set_embedding(self, embedding: tuple) -> None:
+        """Restore an image embedding into the predictor without encoding."""
+        predictor = self._predictor
+        predictor.features, predictor.original_size, predictor.input_size = embedding
+        predictor.is_image_set = True
+    
+    def _activate(self, key: str) -> bool:
+        """
+        Make the embedding for an image key current.
+        
+        Returns:
+            False if the embedding is not cached
+        """
+        if key == self._current_key and key in self._embeddings:
+            self._embeddings.move_to_end(key)
+            self.hits += 1
+            return True
+        
+        embedding = self._embeddings.get(key)
+        if embedding is None:
+            return False
+        
+        self._embeddings.move_to_end(key)
+        self._set_embedding(embedding)
+        self._current_key = key
+        self.hits += 1
+        return True
+    
+    def _encode(self, key: str, image: np.ndarray) -> None:
+        """Encode an image and cache its embedding."""
+        self.misses += 1
+        self._predictor.set_image(image)
+        self._current_key = key
+        
+        self._embeddings[key] = self._get_embedding()
+        while len(self._embeddings) > self.cache_size:
+            self._embeddings.popitem(last=False)
+    
+    # -------------------------------------------------------------------------
+    # Requests
+    # -------------------------------------------------------------------------
+    
+    def _op_hello(self) -> dict:
+        return {
+            "model_type": self.model_type,
+            # Path, size and mtime of the served model file
+            "model_identity": self._generator()._model_identity(),
+            "backend": self.backend,
+            "device": self.device,
+            "cache_size": self.cache_size,
+        }
+    
+    def _op_stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached": len(self._embeddings),
+        }
+    
+    def _op_set_image(self, key: str, image: Optional[np.ndarray] = None) -> bool:
+        if self._activate(key):
+            return True
+        if image is None:
+            return False
+        self._encode(key, image)
+        return True
+    
+    def _op_predict(self, key: str, **kwargs) -> dict:
+        if not self._activate(key):
+            raise KeyError(f"image {key} is not cached, call set_image first")
+        
+        masks, scores, logits = self._predictor.predict(**kwargs)
+        data, shape = pack_masks(masks)
+        return {"masks": data, "shape": shape, "scores": scores, "logits": logits}
+    
+    def _op_generate(self, image: np.ndarray, params: dict) -> List[dict]:
+        results = self._automatic_generator(params).generate(image)
+        for result in results:
+            result["segmentation"] = pack_masks(result["segmentation"])
+        # The automatic generator replaces the predictor's embedding
+        self._current_key = None
+        return results
+    
+    def handle(self, op: str, kwargs: dict) -> Any:
+        """
+        Run one request.
+        
+        Args:
+            op: Operation name (hello, stats, set_image, predict, generate)
+            kwargs: Operation arguments
+        """
+        method = getattr(self, f"_op_{op}", None)
+        if method is None:
+            raise ValueError(f"Unknown SAM server operation '{op}'")
+        with self._lock:
+            return method(**kwargs)
+    
+    def _serve_connection(self, conn: Connection) -> None:
+        """Answer requests on one connection until the client disconnects."""
+        with conn:
+            while not self._closed.is_set():
+                try:
+                    op, kwargs = conn.recv()
+                except (EOFError, OSError):
+                    return
+                
+                try:
+                    response = ("ok", self.handle(op, kwargs))
+                except Exception as e:
+                    logger.exception(f"SAM server request '{op}' failed")
+                    response = ("error", f"{type(e).__name__}: {e}")
+                
+                try:
+                    conn.send(response)
+                except (BrokenPipeError, OSError):
+                    return
+    
+    # -------------------------------------------------------------------------
+    # Lifecycle
+    # -------------------------------------------------------------------------
+    
+    def start(self) -> None:
+        """
+        Load the model and start listening.
+        
+        Raises:
+            ValueError: If a TCP address is not loopback and remote
+                clients are not allowed
+            RuntimeError: If a server is already listening on the socket
+        """
+        address = parse_address(self.address)
+        if not isinstance(address, str) and not self.allow_remote and not is_loopback(address[0]):
+            raise ValueError(
+                f"Refusing to listen on non-loopback host {address[0]}; "
+                f"allow remote clients explicitly to do so"
+            )
+        
+        self._load_model()
+        
+        if isinstance(address, str):
+            path = Path(address)
+            if path.exists():
+                # Remove a stale socket left by a server that did not exit cleanly
+                if connect(self.address) is not None:
+                    raise RuntimeError(f"A SAM server is already running at {address}")
+                path.unlink()
+        
+        # Create the socket file closed to other users from the start
+        old_umask = os.umask(0o177)
+        try:
+            self._listener = Listener(address, authkey=_authkey(create=True))
+        finally:
+            os.umask(old_umask)
+        
+        logger.info(f"SAM server ({self.model_type}) listening on {self.address}")
+    
+    def serve_forever(self) -> None:
+        """Accept connections until close() is called."""
+        if self._listener is None:
+            self.start()
+        
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError):
+                if self._closed.is_set():
+                    break
+                continue
+            except Exception as e:
+                # Failed authentication or handshake; keep serving
+                logger.warning(f"Rejected SAM server connection: {e}")
+                continue
+            
+            threading.Thread(
+                target=self._serve_connection, args=(conn,), daemon=True
+            ).start()
+    
+    def close(self) -> None:
+        """Stop accepting connections and remove the socket file."""
+        self._closed.set()
+        if self._listener is None:
+            return
+        
+        address = self._listener.address
+        # Wake up accept() so serve_forever() can exit
+        try:
+            family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+            with socket.socket(family) as sock:
+                sock.settimeout(1.0)
+                sock.connect(address)
+        except OSError:
+            pass
+        
+        self._listener.close()
+        self._listener = None
+
+
+class SAMServerClient:
+    """Connection to a running SAMServer."""
+    
+    def __init__(self, conn: Connection, address: str):
+        self.address = address
+        self._conn = conn
+        self._lock = threading.Lock()
+        self.info = self.request("hello")
+    
+    def request(self, op: str, **kwargs) -> Any:
+        """
+        Send a request and wait for its result.
+        
+        Raises:
+            RuntimeError: If the server failed to run the request
+        """
+        with self._lock:
+            self._conn.send((op, kwargs))
+            status, result = self._conn.recv()
+        
+        if status != "ok":
+            raise RuntimeError(f"SAM server error: {result}")
+        return result
+    
+    def stats(self) -> dict:
+        """Embedding cache statistics of the server."""
+        return self.request("stats")
+    
+    def predictor(self) -> "RemotePredictor":
+        """Predictor with the SamPredictor interface backed by the server."""
+        return RemotePredictor(self)
+    
+    def automatic_generator(self, **params) -> "RemoteAutomaticMaskGenerator":
+        """Automatic mask generator backed by the server."""
+        return RemoteAutomaticMaskGenerator(self, params)
+    
+    def close(self) -> None:
+        self._conn.close()
+
+
+class RemotePredictor:
+    """
+    Drop-in for SamPredictor that runs on a SAM server.
+    
+    set_image() only uploads the image when the server has no cached
+    embedding for it.
+    """
+    
+    def __init__(self, client: SAMServerClient):
+        self.client = client
+        self._key: Optional[str] = None
+        self._image: Optional[np.ndarray] = None
+        self._image_keys = ImageKeyCache()
+    
+    def set_image(self, image: np.ndarray) -> None:
+        """Select an image, encoding it on the server if not cached."""
+        key = self._image_keys(image)
+        if not self.client.request("set_image", key=key):
+            self.client.request("set_image", key=key, image=np.ascontiguousarray(image))
+        self._key = key
+        self._image = image
+    
+    def predict(
+        self,
+        point_coords: Optional[np.ndarray] = None,
+        point_labels: Optional[np.ndarray] = None,
+        box: Optional[np.ndarray] = None,
+        mask_input: Optional[np.ndarray] = None,
+        multimask_output: bool = True,
+        return_logits: bool = False,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Predict masks for prompts on the current image (see SamPredictor.predict)."""
+        if self._key is None:
+            raise RuntimeError("An image must be set with set_image() before mask prediction.")
+        
+        kwargs = dict(
+            point_coords=point_coords,
+            point_labels=point_labels,
+            box=box,
+            mask_input=mask_input,
+            multimask_output=multimask_output,
+            return_logits=return_logits,
+        )
+        try:
+            result = self.client.request("predict", key=self._key, **kwargs)
+        except RuntimeError as e:
+            if "is not cached" not in str(e):
+                raise
+            # Evicted by other clients since set_image(); upload again
+            self.set_image(self._image)
+            result = self.client.request("predict", key=self._key, **kwargs)
+        
+        masks = unpack_masks(result["masks"], result["shape"])
+        return masks, result["scores"], result["logits"]
+
+
+class RemoteAutomaticMaskGenerator:
+    """Drop-in for SamAutomaticMaskGenerator that runs on a SAM server."""
+    
+    def __init__(self, client: SAMServerClient, params: dict):
+        self.client = client
+        self.params = params
+    
+    def generate(self, image: np.ndarray) -> List[dict]:
+        """Generate masks for an image (see SamAutomaticMaskGenerator.generate)."""
+        results = self.client.request(
+            "generate", image=np.ascontiguousarray(image), params=self.params
+        )
+        for result in results:
+            result["segmentation"] = unpack_masks(*result["segmentation"])
+        return results
+
+
+def connect(
+    address: Optional[str] = None,
+    model_type: Optional[str] = None,
+    model_identity: Optional[tuple] = None,
+) -> Optional[SAMServerClient]:
+    """
+    Connect to a running SAM server.
+    
+    Args:
+        address: Server address; defaults to $PHASE1A_SAM_SERVER, then
+            default_address()
+        model_type: Required model variant; servers running another
+            variant are ignored
+        model_identity: Required model file identity (see
+            MaskGenerator._model_identity()); servers running another
+            checkpoint are ignored
+    
+    Returns:
+        SAMServerClient, or None if no matching server is reachable
+    """
+    try:
+        address = address or os.environ.get(ADDRESS_ENV) or default_address()
+        parsed = parse_address(address)
+        if isinstance(parsed, str):
+            if not Path(parsed).exists():
+                return None
+            if os.stat(parsed).st_uid != os.getuid():
+                logger.warning(f"Not connecting to SAM server socket {address} owned by another user")
+                return None
+        authkey = _authkey()
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"Cannot look for a SAM server: {e}")
+        return None
+    if authkey is None:
+        return None
+    
+    try:
+        conn = Client(parsed, authkey=authkey)
+        client = SAMServerClient(conn, address)
+    except (OSError, EOFError, RuntimeError) as e:
+        logger.debug(f"No SAM server at {address}: {e}")
+        return None
+    except Exception as e:
+        # AuthenticationError and friends
+        logger.warning(f"Could not connect to SAM server at {address}: {e}")
+        return None
+    
+    if model_type is not None and client.info["model_type"] != model_type:
+        logger.warning(
+            f"SAM server at {address} runs {client.info['model_type']}, "
+            f"not {model_type}; loading the model in-process"
+        )
+        client.close()
+        return None
+    
+    if model_identity is not None and client.info.get("model_identity") != model_identity:
+        logger.warning(
+            f"SAM server at {address} runs another checkpoint than "
+            f"{model_identity[0]}; loading the model in-process"
+        )
+        client.close()
+        return None
+    
+    return client
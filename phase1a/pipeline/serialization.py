@@ -0,0 +1,183 @@
+"""
+Serialization Module
+
+Reads and writes pipeline intermediates (features, classifications,
+gating results, hole assignments, mask metadata, selections).
+
+Formats are chosen by file suffix:
+- ``.json``: JSON, encoded with orjson when installed (stdlib json
+  otherwise). Pretty-printed by default, like earlier outputs, so
+  existing output directories stay readable by every backend.
+- ``.msgpack``: compact binary MessagePack, requires msgspec.
+
+Install the optional backends with ``pip install "phase1a[fast]"``.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Union
+import logging
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - depends on environment
+    msgspec = None
+
+logger = logging.getLogger(__name__)
+
+# Format name -> file suffix
+FORMATS = {
+    "json": ".json",
+    "msgpack": ".msgpack",
+}
+
+_SUFFIX_FORMATS = {suffix: name for name, suffix in FORMATS.items()}
+
+
+def _default(obj: Any) -> Any:
+    """Convert numpy values (and other sequences) for encoders."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def json_backend() -> str:
+    """Name of the JSON backend in use ("orjson" or "json")."""
+    return "orjson" if orjson is not None else "json"
+
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """
+    Encode an object as UTF-8 JSON.
+
+    Args:
+        obj: JSON-compatible object (numpy values are converted)
+        compact: Omit indentation and whitespace
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    if compact:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = json.dumps(obj, default=_default, ensure_ascii=False, indent=2)
+    return text.encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _require_msgspec() -> None:
+    if msgspec is None:
+        raise ImportError(
+            "msgspec is required for .msgpack files: pip install msgspec"
+        )
+
+
+def packb(obj: Any) -> bytes:
+    """Encode an object as MessagePack."""
+    _require_msgspec()
+    return msgspec.msgpack.encode(obj, enc_hook=_default)
+
+
+def unpackb(data: bytes) -> Any:
+    """Decode MessagePack bytes."""
+    _require_msgspec()
+    return msgspec.msgpack.decode(data)
+
+
+def format_for(path: Path) -> str:
+    """Format name for a path's suffix (unknown suffixes are JSON)."""
+    return _SUFFIX_FORMATS.get(Path(path).suffix, "json")
+
+
+def with_format(path: Path, format: str) -> Path:
+    """
+    Replace a path's suffix with the suffix of a format.
+
+    Args:
+        path: File path (e.g. ``metadata/classifications.json``)
+        format: Format name, "json" or "msgpack"
+    """
+    if format not in FORMATS:
+        raise ValueError(
+            f"Unknown format '{format}', expected one of {tuple(FORMATS)}"
+        )
+    return Path(path).with_suffix(FORMATS[format])
+
+
+def resolve(path: Path) -> Path:
+    """
+    Find the file for a path in any supported format.
+
+    Returns the path itself if it exists, else the first existing sibling
+    with the same stem and another format's suffix, else the path
+    unchanged (so the caller's open() raises the usual error).
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+    for suffix in FORMATS.values():
+        candidate = path.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    return path
+
+
+def dump(obj: Any, path: Path, compact: bool = False) -> None:
+    """
+    Write an object to a file in the format given by its suffix.
+
+    Args:
+        obj: Object to write
+        path: Output path (``.json`` or ``.msgpack``)
+        compact: For JSON, omit indentation
+    """
+    path = Path(path)
+    if format_for(path) == "msgpack":
+        data = packb(obj)
+    else:
+        data = dumps(obj, compact=compact)
+
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def load(path: Path) -> Any:
+    """
+    Read an object from a file, in whichever supported format exists.
+
+    Args:
+        path: Input path; a missing file is looked up with the other
+            formats' suffixes (see resolve())
+    """
+    path = resolve(path)
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if format_for(path) == "msgpack":
+        return unpackb(data)
+    return loads(data)
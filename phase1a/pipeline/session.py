@@ -0,0 +1,175 @@
+"""
+Session Journal Module
+
+Autosave for ``phase1a select``. Every mask operation of a
+PointBasedSelector is appended to a JSON-lines journal as the history
+edit it produced (masks bit-packed, deflated and cropped, see
+history.py) together with its prompt (click point, outline, hole,
+feature). Undo, redo and finished features are journaled too.
+
+Restarting on the same image replays the journal
+(PointBasedSelector.resume()), restoring the generated masks, selections
+and undo history without running SAM, and the MaskGenerator reloads
+image embeddings from the session's embedding directory instead of
+encoding again.
+
+Layout under the output directory::
+
+    session/<image key>/journal.jsonl
+    session/<image key>/embeddings/*.npz
+"""
+
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Set, Tuple
+import logging
+
+import numpy as np
+
+from . import serialization
+from .history import Edit
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_VERSION = 1
+
+
+class SessionJournal:
+    """
+    Append-only journal of a selection session on one image.
+    
+    Records are single JSON lines, flushed and synced as they are
+    written, so a crash loses at most the operation in progress. A
+    truncated last line is dropped when the journal is read.
+    """
+    
+    def __init__(self, directory: Path, image: np.ndarray):
+        """
+        Initialize the journal.
+        
+        Args:
+            directory: Session directory for this image
+            image: RGB image (H, W, 3) being annotated
+        """
+        from .sam_server import image_key
+        
+        self.directory = Path(directory)
+        self.image_key = image_key(image)
+        self.shape = tuple(image.shape[:2])
+        self.completed: Set[Tuple[int, str]] = set()  # (hole, feature) marked done
+        self._file = None
+    
+    @classmethod
+    def for_image(cls, output_dir: Path, image: np.ndarray) -> "SessionJournal":
+        """Journal for an image under ``output_dir/session``."""
+        from .sam_server import image_key
+        
+        return cls(Path(output_dir) / "session" / image_key(image), image)
+    
+    @property
+    def path(self) -> Path:
+        return self.directory / "journal.jsonl"
+    
+    @property
+    def embedding_dir(self) -> Path:
+        """Where the MaskGenerator should persist embeddings."""
+        return self.directory / "embeddings"
+    
+    def exists(self) -> bool:
+        """Whether a previous session left a journal."""
+        return self.path.exists() and self.path.stat().st_size > 0
+    
+    def clear(self) -> None:
+        """Delete the session (journal and embeddings)."""
+        self.close()
+        if self.directory.exists():
+            shutil.rmtree(self.directory)
+        self.completed.clear()
+    
+    def records(self) -> Iterator[dict]:
+        """
+        Read the journal's records after its header.
+        
+        Raises:
+            ValueError: If the journal belongs to another image or version
+        """
+        if not self.exists():
+            return
+        
+        with open(self.path, "rb") as f:
+            offset = 0
+            for number, line in enumerate(f):
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    record = serialization.loads(line)
+                except ValueError as e:
+                    logger.warning(f"Journal {self.path} ends in a damaged record "
+                                   f"(line {number + 1}: {e}), dropping it")
+                    self._truncate(offset)
+                    return
+                offset += len(line)
+                
+                if number == 0:
+                    self._check_header(record)
+                    continue
+                if record.get("type") == "done":
+                    self.completed.add((record["hole"], record["feature"]))
+                yield record
+    
+    def _check_header(self, header: dict) -> None:
+        if header.get("type") != "session" or header.get("version") != JOURNAL_VERSION:
+            raise ValueError(f"{self.path} is not a version {JOURNAL_VERSION} session journal")
+        if header["image"] != self.image_key:
+            raise ValueError(f"{self.path} belongs to a different image")
+    
+    def _truncate(self, offset: int) -> None:
+        """Cut a damaged tail so later records append cleanly."""
+        with open(self.path, "r+b") as f:
+            f.truncate(offset)
+    
+    def append(self, record: dict) -> None:
+        """Append a record and sync it to disk."""
+        if self._file is None:
+            new = not self.exists()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            if new:
+                self._write({
+                    "type": "session",
+                    "version": JOURNAL_VERSION,
+                    "image": self.image_key,
+                    "shape": list(self.shape),
+                })
+        self._write(record)
+    
+    def _write(self, record: dict) -> None:
+        self._file.write(serialization.dumps(record, compact=True) + b"\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def log_edit(self, edit: Edit, prompt: dict, mask_count: int) -> None:
+        """Journal an operation's edit and the prompt that produced it."""
+        self.append({
+            "type": "edit",
+            "prompt": prompt,
+            "mask_count": mask_count,
+            "edit": edit.to_dict(),
+        })
+    
+    def log_undo(self) -> None:
+        self.append({"type": "undo"})
+    
+    def log_redo(self) -> None:
+        self.append({"type": "redo"})
+    
+    def log_done(self, hole: int, feature: str) -> None:
+        """Journal that a hole's feature was finished."""
+        self.completed.add((hole, feature))
+        self.append({"type": "done", "hole": hole, "feature": feature})
+    
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,239 @@
+"""
+Superpixel Module
+
+Over-segments an image into superpixels (SLIC or Felzenszwalb) so that
+clicks in ``phase1a select`` can pick regions with a label-map lookup
+instead of a SAM decode.
+
+A segmentation is computed once per image and cached to disk as a
+compressed ``.npz`` keyed by image content, method and parameters.
+Segmenting a large course image takes tens of seconds, so precompute()
+runs it in a background process while the user starts selecting.
+"""
+
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Iterable, Optional
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Segmentation methods and their default parameters. For SLIC,
+# segment_size is the approximate superpixel side in pixels.
+DEFAULT_PARAMS = {
+    "slic": {"segment_size": 24, "compactness": 10.0},
+    "felzenszwalb": {"scale": 100.0, "sigma": 0.8, "min_size": 50},
+}
+
+METHODS = tuple(DEFAULT_PARAMS)
+
+
+def _params(method: str, params: dict) -> dict:
+    if method not in DEFAULT_PARAMS:
+        raise ValueError(f"Unknown superpixel method: {method} (use one of {', '.join(METHODS)})")
+    return {**DEFAULT_PARAMS[method], **params}
+
+
+def compute_superpixels(image: np.ndarray, method: str = "slic", **params) -> np.ndarray:
+    """
+    Over-segment an image.
+    
+    Args:
+        image: RGB image (H, W, 3)
+        method: 'slic' or 'felzenszwalb'
+        **params: Overrides for DEFAULT_PARAMS[method]
+    
+    Returns:
+        Label map (H, W) of int32 superpixel labels starting at 0
+    """
+    from skimage import segmentation
+    
+    params = _params(method, params)
+    if method == "slic":
+        height, width = image.shape[:2]
+        n_segments = max(1, (height * width) // params["segment_size"] ** 2)
+        labels = segmentation.slic(
+            image, n_segments=n_segments, compactness=params["compactness"], start_label=0,
+        )
+    else:
+        labels = segmentation.felzenszwalb(
+            image, scale=params["scale"], sigma=params["sigma"], min_size=params["min_size"],
+        )
+    return labels.astype(np.int32)
+
+
+def cache_path(cache_dir: Path, image: np.ndarray, method: str = "slic", **params) -> Path:
+    """
+    Cache file for an image's segmentation.
+    
+    Args:
+        cache_dir: Cache directory
+        image: RGB image (H, W, 3)
+        method: Segmentation method
+        **params: Overrides for DEFAULT_PARAMS[method]
+    """
+    from .sam_server import image_key
+    
+    params = _params(method, params)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(image_key(image).encode())
+    digest.update(repr(sorted(params.items())).encode())
+    return Path(cache_dir) / f"{method}_{digest.hexdigest()}.npz"
+
+
+def _compute_to_cache(image: np.ndarray, path: Path, method: str, params: dict) -> Path:
+    """Segment an image and write the cache file (runs in the worker process)."""
+    labels = compute_superpixels(image, method, **params)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary name first so readers never see a partial file
+    tmp_path = path.with_name(f".{path.stem}.{os.getpid()}.npz")
+    np.savez_compressed(tmp_path, labels=labels)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _watch(process: multiprocessing.Process, future: Future, path: Path) -> None:
+    """Resolve a precompute() future when its worker process exits."""
+    process.join()
+    if process.exitcode == 0 and path.exists():
+        future.set_result(path)
+    else:
+        future.set_exception(
+            RuntimeError(f"Superpixel process exited with code {process.exitcode}")
+        )
+
+
+def precompute(
+    image: np.ndarray,
+    cache_dir: Path,
+    method: str = "slic",
+    **params,
+) -> Future:
+    """
+    Segment an image in a background process unless it is already cached.
+    
+    The process is a daemon, so exiting the interpreter terminates it
+    instead of waiting for the segmentation (a partial result is never
+    cached).
+    
+    Args:
+        image: RGB image (H, W, 3)
+        cache_dir: Cache directory
+        method: Segmentation method
+        **params: Overrides for DEFAULT_PARAMS[method]
+    
+    Returns:
+        Future resolving to the cache file path
+    """
+    path = cache_path(cache_dir, image, method, **params)
+    if path.exists():
+        future: Future = Future()
+        future.set_result(path)
+        return future
+    
+    logger.info(f"Computing {method} superpixels in the background -> {path}")
+    process = multiprocessing.Process(
+        target=_compute_to_cache, args=(image, path, method, params), daemon=True,
+    )
+    process.start()
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+    threading.Thread(target=_watch, args=(process, future, path), daemon=True).start()
+    return future
+
+
+class SuperpixelIndex:
+    """
+    Superpixel label map with a per-label bounding-box table.
+    
+    Looking up the superpixel under a point is one array read, and the
+    mask of a set of superpixels is only built inside their joint bounding
+    box.
+    """
+    
+    def __init__(self, labels: np.ndarray):
+        """
+        Initialize the index.
+        
+        Args:
+            labels: Label map (H, W) of non-negative superpixel labels
+        """
+        from scipy import ndimage
+        
+        self.labels = np.asarray(labels, dtype=np.int32)
+        self.count = int(self.labels.max()) + 1 if self.labels.size else 0
+        
+        # (y0, y1, x0, x1) per label, exclusive ends; empty for unused labels
+        self.bboxes = np.zeros((self.count, 4), dtype=np.int64)
+        for label, found in enumerate(ndimage.find_objects(self.labels + 1)):
+            if found is not None:
+                rows, cols = found
+                self.bboxes[label] = (rows.start, rows.stop, cols.start, cols.stop)
+    
+    @property
+    def shape(self) -> tuple:
+        """(height, width) of the label map."""
+        return self.labels.shape
+    
+    @classmethod
+    def load(cls, path: Path) -> "SuperpixelIndex":
+        """Load an index from a cache file written by precompute()."""
+        with np.load(path) as data:
+            return cls(data["labels"])
+    
+    @classmethod
+    def open(
+        cls,
+        image: np.ndarray,
+        cache_dir: Path,
+        method: str = "slic",
+        **params,
+    ) -> Optional["SuperpixelIndex"]:
+        """
+        Load the cached index for an image.
+        
+        Returns:
+            The index, or None if the image has not been segmented yet
+        """
+        path = cache_path(cache_dir, image, method, **params)
+        if not path.exists():
+            return None
+        return cls.load(path)
+    
+    def save(self, path: Path) -> None:
+        """Write the label map to a compressed .npz file."""
+        np.savez_compressed(path, labels=self.labels)
+    
+    def at(self, x: int, y: int) -> Optional[int]:
+        """Label of the superpixel at (x, y), or None outside the image."""
+        height, width = self.labels.shape
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        return int(self.labels[y, x])
+    
+    def mask(self, labels: Iterable[int]) -> np.ndarray:
+        """
+        Binary mask of the union of some superpixels.
+        
+        Args:
+            labels: Superpixel labels
+        
+        Returns:
+            Boolean mask (H, W)
+        """
+        labels = np.fromiter(labels, dtype=np.int64)
+        mask = np.zeros(self.labels.shape, dtype=bool)
+        if len(labels) == 0:
+            return mask
+        
+        boxes = self.bboxes[labels]
+        y0, x0 = boxes[:, 0].min(), boxes[:, 2].min()
+        y1, x1 = boxes[:, 1].max(), boxes[:, 3].max()
+        mask[y0:y1, x0:x1] = np.isin(self.labels[y0:y1, x0:x1], labels)
+        return mask
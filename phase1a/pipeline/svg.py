@@ -10,16 +10,49 @@ Output format matches the RockRidge_No_Overlay.svg reference:
 - Sodipodi namespace for Inkscape compatibility
 """
 
+import hashlib
+import io
+import itertools
 import json
 import re
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterator, Optional, Any, TextIO, Tuple
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from .curves import fit_rings
 from .holes import HoleAssignment
 
 logger = logging.getLogger(__name__)
 
+# Placeholder path id in cached layers, replaced with sequential ids on write
+_PATH_ID_SLOT = "\x00"
+
+Bounds = Tuple[float, float, float, float]
+
+
+def _union_bounds(a: Optional[Bounds], b: Optional[Bounds]) -> Optional[Bounds]:
+    """Union of two (minx, miny, maxx, maxy) boxes; None means empty."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+@dataclass
+class _CachedLayer:
+    """A rendered hole layer, reusable while its assignments are unchanged."""
+    key: str
+    fragments: List[str]  # Layer text split at path ids (len = paths + 1)
+    bounds: Optional[Bounds]  # Geometry bounds of the layer (None = empty)
+
 
 class SVGGenerator:
     """
@@ -43,6 +76,13 @@ class SVGGenerator:
     - tee: #A0E5B8
     - cart_path: #BEBEBB (Concrete)
     - hole99: #FF00CB
+    
+    With cache_layers=True the generator remembers each rendered hole
+    layer keyed by a hash of its assignments (feature classes and WKB
+    geometry). Later writes only re-encode layers whose hash changed and
+    splice them between the cached ones, renumbering path ids so output
+    is identical to an uncached write. Changed layers are tracked for
+    partial PNG re-rendering (see take_dirty_bounds()).
     """
     
     @staticmethod
@@ -133,6 +173,11 @@ class SVGGenerator:
     # OPCD color palette - loaded from GPL file
     DEFAULT_COLORS = _get_default_colors()
     
+    PATH_MODES = ("relative", "absolute", "auto")
+    
+    # Layer order: 99 first (outer mesh), then 1-18, then 98 (cart paths)
+    HOLE_ORDER = [99] + list(range(1, 19)) + [98]
+    
     def __init__(
         self,
         width: int = 4096,
@@ -140,6 +185,10 @@ class SVGGenerator:
         colors: Optional[Dict[str, str]] = None,
         opacity: float = 0.5,
         palette_path: Optional[Path] = None,
+        precision: int = 4,
+        path_mode: str = "relative",
+        curve_tolerance: Optional[float] = None,
+        cache_layers: bool = False,
     ):
         """
         Initialize the SVG generator.
@@ -150,10 +199,23 @@ class SVGGenerator:
             colors: Custom color palette (overrides defaults)
             opacity: Opacity for path fills (default 0.5, matching reference SVG)
             palette_path: Path to color_defaults.gpl palette file (auto-detected if None)
+            precision: Decimal places for path coordinates
+            path_mode: "relative", "absolute" or "auto" (shortest per ring)
+            curve_tolerance: Max deviation in pixels for Bezier curve fitting
+                (None = straight line segments)
+            cache_layers: Keep rendered layers and only rebuild changed ones
         """
+        if path_mode not in self.PATH_MODES:
+            raise ValueError(
+                f"Invalid path_mode {path_mode!r}, expected one of {self.PATH_MODES}"
+            )
+        
         self.width = width
         self.height = height
         self.opacity = opacity
+        self.precision = precision
+        self.path_mode = path_mode
+        self.curve_tolerance = curve_tolerance
         
         # Load OPCD palette from GPL file
         opcd_colors = self.load_opcd_palette(palette_path)
@@ -163,11 +225,82 @@ class SVGGenerator:
         
         # Counter for generating unique path IDs
         self._path_counter = 0
+        
+        # Per-hole layer cache and change tracking (cache_layers only)
+        self.cache_layers = cache_layers
+        self._layer_cache: Dict[int, _CachedLayer] = {}
+        self._cache_settings: Optional[tuple] = None
+        self.dirty_holes: List[int] = []  # Layers rebuilt by the last write
+        self._dirty_bounds: Optional[Bounds] = None
+    
+    def _encode_ring(
+        self,
+        coords: np.ndarray,
+        relative: bool,
+    ) -> str:
+        """
+        Encode one ring's coordinate array as SVG path data.
+        
+        Args:
+            coords: (N, 2) array of ring coordinates
+            relative: Use relative (m ... z) instead of absolute (M ... Z) commands
+            
+        Returns:
+            SVG path data for the ring
+        """
+        pair = f"%.{self.precision}f,%.{self.precision}f"
+        
+        if relative:
+            # First point absolute, then deltas between consecutive points
+            values = np.empty_like(coords)
+            values[0] = coords[0]
+            np.subtract(coords[1:], coords[:-1], out=values[1:])
+            template = "m " + " ".join([pair] * len(coords)) + " z"
+        else:
+            values = coords
+            template = "M " + " ".join([pair] * len(coords)) + " Z"
+        
+        return template % tuple(values.ravel().tolist())
+    
+    def _encode_curve_ring(
+        self,
+        segments: np.ndarray,
+        relative: bool,
+    ) -> str:
+        """
+        Encode a chain of cubic Bezier segments as SVG path data.
+        
+        Args:
+            segments: (K, 4, 2) control points of each segment
+            relative: Use relative (m ... c ... z) instead of absolute commands
+            
+        Returns:
+            SVG path data for the ring
+        """
+        pair = f"%.{self.precision}f,%.{self.precision}f"
+        
+        controls = segments[:, 1:, :]
+        if relative:
+            # Control and end points are relative to each segment's start
+            controls = controls - segments[:, :1, :]
+            template = "m " + pair + " c " + " ".join([pair] * (3 * len(segments))) + " z"
+        else:
+            template = "M " + pair + " C " + " ".join([pair] * (3 * len(segments))) + " Z"
+        
+        values = np.concatenate([segments[0, 0], controls.ravel()])
+        return template % tuple(values.tolist())
     
     def _polygon_to_path(self, geometry: Any) -> str:
         """
         Convert a Shapely geometry to SVG path data.
         
+        Coordinates of all rings are fetched as one array and each ring is
+        formatted in a single operation. Relative coordinates (l for lines)
+        are used by default; path_mode "absolute" or "auto" (whichever is
+        shorter per ring) can be selected on the generator. When
+        curve_tolerance is set, rings are also fitted with cubic Bezier (c)
+        segments, which are used wherever they encode shorter than lines.
+        
         Args:
             geometry: Shapely Polygon or MultiPolygon
             
@@ -176,47 +309,44 @@ class SVGGenerator:
         """
         from shapely.geometry import Polygon, MultiPolygon
         
-        def ring_to_path(ring) -> str:
-            coords = list(ring.coords)
-            if not coords:
-                return ""
-            
-            # Start with move to first point
-            path_parts = [f"m {coords[0][0]:.4f},{coords[0][1]:.4f}"]
-            
-            # Use relative coordinates (c for curves would be better, but l for lines works)
-            prev_x, prev_y = coords[0]
-            for x, y in coords[1:]:
-                dx = x - prev_x
-                dy = y - prev_y
-                path_parts.append(f"{dx:.4f},{dy:.4f}")
-                prev_x, prev_y = x, y
-            
-            # Close path
-            path_parts.append("z")
-            
-            return " ".join(path_parts)
+        if not isinstance(geometry, (Polygon, MultiPolygon)):
+            logger.warning(f"Unsupported geometry type: {type(geometry)}")
+            return ""
         
-        def polygon_to_path(poly: Polygon) -> str:
-            parts = []
-            
-            # Exterior ring
-            parts.append(ring_to_path(poly.exterior))
-            
-            # Interior rings (holes)
-            for interior in poly.interiors:
-                parts.append(ring_to_path(interior))
-            
-            return " ".join(parts)
+        # Exterior then interior rings of each part, in order
+        rings = shapely.get_rings(shapely.get_parts(geometry))
+        if len(rings) == 0:
+            return ""
+        
+        coords, ring_index = shapely.get_coordinates(rings, return_index=True)
+        splits = np.flatnonzero(np.diff(ring_index)) + 1
+        ring_coords = np.split(coords, splits)
         
-        if isinstance(geometry, Polygon):
-            return polygon_to_path(geometry)
-        elif isinstance(geometry, MultiPolygon):
-            paths = [polygon_to_path(poly) for poly in geometry.geoms]
-            return " ".join(paths)
+        if self.curve_tolerance is not None:
+            ring_curves = fit_rings(ring_coords, self.curve_tolerance)
         else:
-            logger.warning(f"Unsupported geometry type: {type(geometry)}")
-            return ""
+            ring_curves = [None] * len(ring_coords)
+        
+        if self.path_mode == "relative":
+            modes = (True,)
+        elif self.path_mode == "absolute":
+            modes = (False,)
+        else:
+            modes = (True, False)
+        
+        parts = []
+        for ring, curves in zip(ring_coords, ring_curves):
+            encoders = [partial(self._encode_ring, ring)]
+            if curves is not None:
+                # A curve segment costs three coordinate pairs, so rings
+                # with little curvature to exploit stay as lines
+                encoders.append(partial(self._encode_curve_ring, curves))
+            parts.append(min(
+                (encode(relative=relative) for encode in encoders for relative in modes),
+                key=len,
+            ))
+        
+        return " ".join(parts)
     
     def _format_layer_id(self, hole: int) -> str:
         """Format hole number as layer ID (e.g., 'layer1' for hole 1)."""
@@ -256,94 +386,9 @@ class SVGGenerator:
         }
         return label_map.get(feature_class, feature_class)
     
-    def generate(
-        self,
-        assignments_by_hole: Dict[int, List[HoleAssignment]],
-        document_name: str = "course.svg",
-    ) -> str:
-        """
-        Generate SVG content from hole assignments in Inkscape-compatible format.
-        
-        Args:
-            assignments_by_hole: Dictionary mapping holes to assignments
-            document_name: Name for sodipodi:docname attribute
-            
-        Returns:
-            SVG content as string
-        """
-        # Reset path counter
-        self._path_counter = 0
-        
-        # Build layers
-        layers = []
-        
-        # Process holes in order: 99 first (outer mesh), then 1-18, then 98 (cart paths)
-        hole_order = [99] + list(range(1, 19)) + [98]
-        
-        for hole in hole_order:
-            if hole not in assignments_by_hole:
-                continue
-            
-            assignments = assignments_by_hole[hole]
-            layer_id = self._format_layer_id(hole)
-            layer_label = self._format_hole_label(hole)
-            
-            # Track feature counts for generating unique labels
-            feature_counts: Dict[str, int] = {}
-            
-            # Build paths for this hole
-            paths = []
-            for assignment in assignments:
-                polygon = assignment.polygon
-                path_data = self._polygon_to_path(polygon.geometry)
-                
-                if not path_data:
-                    continue
-                
-                # Get color for this feature
-                feature_class = polygon.feature_class
-                color = self.colors.get(feature_class, self.colors.get("ignore", "#cccccc"))
-                
-                # Generate feature label with index
-                feature_index = feature_counts.get(feature_class, 0)
-                feature_counts[feature_class] = feature_index + 1
-                feature_label = self._format_feature_label(feature_class, hole, feature_index)
-                
-                # Generate unique path ID
-                path_id = self._get_next_path_id()
-                
-                # Build path element with inline style (matching reference format)
-                path_elem = (
-                    f'    <path\n'
-                    f'       style="opacity:{self.opacity};fill:{color}"\n'
-                    f'       d="{path_data}"\n'
-                    f'       id="{path_id}"\n'
-                    f'       inkscape:label="{feature_label}" />'
-                )
-                paths.append(path_elem)
-            
-            if paths:
-                paths_content = "\n".join(paths)
-                # Determine layer style
-                layer_style = "display:inline"
-                if hole == 99:
-                    layer_style = "display:inline;opacity:1"
-                
-                layer_elem = (
-                    f'  <g\n'
-                    f'     inkscape:groupmode="layer"\n'
-                    f'     id="{layer_id}"\n'
-                    f'     inkscape:label="{layer_label}"\n'
-                    f'     style="{layer_style}">\n'
-                    f'{paths_content}\n'
-                    f'  </g>'
-                )
-                layers.append(layer_elem)
-        
-        layers_content = "\n".join(layers)
-        
-        # Assemble SVG with Inkscape-compatible format
-        svg = f'''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+    def _write_header(self, fp: TextIO, document_name: str) -> None:
+        """Write the XML prolog, root element and Inkscape named view."""
+        fp.write(f'''<?xml version="1.0" encoding="UTF-8" standalone="no"?>
 <!-- Generated by Phase 1A Golf Course Builder -->
 
 <svg
@@ -368,10 +413,279 @@ class SVGGenerator:
      inkscape:pageopacity="0.0"
      inkscape:pagecheckerboard="0"
      inkscape:deskcolor="#d1d1d1" />
-{layers_content}
-</svg>'''
+''')
+    
+    def _iter_path_elements(
+        self,
+        hole: int,
+        assignments: List[HoleAssignment],
+        path_ids: Optional[Iterator[str]] = None,
+    ) -> Iterator[str]:
+        """
+        Yield the <path> elements of one hole layer, one at a time.
+        
+        Args:
+            hole: Hole number
+            assignments: Assignments for this hole
+            path_ids: Source of path ids (None = the generator's counter)
+        """
+        # Track feature counts for generating unique labels
+        feature_counts: Dict[str, int] = {}
         
-        return svg
+        for assignment in assignments:
+            polygon = assignment.polygon
+            path_data = self._polygon_to_path(polygon.geometry)
+            
+            if not path_data:
+                continue
+            
+            # Get color for this feature
+            feature_class = polygon.feature_class
+            color = self.colors.get(feature_class, self.colors.get("ignore", "#cccccc"))
+            
+            # Generate feature label with index
+            feature_index = feature_counts.get(feature_class, 0)
+            feature_counts[feature_class] = feature_index + 1
+            feature_label = self._format_feature_label(feature_class, hole, feature_index)
+            
+            # Generate unique path ID
+            path_id = next(path_ids) if path_ids is not None else self._get_next_path_id()
+            
+            # Build path element with inline style (matching reference format)
+            yield (
+                f'    <path\n'
+                f'       style="opacity:{self.opacity};fill:{color}"\n'
+                f'       d="{path_data}"\n'
+                f'       id="{path_id}"\n'
+                f'       inkscape:label="{feature_label}" />'
+            )
+    
+    def _write_layer(
+        self,
+        fp: TextIO,
+        hole: int,
+        assignments: List[HoleAssignment],
+        separator: str = "",
+        path_ids: Optional[Iterator[str]] = None,
+    ) -> bool:
+        """
+        Stream one hole layer to a file-like object.
+        
+        The layer group is only opened once its first path is produced,
+        so holes without drawable geometry write nothing.
+        
+        Args:
+            fp: Text file-like object to write to
+            hole: Hole number
+            assignments: Assignments for this hole
+            separator: Text written before the layer (if it is written)
+            path_ids: Source of path ids (None = the generator's counter)
+            
+        Returns:
+            True if the layer was written
+        """
+        written = False
+        
+        for path_elem in self._iter_path_elements(hole, assignments, path_ids):
+            if not written:
+                # Determine layer style
+                layer_style = "display:inline"
+                if hole == 99:
+                    layer_style = "display:inline;opacity:1"
+                
+                fp.write(
+                    f'{separator}'
+                    f'  <g\n'
+                    f'     inkscape:groupmode="layer"\n'
+                    f'     id="{self._format_layer_id(hole)}"\n'
+                    f'     inkscape:label="{self._format_hole_label(hole)}"\n'
+                    f'     style="{layer_style}">\n'
+                )
+                written = True
+            else:
+                fp.write("\n")
+            fp.write(path_elem)
+        
+        if written:
+            fp.write("\n  </g>")
+        
+        return written
+    
+    def _layer_key(self, assignments: List[HoleAssignment]) -> str:
+        """Hash of a layer's feature classes and geometries, in order."""
+        digest = hashlib.blake2b(digest_size=16)
+        geometries = [a.polygon.geometry for a in assignments]
+        for assignment, wkb in zip(assignments, shapely.to_wkb(geometries)):
+            digest.update(assignment.polygon.feature_class.encode())
+            digest.update(b"\x00")
+            digest.update(wkb or b"")
+        return digest.hexdigest()
+    
+    def _settings_key(self) -> tuple:
+        """Everything besides geometry that affects layer text."""
+        return (
+            self.opacity,
+            self.precision,
+            self.path_mode,
+            self.curve_tolerance,
+            tuple(sorted(self.colors.items())),
+        )
+    
+    def _render_layer(
+        self,
+        hole: int,
+        assignments: List[HoleAssignment],
+        key: str,
+    ) -> _CachedLayer:
+        """Render one layer with placeholder path ids for the cache."""
+        buffer = io.StringIO()
+        self._write_layer(
+            buffer, hole, assignments, path_ids=itertools.repeat(_PATH_ID_SLOT)
+        )
+        
+        bounds = None
+        if assignments:
+            total = shapely.total_bounds([a.polygon.geometry for a in assignments])
+            if not np.isnan(total).any():
+                bounds = tuple(float(v) for v in total)
+        
+        return _CachedLayer(
+            key=key,
+            fragments=buffer.getvalue().split(_PATH_ID_SLOT),
+            bounds=bounds,
+        )
+    
+    def _update_layer_cache(
+        self,
+        assignments_by_hole: Dict[int, List[HoleAssignment]],
+    ) -> None:
+        """Rebuild cached layers whose assignments changed; track what changed."""
+        settings = self._settings_key()
+        if settings != self._cache_settings:
+            # Palette/encoding changed: every cached layer is stale
+            for layer in self._layer_cache.values():
+                self._dirty_bounds = _union_bounds(self._dirty_bounds, layer.bounds)
+            self._layer_cache = {}
+            self._cache_settings = settings
+        
+        dirty = []
+        for hole in list(self._layer_cache):
+            if hole not in assignments_by_hole:
+                removed = self._layer_cache.pop(hole)
+                self._dirty_bounds = _union_bounds(self._dirty_bounds, removed.bounds)
+                dirty.append(hole)
+        
+        for hole, assignments in assignments_by_hole.items():
+            key = self._layer_key(assignments)
+            cached = self._layer_cache.get(hole)
+            if cached is not None and cached.key == key:
+                continue
+            
+            layer = self._render_layer(hole, assignments, key)
+            self._layer_cache[hole] = layer
+            self._dirty_bounds = _union_bounds(self._dirty_bounds, layer.bounds)
+            if cached is not None:
+                self._dirty_bounds = _union_bounds(self._dirty_bounds, cached.bounds)
+            dirty.append(hole)
+        
+        self.dirty_holes = sorted(dirty)
+        if dirty:
+            logger.debug(f"Rebuilt SVG layers for holes {self.dirty_holes}")
+    
+    def _write_cached(
+        self,
+        assignments_by_hole: Dict[int, List[HoleAssignment]],
+        fp: TextIO,
+    ) -> None:
+        """Write layers from the cache, numbering path ids in document order."""
+        self._update_layer_cache(assignments_by_hole)
+        
+        separator = ""
+        for hole in self.HOLE_ORDER:
+            if hole not in assignments_by_hole:
+                continue
+            
+            fragments = self._layer_cache[hole].fragments
+            if len(fragments) == 1:
+                continue  # Layer has no drawable paths
+            
+            fp.write(separator)
+            fp.write(fragments[0])
+            for fragment in fragments[1:]:
+                fp.write(self._get_next_path_id())
+                fp.write(fragment)
+            separator = "\n"
+    
+    def take_dirty_bounds(self) -> Optional[Bounds]:
+        """
+        Return and reset the area changed since the previous call.
+        
+        Covers the old and new geometry of every layer rebuilt or removed
+        by cached writes (cache_layers=True) since the last call.
+        
+        Returns:
+            (minx, miny, maxx, maxy) in SVG coordinates, or None if nothing
+            changed
+        """
+        bounds, self._dirty_bounds = self._dirty_bounds, None
+        return bounds
+    
+    def write(
+        self,
+        assignments_by_hole: Dict[int, List[HoleAssignment]],
+        fp: TextIO,
+        document_name: str = "course.svg",
+    ) -> None:
+        """
+        Stream SVG content to a text file-like object.
+        
+        Layers and paths are written as they are produced, so the full
+        document is never held in memory (unless cache_layers is set, in
+        which case rendered layers are kept for the next write).
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            fp: Text file-like object to write to
+            document_name: Name for sodipodi:docname attribute
+        """
+        # Reset path counter
+        self._path_counter = 0
+        
+        self._write_header(fp, document_name)
+        
+        if self.cache_layers:
+            self._write_cached(assignments_by_hole, fp)
+            fp.write("\n</svg>")
+            return
+        
+        separator = ""
+        for hole in self.HOLE_ORDER:
+            if hole not in assignments_by_hole:
+                continue
+            
+            if self._write_layer(fp, hole, assignments_by_hole[hole], separator):
+                separator = "\n"
+        
+        fp.write("\n</svg>")
+    
+    def generate(
+        self,
+        assignments_by_hole: Dict[int, List[HoleAssignment]],
+        document_name: str = "course.svg",
+    ) -> str:
+        """
+        Generate SVG content from hole assignments in Inkscape-compatible format.
+        
+        Args:
+            assignments_by_hole: Dictionary mapping holes to assignments
+            document_name: Name for sodipodi:docname attribute
+            
+        Returns:
+            SVG content as string
+        """
+        buffer = io.StringIO()
+        self.write(assignments_by_hole, buffer, document_name=document_name)
+        return buffer.getvalue()
     
     def save(
         self,
@@ -379,7 +693,7 @@ class SVGGenerator:
         output_path: Path,
     ) -> None:
         """
-        Generate and save SVG to file.
+        Generate and save SVG to file, streaming layers directly to disk.
         
         Args:
             assignments_by_hole: Dictionary mapping holes to assignments
@@ -389,11 +703,8 @@ class SVGGenerator:
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Use filename as document name
-        document_name = output_path.name
-        svg_content = self.generate(assignments_by_hole, document_name=document_name)
-        
         with open(output_path, "w") as f:
-            f.write(svg_content)
+            self.write(assignments_by_hole, f, document_name=output_path.name)
         
         logger.info(f"Saved SVG to {output_path}")
     
@@ -413,12 +724,19 @@ class SVGCleaner:
     - Fix self-intersections
     - Simplify nodes
     - Optional fringe generation
+    
+    Overlapping shapes are found per hole and class with an STRtree; only
+    connected clusters of intersecting shapes are unioned, so unrelated
+    features stay separate paths. Cluster unions for all holes run on a
+    thread pool (Shapely releases the GIL), then validity fixing and
+    simplification run once over every resulting geometry.
     """
     
     def __init__(
         self,
         simplify_tolerance: float = 1.0,
         union_same_class: bool = True,
+        max_workers: Optional[int] = None,
     ):
         """
         Initialize the SVG cleaner.
@@ -426,9 +744,58 @@ class SVGCleaner:
         Args:
             simplify_tolerance: Tolerance for node simplification
             union_same_class: Whether to union overlapping shapes of same class
+            max_workers: Threads used for cluster unions (None = default pool size)
         """
         self.simplify_tolerance = simplify_tolerance
         self.union_same_class = union_same_class
+        self.max_workers = max_workers
+    
+    @staticmethod
+    def _overlap_clusters(geometries: np.ndarray) -> List[np.ndarray]:
+        """
+        Group geometries into connected clusters of intersecting shapes.
+        
+        Args:
+            geometries: Array of Shapely geometries
+            
+        Returns:
+            List of index arrays, ordered by each cluster's first member
+        """
+        n = len(geometries)
+        if n == 1:
+            return [np.array([0])]
+        
+        tree = STRtree(geometries)
+        left, right = tree.query(geometries, predicate="intersects")
+        
+        # Min-label propagation with pointer jumping over the overlap graph
+        labels = np.arange(n)
+        while True:
+            updated = labels.copy()
+            np.minimum.at(updated, left, labels[right])
+            updated = updated[updated]
+            if np.array_equal(updated, labels):
+                break
+            labels = updated
+        
+        _, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        order = np.argsort(first)
+        return [np.flatnonzero(inverse == k) for k in order]
+    
+    def _finish(self, geometries: np.ndarray) -> np.ndarray:
+        """Fix invalid geometries and simplify, all in one batch."""
+        invalid = ~shapely.is_valid(geometries)
+        if invalid.any():
+            geometries[invalid] = shapely.make_valid(geometries[invalid])
+        
+        if self.simplify_tolerance > 0:
+            geometries = shapely.simplify(
+                geometries,
+                self.simplify_tolerance,
+                preserve_topology=True,
+            )
+        
+        return geometries
     
     def clean(
         self,
@@ -443,89 +810,109 @@ class SVGCleaner:
         Returns:
             Cleaned assignments dictionary
         """
-        from shapely.ops import unary_union
-        from shapely.validation import make_valid
+        from .polygons import PolygonFeature
+        
+        cleaned: Dict[int, List[HoleAssignment]] = {}
         
-        cleaned = {}
+        if not self.union_same_class:
+            # Just fix and simplify individual geometries
+            flat = [
+                (hole, assignment)
+                for hole, assignments in assignments_by_hole.items()
+                for assignment in assignments
+            ]
+            geometries = self._finish(np.array(
+                [a.polygon.geometry for _, a in flat], dtype=object
+            ))
+            
+            for hole in assignments_by_hole:
+                cleaned[hole] = []
+            for (hole, assignment), geom in zip(flat, geometries):
+                # Create new polygon with cleaned geometry
+                new_polygon = PolygonFeature(
+                    id=assignment.polygon.id,
+                    feature_class=assignment.polygon.feature_class,
+                    confidence=assignment.polygon.confidence,
+                    geometry=geom,
+                    properties=assignment.polygon.properties,
+                )
+                cleaned[hole].append(HoleAssignment(
+                    polygon=new_polygon,
+                    hole=hole,
+                ))
+            
+            logger.info(f"Cleaned SVG geometry for {len(cleaned)} holes")
+            return cleaned
         
+        # Find overlap clusters for each (hole, class) group
+        clusters = []  # (hole, feature_class, cluster_index, members)
         for hole, assignments in assignments_by_hole.items():
-            if self.union_same_class:
-                # Group by feature class
-                by_class: Dict[str, List[HoleAssignment]] = {}
-                for assignment in assignments:
-                    cls = assignment.polygon.feature_class
-                    if cls not in by_class:
-                        by_class[cls] = []
-                    by_class[cls].append(assignment)
-                
-                # Union each class
-                cleaned_assignments = []
-                for feature_class, class_assignments in by_class.items():
-                    geometries = [a.polygon.geometry for a in class_assignments]
-                    
-                    # Union and simplify
-                    unioned = unary_union(geometries)
-                    
-                    if not unioned.is_valid:
-                        unioned = make_valid(unioned)
-                    
-                    if self.simplify_tolerance > 0:
-                        unioned = unioned.simplify(
-                            self.simplify_tolerance,
-                            preserve_topology=True,
-                        )
-                    
-                    # Create new assignment with unioned geometry
-                    # Use first assignment as template
-                    template = class_assignments[0]
-                    from .polygons import PolygonFeature
-                    
-                    new_polygon = PolygonFeature(
-                        id=f"{feature_class}_{hole:02d}_merged",
-                        feature_class=feature_class,
-                        confidence=min(a.polygon.confidence for a in class_assignments),
-                        geometry=unioned,
-                        properties={"merged_count": len(class_assignments)},
-                    )
-                    
-                    cleaned_assignments.append(HoleAssignment(
-                        polygon=new_polygon,
-                        hole=hole,
+            cleaned[hole] = []
+            
+            # Group by feature class
+            by_class: Dict[str, List[HoleAssignment]] = {}
+            for assignment in assignments:
+                by_class.setdefault(assignment.polygon.feature_class, []).append(assignment)
+            
+            for feature_class, class_assignments in by_class.items():
+                geometries = np.array(
+                    [a.polygon.geometry for a in class_assignments], dtype=object
+                )
+                for k, members in enumerate(self._overlap_clusters(geometries)):
+                    clusters.append((
+                        hole,
+                        feature_class,
+                        k,
+                        [class_assignments[i] for i in members],
                     ))
-                
-                cleaned[hole] = cleaned_assignments
+        
+        # Union multi-member clusters of all holes in parallel
+        merged = np.empty(len(clusters), dtype=object)
+        to_union = []
+        for i, (_, _, _, members) in enumerate(clusters):
+            if len(members) == 1:
+                merged[i] = members[0].polygon.geometry
             else:
-                # Just fix and simplify individual geometries
-                cleaned_assignments = []
-                for assignment in assignments:
-                    geom = assignment.polygon.geometry
-                    
-                    if not geom.is_valid:
-                        geom = make_valid(geom)
-                    
-                    if self.simplify_tolerance > 0:
-                        geom = geom.simplify(
-                            self.simplify_tolerance,
-                            preserve_topology=True,
-                        )
-                    
-                    # Create new polygon with cleaned geometry
-                    from .polygons import PolygonFeature
-                    
-                    new_polygon = PolygonFeature(
-                        id=assignment.polygon.id,
-                        feature_class=assignment.polygon.feature_class,
-                        confidence=assignment.polygon.confidence,
-                        geometry=geom,
-                        properties=assignment.polygon.properties,
-                    )
-                    
-                    cleaned_assignments.append(HoleAssignment(
-                        polygon=new_polygon,
-                        hole=hole,
-                    ))
-                
-                cleaned[hole] = cleaned_assignments
+                to_union.append(i)
+        
+        def union_cluster(i: int):
+            return shapely.union_all([a.polygon.geometry for a in clusters[i][3]])
+        
+        if len(to_union) > 1 and self.max_workers != 1:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for i, geom in zip(to_union, pool.map(union_cluster, to_union)):
+                    merged[i] = geom
+        else:
+            for i in to_union:
+                merged[i] = union_cluster(i)
+        
+        merged = self._finish(merged)
+        
+        for (hole, feature_class, k, members), geom in zip(clusters, merged):
+            if len(members) == 1:
+                # Untouched feature keeps its identity
+                source = members[0].polygon
+                new_polygon = PolygonFeature(
+                    id=source.id,
+                    feature_class=feature_class,
+                    confidence=source.confidence,
+                    geometry=geom,
+                    properties=source.properties,
+                )
+            else:
+                suffix = "" if k == 0 else f"_{k}"
+                new_polygon = PolygonFeature(
+                    id=f"{feature_class}_{hole:02d}_merged{suffix}",
+                    feature_class=feature_class,
+                    confidence=min(a.polygon.confidence for a in members),
+                    geometry=geom,
+                    properties={"merged_count": len(members)},
+                )
+            
+            cleaned[hole].append(HoleAssignment(
+                polygon=new_polygon,
+                hole=hole,
+            ))
         
         logger.info(f"Cleaned SVG geometry for {len(cleaned)} holes")
         return cleaned
@@ -25,9 +25,13 @@ except ImportError:
 from .masks import MaskData
 from .interactive import InteractiveSelector, FeatureType
 from .svg import SVGGenerator
+from .worker import MaskWorker
 
 logger = logging.getLogger(__name__)
 
+# Slider previews run this long after the slider stops moving
+PREVIEW_DELAY_MS = 150
+
 # Cache OPCD palette to avoid reloading on every redraw
 _OPCD_PALETTE_CACHE = None
 _OPCD_RGB_CACHE = None
@@ -47,6 +51,306 @@ def _get_opcd_colors():
     return _OPCD_PALETTE_CACHE, _OPCD_RGB_CACHE
 
 
+def _mask_color(mask_id: str, is_selected: bool, alpha: float) -> Tuple[np.ndarray, float]:
+    """
+    Overlay color and opacity for a mask, from the OPCD palette.
+    
+    Args:
+        mask_id: Mask ID, e.g. "green_1_0000" (feature type is taken from it)
+        is_selected: Whether the mask is selected
+        alpha: Base transparency for mask overlay
+        
+    Returns:
+        (RGB color, alpha) for the mask
+    """
+    # Get cached OPCD palette colors (only loaded once)
+    opcd_colors, opcd_rgb = _get_opcd_colors()
+    
+    # Default colors if feature type can't be determined
+    default_color = opcd_rgb.get('ignore', np.array([204, 204, 204]))
+    selected_highlight = np.array([255, 0, 0])  # Red border for selected
+    
+    # Determine feature type from mask ID
+    # Format: "green_1_0000", "fairway_2_0001", "bunker_1_0002", etc.
+    mask_id_lower = mask_id.lower()
+    feature_color = default_color
+    
+    if 'green' in mask_id_lower:
+        feature_color = opcd_rgb.get('green', np.array([188, 229, 164]))
+    elif 'fairway' in mask_id_lower:
+        feature_color = opcd_rgb.get('fairway', np.array([67, 229, 97]))
+    elif 'bunker' in mask_id_lower:
+        feature_color = opcd_rgb.get('bunker', np.array([229, 229, 170]))
+    elif 'tee' in mask_id_lower:
+        feature_color = opcd_rgb.get('tee', np.array([160, 229, 184]))
+    elif 'rough' in mask_id_lower:
+        feature_color = opcd_rgb.get('rough', np.array([39, 132, 56]))
+    elif 'water' in mask_id_lower or 'lake' in mask_id_lower:
+        feature_color = opcd_rgb.get('water', np.array([0, 0, 192]))
+    elif 'cart_path' in mask_id_lower or 'concrete' in mask_id_lower:
+        feature_color = opcd_rgb.get('cart_path', np.array([190, 190, 187]))
+    
+    # Use feature color, but make selected masks more visible
+    if is_selected:
+        # Blend feature color with red highlight for selected
+        color = (feature_color * 0.7 + selected_highlight * 0.3).astype(int)
+        mask_alpha = alpha * 0.8  # More opaque for selected
+    else:
+        color = feature_color
+        mask_alpha = alpha * 0.4  # Less opaque for unselected
+    
+    return color, mask_alpha
+
+
+class _OverlayLayer:
+    """A mask cropped to its bounding box with a premultiplied color."""
+    
+    __slots__ = ("source", "selected", "bbox", "mask", "premultiplied", "keep")
+    
+    def __init__(self, mask_data: MaskData, is_selected: bool, alpha: float):
+        self.source = mask_data.mask
+        
+        rows = np.flatnonzero(mask_data.mask.any(axis=1))
+        cols = np.flatnonzero(mask_data.mask.any(axis=0))
+        if len(rows) == 0:
+            self.bbox = None
+            self.mask = None
+        else:
+            # (y0, y1, x0, x1), end-exclusive
+            self.bbox = (int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1)
+            y0, y1, x0, x1 = self.bbox
+            self.mask = mask_data.mask[y0:y1, x0:x1].copy()
+        
+        self.set_style(mask_data.id, is_selected, alpha)
+    
+    def set_style(self, mask_id: str, is_selected: bool, alpha: float) -> None:
+        """Set the layer's color for a selection state."""
+        color, mask_alpha = _mask_color(mask_id, is_selected, alpha)
+        self.selected = is_selected
+        self.premultiplied = color * mask_alpha
+        self.keep = 1 - mask_alpha
+
+
+class MaskOverlayCompositor:
+    """
+    Persistent mask overlay that only re-blends regions that changed.
+    
+    Keeps a uint8 base image, a layer per mask (mask cropped to its
+    bounding box plus premultiplied color) and the composited overlay.
+    update() compares masks and selection with the previous call and
+    re-blends only the bounding boxes of added, removed or restyled masks,
+    so redraw cost follows the changed area instead of image size times
+    mask count.
+    """
+    
+    def __init__(self, image: np.ndarray, alpha: float = 0.5):
+        """
+        Initialize the compositor.
+        
+        Args:
+            image: Source image (H, W, 3) in RGB
+            alpha: Transparency for mask overlay
+        """
+        self.image = image
+        self.alpha = alpha
+        self._base = np.ascontiguousarray(image, dtype=np.uint8)
+        self._overlay = self._base.copy()
+        self._layers: Dict[str, _OverlayLayer] = {}
+        self._order: List[str] = []
+        # Boxes (y0, y1, x0, x1) re-blended by the last update
+        self.dirty: List[tuple] = [(0, self._base.shape[0], 0, self._base.shape[1])]
+    
+    @property
+    def overlay(self) -> np.ndarray:
+        """The current composited overlay (updated in place)."""
+        return self._overlay
+    
+    def update(
+        self,
+        masks: List[MaskData],
+        selected_mask_ids: Optional[List[str]] = None,
+    ) -> np.ndarray:
+        """
+        Bring the overlay up to date with the given masks and selection.
+        
+        Masks are matched by ID; a mask counts as changed when its array
+        object or selection state differs from the previous update.
+        
+        Args:
+            masks: Masks to display, blended in list order
+            selected_mask_ids: Optional list of selected mask IDs to highlight
+            
+        Returns:
+            Overlaid image (the compositor's buffer, not a copy)
+        """
+        height, width = self._base.shape[:2]
+        selected_ids = set(selected_mask_ids or [])
+        order = [mask_data.id for mask_data in masks]
+        dirty: List[tuple] = []
+        
+        layers = {}
+        for mask_data in masks:
+            is_selected = mask_data.id in selected_ids
+            layer = self._layers.get(mask_data.id)
+            if layer is None or layer.source is not mask_data.mask:
+                if layer is not None and layer.bbox is not None:
+                    dirty.append(layer.bbox)
+                layer = _OverlayLayer(mask_data, is_selected, self.alpha)
+                if layer.bbox is not None:
+                    dirty.append(layer.bbox)
+            elif layer.selected != is_selected:
+                # Selection toggled: same geometry, new color
+                layer.set_style(mask_data.id, is_selected, self.alpha)
+                if layer.bbox is not None:
+                    dirty.append(layer.bbox)
+            layers[mask_data.id] = layer
+        
+        for mask_id, layer in self._layers.items():
+            if mask_id not in layers and layer.bbox is not None:
+                dirty.append(layer.bbox)
+        
+        # Blend order changed for masks present before and after: start over
+        kept = set(self._order) & set(order)
+        if [i for i in self._order if i in kept] != [i for i in order if i in kept]:
+            dirty = [(0, height, 0, width)]
+        
+        # Overlapping boxes covering more than the image: one full pass
+        if sum((y1 - y0) * (x1 - x0) for y0, y1, x0, x1 in dirty) >= height * width:
+            dirty = [(0, height, 0, width)]
+        
+        self._layers = layers
+        self._order = order
+        self.dirty = dirty
+        
+        for bbox in dirty:
+            self._composite(bbox)
+        
+        return self._overlay
+    
+    def _composite(self, bbox: tuple) -> None:
+        """Re-blend all layers over the base image within a bounding box."""
+        y0, y1, x0, x1 = bbox
+        region = self._base[y0:y1, x0:x1].astype(float)
+        
+        for mask_id in self._order:
+            layer = self._layers[mask_id]
+            if layer.bbox is None:
+                continue
+            ly0, ly1, lx0, lx1 = layer.bbox
+            iy0, iy1 = max(y0, ly0), min(y1, ly1)
+            ix0, ix1 = max(x0, lx0), min(x1, lx1)
+            if iy0 >= iy1 or ix0 >= ix1:
+                continue
+            
+            mask = layer.mask[iy0 - ly0:iy1 - ly0, ix0 - lx0:ix1 - lx0]
+            target = region[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+            target[mask] = target[mask] * layer.keep + layer.premultiplied
+        
+        self._overlay[y0:y1, x0:x1] = region.astype(np.uint8)
+
+
+def _downsample(image: np.ndarray) -> np.ndarray:
+    """Halve an RGB image with a 2x2 box filter (odd edges are replicated)."""
+    height, width = image.shape[:2]
+    if height % 2 or width % 2:
+        image = np.pad(image, ((0, height % 2), (0, width % 2), (0, 0)), mode='edge')
+    total = (
+        image[0::2, 0::2].astype(np.uint16) + image[1::2, 0::2]
+        + image[0::2, 1::2] + image[1::2, 1::2]
+    )
+    return ((total + 2) // 4).astype(np.uint8)
+
+
+class DisplayPyramid:
+    """
+    Level-of-detail pyramid of an RGB image for display.
+    
+    Level k halves level k-1, so one level-k pixel covers exactly
+    2**k x 2**k source pixels. view() returns just the visible window of
+    the coarsest level that still has at least one pixel per screen
+    pixel, so matplotlib never resamples the full-resolution image.
+    """
+    
+    def __init__(self, image: np.ndarray, min_size: int = 512):
+        """
+        Build the pyramid.
+        
+        Args:
+            image: Full-resolution RGB image (H, W, 3) uint8; kept by
+                reference, see update()
+            min_size: Stop once a level's longest side is at most this
+        """
+        self.levels = [image]
+        while max(self.levels[-1].shape[:2]) > min_size:
+            self.levels.append(_downsample(self.levels[-1]))
+    
+    @property
+    def source(self) -> np.ndarray:
+        """The full-resolution image (level 0)."""
+        return self.levels[0]
+    
+    def update(self, boxes: List[tuple]) -> None:
+        """
+        Propagate changes to the source image into the coarser levels.
+        
+        Args:
+            boxes: Changed regions (y0, y1, x0, x1) of the source image
+        """
+        for y0, y1, x0, x1 in boxes:
+            for k in range(1, len(self.levels)):
+                y0, x0 = y0 // 2, x0 // 2
+                y1, x1 = -(-y1 // 2), -(-x1 // 2)
+                finer = self.levels[k - 1][2 * y0:2 * y1, 2 * x0:2 * x1]
+                self.levels[k][y0:y1, x0:x1] = _downsample(finer)
+    
+    def level_for(self, source_per_screen_pixel: float) -> int:
+        """Coarsest level with at least one pixel per screen pixel."""
+        if source_per_screen_pixel <= 1:
+            return 0
+        level = int(np.floor(np.log2(source_per_screen_pixel)))
+        return min(level, len(self.levels) - 1)
+    
+    def view(
+        self,
+        xlim: Tuple[float, float],
+        ylim: Tuple[float, float],
+        screen_size: Tuple[float, float],
+    ) -> Tuple[int, np.ndarray, tuple]:
+        """
+        Visible window of the level matching the zoom.
+        
+        Args:
+            xlim: Visible x range in source pixels
+            ylim: Visible y range in source pixels (either order)
+            screen_size: (width, height) of the axes in screen pixels
+            
+        Returns:
+            (level, window array, imshow extent (left, right, bottom, top)
+            in source pixels)
+        """
+        height, width = self.source.shape[:2]
+        x0, x1 = sorted(xlim)
+        y0, y1 = sorted(ylim)
+        screen_width, screen_height = screen_size
+        density = max((x1 - x0) / max(screen_width, 1), (y1 - y0) / max(screen_height, 1))
+        
+        level = self.level_for(density)
+        scale = 2 ** level
+        image = self.levels[level]
+        level_height, level_width = image.shape[:2]
+        
+        lx0 = min(max(int(np.floor(x0 / scale)), 0), level_width - 1)
+        ly0 = min(max(int(np.floor(y0 / scale)), 0), level_height - 1)
+        lx1 = min(max(int(np.ceil(x1 / scale)), lx0 + 1), level_width)
+        ly1 = min(max(int(np.ceil(y1 / scale)), ly0 + 1), level_height)
+        
+        extent = (
+            lx0 * scale, min(lx1 * scale, width),
+            min(ly1 * scale, height), ly0 * scale,
+        )
+        return level, image[ly0:ly1, lx0:lx1], extent
+
+
 def create_mask_overlay(
     image: np.ndarray,
     masks: List[MaskData],
@@ -57,6 +361,9 @@ def create_mask_overlay(
     Create an overlay visualization showing masks on the image.
     Uses OPCD palette colors based on feature type.
     
+    For repeated redraws keep a MaskOverlayCompositor instead, which only
+    re-blends what changed.
+    
     Args:
         image: Source image (H, W, 3) in RGB
         masks: List of masks to display
@@ -66,58 +373,7 @@ def create_mask_overlay(
     Returns:
         Overlaid image
     """
-    overlay = image.copy().astype(float)
-    
-    selected_ids = set(selected_mask_ids or [])
-    
-    # Get cached OPCD palette colors (only loaded once)
-    opcd_colors, opcd_rgb = _get_opcd_colors()
-    
-    # Default colors if feature type can't be determined
-    default_color = opcd_rgb.get('ignore', np.array([204, 204, 204]))
-    selected_highlight = np.array([255, 0, 0])  # Red border for selected
-    
-    for mask_data in masks:
-        mask = mask_data.mask
-        is_selected = mask_data.id in selected_ids
-        
-        # Determine feature type from mask ID
-        # Format: "green_1_0000", "fairway_2_0001", "bunker_1_0002", etc.
-        mask_id_lower = mask_data.id.lower()
-        feature_color = default_color
-        
-        if 'green' in mask_id_lower:
-            feature_color = opcd_rgb.get('green', np.array([188, 229, 164]))
-        elif 'fairway' in mask_id_lower:
-            feature_color = opcd_rgb.get('fairway', np.array([67, 229, 97]))
-        elif 'bunker' in mask_id_lower:
-            feature_color = opcd_rgb.get('bunker', np.array([229, 229, 170]))
-        elif 'tee' in mask_id_lower:
-            feature_color = opcd_rgb.get('tee', np.array([160, 229, 184]))
-        elif 'rough' in mask_id_lower:
-            feature_color = opcd_rgb.get('rough', np.array([39, 132, 56]))
-        elif 'water' in mask_id_lower or 'lake' in mask_id_lower:
-            feature_color = opcd_rgb.get('water', np.array([0, 0, 192]))
-        elif 'cart_path' in mask_id_lower or 'concrete' in mask_id_lower:
-            feature_color = opcd_rgb.get('cart_path', np.array([190, 190, 187]))
-        
-        # Use feature color, but make selected masks more visible
-        if is_selected:
-            # Blend feature color with red highlight for selected
-            color = (feature_color * 0.7 + selected_highlight * 0.3).astype(int)
-            mask_alpha = alpha * 0.8  # More opaque for selected
-        else:
-            color = feature_color
-            mask_alpha = alpha * 0.4  # Less opaque for unselected
-        
-        # Apply mask overlay
-        for c in range(3):
-            overlay[:, :, c][mask] = (
-                overlay[:, :, c][mask] * (1 - mask_alpha) +
-                color[c] * mask_alpha
-            )
-    
-    return overlay.astype(np.uint8)
+    return MaskOverlayCompositor(image, alpha).update(masks, selected_mask_ids)
 
 
 class InteractiveMaskSelector:
@@ -131,6 +387,9 @@ class InteractiveMaskSelector:
     
     Additional Features:
     - Merge ('M' key): Merge all selected masks into one with smooth edges
+    - Live preview ('T' key): Moving a slider re-runs the last SAM or grow
+      outline and shows the candidate in place of its mask; 'A' applies it,
+      Esc discards it
     """
     
     def __init__(
@@ -158,6 +417,14 @@ class InteractiveMaskSelector:
         self.done_button = None
         self._done_pressed = False
         self._image_artist = None  # Cache image artist for efficient updates
+        self._compositor: Optional[MaskOverlayCompositor] = None  # Incremental overlay
+        self._pyramid: Optional[DisplayPyramid] = None  # Display levels of the overlay
+        self._display_view = None  # (level, extent) currently shown
+        
+        # Background mask generation; results are polled by a timer
+        self._worker: Optional[MaskWorker] = None
+        self._worker_timer = None
+        self._busy_text = None  # "Computing..." indicator
         self._last_generated_mask_id = None  # Track last generated mask for undo
         
         # Drawing mode state
@@ -183,6 +450,12 @@ class InteractiveMaskSelector:
         self._growth_limit = 50
         self._growth_slider = None
         
+        # Live preview of the last outline at the current slider values
+        self._preview_enabled = True
+        self._last_outline = None  # Outline of the mask being previewed
+        self._preview: Optional[MaskData] = None  # Candidate, not yet applied
+        self._preview_timer = None  # Debounces slider movements
+        
     def _setup_instructions_panel(self):
         """Setup the left instructions panel with controls and shortcuts."""
         ax = self.ax_instructions
@@ -209,7 +482,12 @@ class InteractiveMaskSelector:
             "",
             "  M = Merge masks",
             "",
-            "  Esc = Undo last",
+            "  T = Toggle preview",
+            "  A = Apply preview",
+            "  N = New region",
+            "      (superpixel clicks)",
+            "",
+            "  Z = Undo  Y = Redo",
             "",
             "  Enter/Space = Done",
             "",
@@ -261,7 +539,9 @@ class InteractiveMaskSelector:
         self._selected_label.set_text(f"Selected: {len(self.selected_mask_ids)}")
         
         # Update task hint based on context
-        if hasattr(self, '_current_feature_type') and hasattr(self, '_current_hole'):
+        if self._preview is not None:
+            self._task_label.set_text("Preview: A = apply, Esc = discard")
+        elif hasattr(self, '_current_feature_type') and hasattr(self, '_current_hole'):
             feature_name = self._current_feature_type.value if self._current_feature_type else "feature"
             self._task_label.set_text(f"Draw {feature_name} for hole {self._current_hole}")
     
@@ -337,6 +617,7 @@ class InteractiveMaskSelector:
         if hasattr(self, '_growth_value_text'):
             self._growth_value_text.set_text(f"Value: {self._growth_limit}px")
             self.fig.canvas.draw_idle()
+        self._schedule_preview()
     
     def _update_growth_limit(self, growth_limit):
         """Update the mask generator's growth limit."""
@@ -424,112 +705,49 @@ class InteractiveMaskSelector:
         
         # Need at least a few points to form an outline
         if len(self._draw_points) < 5:
-            logger.info("Draw a larger outline (click and drag)")
+            if getattr(self.selector, 'strategy', 'sam') == 'superpixel' and hasattr(self, '_current_hole'):
+                # Superpixel strategy: a click toggles the superpixel under
+                # it (shift+click asks SAM instead)
+                x, y = self._draw_points[0]
+                self._run_async(
+                    self._click_job, int(x), int(y), self._current_hole, self._current_feature_type,
+                    getattr(event, 'key', None) == 'shift',
+                    on_done=self._on_click_done,
+                )
+            else:
+                logger.info("Draw a larger outline (click and drag)")
             if self._draw_line is not None:
                 self._draw_line.remove()
                 self._draw_line = None
             self.fig.canvas.draw_idle()
             return
         
-        # Process events before heavy SAM work to keep GUI responsive
-        try:
-            self.fig.canvas.flush_events()
-        except:
-            pass
-        
         # Check if this is a point-based selector with outline support
         if hasattr(self.selector, 'draw_to_mask') and hasattr(self, '_current_hole') and hasattr(self, '_current_feature_type'):
             if self._grow_mode:
-                # Grow mode: region growing from drawn polygon interior
-                print(f"[GROW MODE] Processing {len(self._draw_points)} draw points")
-                if hasattr(self.selector, 'grow_from_polygon'):
-                    mask_data = self.selector.grow_from_polygon(
-                        self._draw_points,
-                        self._current_hole,
-                        self._current_feature_type,
-                        color_sensitivity=self._color_sensitivity,
-                        growth_limit=self._growth_limit,
-                    )
-                    if mask_data:
-                        self._last_generated_mask_id = mask_data.id
-                        if mask_data.id not in self.selected_mask_ids:
-                            self.selected_mask_ids.append(mask_data.id)
-                        logger.info(f"Grew mask from polygon: {mask_data.id}")
-                        print(f"[GROW MODE] Created: {mask_data.id} ({mask_data.area} pixels)")
-                    else:
-                        logger.warning("Failed to grow mask from polygon")
-                        print("[GROW MODE] Failed - try adjusting sliders")
-                else:
-                    logger.warning("Grow mode not supported by this selector")
-                    print("[GROW MODE] Not supported - using SAM instead")
-                    # Fallback to SAM mode
-                    mask_data = self.selector.draw_to_mask(
-                        self._draw_points,
-                        self._current_hole,
-                        self._current_feature_type
-                    )
-                    if mask_data:
-                        self._last_generated_mask_id = mask_data.id
-                        if mask_data.id not in self.selected_mask_ids:
-                            self.selected_mask_ids.append(mask_data.id)
+                mode = 'grow'
             elif self._fill_mode:
-                # Fill mode: generate filled polygon and AUTO-MERGE with last mask
-                print(f"[FILL MODE] Processing {len(self._draw_points)} draw points")
-                if hasattr(self.selector, 'fill_and_merge'):
-                    # Use auto-merge fill if available
-                    mask_data = self.selector.fill_and_merge(
-                        self._draw_points,
-                        self._last_generated_mask_id,  # Merge with this mask
-                        self._current_hole,
-                        self._current_feature_type
-                    )
-                    if mask_data:
-                        # Remove old mask from selection if it was replaced
-                        if self._last_generated_mask_id and self._last_generated_mask_id in self.selected_mask_ids:
-                            self.selected_mask_ids.remove(self._last_generated_mask_id)
-                        self._last_generated_mask_id = mask_data.id
-                        if mask_data.id not in self.selected_mask_ids:
-                            self.selected_mask_ids.append(mask_data.id)
-                        logger.info(f"Fill merged into: {mask_data.id}")
-                        print(f"[FILL MODE] Merged into: {mask_data.id}")
-                    else:
-                        logger.warning("Failed to fill and merge")
-                        print("[FILL MODE] Failed - draw a larger area")
-                elif hasattr(self.selector, 'fill_polygon_to_mask'):
-                    # Fallback to separate fill
-                    mask_data = self.selector.fill_polygon_to_mask(
-                        self._draw_points,
-                        self._current_hole,
-                        self._current_feature_type
-                    )
-                    if mask_data:
-                        self._last_generated_mask_id = mask_data.id
-                        if mask_data.id not in self.selected_mask_ids:
-                            self.selected_mask_ids.append(mask_data.id)
-                        logger.info(f"Generated filled polygon: {mask_data.id}")
-                        print(f"[FILL MODE] Created separate fill: {mask_data.id}")
-                    else:
-                        logger.warning("Failed to generate filled polygon")
-                        print("[FILL MODE] Failed to generate filled polygon")
-                else:
-                    logger.warning("Fill mode not supported by this selector")
-                    print("[FILL MODE] Not supported by this selector")
+                mode = 'fill'
             else:
-                # SAM mode: generate mask from outline with SAM processing
-                mask_data = self.selector.draw_to_mask(
-                    self._draw_points,
-                    self._current_hole,
-                    self._current_feature_type
-                )
-                if mask_data:
-                    # Track this as the last generated mask for undo
-                    self._last_generated_mask_id = mask_data.id
-                    # Add to selected masks
-                    if mask_data.id not in self.selected_mask_ids:
-                        self.selected_mask_ids.append(mask_data.id)
-                    logger.info(f"Generated mask from outline: {mask_data.id}")
-                else:
-                    logger.warning("Failed to generate mask from outline")
+                mode = 'sam'
+            # Capture everything the job needs now; the user may switch
+            # mode, feature or sliders before it runs
+            outline = {
+                'points': list(self._draw_points),
+                'hole': self._current_hole,
+                'feature_type': self._current_feature_type,
+                'mode': mode,
+            }
+            self._run_async(
+                self._outline_job,
+                outline['points'],
+                outline['hole'],
+                outline['feature_type'],
+                mode,
+                self._color_sensitivity,
+                self._growth_limit,
+                on_done=lambda result: self._on_outline_done(result, outline),
+            )
         
         # Clear drawing visualization
         if self._draw_line is not None:
@@ -539,15 +757,104 @@ class InteractiveMaskSelector:
         # Clear draw points
         self._draw_points = []
         
-        # Process events after mask generation to keep GUI responsive
-        try:
-            self.fig.canvas.flush_events()
-        except:
-            pass
-        
-        # Redraw to show the new mask
+        # Redraw to remove the outline (the mask appears when its job finishes)
         self._redraw()
     
+    def _outline_job(self, draw_points, hole, feature_type, mode, color_sensitivity, growth_limit):
+        """
+        Generate a mask from a drawn outline (runs on the worker thread).
+        
+        Returns:
+            (mask_data, replaced_mask_id) - replaced_mask_id is the mask a
+            fill was merged into, which should leave the selection
+        """
+        replaced_id = None
+        mask_data = None
+        
+        if mode == 'grow':
+            # Grow mode: region growing from drawn polygon interior
+            print(f"[GROW MODE] Processing {len(draw_points)} draw points")
+            if hasattr(self.selector, 'grow_from_polygon'):
+                mask_data = self.selector.grow_from_polygon(
+                    draw_points,
+                    hole,
+                    feature_type,
+                    color_sensitivity=color_sensitivity,
+                    growth_limit=growth_limit,
+                )
+                if mask_data:
+                    logger.info(f"Grew mask from polygon: {mask_data.id}")
+                    print(f"[GROW MODE] Created: {mask_data.id} ({mask_data.area} pixels)")
+                else:
+                    logger.warning("Failed to grow mask from polygon")
+                    print("[GROW MODE] Failed - try adjusting sliders")
+            else:
+                logger.warning("Grow mode not supported by this selector")
+                print("[GROW MODE] Not supported - using SAM instead")
+                # Fallback to SAM mode
+                mask_data = self.selector.draw_to_mask(draw_points, hole, feature_type)
+        elif mode == 'fill':
+            # Fill mode: generate filled polygon and AUTO-MERGE with last mask
+            print(f"[FILL MODE] Processing {len(draw_points)} draw points")
+            if hasattr(self.selector, 'fill_and_merge'):
+                # Use auto-merge fill if available. Read the last mask here,
+                # not at submit time, so it includes earlier queued jobs.
+                replaced_id = self._last_generated_mask_id
+                mask_data = self.selector.fill_and_merge(
+                    draw_points,
+                    replaced_id,  # Merge with this mask
+                    hole,
+                    feature_type
+                )
+                if mask_data:
+                    logger.info(f"Fill merged into: {mask_data.id}")
+                    print(f"[FILL MODE] Merged into: {mask_data.id}")
+                else:
+                    logger.warning("Failed to fill and merge")
+                    print("[FILL MODE] Failed - draw a larger area")
+            elif hasattr(self.selector, 'fill_polygon_to_mask'):
+                # Fallback to separate fill
+                mask_data = self.selector.fill_polygon_to_mask(draw_points, hole, feature_type)
+                if mask_data:
+                    logger.info(f"Generated filled polygon: {mask_data.id}")
+                    print(f"[FILL MODE] Created separate fill: {mask_data.id}")
+                else:
+                    logger.warning("Failed to generate filled polygon")
+                    print("[FILL MODE] Failed to generate filled polygon")
+            else:
+                logger.warning("Fill mode not supported by this selector")
+                print("[FILL MODE] Not supported by this selector")
+        else:
+            # SAM mode: generate mask from outline with SAM processing
+            mask_data = self.selector.draw_to_mask(draw_points, hole, feature_type)
+            if mask_data:
+                logger.info(f"Generated mask from outline: {mask_data.id}")
+            else:
+                logger.warning("Failed to generate mask from outline")
+        
+        if mask_data:
+            # Track this as the last generated mask for undo (and for fills
+            # queued behind this job)
+            self._last_generated_mask_id = mask_data.id
+        return mask_data, replaced_id
+    
+    def _on_outline_done(self, result, outline=None):
+        """Select a mask generated from an outline (GUI thread)."""
+        mask_data, replaced_id = result
+        if not mask_data:
+            return
+        # SAM and grow masks can be re-tuned with the sliders
+        self._preview = None
+        if outline is not None and outline['mode'] in ('sam', 'grow'):
+            self._last_outline = dict(outline, mask_id=mask_data.id)
+        else:
+            self._last_outline = None
+        # Remove old mask from selection if a fill replaced it
+        if replaced_id and replaced_id != mask_data.id and replaced_id in self.selected_mask_ids:
+            self.selected_mask_ids.remove(replaced_id)
+        if mask_data.id not in self.selected_mask_ids:
+            self.selected_mask_ids.append(mask_data.id)
+    
     def _on_click(self, event):
         """Handle mouse click events (single click fallback)."""
         # This is now a fallback - drawing is preferred
@@ -579,18 +886,10 @@ class InteractiveMaskSelector:
             # For point-based selector, single click is now just a fallback
             # Drawing is the preferred method
             if hasattr(self.selector, 'click_to_mask') and hasattr(self, '_current_hole') and hasattr(self, '_current_feature_type'):
-                mask_data = self.selector.click_to_mask(
-                    x, y,
-                    self._current_hole,
-                    self._current_feature_type
+                self._run_async(
+                    self._click_job, x, y, self._current_hole, self._current_feature_type,
+                    on_done=self._on_click_done,
                 )
-                if mask_data:
-                    self._last_generated_mask_id = mask_data.id
-                    if mask_data.id not in self.selected_mask_ids:
-                        self.selected_mask_ids.append(mask_data.id)
-                    self._redraw()
-                    if self.click_callback:
-                        self.click_callback(mask_data.id)
             else:
                 # Original mask selection mode
                 mask_id = self.selector.get_mask_at_point(x, y)
@@ -610,6 +909,83 @@ class InteractiveMaskSelector:
                 else:
                     logger.warning(f"No mask found at ({x}, {y})")
     
+    def _click_job(self, x, y, hole, feature_type, use_sam=False):
+        """Generate a mask from a click (runs on the worker thread)."""
+        mask_data = self.selector.click_to_mask(x, y, hole, feature_type, use_sam=use_sam)
+        if mask_data:
+            self._last_generated_mask_id = mask_data.id
+        return mask_data
+    
+    def _on_click_done(self, mask_data):
+        """Select a mask generated from a click (GUI thread)."""
+        # A superpixel click can empty and remove a region
+        self.selected_mask_ids = [
+            mask_id for mask_id in self.selected_mask_ids
+            if mask_id in self.selector.generated_masks
+        ]
+        if not mask_data:
+            return
+        if mask_data.id not in self.selected_mask_ids:
+            self.selected_mask_ids.append(mask_data.id)
+        if self.click_callback:
+            self.click_callback(mask_data.id)
+    
+    def _run_async(self, fn, *args, on_done, key=None):
+        """
+        Run a mask operation on the background worker.
+        
+        ``on_done`` gets the result on the GUI thread, after which the view
+        is redrawn. Without a running window (no poll timer) the operation
+        runs synchronously.
+        
+        Args:
+            fn: Operation to run
+            on_done: Callback taking fn's result
+            key: Coalescing key for superseded requests (side-effect free
+                operations only, see MaskWorker)
+        """
+        if self._worker_timer is None:
+            on_done(fn(*args))
+            self._redraw()
+            return
+        
+        if self._worker is None:
+            self._worker = MaskWorker()
+        self._worker.submit(fn, *args, key=key, on_done=on_done)
+        self._set_busy(True)
+    
+    def _poll_worker(self):
+        """Deliver finished background results (matplotlib timer callback)."""
+        if self._worker is None:
+            return
+        if self._worker.poll():
+            self._redraw()
+        self._set_busy(self._worker.busy)
+    
+    def wait_for_pending(self, timeout: Optional[float] = None):
+        """Wait for queued mask operations and apply their results."""
+        if self._worker is None:
+            return
+        self._worker.wait(timeout)
+        self._poll_worker()
+    
+    def _set_busy(self, busy: bool):
+        """Show or hide the "computing" indicator."""
+        if self.ax is None or self.fig is None:
+            return
+        if self._busy_text is None:
+            if not busy:
+                return
+            self._busy_text = self.ax.text(
+                0.99, 0.01, "Computing...", transform=self.ax.transAxes,
+                ha='right', va='bottom', fontsize=11, color='white',
+                bbox=dict(boxstyle='round', facecolor='darkorange', alpha=0.85),
+            )
+        elif self._busy_text.get_visible() == busy:
+            return
+        self._busy_text.set_visible(busy)
+        self.fig.canvas.draw_idle()
+    
     def _on_done(self, event):
         """Handle Done button press."""
         self._done_pressed = True
@@ -624,6 +1000,7 @@ class InteractiveMaskSelector:
         if hasattr(self, '_sens_value_text'):
             self._sens_value_text.set_text(f"Value: {self._color_sensitivity:.2f}")
             self.fig.canvas.draw_idle()
+        self._schedule_preview()
     
     def _update_color_tolerance(self, sensitivity):
         """Convert slider value to color tolerance and update mask generator."""
@@ -644,6 +1021,93 @@ class InteractiveMaskSelector:
         
         logger.info(f"Color sensitivity: {sensitivity:.2f} -> tolerance: {color_tolerance:.1f} LAB")
     
+    def _schedule_preview(self):
+        """Preview the last outline once the sliders stop moving."""
+        if not self._preview_enabled or self._last_outline is None:
+            return
+        if self._worker_timer is None:
+            # No running window, nothing to debounce
+            self._run_preview()
+            return
+        if self._preview_timer is None:
+            self._preview_timer = self.fig.canvas.new_timer(interval=PREVIEW_DELAY_MS)
+            self._preview_timer.single_shot = True
+            self._preview_timer.add_callback(self._run_preview)
+        # Restarting pushes the preview back while the slider keeps moving
+        self._preview_timer.stop()
+        self._preview_timer.start()
+    
+    def _run_preview(self):
+        """Regenerate the last outline's mask at the current slider values."""
+        outline = self._last_outline
+        if outline is None:
+            return
+        if outline['mask_id'] not in self.selector.generated_masks:
+            self._last_outline = None  # Undone or merged away
+            return
+        # Superseded previews are dropped by the worker
+        self._run_async(
+            self._preview_job,
+            outline,
+            self._color_sensitivity,
+            self._growth_limit,
+            self.selector.mask_generator.color_tolerance,
+            key='preview',
+            on_done=lambda mask_data: self._on_preview_done(mask_data, outline),
+        )
+    
+    def _preview_job(self, outline, color_sensitivity, growth_limit, color_tolerance):
+        """
+        Generate a candidate mask without storing it (runs on the worker thread).
+        
+        The mask generator keeps the outline's SAM candidate, LAB image and
+        growth fields, so only the slider-dependent steps run again.
+        """
+        generator = self.selector.mask_generator
+        if outline['mode'] == 'grow':
+            return generator.generate_from_polygon_grow(
+                self.selector.image,
+                outline['points'],
+                color_sensitivity=color_sensitivity,
+                growth_limit=growth_limit,
+                smooth_edges=True,
+            )
+        return generator.generate_from_outline(
+            self.selector.image, outline['points'], color_tolerance=color_tolerance,
+        )
+    
+    def _on_preview_done(self, mask_data, outline):
+        """Show a candidate mask in place of the outline's mask (GUI thread)."""
+        if outline is not self._last_outline:
+            return  # Superseded by a newer outline
+        if mask_data is None:
+            logger.info("No mask at these slider values")
+            self._preview = None
+            return
+        mask_data.id = outline['mask_id']
+        self._preview = mask_data
+    
+    def _apply_preview(self):
+        """Replace the previewed mask with the candidate."""
+        if self._preview is None:
+            return
+        preview, self._preview = self._preview, None
+        if hasattr(self.selector, 'replace_mask'):
+            # Queued behind pending jobs, like every other mask edit
+            self._run_async(
+                self.selector.replace_mask, preview,
+                on_done=lambda replaced: None,
+            )
+        else:
+            self._redraw()
+    
+    def _discard_preview(self):
+        """Drop the candidate mask, if any, keeping the applied one."""
+        if self._preview is None:
+            return
+        self._preview = None
+        self._redraw()
+    
     def _on_scroll(self, event):
         """Handle mouse wheel scroll for zooming."""
         if event.inaxes != self.ax:
@@ -701,6 +1165,36 @@ class InteractiveMaskSelector:
         self.ax.set_ylim(new_ylim)
         self.fig.canvas.draw_idle()
     
+    def _axes_pixels(self) -> Tuple[float, float]:
+        """Size of the image axes in screen pixels."""
+        bbox = self.ax.get_window_extent()
+        return bbox.width, bbox.height
+    
+    def _on_limits_changed(self, ax):
+        """Show the pyramid level matching new limits (zoom, pan, toolbar)."""
+        self._update_display()
+    
+    def _update_display(self, force: bool = False):
+        """
+        Push the visible window of the matching pyramid level to the artist.
+        
+        Args:
+            force: Update even if the level and window are unchanged
+                (the overlay itself changed)
+        """
+        if self._image_artist is None or self._pyramid is None:
+            return
+        
+        level, window, extent = self._pyramid.view(
+            self.ax.get_xlim(), self.ax.get_ylim(), self._axes_pixels()
+        )
+        if not force and (level, extent) == self._display_view:
+            return
+        
+        self._image_artist.set_data(window)
+        self._image_artist.set_extent(extent)
+        self._display_view = (level, extent)
+    
     def _on_key(self, event):
         """Handle keyboard events."""
         if event.key == 'enter' or event.key == ' ':
@@ -726,61 +1220,97 @@ class InteractiveMaskSelector:
             # M = Merge selected masks
             if len(self.selected_mask_ids) >= 2:
                 if hasattr(self.selector, 'merge_selected_masks') and hasattr(self, '_current_hole') and hasattr(self, '_current_feature_type'):
-                    merged = self.selector.merge_selected_masks(
+                    self._run_async(
+                        self._merge_job,
                         self.selected_mask_ids.copy(),
                         self._current_hole,
-                        self._current_feature_type
+                        self._current_feature_type,
+                        on_done=self._on_merge_done,
                     )
-                    if merged:
-                        # Clear old selections and select merged mask
-                        self.selected_mask_ids.clear()
-                        self.selected_mask_ids.append(merged.id)
-                        self._last_generated_mask_id = merged.id
-                        logger.info(f"Merged masks into: {merged.id}")
-                        self._redraw()
-                    else:
-                        logger.warning("Failed to merge masks")
                 else:
                     logger.warning("Merge not supported by this selector")
             else:
                 logger.info("Select at least 2 masks to merge (press M again after selecting)")
+        elif event.key == 't':
+            # T = Toggle live preview of slider changes
+            self._preview_enabled = not self._preview_enabled
+            if not self._preview_enabled:
+                self._discard_preview()
+            logger.info(f"Live preview {'on' if self._preview_enabled else 'off'}")
+        elif event.key == 'a':
+            # A = Apply the previewed mask
+            self._apply_preview()
+        elif event.key == 'n':
+            # N = Start a new superpixel region
+            if hasattr(self.selector, 'new_region'):
+                self.selector.new_region()
+                logger.info("Next click starts a new region")
+        elif event.key in ('z', 'ctrl+z'):
+            # Z = Undo the last mask operation
+            self._undo()
+        elif event.key in ('y', 'ctrl+y', 'ctrl+Z', 'ctrl+shift+z'):
+            # Y = Redo
+            self._undo(redo=True)
         elif event.key == 'escape':
-            # Escape = Undo last generated mask (for point-based) or clear selection
-            if hasattr(self.selector, 'click_to_mask') and self._last_generated_mask_id:
-                # Point-based mode: remove last generated mask
-                mask_id = self._last_generated_mask_id
-                
-                # Remove from selected masks
-                if mask_id in self.selected_mask_ids:
-                    self.selected_mask_ids.remove(mask_id)
-                
-                # Remove from generated_masks
-                if hasattr(self.selector, 'generated_masks') and mask_id in self.selector.generated_masks:
-                    del self.selector.generated_masks[mask_id]
-                
-                # Remove from selections
-                if hasattr(self.selector, 'selections'):
-                    for hole, selection in self.selector.selections.items():
-                        if hasattr(selection, 'greens') and mask_id in selection.greens:
-                            selection.greens.remove(mask_id)
-                        if hasattr(selection, 'tees') and mask_id in selection.tees:
-                            selection.tees.remove(mask_id)
-                        if hasattr(selection, 'fairways') and mask_id in selection.fairways:
-                            selection.fairways.remove(mask_id)
-                        if hasattr(selection, 'bunkers') and mask_id in selection.bunkers:
-                            selection.bunkers.remove(mask_id)
-                
-                # Clear last generated mask tracking
-                self._last_generated_mask_id = None
-                
-                # Update display
-                self._redraw()
-                logger.info(f"Undid last mask generation: {mask_id}")
+            # Escape = Discard a preview, else undo (for point-based) or
+            # clear selection
+            if self._preview is not None:
+                self._discard_preview()
+            elif hasattr(self.selector, 'undo'):
+                self._undo()
             else:
                 # Fallback: clear all selections
                 self.selected_mask_ids.clear()
                 self._redraw()
     
+    def _undo(self, redo: bool = False):
+        """Undo or redo a mask operation, after any queued ones."""
+        if not hasattr(self.selector, 'undo'):
+            logger.info("Undo not supported by this selector")
+            return
+        # A preview is relative to the mask as it is now
+        self._preview = None
+        self._run_async(self._history_job, redo, on_done=self._on_history_done)
+    
+    def _history_job(self, redo):
+        """Undo or redo on the selector (runs on the worker thread)."""
+        edit = self.selector.redo() if redo else self.selector.undo()
+        return edit, redo
+    
+    def _on_history_done(self, result):
+        """Follow an undo or redo in the selection (GUI thread)."""
+        edit, redo = result
+        if edit is None:
+            return
+        masks = self.selector.generated_masks
+        self.selected_mask_ids = [mask_id for mask_id in self.selected_mask_ids if mask_id in masks]
+        # Masks brought back are selected again
+        restored = edit.added if redo else edit.removed
+        for mask_id in restored:
+            if mask_id in masks and mask_id not in self.selected_mask_ids:
+                self.selected_mask_ids.append(mask_id)
+        if restored:
+            self._last_generated_mask_id = restored[-1]
+        elif self._last_generated_mask_id not in masks:
+            self._last_generated_mask_id = None
+    
+    def _merge_job(self, mask_ids, hole, feature_type):
+        """Merge masks (runs on the worker thread)."""
+        merged = self.selector.merge_selected_masks(mask_ids, hole, feature_type)
+        if merged:
+            self._last_generated_mask_id = merged.id
+            logger.info(f"Merged masks into: {merged.id}")
+        else:
+            logger.warning("Failed to merge masks")
+        return merged
+    
+    def _on_merge_done(self, merged):
+        """Select the merged mask (GUI thread)."""
+        if merged:
+            # Clear old selections and select merged mask
+            self.selected_mask_ids.clear()
+            self.selected_mask_ids.append(merged.id)
+    
     def _redraw(self):
         """Redraw the visualization with current selections."""
         if self.ax is None or self.fig is None:
@@ -796,7 +1326,22 @@ class InteractiveMaskSelector:
             # Original selector
             masks = list(self.selector.masks.values())
         
-        overlay = create_mask_overlay(image, masks, self.selected_mask_ids)
+        # Show a slider preview in place of the mask it would replace
+        if self._preview is not None:
+            if any(mask_data.id == self._preview.id for mask_data in masks):
+                masks = [self._preview if mask_data.id == self._preview.id else mask_data
+                         for mask_data in masks]
+            else:
+                self._preview = None  # The mask was removed or merged
+        
+        # Only the bounding boxes of changed masks are re-blended
+        if self._compositor is None or self._compositor.image is not image:
+            self._compositor = MaskOverlayCompositor(image)
+        overlay = self._compositor.update(masks, self.selected_mask_ids)
+        if self._pyramid is None or self._pyramid.source is not overlay:
+            self._pyramid = DisplayPyramid(overlay)
+        else:
+            self._pyramid.update(self._compositor.dirty)
         
         # Save current zoom/pan state before updating
         current_xlim = self.ax.get_xlim() if self.ax is not None else None
@@ -805,11 +1350,18 @@ class InteractiveMaskSelector:
         # Check if we have an existing image to update (more efficient than clearing)
         if hasattr(self, '_image_artist') and self._image_artist is not None:
             # Update existing image data instead of clearing and redrawing
-            self._image_artist.set_array(overlay)
+            self._update_display(force=True)
         else:
-            # First time - create image artist
+            # First time - create image artist showing the coarsest fitting level
             height, width = overlay.shape[:2]
-            self._image_artist = self.ax.imshow(overlay, extent=[0, width, height, 0], origin='upper')
+            level, window, extent = self._pyramid.view((0, width), (height, 0), self._axes_pixels())
+            self._image_artist = self.ax.imshow(window, extent=extent, origin='upper')
+            self._display_view = (level, extent)
+            
+            # Limits are driven by the user, not by the displayed window
+            self.ax.set_autoscale_on(False)
+            self.ax.callbacks.connect('xlim_changed', self._on_limits_changed)
+            self.ax.callbacks.connect('ylim_changed', self._on_limits_changed)
             self.ax.set_title(self.title, fontsize=14, pad=20)
             self.ax.axis('on')
             self.ax.set_facecolor('black')
@@ -832,29 +1384,6 @@ class InteractiveMaskSelector:
                 self.ax.set_xlim(current_xlim)
                 self.ax.set_ylim(current_ylim)
         
-        # Add mask ID labels at centroids
-        for i, mask_data in enumerate(masks):
-            y_coords, x_coords = np.where(mask_data.mask)
-            if len(y_coords) > 0:
-                centroid_x = int(x_coords.mean())
-                centroid_y = int(y_coords.mean())
-                # Get mask index - support both InteractiveSelector and PointBasedSelector
-                if hasattr(self.selector, '_mask_id_to_index'):
-                    mask_idx = self.selector._mask_id_to_index.get(mask_data.id, i)
-                else:
-                    # For PointBasedSelector, use index in generated_masks
-                    mask_idx = i
-                is_selected = mask_data.id in self.selected_mask_ids
-                color = 'lime' if is_selected else 'white'
-                weight = 'bold' if is_selected else 'normal'
-                # Only add text labels if we're doing a full redraw (not just updating image)
-                if not hasattr(self, '_text_artists'):
-                    self._text_artists = []
-                
-                # For now, skip text labels on updates to avoid blinking
-                # We can add them back if needed, but they cause redraw issues
-                pass
-        
         # Update the instructions panel on the left
         self._update_instructions()
         
@@ -943,6 +1472,11 @@ class InteractiveMaskSelector:
         except AttributeError:
             pass  # Focus handling not critical for tests
         
+        # Poll the background worker for finished masks on the GUI thread
+        self._worker_timer = self.fig.canvas.new_timer(interval=50)
+        self._worker_timer.add_callback(self._poll_worker)
+        self._worker_timer.start()
+        
         # Initial display - this will show the image with masks
         self._redraw()
         
@@ -0,0 +1,196 @@
+"""
+Background Worker Module
+
+Runs slow mask operations (SAM decodes, region growing, polygon fills)
+off the GUI thread so the interactive window stays responsive.
+
+Jobs run one at a time, in submission order, on a single daemon thread,
+so operations that mutate a selector never race each other. Results are
+handed back to the GUI thread through poll(), which the selector calls
+from a matplotlib timer.
+"""
+
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A submitted unit of work and, once run, its outcome."""
+    
+    def __init__(
+        self,
+        fn: Callable[..., Any],
+        args: tuple,
+        kwargs: dict,
+        key: Optional[str],
+        on_done: Optional[Callable[[Any], None]],
+        on_error: Optional[Callable[[BaseException], None]],
+    ):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.on_done = on_done
+        self.on_error = on_error
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self.finished = threading.Event()
+
+
+class MaskWorker:
+    """
+    Single background thread with a coalescing job queue.
+    
+    Jobs submitted with a ``key`` supersede earlier jobs with the same key:
+    a queued one is dropped, and a running one is marked cancelled so its
+    result is discarded. Use keys only for side-effect free work such as
+    previews; unkeyed jobs always run and always report.
+    """
+    
+    def __init__(self, name: str = "mask-worker"):
+        """
+        Initialize the worker (the thread starts on first submit).
+        
+        Args:
+            name: Thread name
+        """
+        self.name = name
+        self._queue: Deque[Job] = deque()
+        self._done: Deque[Job] = deque()
+        self._latest: Dict[str, Job] = {}
+        self._running: Optional[Job] = None
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+    
+    @property
+    def busy(self) -> bool:
+        """True while jobs are queued or running."""
+        with self._condition:
+            return self._running is not None or bool(self._queue)
+    
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running."""
+        with self._condition:
+            return len(self._queue) + (self._running is not None)
+    
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        key: Optional[str] = None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        **kwargs,
+    ) -> Job:
+        """
+        Queue ``fn(*args, **kwargs)`` for the worker thread.
+        
+        Args:
+            fn: Function to run
+            key: Coalescing key; supersedes earlier jobs with the same key
+            on_done: Called with the result on the polling thread
+            on_error: Called with the exception on the polling thread
+                (default: log it)
+        
+        Returns:
+            The queued Job
+        """
+        job = Job(fn, args, kwargs, key, on_done, on_error)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("MaskWorker is closed")
+            if key is not None:
+                previous = self._latest.get(key)
+                if previous is not None:
+                    previous.cancelled = True
+                    if previous in self._queue:
+                        self._queue.remove(previous)
+                        previous.finished.set()
+                self._latest[key] = job
+            self._queue.append(job)
+            self._ensure_thread()
+            self._condition.notify()
+        return job
+    
+    def poll(self) -> int:
+        """
+        Deliver finished jobs' callbacks on the calling (GUI) thread.
+        
+        Returns:
+            Number of jobs delivered (cancelled jobs are not counted)
+        """
+        delivered = 0
+        while True:
+            with self._condition:
+                if not self._done:
+                    return delivered
+                job = self._done.popleft()
+            if job.cancelled:
+                continue
+            
+            delivered += 1
+            if job.error is not None:
+                if job.on_error is not None:
+                    job.on_error(job.error)
+                else:
+                    logger.error(f"Background job {job.fn.__name__} failed: {job.error}",
+                                 exc_info=job.error)
+            elif job.on_done is not None:
+                job.on_done(job.result)
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all submitted jobs have run.
+        
+        Returns:
+            False if the timeout expired first
+        """
+        with self._condition:
+            jobs: List[Job] = list(self._queue)
+            if self._running is not None:
+                jobs.append(self._running)
+        return all(job.finished.wait(timeout) for job in jobs)
+    
+    def close(self) -> None:
+        """Drop queued jobs and stop the thread after the running job."""
+        with self._condition:
+            self._closed = True
+            for job in self._queue:
+                job.cancelled = True
+                job.finished.set()
+            self._queue.clear()
+            self._condition.notify()
+    
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                job = self._queue.popleft()
+                self._running = job
+            
+            try:
+                job.result = job.fn(*job.args, **job.kwargs)
+            except Exception as e:
+                job.error = e
+            
+            with self._condition:
+                self._running = None
+                if job.key is not None and self._latest.get(job.key) is job:
+                    del self._latest[job.key]
+                self._done.append(job)
+            job.finished.set()
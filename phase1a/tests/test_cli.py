@@ -0,0 +1,161 @@
+"""
+Tests for the command line interface.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from phase1a.cli import cli
+
+# Directory containing the phase1a package
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules that light commands (--help, info, init-config) must not import
+HEAVY_MODULES = [
+    "numpy",
+    "PIL",
+    "yaml",
+    "shapely",
+    "cv2",
+    "torch",
+    "matplotlib",
+    "phase1a.client",
+    "phase1a.pipeline.masks",
+]
+
+# Cumulative import time of phase1a.cli reported by -X importtime
+# (about 350 ms when it eagerly imported the client and pipeline)
+IMPORT_BUDGET_MS = 250
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    """Run a fresh interpreter with phase1a importable."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")])
+    )
+    return subprocess.run(
+        [sys.executable, *args],
+        capture_output=True,
+        text=True,
+        cwd=PROJECT_ROOT,
+        env=env,
+        check=True,
+    )
+
+
+class TestStartup:
+    """Tests for CLI startup cost."""
+
+    @pytest.mark.parametrize("command", [["--help"], ["info"]])
+    def test_light_commands_skip_heavy_imports(self, command):
+        """--help and info should not import numpy, the client or SAM."""
+        code = (
+            "import sys\n"
+            "from phase1a.cli import cli\n"
+            "try:\n"
+            f"    cli({command!r})\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+        )
+        result = run_python("-c", code)
+
+        assert result.stdout.splitlines()[-1] == "loaded:"
+
+    def test_import_time_budget(self):
+        """Importing the CLI for phase1a --help should stay within budget."""
+        result = run_python("-X", "importtime", "-c", "import phase1a.cli")
+
+        # Lines look like "import time: self | cumulative | name"
+        cumulative = {
+            line.split("|")[2].strip(): int(line.split("|")[1])
+            for line in result.stderr.splitlines()
+            if line.startswith("import time:") and line.count("|") == 2
+            and line.split("|")[1].strip().isdigit()
+        }
+
+        assert cumulative["phase1a.cli"] / 1000 < IMPORT_BUDGET_MS
+
+
+class TestLazyImports:
+    """Tests for lazy package attributes."""
+
+    def test_pipeline_attributes(self):
+        """Pipeline classes should resolve from their submodules."""
+        import phase1a.pipeline as pipeline
+        from phase1a.pipeline.classify import MaskClassifier
+
+        assert pipeline.MaskClassifier is MaskClassifier
+        assert "SVGGenerator" in dir(pipeline)
+
+    def test_pipeline_unknown_attribute(self):
+        """Unknown names should raise AttributeError."""
+        import phase1a.pipeline as pipeline
+
+        with pytest.raises(AttributeError):
+            pipeline.NotAStage
+
+    def test_package_attributes(self):
+        """Phase1AClient and Phase1AConfig should load on access."""
+        import phase1a
+        from phase1a.config import Phase1AConfig
+
+        assert phase1a.Phase1AConfig is Phase1AConfig
+        assert phase1a.Phase1AClient.__name__ == "Phase1AClient"
+
+
+class TestCommands:
+    """Tests for light CLI commands."""
+
+    def test_info(self):
+        """info should print the pipeline stages."""
+        result = CliRunner().invoke(cli, ["info"])
+
+        assert result.exit_code == 0
+        assert "Pipeline Stages" in result.output
+
+    def test_init_config(self, temp_dir):
+        """init-config should write a loadable config file."""
+        from phase1a.config import Phase1AConfig
+
+        output = temp_dir / "config.yaml"
+        result = CliRunner().invoke(cli, ["init-config", "-o", str(output)])
+
+        assert result.exit_code == 0
+        assert Phase1AConfig.from_yaml(output).to_dict() == Phase1AConfig().to_dict()
+
+    def test_export_png_batch_size(self, temp_dir, monkeypatch):
+        """-w/-h should size every render of a batch."""
+        from phase1a.pipeline import export
+
+        rendered = []
+        monkeypatch.setattr(
+            export, "export_svgs_to_png", lambda jobs, **kwargs: rendered.extend(jobs) or []
+        )
+        svgs = [temp_dir / "a.svg", temp_dir / "b.svg"]
+        for svg in svgs:
+            svg.write_text("<svg/>")
+
+        result = CliRunner().invoke(
+            cli, ["export-png", *map(str, svgs), "-w", "512", "-h", "256"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert [(job.width, job.height) for job in rendered] == [(512, 256), (512, 256)]
+        assert [job.output_path.name for job in rendered] == ["a_512.png", "b_512.png"]
+
+    def test_export_png_size_conflict(self, temp_dir):
+        """-w/-h together with --size should be a usage error."""
+        svg = temp_dir / "a.svg"
+        svg.write_text("<svg/>")
+
+        result = CliRunner().invoke(cli, ["export-png", str(svg), "-s", "256", "-w", "512"])
+
+        assert result.exit_code == 2
+        assert "cannot be combined with --size" in result.output
@@ -225,6 +225,29 @@ class TestPhase1AClientIntegration:
         
         assert len(loaded) == len(mock_mask_data)
     
+    def test_load_masks_two_formats(self, temp_dir, mock_mask_data):
+        """Masks saved as JSON and later as msgpack should load once, from msgpack."""
+        import dataclasses
+        import os
+        from phase1a.pipeline import serialization
+        from phase1a.pipeline.masks import MaskGenerator
+        
+        if serialization.msgspec is None:
+            pytest.skip("msgspec not installed")
+        
+        masks_dir = temp_dir / "masks"
+        generator = MaskGenerator()
+        generator.save_masks(mock_mask_data, masks_dir, format="json")
+        for path in masks_dir.glob("*.json"):
+            os.utime(path, ns=(0, 0))
+        updated = [dataclasses.replace(mask, area=mask.area + 1) for mask in mock_mask_data]
+        generator.save_masks(updated, masks_dir, format="msgpack")
+        
+        loaded = MaskGenerator.load_masks(masks_dir)
+        
+        assert sorted(mask.id for mask in loaded) == sorted(mask.id for mask in mock_mask_data)
+        assert {mask.id: mask.area for mask in loaded} == {mask.id: mask.area for mask in updated}
+    
     def test_load_features(self, temp_dir, mock_features):
         """Test loading features from a previous run."""
         from phase1a.pipeline.features import FeatureExtractor
@@ -14,6 +14,7 @@ from phase1a.config import (
     SAMConfig,
     PolygonConfig,
     SVGConfig,
+    ExportConfig,
 )
 
 
@@ -83,6 +84,24 @@ class TestSVGConfig:
             assert len(color) == 7
 
 
+class TestExportConfig:
+    """Tests for ExportConfig."""
+    
+    def test_default_backend(self):
+        assert ExportConfig().backend == "cairosvg"
+    
+    def test_round_trip(self):
+        config = Phase1AConfig(export=ExportConfig(backend="raster", tile_layout="dzi"))
+        data = config.to_dict()
+        
+        assert data["export"]["backend"] == "raster"
+        assert data["export"]["tile_layout"] == "dzi"
+        restored = Phase1AConfig._from_dict(data).export
+        assert restored.backend == "raster"
+        assert restored.tile_layout == "dzi"
+        assert restored.tile_size == 256
+
+
 class TestPhase1AConfig:
     """Tests for main Phase1AConfig."""
     
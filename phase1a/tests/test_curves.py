@@ -0,0 +1,129 @@
+"""
+Tests for Bezier curve fitting module.
+"""
+
+import cv2
+import numpy as np
+import pytest
+import shapely
+from shapely.geometry import LineString, Point, Polygon
+
+from phase1a.pipeline.curves import fit_ring, fit_rings, _evaluate
+from phase1a.pipeline.svg import SVGGenerator
+
+
+def curve_line(segments, samples=50):
+    """Sample a chain of Bezier segments as a LineString."""
+    u = np.linspace(0, 1, samples)
+    return LineString(np.vstack([_evaluate(s, u) for s in segments]))
+
+
+@pytest.fixture
+def blob_ring():
+    """A smooth, irregular closed ring."""
+    t = np.linspace(0, 2 * np.pi, 400, endpoint=False)
+    r = 200 + 30 * np.sin(3 * t) + 10 * np.cos(7 * t)
+    polygon = Polygon(np.c_[1000 + r * np.cos(t), 1000 + r * np.sin(t)])
+    return shapely.get_coordinates(polygon.exterior)
+
+
+@pytest.fixture
+def traced_polygon():
+    """A green-like mask traced by cv2 and simplified as the pipeline does."""
+    t = np.linspace(0, 2 * np.pi, 720, endpoint=False)
+    r = 90 + 12 * np.sin(2 * t + 0.3) + 6 * np.cos(3 * t)
+    outline = np.c_[150 + 1.3 * r * np.cos(t), 150 + r * np.sin(t)]
+    mask = np.zeros((300, 300), dtype=np.uint8)
+    cv2.fillPoly(mask, [np.round(outline).astype(np.int32)], 1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE)
+    return Polygon(contours[0][:, 0, :]).simplify(1.0)
+
+
+class TestFitRing:
+    """Tests for fit_ring function."""
+    
+    def test_segments_shape(self, blob_ring):
+        segments = fit_ring(blob_ring, tolerance=1.0)
+        
+        assert segments.ndim == 3
+        assert segments.shape[1:] == (4, 2)
+    
+    def test_far_fewer_nodes_than_vertices(self, blob_ring):
+        segments = fit_ring(blob_ring, tolerance=1.0)
+        
+        assert len(segments) < len(blob_ring) / 10
+    
+    def test_within_tolerance(self, blob_ring):
+        segments = fit_ring(blob_ring, tolerance=1.0)
+        
+        line = curve_line(segments)
+        
+        assert line.hausdorff_distance(LineString(blob_ring)) < 1.0
+    
+    def test_chain_is_closed_and_continuous(self, blob_ring):
+        segments = fit_ring(blob_ring, tolerance=1.0)
+        
+        np.testing.assert_allclose(segments[1:, 0], segments[:-1, 3])
+        np.testing.assert_allclose(segments[0, 0], segments[-1, 3])
+    
+    def test_corners_are_preserved(self):
+        square = np.array([(0, 0), (100, 0), (100, 100), (0, 100), (0, 0)], float)
+        
+        segments = fit_ring(square, tolerance=0.5)
+        line = curve_line(segments)
+        
+        assert line.hausdorff_distance(LineString(square)) < 0.5
+        for corner in square[:-1]:
+            assert Point(corner).distance(line) < 1e-9
+    
+    def test_too_short_ring(self):
+        assert fit_ring(np.array([(0, 0), (1, 0), (0, 0)], float), 1.0) is None
+    
+    def test_duplicate_points_ignored(self, blob_ring):
+        doubled = np.repeat(blob_ring, 2, axis=0)
+        
+        segments = fit_ring(doubled, tolerance=1.0)
+        
+        assert np.all(np.isfinite(segments))
+
+
+class TestFitRings:
+    """Tests for batched fitting."""
+    
+    def test_fit_rings_batch(self, blob_ring):
+        square = np.array([(0, 0), (10, 0), (10, 10), (0, 10), (0, 0)], float)
+        tiny = np.array([(0, 0), (1, 0), (0, 0)], float)
+        
+        results = fit_rings([blob_ring, square, tiny], tolerance=1.0)
+        
+        assert len(results) == 3
+        assert results[0] is not None
+        assert results[1] is not None
+        assert results[2] is None
+
+
+class TestTracedContour:
+    """Regression tests on a simplified, pixel-traced mask contour."""
+    
+    def test_fewer_nodes_than_vertices(self, traced_polygon):
+        coords = shapely.get_coordinates(traced_polygon.exterior)
+        
+        for tolerance in (1.0, 2.0):
+            segments = fit_ring(coords, tolerance)
+            assert len(segments) < len(coords) / 3
+            assert curve_line(segments).hausdorff_distance(LineString(coords)) < tolerance + 1.0
+    
+    def test_smaller_than_lines(self, traced_polygon):
+        lines = SVGGenerator()._polygon_to_path(traced_polygon)
+        
+        for tolerance in (1.0, 2.0):
+            curves = SVGGenerator(curve_tolerance=tolerance)._polygon_to_path(traced_polygon)
+            assert " c " in curves
+            assert len(curves) < len(lines)
+    
+    def test_never_larger_than_lines(self, traced_polygon):
+        lines = SVGGenerator()._polygon_to_path(traced_polygon)
+        
+        for tolerance in (0.1, 0.5):
+            curves = SVGGenerator(curve_tolerance=tolerance)._polygon_to_path(traced_polygon)
+            assert len(curves) <= len(lines)
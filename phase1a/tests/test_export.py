@@ -7,7 +7,15 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
-from phase1a.pipeline.export import PNGExporter, export_svg_to_png
+from phase1a.pipeline.export import (
+    PNGExporter,
+    RasterExporter,
+    TiledExporter,
+    ExportJob,
+    batch_jobs,
+    export_svg_to_png,
+    export_svgs_to_png,
+)
 
 
 def _cairosvg_available():
@@ -124,6 +132,308 @@ class TestPNGExporter:
         assert output_path.parent.exists()
 
 
+class TestPNGExporterStreaming:
+    """Tests for streaming SVG into the PNG exporter."""
+    
+    def test_export_from_generator_streams_bytes(self, temp_dir):
+        import sys
+        from shapely.geometry import Polygon
+        from phase1a.pipeline.svg import SVGGenerator
+        from phase1a.pipeline.holes import HoleAssignment
+        from phase1a.pipeline.polygons import PolygonFeature
+        
+        assignments = {
+            1: [HoleAssignment(
+                polygon=PolygonFeature(
+                    id="green_1",
+                    feature_class="green",
+                    confidence=0.9,
+                    geometry=Polygon([(10, 10), (50, 10), (50, 50)]),
+                    properties={},
+                ),
+                hole=1,
+            )],
+        }
+        generator = SVGGenerator(width=64, height=64)
+        received = {}
+        
+        def fake_svg2png(**kwargs):
+            received["svg"] = kwargs["file_obj"].read()
+            received["write_to"] = kwargs["write_to"]
+        
+        fake_cairosvg = MagicMock(svg2png=fake_svg2png)
+        output_path = temp_dir / "overlay.png"
+        
+        with patch.dict(sys.modules, {"cairosvg": fake_cairosvg}):
+            PNGExporter().export_from_generator(generator, assignments, output_path)
+        
+        assert received["svg"] == generator.generate(assignments).encode("utf-8")
+        assert received["write_to"] == str(output_path)
+
+
+def _assignment(feature_class, geometry, hole=1):
+    from phase1a.pipeline.holes import HoleAssignment
+    from phase1a.pipeline.polygons import PolygonFeature
+    
+    return HoleAssignment(
+        polygon=PolygonFeature(
+            id=f"{feature_class}_{hole}",
+            feature_class=feature_class,
+            confidence=0.9,
+            geometry=geometry,
+            properties={},
+        ),
+        hole=hole,
+    )
+
+
+class TestRasterExporter:
+    """Tests for direct geometry rasterization."""
+    
+    COLORS = {"green": "#bce5a4", "water": "#0000c0", "ignore": "#cccccc"}
+    
+    def test_fills_polygon_with_color_and_opacity(self):
+        from shapely.geometry import box
+        
+        exporter = RasterExporter(64, 64, self.COLORS, opacity=0.5)
+        image = exporter.render({1: [_assignment("green", box(10, 10, 40, 40))]})
+        
+        assert image.shape == (64, 64, 4)
+        assert tuple(image[25, 25]) == (0xbc, 0xe5, 0xa4, 128)
+        assert image[5, 5, 3] == 0
+        assert image[45, 45, 3] == 0
+    
+    def test_interior_rings_are_not_filled(self):
+        from shapely.geometry import Polygon
+        
+        donut = Polygon(
+            [(0, 0), (60, 0), (60, 60), (0, 60)],
+            [[(20, 20), (40, 20), (40, 40), (20, 40)]],
+        )
+        exporter = RasterExporter(64, 64, self.COLORS, opacity=1.0)
+        image = exporter.render({1: [_assignment("water", donut)]})
+        
+        assert image[10, 10, 3] == 255
+        assert image[30, 30, 3] == 0
+    
+    def test_layers_follow_svg_hole_order(self):
+        from shapely.geometry import box
+        
+        # Hole 99 is drawn first, so hole 1 ends up on top
+        assignments = {
+            1: [_assignment("green", box(0, 0, 32, 32), hole=1)],
+            99: [_assignment("water", box(0, 0, 32, 32), hole=99)],
+        }
+        exporter = RasterExporter(32, 32, self.COLORS, opacity=1.0)
+        image = exporter.render(assignments)
+        
+        assert tuple(image[16, 16, :3]) == (0xbc, 0xe5, 0xa4)
+    
+    def test_overlapping_paths_blend(self):
+        from shapely.geometry import box
+        
+        geometry = box(0, 0, 32, 32)
+        exporter = RasterExporter(32, 32, self.COLORS, opacity=0.5)
+        image = exporter.render({1: [
+            _assignment("green", geometry),
+            _assignment("green", geometry),
+        ]})
+        
+        # 1 - (1 - 0.5)^2 = 0.75
+        assert image[16, 16, 3] == round(0.75 * 255)
+    
+    def test_output_size_scales_geometry(self):
+        from shapely.geometry import box
+        
+        exporter = RasterExporter(
+            64, 64, self.COLORS, opacity=1.0, output_width=128, output_height=128,
+        )
+        image = exporter.render({1: [_assignment("green", box(0, 0, 32, 32))]})
+        
+        assert image.shape == (128, 128, 4)
+        assert image[60, 60, 3] == 255
+        assert image[70, 70, 3] == 0
+    
+    def test_background_color(self):
+        exporter = RasterExporter(16, 16, self.COLORS, background_color="#ffffff")
+        image = exporter.render({})
+        
+        assert (image == 255).all()
+    
+    def test_export_writes_png(self, temp_dir):
+        from PIL import Image
+        from shapely.geometry import box
+        from phase1a.pipeline.svg import SVGGenerator
+        
+        generator = SVGGenerator(width=64, height=48)
+        exporter = RasterExporter.from_generator(generator)
+        output_path = temp_dir / "nested" / "overlay.png"
+        
+        exporter.export({1: [_assignment("green", box(8, 8, 24, 24))]}, output_path)
+        
+        img = Image.open(output_path)
+        assert img.format == "PNG"
+        assert img.mode == "RGBA"
+        assert img.size == (64, 48)
+    
+    @pytest.mark.slow
+    @pytest.mark.skipif(
+        not _cairosvg_available(),
+        reason="cairosvg not installed"
+    )
+    def test_matches_cairosvg(self, temp_dir):
+        """Benchmark against cairosvg and check the visual difference."""
+        import time
+        import numpy as np
+        from PIL import Image
+        from shapely.geometry import Point
+        from phase1a.pipeline.svg import SVGGenerator
+        
+        rng = np.random.default_rng(0)
+        classes = ["green", "bunker", "fairway", "water", "rough"]
+        assignments = {
+            hole: [
+                _assignment(
+                    classes[i % len(classes)],
+                    Point(*rng.uniform(0, 1024, 2)).buffer(rng.uniform(5, 60)),
+                    hole=hole,
+                )
+                for i in range(20)
+            ]
+            for hole in range(1, 19)
+        }
+        generator = SVGGenerator(width=1024, height=1024)
+        svg_path = temp_dir / "course.svg"
+        generator.save(assignments, svg_path)
+        
+        start = time.perf_counter()
+        PNGExporter().export(svg_path, temp_dir / "cairo.png")
+        cairo_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        RasterExporter.from_generator(generator).export(assignments, temp_dir / "raster.png")
+        raster_seconds = time.perf_counter() - start
+        
+        print(f"cairosvg: {cairo_seconds:.3f}s, raster: {raster_seconds:.3f}s")
+        
+        cairo = np.asarray(Image.open(temp_dir / "cairo.png").convert("RGBA"), dtype=float)
+        raster = np.asarray(Image.open(temp_dir / "raster.png").convert("RGBA"), dtype=float)
+        
+        # Differences are limited to anti-aliased edge pixels
+        alpha_diff = np.abs(cairo[..., 3] - raster[..., 3])
+        assert alpha_diff.mean() < 1.0
+        assert (alpha_diff > 16).mean() < 0.01
+
+
+class TestTiledExporter:
+    """Tests for tile pyramid export."""
+    
+    COLORS = {"green": "#bce5a4", "water": "#0000c0", "ignore": "#cccccc"}
+    
+    @pytest.fixture
+    def assignments(self):
+        from shapely.geometry import Point
+        
+        return {
+            1: [_assignment("green", Point(40, 30).buffer(25))],
+            2: [_assignment("water", Point(70, 50).buffer(20), hole=2)],
+        }
+    
+    def test_region_render_matches_full_render(self, assignments):
+        exporter = RasterExporter(100, 80, self.COLORS)
+        full = exporter.render(assignments)
+        
+        for x, y, w, h in [(0, 0, 32, 32), (32, 32, 32, 32), (13, 27, 50, 40)]:
+            tile = exporter.render(assignments, region=(x, y, w, h))
+            assert (tile == full[y:y + h, x:x + w]).all()
+    
+    def test_xyz_pyramid(self, assignments, temp_dir):
+        import json
+        import numpy as np
+        from PIL import Image
+        
+        exporter = RasterExporter(100, 80, self.COLORS)
+        tiled = TiledExporter(exporter, tile_size=32, layout="xyz", max_workers=1)
+        
+        root = tiled.export(assignments, temp_dir / "tiles")
+        
+        meta = json.loads((root / "tiles.json").read_text())
+        assert meta["max_zoom"] == 2
+        assert meta["width"] == 100
+        
+        # Finest level stitches back into the full render
+        full = exporter.render(assignments)
+        stitched = np.zeros((96, 128, 4), dtype=np.uint8)
+        for x in range(4):
+            for y in range(3):
+                tile = Image.open(root / "2" / str(x) / f"{y}.png")
+                assert tile.size == (32, 32)
+                stitched[y * 32:(y + 1) * 32, x * 32:(x + 1) * 32] = np.asarray(tile)
+        assert (stitched[:80, :100] == full).all()
+        assert (stitched[80:] == 0).all()
+        
+        # Zoom 0 is the whole overlay in one padded tile
+        assert not (root / "0" / "1").exists()
+        top = np.asarray(Image.open(root / "0" / "0" / "0.png"))
+        assert top.shape == (32, 32, 4)
+        assert top[..., 3].any()
+    
+    def test_dzi_pyramid(self, assignments, temp_dir):
+        from PIL import Image
+        
+        exporter = RasterExporter(100, 80, self.COLORS)
+        tiled = TiledExporter(exporter, tile_size=64, layout="dzi", max_workers=1)
+        
+        dzi_path = tiled.export(assignments, temp_dir / "tiles", name="course")
+        
+        assert dzi_path == temp_dir / "tiles" / "course.dzi"
+        assert 'TileSize="64"' in dzi_path.read_text()
+        assert 'Width="100" Height="80"' in dzi_path.read_text()
+        
+        files = temp_dir / "tiles" / "course_files"
+        # ceil(log2(100)) = 7 is full resolution, down to 1x1 at level 0
+        assert sorted(int(p.name) for p in files.iterdir()) == list(range(8))
+        assert Image.open(files / "7" / "1_1.png").size == (36, 16)
+        assert Image.open(files / "6" / "0_0.png").size == (50, 40)
+        assert Image.open(files / "0" / "0_0.png").size == (1, 1)
+    
+    def test_downsampled_level_averages_children(self, temp_dir):
+        import numpy as np
+        from PIL import Image
+        from shapely.geometry import box
+        
+        exporter = RasterExporter(64, 64, self.COLORS, opacity=1.0)
+        tiled = TiledExporter(exporter, tile_size=32, layout="xyz", max_workers=1)
+        
+        # Left half opaque, right half transparent
+        root = tiled.export({1: [_assignment("green", box(0, 0, 32, 64))]}, temp_dir)
+        
+        top = np.asarray(Image.open(root / "0" / "0" / "0.png"))
+        assert tuple(top[10, 5]) == (0xbc, 0xe5, 0xa4, 255)
+        assert top[10, 25, 3] == 0
+    
+    def test_parallel_matches_serial(self, assignments, temp_dir):
+        exporter = RasterExporter(100, 80, self.COLORS)
+        
+        serial = TiledExporter(exporter, tile_size=32, max_workers=1)
+        parallel = TiledExporter(exporter, tile_size=32, max_workers=2)
+        serial.export(assignments, temp_dir / "serial")
+        parallel.export(assignments, temp_dir / "parallel")
+        
+        tiles = sorted(p.relative_to(temp_dir / "serial")
+                       for p in (temp_dir / "serial").rglob("*.png"))
+        assert len(tiles) == 12 + 4 + 1
+        for tile in tiles:
+            assert (temp_dir / "serial" / tile).read_bytes() == \
+                (temp_dir / "parallel" / tile).read_bytes()
+    
+    def test_invalid_layout(self):
+        exporter = RasterExporter(10, 10, self.COLORS)
+        
+        with pytest.raises(ValueError):
+            TiledExporter(exporter, layout="tms")
+
+
 class TestExportConvenienceFunction:
     """Tests for export_svg_to_png convenience function."""
     
@@ -152,6 +462,66 @@ class TestExportConvenienceFunction:
         assert img.size == (128, 128)
 
 
+class TestBatchExport:
+    """Tests for parallel batch export."""
+    
+    def test_batch_jobs_names_outputs_by_size(self, temp_dir):
+        jobs = batch_jobs(
+            [Path("a/course.svg"), Path("b/other.svg")],
+            output_dir=temp_dir,
+            widths=[256, None],
+        )
+        
+        assert [job.output_path.name for job in jobs] == [
+            "course_256.png", "course.png", "other_256.png", "other.png",
+        ]
+        assert jobs[0].width == 256
+        assert jobs[1].width is None
+    
+    def test_batch_jobs_default_next_to_svg(self):
+        jobs = batch_jobs([Path("a/course.svg")])
+        
+        assert jobs[0].output_path == Path("a/course.png")
+    
+    def test_serial_batch_times_each_job(self, temp_dir):
+        jobs = batch_jobs([Path("x.svg"), Path("y.svg")], temp_dir)
+        seen = []
+        
+        with patch("phase1a.pipeline.export.export_svg_to_png") as mock_export:
+            results = export_svgs_to_png(jobs, max_workers=1, on_result=seen.append)
+        
+        assert mock_export.call_count == 2
+        assert [r.job for r in results] == jobs
+        assert all(r.ok and r.seconds >= 0 for r in results)
+        assert len(seen) == 2
+    
+    def test_failures_are_reported_not_raised(self, temp_dir):
+        jobs = [
+            ExportJob(temp_dir / f"missing_{i}.svg", temp_dir / f"out_{i}.png")
+            for i in range(5)
+        ]
+        
+        # Generator input with a small in-flight bound
+        results = export_svgs_to_png(iter(jobs), max_workers=2, max_pending=2)
+        
+        assert [r.job.svg_path for r in results] == [job.svg_path for job in jobs]
+        assert all(not r.ok for r in results)
+    
+    @pytest.mark.skipif(
+        not _cairosvg_available(),
+        reason="cairosvg not installed"
+    )
+    def test_parallel_batch_renders_sizes(self, sample_svg_file, temp_dir):
+        from PIL import Image
+        
+        jobs = batch_jobs([sample_svg_file], temp_dir / "out", widths=[64, None])
+        results = export_svgs_to_png(jobs, max_workers=2)
+        
+        assert all(r.ok for r in results)
+        assert Image.open(temp_dir / "out" / "test_64.png").size == (64, 64)
+        assert Image.open(temp_dir / "out" / "test.png").size == (256, 256)
+
+
 class TestPNGExporterEdgeCases:
     """Edge case tests for PNG export."""
     
@@ -0,0 +1,152 @@
+"""
+Tests for the undo/redo edit history.
+"""
+
+import numpy as np
+
+from phase1a.pipeline.history import Edit, EditHistory, MaskChange, PackedMask
+from phase1a.pipeline.masks import MaskData, mask_moments
+
+
+def make_mask(mask_id, y0, y1, x0, x1, shape=(100, 120)):
+    mask = np.zeros(shape, dtype=bool)
+    mask[y0:y1, x0:x1] = True
+    return MaskData(mask_id, mask, int(mask.sum()), (x0, y0, x1 - x0, y1 - y0), 0.9, 0.95)
+
+
+class TestPackedMask:
+    """Tests for PackedMask."""
+
+    def test_round_trip(self):
+        """Packing should crop to the mask and unpack to the same mask."""
+        mask = make_mask("a", 10, 30, 20, 45).mask
+        mask[12, 50] = True
+
+        packed = PackedMask.pack(mask)
+
+        assert packed.box == (10, 30, 20, 51)
+        assert packed.nbytes == (20 * 31 + 7) // 8
+        np.testing.assert_array_equal(packed.unpack(), mask)
+
+    def test_empty(self):
+        """An empty mask should pack to nothing."""
+        packed = PackedMask.pack(np.zeros((50, 50), dtype=bool))
+
+        assert packed.nbytes == 0
+        assert not packed.unpack().any()
+
+    def test_xor(self):
+        """xor() should flip the packed pixels in a copy."""
+        old = make_mask("a", 10, 30, 10, 30).mask
+        new = make_mask("a", 10, 30, 10, 40).mask
+
+        delta = PackedMask.pack(old ^ new)
+
+        np.testing.assert_array_equal(delta.xor(old), new)
+        np.testing.assert_array_equal(delta.xor(new), old)
+        assert delta.box == (10, 30, 30, 40)
+
+
+class TestMaskChange:
+    """Tests for MaskChange."""
+
+    def test_add_and_remove(self):
+        """Additions and removals should apply in both directions."""
+        mask_data = make_mask("a", 5, 15, 5, 15)
+        masks = {}
+        change = MaskChange.between(None, mask_data)
+
+        change.apply(masks, forward=True)
+        np.testing.assert_array_equal(masks["a"].mask, mask_data.mask)
+        assert masks["a"].area == mask_data.area
+        assert masks["a"].bbox == mask_data.bbox
+
+        change.apply(masks, forward=False)
+        assert masks == {}
+
+    def test_edit(self):
+        """An edit should store only the changed pixels."""
+        old = make_mask("a", 0, 100, 0, 100)
+        new = make_mask("a", 0, 100, 0, 102)
+        masks = {"a": new}
+        change = MaskChange.between(old, new)
+
+        assert change.pixels.box == (0, 100, 100, 102)
+
+        change.apply(masks, forward=False)
+        np.testing.assert_array_equal(masks["a"].mask, old.mask)
+        assert masks["a"].area == old.area
+        change.apply(masks, forward=True)
+        np.testing.assert_array_equal(masks["a"].mask, new.mask)
+
+
+class TestEditHistory:
+    """Tests for EditHistory."""
+
+    def edit(self, label, size=10):
+        return Edit(label, [MaskChange.between(None, make_mask(label, 0, size, 0, size))])
+
+    def test_undo_redo(self):
+        """Edits should move between the undo and redo stacks."""
+        history = EditHistory()
+        history.record(self.edit("a"))
+        history.record(self.edit("b"))
+
+        assert history.pop_undo().label == "b"
+        assert history.can_redo
+        assert history.pop_redo().label == "b"
+        assert history.pop_redo() is None
+
+        history.pop_undo()
+        history.record(self.edit("c"))
+        assert not history.can_redo
+        assert [history.pop_undo().label, history.pop_undo().label] == ["c", "a"]
+        assert history.pop_undo() is None
+
+    def test_memory_cap(self):
+        """The oldest edits should be dropped past the cap, never the newest."""
+        edit_bytes = self.edit("x", 40).nbytes
+        history = EditHistory(max_bytes=3 * edit_bytes)
+
+        for label in "abcde":
+            history.record(self.edit(label, 40))
+
+        assert len(history) == 3
+        assert history.nbytes == 3 * edit_bytes
+        assert history.pop_undo().label == "e"
+
+        history = EditHistory(max_bytes=1)
+        history.record(self.edit("big"))
+        assert len(history) == 1
+
+    def test_disabled(self):
+        """A zero cap should record nothing."""
+        history = EditHistory(max_bytes=0)
+        history.record(self.edit("a"))
+
+        assert not history.can_undo
+        assert history.nbytes == 0
+
+    def test_edit_round_trip(self):
+        """Edits should survive conversion to a dict and back."""
+        old = make_mask("a", 10, 30, 10, 30)
+        new = make_mask("a", 10, 30, 10, 40)
+        mask_moments(new)
+        edit = Edit(
+            "replace_mask",
+            [MaskChange.between(old, new), MaskChange.between(None, make_mask("b", 0, 5, 0, 5))],
+            selections={1: (None, (("a",), (), (), ("b",), (), ()))},
+            regions={"a": (frozenset({1, 2}), None)},
+        )
+
+        loaded = Edit.from_dict(edit.to_dict(), (100, 120))
+
+        assert loaded.selections == edit.selections
+        assert loaded.regions == edit.regions
+        masks = {"a": old}
+        for change in loaded.masks:
+            change.apply(masks, forward=True)
+        np.testing.assert_array_equal(masks["a"].mask, new.mask)
+        assert masks["a"].bbox == new.bbox
+        assert masks["a"].moments == new.moments
+        np.testing.assert_array_equal(masks["b"].mask, make_mask("b", 0, 5, 0, 5).mask)
@@ -229,3 +229,147 @@ class TestHoleAssignerEdgeCases:
         """Verify special hole constants."""
         assert HoleAssigner.CART_PATH_HOLE == 98
         assert HoleAssigner.OUTER_MESH_HOLE == 99
+
+
+class TestCorridorAssignment:
+    """Tests for tee→green corridor hole assignment."""
+    
+    @pytest.fixture
+    def long_holes(self):
+        """Two parallel holes running left to right, 200px apart."""
+        green_centers = [
+            {"hole": 1, "x": 900, "y": 100},
+            {"hole": 2, "x": 100, "y": 300},
+        ]
+        tee_centers = [
+            {"hole": 1, "x": 100, "y": 100},
+            {"hole": 2, "x": 900, "y": 300},
+        ]
+        return green_centers, tee_centers
+    
+    def test_builds_corridor_per_hole(self, long_holes):
+        green_centers, tee_centers = long_holes
+        assigner = HoleAssigner(
+            green_centers=green_centers,
+            tee_centers=tee_centers,
+        )
+        
+        assert [c.hole for c in assigner.corridors] == [1, 2]
+        assert assigner.corridors[0].geometry.contains(make_polygon(480, 90))
+    
+    def test_no_corridor_without_tee(self, sample_green_centers):
+        assigner = HoleAssigner(green_centers=sample_green_centers)
+        assert assigner.corridors == []
+    
+    def test_fairway_bunker_follows_corridor(self, long_holes):
+        """A bunker near hole 2's green but on hole 1's fairway goes to hole 1."""
+        green_centers, tee_centers = long_holes
+        polygon = PolygonFeature(
+            id="bunker",
+            feature_class="bunker",
+            confidence=0.9,
+            geometry=make_polygon(150, 90),
+            properties={},
+        )
+        
+        nearest_only = HoleAssigner(green_centers=green_centers)
+        assert nearest_only.assign(polygon).hole == 2
+        
+        assigner = HoleAssigner(
+            green_centers=green_centers,
+            tee_centers=tee_centers,
+        )
+        assignment = assigner.assign(polygon)
+        assert assignment.hole == 1
+        assert assignment.distance_to_green is not None
+    
+    def test_largest_overlap_wins(self, long_holes):
+        green_centers, tee_centers = long_holes
+        assigner = HoleAssigner(
+            green_centers=green_centers,
+            tee_centers=tee_centers,
+            corridor_width=300,
+        )
+        # Overlaps both corridors but mostly hole 2
+        polygon = PolygonFeature(
+            id="p",
+            feature_class="rough",
+            confidence=0.8,
+            geometry=Polygon([(400, 180), (500, 180), (500, 330), (400, 330)]),
+            properties={},
+        )
+        
+        assert assigner.assign(polygon).hole == 2
+    
+    def test_falls_back_to_nearest_green(self, long_holes):
+        green_centers, tee_centers = long_holes
+        assigner = HoleAssigner(
+            green_centers=green_centers,
+            tee_centers=tee_centers,
+        )
+        polygon = PolygonFeature(
+            id="outside",
+            feature_class="rough",
+            confidence=0.8,
+            geometry=make_polygon(90, 600),
+            properties={},
+        )
+        
+        assert assigner.assign(polygon).hole == 2
+    
+    def test_assign_all_matches_assign(self, long_holes):
+        green_centers, tee_centers = long_holes
+        assigner = HoleAssigner(
+            green_centers=green_centers,
+            tee_centers=tee_centers,
+        )
+        polygons = [
+            PolygonFeature(
+                id=f"p{i}",
+                feature_class="bunker",
+                confidence=0.9,
+                geometry=make_polygon(x, y),
+                properties={},
+            )
+            for i, (x, y) in enumerate([(150, 90), (800, 290), (500, 600), (300, 95)])
+        ]
+        
+        assignments_by_hole = assigner.assign_all(polygons)
+        batched = {
+            a.polygon.id: hole
+            for hole, assignments in assignments_by_hole.items()
+            for a in assignments
+        }
+        
+        for polygon in polygons:
+            assert batched[polygon.id] == assigner.assign(polygon).hole
+    
+    def test_from_selections(self):
+        import numpy as np
+        from phase1a.pipeline.interactive import HoleSelection
+        from phase1a.pipeline.masks import MaskData
+        
+        def square_mask(x, y):
+            mask = np.zeros((400, 1000), dtype=bool)
+            mask[y - 5:y + 5, x - 5:x + 5] = True
+            return MaskData(
+                id=f"m_{x}_{y}",
+                mask=mask,
+                area=int(mask.sum()),
+                bbox=(x - 5, y - 5, 10, 10),
+                predicted_iou=1.0,
+                stability_score=1.0,
+            )
+        
+        tee = square_mask(100, 100)
+        green = square_mask(900, 100)
+        selections = {1: HoleSelection(hole=1, tees=[tee.id], greens=[green.id])}
+        
+        assigner = HoleAssigner.from_selections(
+            selections, {tee.id: tee, green.id: green}
+        )
+        
+        assert len(assigner.corridors) == 1
+        assert assigner.corridors[0].hole == 1
+        assert assigner.green_centers[0].x == pytest.approx(899.5)
+        assert assigner.tee_centers[0].x == pytest.approx(99.5)
@@ -7,9 +7,11 @@ import numpy as np
 from pathlib import Path
 import json
 import tempfile
+import threading
 
 from phase1a.pipeline.interactive import (
     InteractiveSelector,
+    MaskIndex,
     HoleSelection,
     FeatureType,
     SelectedMask,
@@ -150,6 +152,90 @@ class TestInteractiveSelector:
         assert loaded[2].tees == ["mask_0001"]
 
 
+class TestMaskIndex:
+    """Tests for label-map and bounding-box hit testing."""
+    
+    @staticmethod
+    def _square(mask_id, x, y, size, shape=(100, 100)):
+        mask = np.zeros(shape, dtype=bool)
+        mask[y:y + size, x:x + size] = True
+        return MaskData(
+            id=mask_id, mask=mask, area=int(mask.sum()), bbox=(x, y, size, size),
+            predicted_iou=0.9, stability_score=0.9,
+        )
+    
+    def test_overlap_first_wins(self):
+        """Overlapping masks should resolve to the earliest added."""
+        index = MaskIndex((100, 100))
+        index.add(self._square("a", 10, 10, 20))
+        index.add(self._square("b", 20, 20, 20))
+        
+        assert index.at(25, 25) == "a"
+        assert index.at(35, 35) == "b"
+        assert index.at(5, 5) is None
+        assert index.at(-1, 5) is None
+        assert index.at(5, 100) is None
+    
+    def test_remove_uncovers(self):
+        """Removing a mask should expose the masks behind it."""
+        index = MaskIndex((100, 100))
+        index.add(self._square("a", 10, 10, 20))
+        index.add(self._square("b", 20, 20, 20))
+        index.add(self._square("c", 15, 15, 10))
+        
+        index.remove("a")
+        
+        assert "a" not in index
+        assert len(index) == 2
+        assert index.at(25, 25) == "b"
+        assert index.at(16, 16) == "c"
+        assert index.at(12, 12) is None
+        assert index.in_region(0, 0, 99, 99) == ["b", "c"]
+    
+    def test_region_inclusive(self):
+        """Region queries should include touching bounding boxes."""
+        index = MaskIndex((100, 100))
+        index.add(self._square("a", 10, 10, 10))
+        
+        assert index.in_region(19, 19, 30, 30) == ["a"]
+        assert index.in_region(20, 20, 30, 30) == []
+    
+    def test_empty_mask(self):
+        """Empty masks should never be hit."""
+        index = MaskIndex((100, 100))
+        index.add(self._square("empty", 0, 0, 0))
+        
+        assert index.in_region(0, 0, 99, 99) == []
+        index.remove("empty")
+        assert len(index) == 0
+    
+    def test_many_masks(self):
+        """Label maps should widen past 65535 masks' worth of labels."""
+        index = MaskIndex((4, 4))
+        index._ids = [None] * 65535
+        index._masks = [None] * 65535
+        index._bboxes = np.full((65535, 4), -1, dtype=np.int64)
+        index._alive = np.zeros(65535, dtype=bool)
+        
+        index.add(self._square("a", 1, 1, 2, shape=(4, 4)))
+        
+        assert index._labels.dtype == np.uint32
+        assert index.at(1, 1) == "a"
+    
+    def test_selector_add_remove(self, sample_masks, sample_image):
+        """Selector add/remove should keep lookups in sync."""
+        selector = InteractiveSelector(sample_masks, sample_image)
+        assert selector.get_mask_at_point(5, 5) == "mask_0000"
+        
+        selector.add_mask(self._square("extra", 80, 80, 10))
+        selector.remove_mask("mask_0000")
+        
+        assert selector.get_mask_at_point(85, 85) == "extra"
+        assert selector.get_mask_at_point(5, 5) is None
+        assert "mask_0000" not in selector.masks
+        assert selector.get_masks_in_region(0, 0, 20, 20) == ["mask_0001"]
+
+
 class TestHoleSelection:
     """Tests for HoleSelection dataclass."""
     
@@ -378,6 +464,226 @@ class TestInteractiveVisualization:
             pytest.skip("matplotlib not available")
 
 
+    def test_click_runs_in_background(self, sample_image):
+        """Point clicks should generate masks on the worker thread."""
+        try:
+            from phase1a.pipeline.visualize import InteractiveMaskSelector
+            from phase1a.pipeline.point_selector import PointBasedSelector
+            from unittest.mock import Mock
+            import matplotlib.pyplot as plt
+            
+            release = threading.Event()
+            threads = []
+            mask = np.zeros((100, 100), dtype=bool)
+            mask[40:60, 40:60] = True
+            
+            def generate(image, point, label=1):
+                threads.append(threading.current_thread().name)
+                release.wait(5)
+                return MaskData("clicked", mask, 400, (40, 40, 20, 20), 0.9, 0.95)
+            
+            generator = Mock()
+            generator.generate_from_point = Mock(side_effect=generate)
+            selector = PointBasedSelector(sample_image, generator)
+            
+            interactive = InteractiveMaskSelector(selector, "Test")
+            interactive.fig, interactive.ax = plt.subplots(figsize=(4, 4))
+            interactive._worker_timer = Mock()  # Poll manually instead of a timer
+            interactive._current_hole = 1
+            interactive._current_feature_type = FeatureType.GREEN
+            
+            class MockClickEvent:
+                xdata, ydata, button = 50, 50, 1
+                inaxes = interactive.ax
+            
+            interactive._on_click(MockClickEvent())
+            
+            # The handler returns immediately with the indicator shown
+            assert interactive.get_selected_mask_ids() == []
+            assert interactive._busy_text.get_visible()
+            
+            release.set()
+            interactive.wait_for_pending(timeout=5)
+            
+            assert threads == ["mask-worker"]
+            assert len(interactive.get_selected_mask_ids()) == 1
+            assert interactive._last_generated_mask_id in selector.generated_masks
+            assert not interactive._busy_text.get_visible()
+            
+            plt.close(interactive.fig)
+        except ImportError:
+            pytest.skip("matplotlib not available")
+    
+    def test_slider_preview(self, sample_image):
+        """Slider changes should preview the last grown outline until applied."""
+        try:
+            from phase1a.pipeline.visualize import InteractiveMaskSelector
+            from phase1a.pipeline.point_selector import PointBasedSelector
+            from unittest.mock import Mock
+            import matplotlib.pyplot as plt
+            
+            def grow(image, outline_points, color_sensitivity=0.6, growth_limit=50, smooth_edges=True):
+                size = int(10 + 40 * color_sensitivity)
+                mask = np.zeros(image.shape[:2], dtype=bool)
+                mask[100 - size:100 + size, 100 - size:100 + size] = True
+                return MaskData("grown", mask, int(mask.sum()), (0, 0, 0, 0), 1.0, 1.0)
+            
+            generator = Mock()
+            generator.generate_from_polygon_grow = Mock(side_effect=grow)
+            selector = PointBasedSelector(sample_image, generator)
+            
+            interactive = InteractiveMaskSelector(selector, "Test")
+            interactive.fig, interactive.ax = plt.subplots(figsize=(4, 4))
+            interactive._current_hole = 1
+            interactive._current_feature_type = FeatureType.GREEN
+            interactive._grow_mode = True
+            
+            class MockKeyEvent:
+                def __init__(self, key):
+                    self.key = key
+            
+            # Draw an outline (runs synchronously without a poll timer)
+            interactive._drawing = True
+            interactive._draw_points = [(95, 95), (105, 95), (105, 105), (95, 105), (97, 97)]
+            interactive._on_release(None)
+            mask_id = interactive.get_selected_mask_ids()[0]
+            original = selector.generated_masks[mask_id]
+            
+            # Moving a slider shows a candidate without replacing the mask
+            interactive._on_sensitivity_changed(1.0)
+            preview = interactive._preview
+            assert preview.id == mask_id
+            assert preview.area > original.area
+            assert selector.generated_masks[mask_id] is original
+            assert generator.generate_from_polygon_grow.call_count == 2
+            
+            # Escape discards the preview and keeps the mask
+            interactive._on_key(MockKeyEvent('escape'))
+            assert interactive._preview is None
+            assert selector.generated_masks[mask_id] is original
+            
+            # A applies it
+            interactive._on_growth_changed(100)
+            interactive._on_key(MockKeyEvent('a'))
+            assert interactive._preview is None
+            assert selector.generated_masks[mask_id].area > original.area
+            assert interactive.get_selected_mask_ids() == [mask_id]
+            
+            # T turns previews off
+            interactive._on_key(MockKeyEvent('t'))
+            interactive._on_sensitivity_changed(0.0)
+            assert interactive._preview is None
+            assert generator.generate_from_polygon_grow.call_count == 3
+            
+            plt.close(interactive.fig)
+        except ImportError:
+            pytest.skip("matplotlib not available")
+    
+    def test_superpixel_clicks(self, sample_image):
+        """Short clicks should toggle superpixels when that strategy is active."""
+        try:
+            from phase1a.pipeline.visualize import InteractiveMaskSelector
+            from phase1a.pipeline.point_selector import PointBasedSelector
+            from phase1a.pipeline.superpixels import SuperpixelIndex
+            from unittest.mock import Mock
+            import matplotlib.pyplot as plt
+            
+            labels = np.repeat(np.repeat(np.arange(64).reshape(8, 8), 32, axis=0), 32, axis=1)
+            generator = Mock()
+            selector = PointBasedSelector(
+                sample_image, generator, strategy="superpixel", superpixels=SuperpixelIndex(labels),
+            )
+            
+            interactive = InteractiveMaskSelector(selector, "Test")
+            interactive.fig, interactive.ax = plt.subplots(figsize=(4, 4))
+            interactive._current_hole = 1
+            interactive._current_feature_type = FeatureType.GREEN
+            
+            class MockReleaseEvent:
+                key = None
+            
+            def click(x, y):
+                interactive._drawing = True
+                interactive._draw_points = [(x, y)]
+                interactive._on_release(MockReleaseEvent())
+            
+            click(10, 10)
+            click(40, 10)
+            mask_id = interactive.get_selected_mask_ids()[0]
+            assert interactive.get_selected_mask_ids() == [mask_id]
+            assert selector.generated_masks[mask_id].area == 2 * 32 * 32
+            
+            # Toggling both superpixels off removes the region
+            click(10, 10)
+            click(40, 10)
+            assert interactive.get_selected_mask_ids() == []
+            generator.generate_from_point.assert_not_called()
+            
+            plt.close(interactive.fig)
+        except ImportError:
+            pytest.skip("matplotlib not available")
+    
+    def test_undo_redo_keys(self, sample_image):
+        """Z and Y should undo and redo mask operations and follow the selection."""
+        try:
+            from phase1a.pipeline.visualize import InteractiveMaskSelector
+            from phase1a.pipeline.point_selector import PointBasedSelector
+            from unittest.mock import Mock
+            import matplotlib.pyplot as plt
+            
+            def generate(image, point, label=1):
+                x, y = point
+                mask = np.zeros(image.shape[:2], dtype=bool)
+                mask[y - 10:y + 10, x - 10:x + 10] = True
+                return MaskData("clicked", mask, 400, (x - 10, y - 10, 20, 20), 0.9, 0.95)
+            
+            generator = Mock()
+            generator.generate_from_point = Mock(side_effect=generate)
+            selector = PointBasedSelector(sample_image, generator)
+            
+            interactive = InteractiveMaskSelector(selector, "Test")
+            interactive.fig, interactive.ax = plt.subplots(figsize=(4, 4))
+            interactive._current_hole = 1
+            interactive._current_feature_type = FeatureType.GREEN
+            
+            class MockClickEvent:
+                button = 1
+                inaxes = interactive.ax
+                
+                def __init__(self, x, y):
+                    self.xdata, self.ydata = x, y
+            
+            class MockKeyEvent:
+                def __init__(self, key):
+                    self.key = key
+            
+            interactive._on_click(MockClickEvent(30, 30))
+            interactive._on_click(MockClickEvent(70, 70))
+            first, second = interactive.get_selected_mask_ids()
+            
+            # Merge, then undo it: both sources come back selected
+            interactive._on_key(MockKeyEvent('m'))
+            merged = interactive.get_selected_mask_ids()
+            assert len(merged) == 1 and merged[0] not in (first, second)
+            interactive._on_key(MockKeyEvent('ctrl+z'))
+            assert sorted(interactive.get_selected_mask_ids()) == sorted([first, second])
+            
+            # Undo a click, then redo it
+            interactive._on_key(MockKeyEvent('z'))
+            assert interactive.get_selected_mask_ids() == [first]
+            assert second not in selector.generated_masks
+            interactive._on_key(MockKeyEvent('y'))
+            assert interactive.get_selected_mask_ids() == [first, second]
+            
+            # Escape also undoes
+            interactive._on_key(MockKeyEvent('escape'))
+            assert interactive.get_selected_mask_ids() == [first]
+            
+            plt.close(interactive.fig)
+        except ImportError:
+            pytest.skip("matplotlib not available")
+
+
 class TestInteractiveSelectorIntegration:
     """Integration tests for interactive selection workflow."""
     
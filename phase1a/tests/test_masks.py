@@ -0,0 +1,426 @@
+"""
+Tests for mask generator caching, two-level refinement and region growing.
+"""
+
+import os
+from collections import deque
+
+import cv2
+import numpy as np
+import pytest
+
+from phase1a.pipeline.masks import (
+    CROP_GRID,
+    CROP_MIN_SIZE,
+    MaskData,
+    MaskGenerator,
+    RegionGrower,
+    centroid,
+    mask_moments,
+)
+
+
+class FakePredictor:
+    """
+    SamPredictor stand-in recording encoded image shapes.
+
+    Point prompts give squares of half-size 50, 100 and 200 around the
+    point; a box prompt gives the box itself.
+    """
+
+    def __init__(self):
+        self.encoded = []
+        self.features = None
+        self.original_size = None
+        self.input_size = None
+        self.is_image_set = False
+        self.box = None
+
+    def set_image(self, image):
+        self.encoded.append(image.shape[:2])
+        self.features = np.array([image.mean()])
+        self.original_size = image.shape[:2]
+        self.input_size = image.shape[:2]
+        self.is_image_set = True
+
+    def predict(self, point_coords=None, point_labels=None, box=None,
+                mask_input=None, multimask_output=True, return_logits=False):
+        height, width = self.original_size
+        x, y = point_coords[0]
+        self.box = box
+        if box is not None:
+            masks = np.zeros((1, height, width), dtype=bool)
+            masks[0, box[1]:box[3], box[0]:box[2]] = True
+            return masks, np.array([0.97]), np.zeros((1, 4, 4))
+
+        masks = np.zeros((3, height, width), dtype=bool)
+        for i, size in enumerate((50, 100, 200)):
+            masks[i, max(0, y - size):y + size, max(0, x - size):x + size] = True
+        return masks, np.array([0.9, 0.8, 0.7]), np.zeros((3, 4, 4))
+
+
+@pytest.fixture
+def generator():
+    """MaskGenerator with a fake in-process predictor."""
+    generator = MaskGenerator(use_server=False)
+    generator._predictor = FakePredictor()
+    generator._sam = generator._predictor
+    generator.size_preference = 0.5
+    return generator
+
+
+@pytest.fixture
+def large_image():
+    """A 3000x3000 image, about 3x SAM's input size."""
+    return np.full((3000, 3000, 3), 90, dtype=np.uint8)
+
+
+class TestEmbeddingCache:
+    """Tests for reusing image embeddings across clicks."""
+
+    def test_repeated_clicks(self, generator, sample_image):
+        """Clicks on the same image should encode it once."""
+        generator.generate_from_point(sample_image, (100, 100))
+        generator.generate_from_point(sample_image, (150, 60))
+
+        assert generator._predictor.encoded == [(256, 256)]
+
+    def test_eviction(self, generator, sample_image):
+        """Least recently used embeddings should be evicted."""
+        generator.embedding_cache_size = 2
+        images = [sample_image + i for i in range(3)]
+        for image in images:
+            generator.generate_from_point(image, (100, 100))
+
+        generator.generate_from_point(images[2], (100, 100))
+        assert len(generator._predictor.encoded) == 3
+
+        generator.generate_from_point(images[0], (100, 100))
+        assert len(generator._predictor.encoded) == 4
+
+    def test_image_hashed_once(self, generator, sample_image, monkeypatch):
+        """Repeated prompts on one array should hash the image once."""
+        from phase1a.pipeline import sam_server
+
+        hashed = []
+        image_key = sam_server.image_key
+        monkeypatch.setattr(
+            sam_server, "image_key", lambda image: hashed.append(1) or image_key(image)
+        )
+        for point in [(100, 100), (150, 60), (60, 150)]:
+            generator.generate_from_point(sample_image, point)
+
+        assert len(hashed) == 1
+
+    def test_predictor_reused_elsewhere(self, generator, sample_image):
+        """A cached embedding should be restored after another encode."""
+        generator.generate_from_point(sample_image, (100, 100))
+        generator._predictor.set_image(sample_image[:100])
+
+        mask_data = generator.generate_from_point(sample_image, (100, 100))
+
+        assert mask_data.mask.shape == sample_image.shape[:2]
+        assert len(generator._predictor.encoded) == 2
+
+    def test_embedding_dir(self, generator, sample_image, temp_dir):
+        """Embeddings in embedding_dir should spare a new generator the encode."""
+        generator.backend = "onnx"  # numpy features, like the ONNX predictor
+        generator.embedding_dir = str(temp_dir)
+        expected = generator.generate_from_point(sample_image, (100, 100))
+        assert len(list(temp_dir.glob("*.npz"))) == 1
+
+        restarted = MaskGenerator(use_server=False, backend="onnx", embedding_dir=str(temp_dir))
+        restarted._predictor = FakePredictor()
+        restarted._sam = restarted._predictor
+        restarted.size_preference = 0.5
+        mask_data = restarted.generate_from_point(sample_image, (100, 100))
+
+        assert restarted._predictor.encoded == []
+        np.testing.assert_array_equal(mask_data.mask, expected.mask)
+
+        # Another model's embeddings are not reused
+        restarted.model_type = "vit_b"
+        restarted._embeddings.clear()
+        restarted.generate_from_point(sample_image, (100, 100))
+        assert restarted._predictor.encoded == [(256, 256)]
+
+    def test_embedding_path_model_identity(self, temp_dir):
+        """Another or a replaced model should not reuse persisted embeddings."""
+        checkpoint = temp_dir / "sam_vit_h.pth"
+        checkpoint.write_bytes(b"weights")
+        generator = MaskGenerator(checkpoint_path=str(checkpoint), embedding_dir=str(temp_dir))
+        path = generator._embedding_path("image")
+
+        assert generator._embedding_path("image") == path
+        os.utime(checkpoint, ns=(0, 0))
+        assert generator._embedding_path("image") != path
+
+        other = temp_dir / "sam_vit_h_finetuned.pth"
+        other.write_bytes(b"weights")
+        generator.checkpoint_path = str(other)
+        assert generator._embedding_path("image") != path
+
+        generator.backend = "onnx"
+        onnx_path = generator._embedding_path("image")
+        generator.onnx_dir = str(temp_dir / "exported")
+        assert generator._embedding_path("image") != onnx_path
+
+
+class TestTwoLevel:
+    """Tests for native-resolution crop refinement."""
+
+    def test_disabled_by_default(self, generator, large_image):
+        """Without two_level only the full image is encoded."""
+        generator.generate_from_point(large_image, (1500, 1500))
+
+        assert generator._predictor.encoded == [(3000, 3000)]
+
+    def test_refines_in_crop(self, generator, large_image):
+        """The proposal's neighbourhood should be re-encoded at native resolution."""
+        generator.two_level = True
+
+        mask_data = generator.generate_from_point(large_image, (1500, 1500))
+
+        full, crop = generator._predictor.encoded
+        assert full == (3000, 3000)
+        assert CROP_MIN_SIZE <= max(crop) < 3000
+        assert all(side % CROP_GRID == 0 for side in crop)
+        assert mask_data.mask.shape == (3000, 3000)
+        assert mask_data.mask[1500, 1500]
+        assert mask_data.predicted_iou == pytest.approx(0.97)
+
+        # The box prompt covers the 100x100 proposal plus the downscale padding
+        x0, y0, x1, y1 = generator._predictor.box
+        assert x1 - x0 == 100 + 2 * 3
+        assert mask_data.bbox == (1447, 1447, 105, 105)
+
+    def test_crop_cache(self, generator, large_image):
+        """Nearby clicks should reuse the crop embedding."""
+        generator.two_level = True
+
+        generator.generate_from_point(large_image, (1500, 1500))
+        generator.generate_from_point(large_image, (1510, 1490))
+
+        assert len(generator._predictor.encoded) == 2
+
+    def test_small_image(self, generator, sample_image):
+        """Images within SAM's input size are not refined."""
+        generator.two_level = True
+
+        generator.generate_from_point(sample_image, (100, 100))
+
+        assert generator._predictor.encoded == [(256, 256)]
+
+    def test_large_proposal(self, generator, large_image):
+        """Proposals covering most of the image gain nothing from a crop."""
+        generator.two_level = True
+        proposal = np.zeros((3000, 3000), dtype=bool)
+        proposal[100:2900, 100:2900] = True
+
+        assert generator._crop_window(proposal) is None
+
+    def test_keeps_proposal_without_point(self, generator, large_image, monkeypatch):
+        """A refined mask that loses the click point should be discarded."""
+        generator.two_level = True
+        predict = generator._predictor.predict
+
+        def shifted_box(box=None, **kwargs):
+            if box is not None:
+                box = box + 80
+            return predict(box=box, **kwargs)
+
+        monkeypatch.setattr(generator._predictor, "predict", shifted_box)
+
+        mask_data = generator.generate_from_point(large_image, (1500, 1500))
+
+        assert mask_data.area == 100 * 100
+
+
+def _bfs_grow(image_lab, seed_mask, mean_color, color_tolerance, growth_limit):
+    """Pixel-by-pixel breadth-first growing, as the grower used to do it."""
+    height, width = seed_mask.shape
+    grown = seed_mask.copy()
+    visited = seed_mask.copy()
+    boundary = cv2.dilate(seed_mask.astype(np.uint8), np.ones((3, 3), np.uint8)) > 0
+    queue = deque((y, x, 1) for y, x in zip(*np.nonzero(boundary & ~seed_mask)))
+
+    while queue:
+        y, x, dist = queue.popleft()
+        if visited[y, x] or dist > growth_limit:
+            continue
+        visited[y, x] = True
+        if np.sqrt(np.sum((image_lab[y, x] - mean_color) ** 2)) <= color_tolerance:
+            grown[y, x] = True
+            for dy in (-1, 0, 1):
+                for dx in (-1, 0, 1):
+                    ny, nx = y + dy, x + dx
+                    if 0 <= ny < height and 0 <= nx < width and not visited[ny, nx]:
+                        queue.append((ny, nx, dist + 1))
+    return grown
+
+
+@pytest.fixture
+def grass_image():
+    """Noisy grass with a lighter disc and a sand patch touching it."""
+    rng = np.random.default_rng(0)
+    image = np.full((200, 240, 3), (60, 120, 50), dtype=np.uint8)
+    cv2.circle(image, (120, 100), 60, (70, 150, 60), -1)
+    cv2.ellipse(image, (150, 90), (25, 12), 0, 0, 360, (200, 190, 150), -1)
+    noise = rng.integers(-12, 13, image.shape)
+    return np.clip(image.astype(int) + noise, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def outline():
+    """Polygon drawn inside the disc."""
+    angles = np.linspace(0, 2 * np.pi, 30, endpoint=False)
+    return [(120 + 20 * np.cos(a), 100 + 15 * np.sin(a)) for a in angles]
+
+
+class TestRegionGrower:
+    """Tests for cached region growing."""
+
+    @pytest.fixture
+    def grower(self, grass_image, outline):
+        from skimage import color as skcolor
+
+        seed = np.zeros(grass_image.shape[:2], dtype=np.uint8)
+        cv2.fillPoly(seed, [np.array(outline, dtype=np.int32)], 1)
+        np.random.seed(0)
+        return RegionGrower(skcolor.rgb2lab(grass_image), seed > 0, (120, 100), growth_limit=20)
+
+    @pytest.mark.parametrize("sensitivity,limit", [(0.0, 10), (0.6, 50), (1.0, 200)])
+    def test_matches_bfs(self, grower, sensitivity, limit):
+        """Growing should match a pixel-by-pixel breadth-first flood."""
+        grower.grow(sensitivity, limit)
+        steps = grower._steps(grower.tolerance(sensitivity), limit)
+
+        expected = _bfs_grow(
+            grower.image_lab, grower.seed_mask, grower.mean_color,
+            grower.tolerance(sensitivity), limit,
+        )
+        y0, y1, x0, x1 = grower.window
+        np.testing.assert_array_equal(steps <= limit, expected[y0:y1, x0:x1])
+        assert expected.sum() == expected[y0:y1, x0:x1].sum()
+
+    def test_reuses_fields(self, grower, monkeypatch):
+        """A smaller growth limit at a seen tolerance should not grow again."""
+        grower.grow(0.6, 40)
+
+        def fail(*args, **kwargs):
+            raise AssertionError("dilated again")
+
+        monkeypatch.setattr(cv2, "dilate", fail)
+        small = grower.grow(0.6, 10)
+        large = grower.grow(0.6, 40)
+
+        assert small.sum() < large.sum()
+        assert len(grower._fields) == 1
+
+    def test_widens_window(self, grower):
+        """Limits beyond the window padding should widen the window."""
+        y0, y1, x0, x1 = grower.window
+        grower.grow(1.0, 60)
+
+        assert grower.reach == 60
+        assert grower.window[1] - grower.window[0] > y1 - y0
+
+    def test_field_cache_size(self, grower):
+        """Only the most recent tolerances should be kept."""
+        grower.cache_size = 2
+        for sensitivity in (0.1, 0.2, 0.3):
+            grower.grow(sensitivity, 10)
+
+        assert len(grower._fields) == 2
+
+
+class TestSliderCaches:
+    """Tests for reusing work when re-running an outline with new slider values."""
+
+    @pytest.fixture
+    def lab_calls(self, monkeypatch):
+        from skimage import color as skcolor
+
+        calls = []
+        rgb2lab = skcolor.rgb2lab
+
+        def counting(image):
+            calls.append(image.shape)
+            return rgb2lab(image)
+
+        monkeypatch.setattr(skcolor, "rgb2lab", counting)
+        return calls
+
+    def test_grow_reuses_grower(self, generator, grass_image, outline, lab_calls):
+        """Re-growing the same polygon should reuse the LAB image and seed statistics."""
+        first = generator.generate_from_polygon_grow(grass_image, outline, 0.2, 20)
+        grower = generator._grower[1]
+        second = generator.generate_from_polygon_grow(grass_image, outline, 1.0, 60)
+
+        assert generator._grower[1] is grower
+        assert len(lab_calls) == 1
+        assert second.area > first.area
+
+        generator.generate_from_polygon_grow(grass_image, outline[::2], 0.2, 20)
+        assert generator._grower[1] is not grower
+        assert len(lab_calls) == 1
+
+    def test_outline_reuses_candidate(self, generator, grass_image, outline, lab_calls, monkeypatch):
+        """A new color tolerance should re-refine SAM's candidate without prompting again."""
+        predict = generator._predictor.predict
+        calls = []
+
+        def counting(**kwargs):
+            calls.append(kwargs)
+            return predict(**kwargs)
+
+        monkeypatch.setattr(generator._predictor, "predict", counting)
+
+        generator.generate_from_outline(grass_image, outline, color_tolerance=4.0)
+        generator.generate_from_outline(grass_image, outline, color_tolerance=15.0)
+
+        assert len(calls) == 2  # Points and box prompts for the first outline only
+        assert len(lab_calls) == 1
+
+    def test_refine_by_color(self, generator, grass_image):
+        """Color refinement should keep similar pixels connected to the center."""
+        mask = np.ones(grass_image.shape[:2], dtype=bool)
+
+        refined = generator._refine_mask_by_color(grass_image, mask, [(120, 100)], 6.0)
+
+        assert refined[100, 120]
+        assert not refined[90, 150]  # Sand
+        assert not refined[5, 5]  # Darker grass outside the disc
+
+
+class TestMaskMoments:
+    """Tests for mask_moments and centroid."""
+
+    def test_moments(self):
+        """Moments should give the same centroid as averaging pixel coordinates."""
+        rng = np.random.default_rng(0)
+        masks = [rng.random((60, 80)) > 0.7 for _ in range(3)]
+        mask_data = [MaskData(str(i), mask, int(mask.sum()), (0, 0, 80, 60), 1.0, 1.0) for i, mask in enumerate(masks)]
+
+        moments = [mask_moments(data) for data in mask_data]
+
+        ys, xs = np.concatenate([np.nonzero(mask) for mask in masks], axis=1)
+        assert moments[0][0] == masks[0].sum()
+        assert centroid(moments) == pytest.approx((xs.mean(), ys.mean()))
+
+    def test_cached(self):
+        """Moments should be computed once and kept on the MaskData."""
+        mask = np.zeros((20, 20), dtype=bool)
+        mask[2:6, 10:12] = True
+        mask_data = MaskData("a", mask, 8, (10, 2, 2, 4), 1.0, 1.0)
+
+        assert mask_moments(mask_data) == (8, 84, 28)
+        mask_data.mask = None
+        assert mask_moments(mask_data) == (8, 84, 28)
+
+    def test_empty(self):
+        """Empty masks have no centroid."""
+        empty = MaskData("a", np.zeros((5, 5), dtype=bool), 0, (0, 0, 0, 0), 1.0, 1.0)
+
+        assert centroid([]) is None
+        assert centroid([mask_moments(empty)]) is None
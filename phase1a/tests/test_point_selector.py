@@ -4,12 +4,14 @@ Tests for point-based interactive selection module.
 
 import pytest
 import numpy as np
+from concurrent.futures import Future
 from pathlib import Path
 from unittest.mock import Mock, MagicMock, patch
 
 from phase1a.pipeline.point_selector import PointBasedSelector
 from phase1a.pipeline.interactive import FeatureType, HoleSelection
 from phase1a.pipeline.masks import MaskGenerator, MaskData
+from phase1a.pipeline.superpixels import SuperpixelIndex
 
 
 @pytest.fixture
@@ -317,6 +319,27 @@ class TestPointBasedSelector:
         # Center should be between the two masks
         assert 70 <= green_centers[0]["x"] <= 90
         assert 70 <= green_centers[0]["y"] <= 90
+    
+    def test_centers_from_cached_moments(self, sample_image, mock_mask_generator):
+        """Green and tee centers should not read pixel data."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        selector.click_to_mask(60, 70, hole=1, feature_type=FeatureType.GREEN)
+        selector.click_to_mask(80, 90, hole=1, feature_type=FeatureType.GREEN)
+        selector.click_to_mask(150, 40, hole=1, feature_type=FeatureType.TEE)
+        selector.merge_selected_masks(
+            list(selector.get_selection_for_hole(1).greens), hole=1, feature_type=FeatureType.GREEN
+        )
+        
+        (merged_id,) = selector.get_selection_for_hole(1).greens
+        ys, xs = np.nonzero(selector.generated_masks[merged_id].mask)
+        for mask_data in selector.generated_masks.values():
+            mask_data.mask = None
+        
+        (green,) = selector.extract_green_centers()
+        (tee,) = selector.extract_tee_centers()
+        
+        assert (green["x"], green["y"]) == pytest.approx((xs.mean(), ys.mean()))
+        assert (tee["x"], tee["y"]) == (149.5, 39.5)
 
 
 class TestPointBasedSelectorIntegration:
@@ -367,6 +390,201 @@ class TestPointBasedSelectorIntegration:
         assert len(green_centers) == 2
 
 
+class TestSuperpixelStrategy:
+    """Tests for clicks backed by a superpixel index."""
+    
+    @pytest.fixture
+    def index(self):
+        """A 10x10 grid of 20x20 superpixels over the 200x200 image."""
+        labels = np.repeat(np.repeat(np.arange(100).reshape(10, 10), 20, axis=0), 20, axis=1)
+        return SuperpixelIndex(labels)
+    
+    @pytest.fixture
+    def selector(self, sample_image, mock_mask_generator, index):
+        return PointBasedSelector(
+            sample_image, mock_mask_generator, strategy="superpixel", superpixels=index,
+        )
+    
+    def test_clicks_merge_into_region(self, selector, mock_mask_generator):
+        """Clicks for one feature should grow a single region without SAM."""
+        first = selector.click_to_mask(10, 10, hole=1, feature_type=FeatureType.GREEN)
+        second = selector.click_to_mask(30, 10, hole=1, feature_type=FeatureType.GREEN)
+        
+        assert first.id == second.id == "green_1_region_0000"
+        assert second.area == 2 * 20 * 20
+        assert second.bbox == (0, 0, 39, 19)
+        assert selector.generated_masks[second.id] is second
+        assert selector.get_selection_for_hole(1).greens == [second.id]
+        mock_mask_generator.generate_from_point.assert_not_called()
+    
+    def test_click_toggles(self, selector):
+        """Clicking a selected superpixel should remove it, and an empty region."""
+        selector.click_to_mask(10, 10, hole=1, feature_type=FeatureType.GREEN)
+        selector.click_to_mask(30, 10, hole=1, feature_type=FeatureType.GREEN)
+        
+        region = selector.click_to_mask(15, 5, hole=1, feature_type=FeatureType.GREEN)
+        assert region.area == 20 * 20
+        assert not region.mask[10, 10]
+        
+        assert selector.click_to_mask(30, 10, hole=1, feature_type=FeatureType.GREEN) is None
+        assert selector.generated_masks == {}
+        assert selector.get_selection_for_hole(1).greens == []
+    
+    def test_new_region(self, selector):
+        """A new feature, hole or new_region() should start another region."""
+        green = selector.click_to_mask(10, 10, hole=1, feature_type=FeatureType.GREEN)
+        bunker = selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.BUNKER)
+        selector.new_region()
+        other = selector.click_to_mask(90, 90, hole=1, feature_type=FeatureType.BUNKER)
+        
+        assert len({green.id, bunker.id, other.id}) == 3
+        assert selector.get_selection_for_hole(1).bunkers == [bunker.id, other.id]
+    
+    def test_explicit_sam(self, selector, mock_mask_generator):
+        """use_sam should run SAM whatever the strategy."""
+        mask_data = selector.click_to_mask(75, 75, 1, FeatureType.GREEN, use_sam=True)
+        
+        assert mask_data.id == "green_1_0000"
+        mock_mask_generator.generate_from_point.assert_called_once()
+    
+    def test_pending_index(self, sample_image, mock_mask_generator, index, temp_dir):
+        """Clicks should use SAM until the background index is ready."""
+        future = Future()
+        selector = PointBasedSelector(
+            sample_image, mock_mask_generator, strategy="superpixel", superpixels=future,
+        )
+        
+        selector.click_to_mask(75, 75, 1, FeatureType.GREEN)
+        assert mock_mask_generator.generate_from_point.call_count == 1
+        
+        path = temp_dir / "labels.npz"
+        index.save(path)
+        future.set_result(path)
+        
+        region = selector.click_to_mask(75, 75, 1, FeatureType.GREEN)
+        assert region.area == 20 * 20
+        assert mock_mask_generator.generate_from_point.call_count == 1
+    
+    def test_failed_index(self, sample_image, mock_mask_generator):
+        """A failed background computation should fall back to SAM."""
+        future = Future()
+        future.set_exception(MemoryError())
+        selector = PointBasedSelector(
+            sample_image, mock_mask_generator, strategy="superpixel", superpixels=future,
+        )
+        
+        selector.click_to_mask(75, 75, 1, FeatureType.GREEN)
+        
+        assert selector.superpixels is None
+        mock_mask_generator.generate_from_point.assert_called_once()
+    
+    def test_unknown_strategy(self, sample_image, mock_mask_generator):
+        """Unknown strategies should raise ValueError."""
+        with pytest.raises(ValueError, match="strategy"):
+            PointBasedSelector(sample_image, mock_mask_generator, strategy="lasso")
+
+
+class TestUndoRedo:
+    """Tests for the selector's undo/redo history."""
+    
+    def test_undo_redo_click(self, sample_image, mock_mask_generator):
+        """Undo should remove a clicked mask and redo bring it back."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        mask_data = selector.click_to_mask(75, 75, hole=1, feature_type=FeatureType.GREEN)
+        
+        edit = selector.undo()
+        assert edit.added == [mask_data.id]
+        assert selector.generated_masks == {}
+        assert 1 not in selector.selections
+        
+        selector.redo()
+        np.testing.assert_array_equal(selector.generated_masks[mask_data.id].mask, mask_data.mask)
+        assert selector.get_selection_for_hole(1).greens == [mask_data.id]
+        
+        assert selector.redo() is None
+    
+    def test_ids_not_reused(self, sample_image, mock_mask_generator):
+        """Masks created after an undo should get new IDs."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        first = selector.click_to_mask(75, 75, hole=1, feature_type=FeatureType.GREEN)
+        selector.undo()
+        
+        second = selector.click_to_mask(75, 75, hole=1, feature_type=FeatureType.GREEN)
+        
+        assert second.id != first.id
+        assert not selector.history.can_redo
+    
+    def test_merge_drops_sources(self, sample_image, mock_mask_generator):
+        """Merges should keep their sources only in the history."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        a = selector.click_to_mask(70, 70, hole=1, feature_type=FeatureType.GREEN)
+        b = selector.click_to_mask(80, 80, hole=1, feature_type=FeatureType.GREEN)
+        
+        merged = selector.merge_selected_masks([a.id, b.id], hole=1, feature_type=FeatureType.GREEN)
+        assert list(selector.generated_masks) == [merged.id]
+        assert selector.get_selection_for_hole(1).greens == [merged.id]
+        
+        edit = selector.undo()
+        assert sorted(edit.removed) == sorted([a.id, b.id])
+        assert set(selector.generated_masks) == {a.id, b.id}
+        assert sorted(selector.get_selection_for_hole(1).greens) == sorted([a.id, b.id])
+        np.testing.assert_array_equal(selector.generated_masks[a.id].mask, a.mask)
+        
+        selector.redo()
+        assert list(selector.generated_masks) == [merged.id]
+    
+    def test_merge_keeps_masks_selected_elsewhere(self, sample_image, mock_mask_generator):
+        """A merge source still used by another selection should stay."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        a = selector.click_to_mask(70, 70, hole=1, feature_type=FeatureType.GREEN)
+        b = selector.click_to_mask(80, 80, hole=1, feature_type=FeatureType.GREEN)
+        selector.get_selection_for_hole(1).tees.append(a.id)
+        
+        merged = selector.merge_selected_masks([a.id, b.id], hole=1, feature_type=FeatureType.GREEN)
+        
+        assert set(selector.generated_masks) == {a.id, merged.id}
+    
+    def test_replace_stores_delta(self, sample_image, mock_mask_generator):
+        """Replacing a mask should record only the changed pixels."""
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        original = selector.click_to_mask(75, 75, hole=1, feature_type=FeatureType.GREEN)
+        grown = original.mask.copy()
+        grown[85:90, 65:85] = True
+        selector.replace_mask(MaskData(original.id, grown, int(grown.sum()), original.bbox, 1.0, 1.0))
+        
+        edit = selector.undo()
+        
+        assert edit.label == "replace_mask"
+        assert edit.masks[0].pixels.box == (85, 90, 65, 85)
+        np.testing.assert_array_equal(selector.generated_masks[original.id].mask, original.mask)
+        assert selector.generated_masks[original.id].predicted_iou == original.predicted_iou
+    
+    def test_superpixel_regions(self, sample_image, mock_mask_generator):
+        """Undo should restore a region's superpixels along with its mask."""
+        labels = np.repeat(np.repeat(np.arange(100).reshape(10, 10), 20, axis=0), 20, axis=1)
+        selector = PointBasedSelector(
+            sample_image, mock_mask_generator, strategy="superpixel", superpixels=SuperpixelIndex(labels),
+        )
+        selector.click_to_mask(10, 10, hole=1, feature_type=FeatureType.GREEN)
+        selector.click_to_mask(30, 10, hole=1, feature_type=FeatureType.GREEN)
+        
+        selector.undo()
+        region = selector.click_to_mask(50, 10, hole=1, feature_type=FeatureType.GREEN)
+        
+        assert region.area == 2 * 20 * 20
+        assert region.mask[10, 10] and region.mask[10, 50] and not region.mask[10, 30]
+    
+    def test_nothing_to_undo(self, sample_image, mock_mask_generator):
+        """Undo without history, or failed operations, should change nothing."""
+        mock_mask_generator.generate_from_point.side_effect = lambda *args, **kwargs: None
+        selector = PointBasedSelector(sample_image, mock_mask_generator)
+        
+        selector.click_to_mask(75, 75, hole=1, feature_type=FeatureType.GREEN)
+        
+        assert selector.undo() is None
+        assert len(selector.history) == 0
+
+
 class TestMaskGeneratorPointGeneration:
     """Tests for MaskGenerator.generate_from_point() method."""
     
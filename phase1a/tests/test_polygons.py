@@ -8,7 +8,13 @@ from pathlib import Path
 import numpy as np
 import pytest
 
-from phase1a.pipeline.polygons import PolygonGenerator, PolygonFeature
+from phase1a.pipeline.polygons import (
+    PolygonGenerator,
+    PolygonFeature,
+    STORE_FILENAME,
+    read_polygon_store,
+    write_polygon_store,
+)
 
 
 class TestPolygonFeature:
@@ -168,12 +174,22 @@ class TestPolygonGenerator:
             assert polygon.geometry.is_valid
     
     def test_save_polygons(self, mock_polygons, temp_dir):
-        """Test saving polygons to GeoJSON files."""
+        """Test saving polygons to the columnar store only by default."""
         generator = PolygonGenerator()
         polygons_dir = temp_dir / "polygons"
         
         generator.save_polygons(mock_polygons, polygons_dir)
         
+        assert (polygons_dir / STORE_FILENAME).exists()
+        assert not list(polygons_dir.glob("*.geojson"))
+    
+    def test_save_polygons_geojson(self, mock_polygons, temp_dir):
+        """Test opt-in GeoJSON export."""
+        generator = PolygonGenerator()
+        polygons_dir = temp_dir / "polygons"
+        
+        generator.save_polygons(mock_polygons, polygons_dir, geojson=True)
+        
         # Check combined file exists
         assert (polygons_dir / "all_features.geojson").exists()
         
@@ -260,3 +276,88 @@ class TestPolygonGeneratorEdgeCases:
         # May or may not create a valid polygon depending on implementation
         # Just verify no exceptions
         pass
+
+
+class TestPolygonStore:
+    """Tests for the columnar WKB polygon store."""
+    
+    @pytest.fixture
+    def grid_polygons(self):
+        from shapely.geometry import MultiPolygon, Polygon, box
+        
+        polygons = [
+            PolygonFeature(
+                id=f"mask_{i:03d}",
+                feature_class=["green", "bunker", "fairway"][i % 3],
+                confidence=0.5 + i / 100,
+                geometry=box(i * 20, 0, i * 20 + 10, 10),
+                properties={"area": 100.0, "perimeter": np.float64(40.0)},
+            )
+            for i in range(10)
+        ]
+        polygons.append(PolygonFeature(
+            id="water_ü",
+            feature_class="water",
+            confidence=0.75,
+            geometry=MultiPolygon([
+                Polygon([(0, 50), (30, 50), (30, 80)], [[(5, 52), (20, 52), (20, 60)]]),
+                box(100, 100, 120, 120),
+            ]),
+            properties={},
+        ))
+        return polygons
+    
+    def test_round_trip(self, grid_polygons, temp_dir):
+        path = temp_dir / STORE_FILENAME
+        write_polygon_store(grid_polygons, path)
+        
+        loaded = read_polygon_store(path)
+        
+        assert len(loaded) == len(grid_polygons)
+        for orig, load in zip(grid_polygons, loaded):
+            assert load.id == orig.id
+            assert load.feature_class == orig.feature_class
+            assert load.confidence == orig.confidence
+            assert load.properties == orig.properties
+            assert load.geometry.equals_exact(orig.geometry, 0)
+    
+    def test_bbox_read(self, grid_polygons, temp_dir):
+        path = temp_dir / STORE_FILENAME
+        write_polygon_store(grid_polygons, path)
+        
+        loaded = read_polygon_store(path, bbox=(35, 0, 65, 5))
+        
+        assert [p.id for p in loaded] == ["mask_002", "mask_003"]
+        # MultiPolygon bounds span (0, 50)-(120, 120)
+        assert [p.id for p in read_polygon_store(path, bbox=(60, 60, 70, 70))] == ["water_ü"]
+    
+    def test_empty_store(self, temp_dir):
+        path = temp_dir / STORE_FILENAME
+        write_polygon_store([], path)
+        
+        assert read_polygon_store(path) == []
+        assert read_polygon_store(path, bbox=(0, 0, 1, 1)) == []
+    
+    def test_rejects_other_files(self, temp_dir):
+        path = temp_dir / "other.bin"
+        path.write_bytes(b"not a polygon store at all")
+        
+        with pytest.raises(ValueError):
+            read_polygon_store(path)
+    
+    def test_load_polygons_prefers_store(self, grid_polygons, temp_dir):
+        generator = PolygonGenerator()
+        generator.save_polygons(grid_polygons, temp_dir, geojson=True)
+        
+        loaded = PolygonGenerator.load_polygons(temp_dir, bbox=(0, 0, 10, 10))
+        
+        assert [p.id for p in loaded] == ["mask_000"]
+    
+    def test_load_polygons_from_legacy_geojson(self, grid_polygons, temp_dir):
+        PolygonGenerator.export_geojson(grid_polygons, temp_dir)
+        
+        loaded = PolygonGenerator.load_polygons(temp_dir)
+        filtered = PolygonGenerator.load_polygons(temp_dir, bbox=(35, 0, 65, 5))
+        
+        assert [p.id for p in loaded] == [p.id for p in grid_polygons]
+        assert [p.id for p in filtered] == ["mask_002", "mask_003"]
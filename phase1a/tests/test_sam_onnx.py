@@ -0,0 +1,319 @@
+"""
+Tests for ONNX Runtime SAM backend module.
+"""
+
+import importlib.util
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline.masks import MaskGenerator
+from phase1a.pipeline.sam_onnx import (
+    OnnxAutomaticMaskGenerator,
+    OnnxSamPredictor,
+    box_nms,
+    export_onnx,
+    onnx_model_paths,
+    preprocess_image,
+    preprocess_shape,
+    prompt_inputs,
+)
+
+CHECKPOINT = Path(__file__).parent.parent.parent / "checkpoints" / "sam_vit_h_4b8939.pth"
+TEST_IMAGE = Path(__file__).parent.parent / "resources" / "Pictatinny_B.jpg"
+
+
+def _available(*modules):
+    return all(importlib.util.find_spec(m) is not None for m in modules)
+
+
+class FakeEncoder:
+    """Encoder session stand-in counting runs."""
+
+    def __init__(self):
+        self.runs = 0
+
+    def run(self, output_names, feeds):
+        self.runs += 1
+        assert feeds["image"].shape == (1, 3, 1024, 1024)
+        return [np.full((1, 256, 64, 64), self.runs, dtype=np.float32)]
+
+
+class FakeDecoder:
+    """
+    Decoder session stand-in.
+
+    Returns four masks per prompt: squares of half-size 4, 8, 16 and 32
+    output pixels around the prompt's first point (in resized-image
+    coordinates).
+    """
+
+    def __init__(self, batch_prompts=True):
+        self.feeds = []
+        self.batch_prompts = batch_prompts
+
+    def get_inputs(self):
+        prompts = "num_prompts" if self.batch_prompts else 1
+        return [
+            SimpleNamespace(name="image_embeddings", shape=[1, 256, 64, 64]),
+            SimpleNamespace(name="point_coords", shape=[prompts, "num_points", 2]),
+        ]
+
+    def run(self, output_names, feeds):
+        self.feeds.append(feeds)
+        height, width = feeds["orig_im_size"].astype(int)
+        input_height, input_width = preprocess_shape(height, width)
+        prompts = len(feeds["point_coords"])
+        assert self.batch_prompts or prompts == 1
+
+        logits = np.full((prompts, 4, height, width), -10.0, dtype=np.float32)
+        for prompt, (x, y) in enumerate(feeds["point_coords"][:, 0]):
+            x, y = int(x * width / input_width), int(y * height / input_height)
+            for i, size in enumerate((4, 8, 16, 32)):
+                logits[prompt, i, max(0, y - size):y + size, max(0, x - size):x + size] = 10.0
+        scores = np.tile(np.array([0.95, 0.9, 0.92, 0.5], dtype=np.float32), (prompts, 1))
+        return [logits, scores, np.zeros((prompts, 4, 256, 256), dtype=np.float32)]
+
+
+@pytest.fixture
+def predictor():
+    return OnnxSamPredictor(FakeEncoder(), FakeDecoder())
+
+
+class TestPreprocessing:
+    """Tests for SAM input preprocessing."""
+
+    def test_preprocess_shape(self):
+        """The longest side should be scaled to 1024."""
+        assert preprocess_shape(2000, 4000) == (512, 1024)
+        assert preprocess_shape(300, 200) == (1024, 683)
+
+    def test_preprocess_image(self, sample_image):
+        """Images should be resized, normalized and zero-padded to 1024x1024."""
+        encoder_input, input_size = preprocess_image(sample_image[:100])
+
+        assert input_size == (400, 1024)
+        assert encoder_input.shape == (1, 3, 1024, 1024)
+        assert encoder_input.dtype == np.float32
+        assert np.all(encoder_input[:, :, 400:] == 0)
+
+    def test_prompt_inputs_points(self):
+        """Points should be scaled and followed by a padding point."""
+        coords, labels = prompt_inputs(
+            (2000, 4000), (512, 1024), np.array([[400, 200]]), np.array([1])
+        )
+
+        np.testing.assert_allclose(coords, [[[102.4, 51.2], [0, 0]]], rtol=1e-6)
+        np.testing.assert_array_equal(labels, [[1, -1]])
+
+    def test_prompt_inputs_box(self):
+        """Box corners should be labelled 2 and 3, with no padding point."""
+        coords, labels = prompt_inputs(
+            (1024, 1024), (1024, 1024), np.array([[5, 5]]), np.array([1]),
+            box=np.array([0, 0, 10, 20]),
+        )
+
+        np.testing.assert_array_equal(coords, [[[5, 5], [0, 0], [10, 20]]])
+        np.testing.assert_array_equal(labels, [[1, 2, 3]])
+
+    def test_model_paths(self, temp_dir):
+        """Quantized models should have their own file names."""
+        encoder, decoder = onnx_model_paths(temp_dir, "vit_b", quantized=True)
+
+        assert encoder.name == "sam_vit_b_encoder.quant.onnx"
+        assert decoder.name == "sam_vit_b_decoder.quant.onnx"
+
+    def test_box_nms(self):
+        """Overlapping boxes should be suppressed in score order."""
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]], dtype=float)
+        scores = np.array([0.8, 0.9, 0.7])
+
+        np.testing.assert_array_equal(box_nms(boxes, scores, 0.5), [1, 2])
+
+
+class TestOnnxSamPredictor:
+    """Tests for OnnxSamPredictor."""
+
+    def test_predict_multimask(self, predictor, sample_image):
+        """Multimask output should skip the single-mask token like SamPredictor."""
+        predictor.set_image(sample_image)
+        masks, scores, low_res = predictor.predict(
+            point_coords=np.array([[100, 100]]), point_labels=np.array([1])
+        )
+
+        assert masks.shape == (3, 256, 256)
+        assert masks.dtype == bool
+        np.testing.assert_allclose(scores, [0.9, 0.92, 0.5])
+        assert low_res.shape == (3, 256, 256)
+        assert masks[0].sum() == 16 * 16
+
+    def test_predict_single_mask(self, predictor, sample_image):
+        """multimask_output=False should return the single-mask token."""
+        predictor.set_image(sample_image)
+        masks, scores, _ = predictor.predict(
+            point_coords=np.array([[100, 100]]),
+            point_labels=np.array([1]),
+            multimask_output=False,
+        )
+
+        assert masks.shape == (1, 256, 256)
+        assert masks[0].sum() == 8 * 8
+
+    def test_predict_requires_image(self, predictor):
+        """predict before set_image should raise."""
+        with pytest.raises(RuntimeError):
+            predictor.predict(point_coords=np.array([[1, 1]]), point_labels=np.array([1]))
+
+    def test_set_image_reuses_embedding(self, predictor, sample_image):
+        """Setting the same image again should not re-run the encoder."""
+        predictor.set_image(sample_image)
+        predictor.set_image(sample_image.copy())
+        assert predictor.encoder.runs == 1
+
+        predictor.set_image(sample_image[::-1].copy())
+        assert predictor.encoder.runs == 2
+
+    def test_set_image_after_embedding_swap(self, predictor, sample_image):
+        """An embedding restored from a cache should not be mistaken for the last encode."""
+        predictor.set_image(sample_image)
+        predictor.features = predictor.features.copy()
+
+        predictor.set_image(sample_image)
+        assert predictor.encoder.runs == 2
+
+    def test_mask_generator_backend(self, predictor, sample_image, monkeypatch):
+        """MaskGenerator(backend='onnx') should use the ONNX predictor."""
+        monkeypatch.setattr(
+            OnnxSamPredictor, "from_files", classmethod(lambda cls, *args, **kwargs: predictor)
+        )
+        generator = MaskGenerator(backend="onnx", onnx_dir="models")
+
+        mask_data = generator.generate_from_point(sample_image, (100, 100))
+
+        assert mask_data is not None
+        assert mask_data.mask[100, 100]
+        assert isinstance(generator._mask_generator, OnnxAutomaticMaskGenerator)
+
+    def test_missing_models(self, temp_dir, sample_image):
+        """Missing model files should point at export-onnx."""
+        generator = MaskGenerator(backend="onnx", onnx_dir=str(temp_dir))
+
+        with pytest.raises(FileNotFoundError, match="export-onnx"):
+            generator.generate_from_point(sample_image, (100, 100))
+
+    def test_unknown_backend(self, sample_image):
+        """Unknown backends should raise ValueError."""
+        generator = MaskGenerator(backend="tensorrt")
+
+        with pytest.raises(ValueError, match="Unknown SAM backend"):
+            generator.generate_from_point(sample_image, (100, 100))
+
+
+class TestOnnxAutomaticMaskGenerator:
+    """Tests for OnnxAutomaticMaskGenerator."""
+
+    def test_point_grid(self, predictor):
+        """Grid points should be cell centers."""
+        generator = OnnxAutomaticMaskGenerator(predictor, points_per_side=2)
+
+        np.testing.assert_array_equal(
+            generator.point_grid(100, 200), [[50, 25], [150, 25], [50, 75], [150, 75]]
+        )
+
+    def test_generate(self, predictor, sample_image):
+        """Masks should be thresholded, deduplicated and returned in SAM's format."""
+        generator = OnnxAutomaticMaskGenerator(
+            predictor, points_per_side=4, pred_iou_thresh=0.88,
+            stability_score_thresh=0.9,
+        )
+
+        results = generator.generate(sample_image)
+
+        # All 16 grid points decoded in one run at the resized resolution
+        assert len(predictor.decoder.feeds) == 1
+        assert predictor.decoder.feeds[0]["point_coords"].shape == (16, 2, 2)
+        np.testing.assert_array_equal(predictor.decoder.feeds[0]["orig_im_size"], [1024, 1024])
+        # The 0.5-score token is dropped; two masks per point survive NMS
+        assert len(results) == 32
+        for result in results:
+            assert result["segmentation"].shape == sample_image.shape[:2]
+            assert result["area"] == result["segmentation"].sum()
+            assert result["predicted_iou"] >= 0.88
+
+
+    def test_generate_batches(self, predictor, sample_image):
+        """Grid points should be decoded points_per_batch per run."""
+        generator = OnnxAutomaticMaskGenerator(predictor, points_per_side=4, points_per_batch=6)
+
+        batched = generator.generate(sample_image)
+
+        assert [len(feeds["point_coords"]) for feeds in predictor.decoder.feeds] == [6, 6, 4]
+
+        single = OnnxSamPredictor(FakeEncoder(), FakeDecoder(batch_prompts=False))
+        unbatched = OnnxAutomaticMaskGenerator(single, points_per_side=4).generate(sample_image)
+
+        assert len(single.decoder.feeds) == 16
+        assert [r["bbox"] for r in unbatched] == [r["bbox"] for r in batched]
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not _available("torch", "segment_anything", "onnxruntime", "onnx"),
+    reason="torch, segment-anything, onnx and onnxruntime are required",
+)
+@pytest.mark.skipif(
+    not (CHECKPOINT.exists() and TEST_IMAGE.exists()),
+    reason="SAM checkpoint or test image not available",
+)
+class TestOnnxBenchmark:
+    """Accuracy and latency of the ONNX backend against PyTorch."""
+
+    def test_matches_torch(self, temp_dir):
+        """Compare fp32 and int8 ONNX masks and timings with SamPredictor."""
+        from PIL import Image
+
+        image = np.array(Image.open(TEST_IMAGE).convert("RGB"))
+        height, width = image.shape[:2]
+        rng = np.random.default_rng(0)
+        points = rng.uniform([0, 0], [width, height], size=(10, 2)).astype(int)
+
+        def run(generator):
+            start = time.perf_counter()
+            generator._load_model()
+            generator._predictor.set_image(image)
+            encode = time.perf_counter() - start
+
+            masks = []
+            start = time.perf_counter()
+            for point in points:
+                result, _, _ = generator._predictor.predict(
+                    point_coords=point[None], point_labels=np.array([1])
+                )
+                masks.append(result)
+            decode = (time.perf_counter() - start) / len(points)
+            return masks, encode, decode
+
+        export_onnx("vit_h", str(CHECKPOINT), temp_dir, quantize=True)
+
+        reference, *torch_times = run(
+            MaskGenerator(checkpoint_path=str(CHECKPOINT), device="cpu", use_server=False)
+        )
+        print(f"torch: encode {torch_times[0]:.2f}s, decode {torch_times[1] * 1000:.0f}ms")
+
+        for quantized, min_iou in ((False, 0.95), (True, 0.85)):
+            masks, *times = run(MaskGenerator(
+                backend="onnx", onnx_dir=str(temp_dir), quantized=quantized, device="cpu"
+            ))
+            ious = [
+                np.logical_and(a, b).sum() / max(np.logical_or(a, b).sum(), 1)
+                for ref, result in zip(reference, masks)
+                for a, b in zip(ref, result)
+            ]
+            label = "onnx int8" if quantized else "onnx fp32"
+            print(f"{label}: encode {times[0]:.2f}s, decode {times[1] * 1000:.0f}ms, "
+                  f"mean IoU {np.mean(ious):.3f}")
+
+            assert np.mean(ious) >= min_iou
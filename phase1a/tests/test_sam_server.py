@@ -0,0 +1,337 @@
+"""
+Tests for SAM model server module.
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline.masks import MaskGenerator
+from phase1a.pipeline.sam_server import (
+    AUTHKEY_ENV,
+    ImageKeyCache,
+    SAMServer,
+    connect,
+    default_address,
+    image_key,
+    is_loopback,
+    pack_masks,
+    parse_address,
+    runtime_dir,
+    unpack_masks,
+)
+
+
+class FakePredictor:
+    """SamPredictor stand-in: masks are squares around the first point."""
+
+    def __init__(self):
+        self.encodes = 0
+        self.features = None
+        self.original_size = None
+        self.input_size = None
+        self.is_image_set = False
+
+    def set_image(self, image):
+        self.encodes += 1
+        self.features = float(image.mean())
+        self.original_size = image.shape[:2]
+        self.input_size = image.shape[:2]
+        self.is_image_set = True
+
+    def predict(self, point_coords=None, point_labels=None, box=None,
+                mask_input=None, multimask_output=True, return_logits=False):
+        assert self.is_image_set
+        height, width = self.original_size
+        x, y = point_coords[0]
+        masks = np.zeros((3, height, width), dtype=bool)
+        for i, size in enumerate((5, 10, 20)):
+            masks[i, max(0, y - size):y + size, max(0, x - size):x + size] = True
+        scores = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+        return masks, scores, np.zeros((3, 4, 4), dtype=np.float32)
+
+
+class FakeAutomaticGenerator:
+    """SamAutomaticMaskGenerator stand-in returning one mask."""
+
+    def __init__(self, **params):
+        self.params = params
+
+    def generate(self, image):
+        mask = np.zeros(image.shape[:2], dtype=bool)
+        mask[10:30, 10:50] = True
+        return [{
+            "segmentation": mask,
+            "area": int(mask.sum()),
+            "bbox": [10, 10, 40, 20],
+            "predicted_iou": 0.95,
+            "stability_score": 0.97,
+        }]
+
+
+class FakeSAMServer(SAMServer):
+    """SAMServer with fake models instead of segment-anything."""
+
+    def _load_model(self):
+        self._predictor = FakePredictor()
+
+    def _automatic_generator(self, params):
+        return FakeAutomaticGenerator(**params)
+
+
+@pytest.fixture(autouse=True)
+def private_runtime_dir(tmp_path, monkeypatch):
+    """Keep the auth key and default socket out of the real runtime dir."""
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.delenv(AUTHKEY_ENV, raising=False)
+    return tmp_path / "phase1a"
+
+
+@contextmanager
+def running_server(**kwargs):
+    """Run a fake SAM server on a temporary Unix socket."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        server = FakeSAMServer(
+            model_type="vit_b",
+            address=str(Path(tmpdir) / "sam.sock"),
+            cache_size=2,
+            **kwargs,
+        )
+        server.start()
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield server
+        finally:
+            server.close()
+            thread.join(timeout=5)
+
+
+@pytest.fixture
+def server():
+    """A fake SAM server listening on a temporary Unix socket."""
+    with running_server() as server:
+        yield server
+
+
+@pytest.fixture
+def generator(server):
+    """MaskGenerator connected to the fake server."""
+    return MaskGenerator(model_type="vit_b", use_server=True, server_address=server.address)
+
+
+class TestHelpers:
+    """Tests for transfer and address helpers."""
+
+    def test_pack_masks_round_trip(self):
+        """Packed masks should unpack to the original arrays."""
+        masks = np.random.default_rng(0).random((3, 17, 29)) > 0.5
+
+        data, shape = pack_masks(masks)
+
+        assert len(data) < masks.size
+        np.testing.assert_array_equal(unpack_masks(data, shape), masks)
+
+    def test_image_key(self, sample_image):
+        """Image keys should depend on content only."""
+        assert image_key(sample_image) == image_key(sample_image.copy())
+
+        changed = sample_image.copy()
+        changed[0, 0, 0] += 1
+        assert image_key(changed) != image_key(sample_image)
+
+    def test_image_key_cache(self, sample_image, monkeypatch):
+        """Arrays seen recently should not be hashed again."""
+        from phase1a.pipeline import sam_server
+
+        hashed = []
+        monkeypatch.setattr(
+            sam_server, "image_key", lambda image: hashed.append(image) or str(len(hashed))
+        )
+        keys = ImageKeyCache(size=2)
+        crop = sample_image[:10]
+
+        assert keys(sample_image) == keys(sample_image) == "1"
+        assert keys(crop) == "2"
+        assert keys(sample_image) == "1"
+        assert keys(sample_image.copy()) == "3"
+        assert keys(crop) == "4"
+        assert len(hashed) == 4
+
+    def test_parse_address(self):
+        """host:port is TCP, anything else a Unix socket path."""
+        assert parse_address("localhost:7860") == ("localhost", 7860)
+        assert parse_address("/tmp/sam.sock") == "/tmp/sam.sock"
+
+    def test_is_loopback(self):
+        """Only loopback addresses should count as local."""
+        assert is_loopback("127.0.0.1")
+        assert is_loopback("::1")
+        assert not is_loopback("0.0.0.0")
+        assert not is_loopback("192.168.1.10")
+
+
+class TestSecurity:
+    """Tests for the server's access controls."""
+
+    def test_runtime_dir(self, private_runtime_dir):
+        """The runtime dir should be private and hold the default socket."""
+        path = runtime_dir()
+
+        assert path == private_runtime_dir
+        assert os.stat(path).st_mode & 0o777 == 0o700
+        assert default_address() == str(path / "sam.sock")
+
+    def test_runtime_dir_not_private(self, private_runtime_dir):
+        """A runtime dir open to other users should be refused."""
+        private_runtime_dir.mkdir(mode=0o700)
+        os.chmod(private_runtime_dir, 0o777)
+
+        with pytest.raises(RuntimeError, match="not a private directory"):
+            runtime_dir()
+        assert connect() is None
+
+    def test_authkey_file(self, server, private_runtime_dir):
+        """The server should generate a random key readable only by the user."""
+        key_file = private_runtime_dir / "authkey"
+
+        assert os.stat(key_file).st_mode & 0o777 == 0o600
+        assert len(key_file.read_text()) == 64
+        assert os.stat(server.address).st_mode & 0o077 == 0
+
+    def test_wrong_authkey(self, server, monkeypatch):
+        """Clients with another key should not get a connection."""
+        monkeypatch.setenv(AUTHKEY_ENV, "wrong")
+
+        assert connect(server.address) is None
+
+    def test_no_authkey(self, temp_dir):
+        """Without a key no server can have been started."""
+        (temp_dir / "sam.sock").touch()
+
+        assert connect(str(temp_dir / "sam.sock")) is None
+
+    def test_non_loopback_refused(self):
+        """TCP servers should only listen beyond loopback when allowed."""
+        server = FakeSAMServer(model_type="vit_b", address="0.0.0.0:0")
+
+        with pytest.raises(ValueError, match="non-loopback"):
+            server.start()
+
+    def test_use_server_opt_in(self, server, sample_image):
+        """MaskGenerator should not use a server unless asked to."""
+        generator = MaskGenerator(model_type="vit_b", server_address=server.address)
+
+        assert not generator.use_server
+        with pytest.raises((ImportError, ValueError)):
+            generator.generate_from_point(sample_image, (100, 100))
+
+
+class TestSAMServer:
+    """Tests for SAMServer and MaskGenerator's server backend."""
+
+    def test_connect(self, server):
+        """connect should return a client for the matching model type."""
+        client = connect(server.address, model_type="vit_b")
+
+        assert client is not None
+        assert client.info["model_type"] == "vit_b"
+        client.close()
+
+    def test_connect_model_mismatch(self, server):
+        """Servers running another model type should be ignored."""
+        assert connect(server.address, model_type="vit_h") is None
+
+    def test_connect_no_server(self, temp_dir):
+        """connect should return None when nothing listens."""
+        assert connect(str(temp_dir / "missing.sock")) is None
+
+    def test_generate_from_point(self, server, generator, sample_image):
+        """Point masks should come from the server without loading SAM."""
+        mask_data = generator.generate_from_point(sample_image, (100, 100))
+
+        assert mask_data is not None
+        assert mask_data.mask.shape == sample_image.shape[:2]
+        assert mask_data.mask[100, 100]
+        assert generator.checkpoint_path is None
+
+    def test_embedding_cache(self, server, generator, sample_image):
+        """Repeated clicks on one image should encode it once."""
+        generator.generate_from_point(sample_image, (100, 100))
+        generator.generate_from_point(sample_image, (60, 60))
+
+        # A second process clicking on the same image also hits the cache
+        other = MaskGenerator(model_type="vit_b", use_server=True, server_address=server.address)
+        other.generate_from_point(sample_image, (60, 60))
+
+        assert server._predictor.encodes == 1
+        assert server.hits >= 2
+
+    def test_embedding_cache_eviction(self, server, generator, sample_image):
+        """Least recently used embeddings should be evicted."""
+        images = [sample_image + i for i in range(3)]
+        for image in images:
+            generator.generate_from_point(image, (100, 100))
+
+        assert len(server._embeddings) == 2
+        assert image_key(images[0]) not in server._embeddings
+
+        # Evicted images are uploaded and encoded again
+        generator.generate_from_point(images[0], (100, 100))
+        assert server._predictor.encodes == 4
+
+    def test_generate(self, server, generator, sample_image):
+        """Automatic generation should return MaskData with unpacked masks."""
+        masks = generator.generate(sample_image)
+
+        assert len(masks) == 1
+        assert masks[0].mask.dtype == bool
+        assert masks[0].area == 800
+
+    def test_checkpoint_mismatch(self, temp_dir):
+        """Servers running another checkpoint should be ignored."""
+        served = temp_dir / "sam_vit_b.pth"
+        served.write_bytes(b"weights")
+        finetuned = temp_dir / "finetuned.pth"
+        finetuned.write_bytes(b"other weights")
+
+        with running_server(checkpoint_path=str(served)) as server:
+            same = MaskGenerator(
+                model_type="vit_b", checkpoint_path=str(served),
+                use_server=True, server_address=server.address,
+            )
+            assert same._connect_server()
+            assert same._model_identity()[0] == str(served.resolve())
+
+            other = MaskGenerator(
+                model_type="vit_b", checkpoint_path=str(finetuned),
+                use_server=True, server_address=server.address,
+            )
+            assert not other._connect_server()
+
+            # Replacing the served file also changes its identity
+            identity = same._model_identity()
+            os.utime(served, ns=(0, 0))
+            assert connect(server.address, model_identity=identity) is None
+
+    def test_server_error(self, server):
+        """Server-side failures should raise RuntimeError in the client."""
+        client = connect(server.address)
+
+        with pytest.raises(RuntimeError, match="Unknown SAM server operation"):
+            client.request("shutdown")
+        client.close()
+
+    def test_use_server_disabled(self, server, sample_image):
+        """use_server=False should load the model in-process."""
+        generator = MaskGenerator(
+            model_type="vit_b", use_server=False, server_address=server.address
+        )
+
+        with pytest.raises((ImportError, ValueError)):
+            generator.generate_from_point(sample_image, (100, 100))
@@ -0,0 +1,164 @@
+"""
+Tests for serialization module.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline import serialization
+from phase1a.pipeline.classify import MaskClassifier
+from phase1a.pipeline.gating import ConfidenceGate
+
+
+requires_msgspec = pytest.mark.skipif(
+    serialization.msgspec is None, reason="msgspec not installed"
+)
+
+
+@pytest.fixture(params=["orjson", "json"])
+def json_backend(request, monkeypatch):
+    """Run a test with orjson (when installed) and with stdlib json."""
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+class TestJSON:
+    """Tests for JSON encoding and decoding."""
+
+    def test_round_trip(self, json_backend):
+        """Encoded objects should decode unchanged."""
+        obj = {"mask_id": "mask_0001", "area": 120, "bbox": [1, 2, 3, 4], "name": "Grün"}
+
+        assert serialization.json_backend() == json_backend
+        assert serialization.loads(serialization.dumps(obj)) == obj
+
+    def test_numpy_values(self, json_backend):
+        """numpy scalars and arrays should encode as plain values."""
+        obj = {
+            "area": np.int64(42),
+            "ratio": np.float32(0.5),
+            "hist": np.arange(3, dtype=np.float64),
+        }
+
+        decoded = serialization.loads(serialization.dumps(obj))
+
+        assert decoded == {"area": 42, "ratio": 0.5, "hist": [0.0, 1.0, 2.0]}
+
+    def test_compact(self, json_backend):
+        """Compact output should have no whitespace."""
+        data = serialization.dumps({"a": [1, 2]}, compact=True)
+
+        assert data == b'{"a":[1,2]}'
+
+    def test_backends_agree(self, monkeypatch):
+        """orjson and stdlib output should decode to the same values."""
+        if serialization.orjson is None:
+            pytest.skip("orjson not installed")
+        obj = [{"id": i, "score": i / 7, "tags": ["a", "b"]} for i in range(10)]
+
+        fast = serialization.dumps(obj)
+        monkeypatch.setattr(serialization, "orjson", None)
+        slow = serialization.dumps(obj)
+
+        assert json.loads(fast) == json.loads(slow)
+
+    def test_load_stdlib_file(self, temp_dir, json_backend):
+        """Files written by earlier versions (stdlib json) should still load."""
+        path = temp_dir / "features.json"
+        data = [{"mask_id": "m1", "mean_rgb": [1.0, 2.0, 3.0]}]
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+        assert serialization.load(path) == data
+
+
+class TestMsgpack:
+    """Tests for MessagePack files."""
+
+    @requires_msgspec
+    def test_round_trip(self, temp_dir):
+        """MessagePack files should round-trip, including numpy values."""
+        path = temp_dir / "data.msgpack"
+
+        serialization.dump({"area": np.int32(7), "values": np.ones(2)}, path)
+
+        assert serialization.load(path) == {"area": 7, "values": [1.0, 1.0]}
+
+    @requires_msgspec
+    def test_smaller_than_json(self, temp_dir, mock_classifications):
+        """MessagePack output should be more compact than indented JSON."""
+        data = [c.to_dict() for c in mock_classifications]
+
+        serialization.dump(data, temp_dir / "c.json")
+        serialization.dump(data, temp_dir / "c.msgpack")
+
+        assert (temp_dir / "c.msgpack").stat().st_size < (temp_dir / "c.json").stat().st_size
+
+    def test_missing_msgspec(self, temp_dir, monkeypatch):
+        """Writing MessagePack without msgspec should raise ImportError."""
+        monkeypatch.setattr(serialization, "msgspec", None)
+
+        with pytest.raises(ImportError, match="msgspec"):
+            serialization.dump([1], temp_dir / "data.msgpack")
+
+
+class TestPaths:
+    """Tests for format selection by path."""
+
+    def test_format_for(self):
+        """Formats should follow the file suffix."""
+        assert serialization.format_for("a/b.json") == "json"
+        assert serialization.format_for("a/b.msgpack") == "msgpack"
+        assert serialization.format_for("a/b.txt") == "json"
+
+    def test_with_format(self, temp_dir):
+        """with_format should swap the suffix."""
+        path = serialization.with_format(temp_dir / "accepted.json", "msgpack")
+
+        assert path == temp_dir / "accepted.msgpack"
+
+    def test_with_format_invalid(self, temp_dir):
+        """Unknown formats should raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown format"):
+            serialization.with_format(temp_dir / "accepted.json", "yaml")
+
+    def test_resolve(self, temp_dir):
+        """resolve should find a file written in another format."""
+        (temp_dir / "accepted.msgpack").write_bytes(b"")
+
+        assert serialization.resolve(temp_dir / "accepted.json") == temp_dir / "accepted.msgpack"
+        assert serialization.resolve(temp_dir / "missing.json") == temp_dir / "missing.json"
+
+
+@requires_msgspec
+class TestPipelineFormats:
+    """Tests for pipeline intermediates written as MessagePack."""
+
+    def test_classifications(self, mock_classifications, temp_dir):
+        """Classifications should round-trip through a .msgpack file."""
+        output_path = temp_dir / "classifications.msgpack"
+
+        MaskClassifier().save_classifications(mock_classifications, output_path)
+        loaded = MaskClassifier.load_classifications(output_path)
+
+        assert [c.to_dict() for c in loaded] == [c.to_dict() for c in mock_classifications]
+
+    def test_gating_results(self, mock_gated_masks, temp_dir):
+        """load_accepted should find msgpack gating results."""
+        accepted, review, discarded = mock_gated_masks
+
+        ConfidenceGate().save_gating_results(
+            accepted, review, discarded, temp_dir, format="msgpack"
+        )
+        loaded = ConfidenceGate.load_accepted(temp_dir)
+
+        assert (temp_dir / "accepted.msgpack").exists()
+        assert not (temp_dir / "accepted.json").exists()
+        assert [g.classification.mask_id for g in loaded] == [
+            g.classification.mask_id for g in accepted
+        ]
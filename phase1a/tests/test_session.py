@@ -0,0 +1,135 @@
+"""
+Tests for the session journal (autosave and resume).
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline.interactive import FeatureType
+from phase1a.pipeline.masks import MaskData
+from phase1a.pipeline.point_selector import PointBasedSelector
+from phase1a.pipeline.session import SessionJournal
+
+
+@pytest.fixture
+def generator():
+    """Mask generator returning a 20x20 square around each click."""
+    def generate(image, point, label=1):
+        x, y = point
+        mask = np.zeros(image.shape[:2], dtype=bool)
+        mask[y - 10:y + 10, x - 10:x + 10] = True
+        return MaskData("clicked", mask, int(mask.sum()), (x - 10, y - 10, 20, 20), 0.9, 0.95)
+
+    generator = Mock()
+    generator.generate_from_point = Mock(side_effect=generate)
+    return generator
+
+
+def start(sample_image, generator, temp_dir):
+    """Selector resuming (or starting) the session in temp_dir."""
+    journal = SessionJournal.for_image(temp_dir, sample_image)
+    selector = PointBasedSelector(sample_image, generator)
+    selector.resume(journal)
+    return selector, journal
+
+
+class TestSessionJournal:
+    """Tests for SessionJournal and PointBasedSelector.resume()."""
+
+    def test_resume(self, sample_image, generator, temp_dir):
+        """A new selector should get back masks, selections and history."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        green = selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.GREEN)
+        other = selector.click_to_mask(150, 150, hole=1, feature_type=FeatureType.GREEN)
+        merged = selector.merge_selected_masks([green.id, other.id], hole=1, feature_type=FeatureType.GREEN)
+        selector.undo()
+        journal.close()
+
+        resumed, _ = start(sample_image, generator, temp_dir)
+
+        assert generator.generate_from_point.call_count == 2
+        assert list(resumed.generated_masks) == list(selector.generated_masks)
+        for mask_id, mask_data in selector.generated_masks.items():
+            np.testing.assert_array_equal(resumed.generated_masks[mask_id].mask, mask_data.mask)
+            assert resumed.generated_masks[mask_id].bbox == mask_data.bbox
+        assert resumed.get_selection_for_hole(1) == selector.get_selection_for_hole(1)
+
+        # The undone merge can be redone, and new IDs do not collide
+        resumed.redo()
+        assert list(resumed.generated_masks) == [merged.id]
+        clicked = resumed.click_to_mask(100, 100, hole=2, feature_type=FeatureType.GREEN)
+        assert clicked.id not in (green.id, other.id, merged.id)
+
+    def test_appends_after_resume(self, sample_image, generator, temp_dir):
+        """Operations after a resume should be journaled too."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.GREEN)
+        journal.close()
+
+        resumed, journal = start(sample_image, generator, temp_dir)
+        resumed.click_to_mask(150, 150, hole=1, feature_type=FeatureType.TEE)
+        journal.close()
+
+        again, _ = start(sample_image, generator, temp_dir)
+        assert len(again.generated_masks) == 2
+
+    def test_prompts(self, sample_image, generator, temp_dir):
+        """Edit records should carry the operation's prompt."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        selector.click_to_mask(50, 60, hole=3, feature_type=FeatureType.BUNKER)
+        journal.close()
+
+        (record,) = journal.records()
+
+        assert record["prompt"] == {"x": 50, "y": 60, "hole": 3, "feature_type": "bunker", "use_sam": False}
+
+    def test_done_features(self, sample_image, generator, temp_dir):
+        """Finished features should be remembered."""
+        journal = SessionJournal.for_image(temp_dir, sample_image)
+        journal.log_done(1, "green")
+        journal.close()
+
+        selector, resumed = start(sample_image, generator, temp_dir)
+
+        assert resumed.completed == {(1, "green")}
+
+    def test_damaged_tail(self, sample_image, generator, temp_dir):
+        """A record cut off by a crash should be dropped."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.GREEN)
+        selector.click_to_mask(150, 150, hole=1, feature_type=FeatureType.TEE)
+        journal.close()
+        data = journal.path.read_bytes()
+        journal.path.write_bytes(data[:-20])
+
+        resumed, journal = start(sample_image, generator, temp_dir)
+        assert len(resumed.generated_masks) == 1
+
+        # Later records append cleanly after the cut
+        resumed.click_to_mask(100, 100, hole=1, feature_type=FeatureType.FAIRWAY)
+        journal.close()
+        again, _ = start(sample_image, generator, temp_dir)
+        assert len(again.generated_masks) == 2
+
+    def test_other_image(self, sample_image, generator, temp_dir):
+        """A journal should refuse to restore onto another image."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.GREEN)
+        journal.close()
+
+        other = SessionJournal(journal.directory, sample_image[::-1].copy())
+        with pytest.raises(ValueError, match="different image"):
+            PointBasedSelector(sample_image, generator).resume(other)
+
+    def test_clear(self, sample_image, generator, temp_dir):
+        """Clearing should start a fresh session."""
+        selector, journal = start(sample_image, generator, temp_dir)
+        selector.click_to_mask(50, 50, hole=1, feature_type=FeatureType.GREEN)
+        journal.clear()
+
+        resumed, _ = start(sample_image, generator, temp_dir)
+
+        assert resumed.generated_masks == {}
+        assert not journal.directory.exists()
@@ -0,0 +1,130 @@
+"""
+Tests for superpixel over-segmentation and its cache.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline.superpixels import (
+    SuperpixelIndex,
+    cache_path,
+    compute_superpixels,
+    precompute,
+)
+
+
+@pytest.fixture
+def labels():
+    """A 4x4 grid of 10x10 superpixels."""
+    return np.repeat(np.repeat(np.arange(16).reshape(4, 4), 10, axis=0), 10, axis=1)
+
+
+class TestComputeSuperpixels:
+    """Tests for compute_superpixels."""
+
+    @pytest.mark.parametrize("method", ["slic", "felzenszwalb"])
+    def test_methods(self, sample_image, method):
+        """Every pixel should get a label, starting at 0."""
+        labels = compute_superpixels(sample_image, method)
+
+        assert labels.shape == sample_image.shape[:2]
+        assert labels.dtype == np.int32
+        assert labels.min() == 0
+        assert labels.max() > 1
+
+    def test_respects_color_regions(self, sample_image):
+        """Superpixels should not straddle the flat color regions."""
+        labels = compute_superpixels(sample_image, "felzenszwalb")
+
+        green = np.unique(labels[100:156, 100:156])
+        assert not np.isin(green, labels[0:64, 0:64]).any()
+        assert not np.isin(green, labels[192:256, 64:192]).any()
+
+    def test_unknown_method(self, sample_image):
+        """Unknown methods should raise ValueError."""
+        with pytest.raises(ValueError, match="Unknown superpixel method"):
+            compute_superpixels(sample_image, "watershed")
+
+
+class TestSuperpixelIndex:
+    """Tests for SuperpixelIndex."""
+
+    def test_lookup(self, labels):
+        """Points should map to their superpixel."""
+        index = SuperpixelIndex(labels)
+
+        assert index.count == 16
+        assert index.at(15, 5) == 1
+        assert index.at(5, 15) == 4
+        assert index.at(40, 0) is None
+        assert index.at(-1, 0) is None
+
+    def test_bboxes(self, labels):
+        """The box table should hold each superpixel's extent."""
+        index = SuperpixelIndex(labels)
+
+        assert tuple(index.bboxes[6]) == (10, 20, 20, 30)
+
+    def test_mask(self, labels):
+        """A set of labels should give the union of their pixels."""
+        index = SuperpixelIndex(labels)
+
+        mask = index.mask([1, 6, 15])
+
+        np.testing.assert_array_equal(mask, np.isin(labels, [1, 6, 15]))
+        assert not index.mask([]).any()
+
+    def test_save_and_load(self, labels, temp_dir):
+        """An index should round-trip through its .npz file."""
+        path = temp_dir / "labels.npz"
+        SuperpixelIndex(labels).save(path)
+
+        loaded = SuperpixelIndex.load(path)
+
+        np.testing.assert_array_equal(loaded.labels, labels)
+
+
+class TestCache:
+    """Tests for the on-disk cache and background precomputation."""
+
+    def test_cache_path(self, sample_image, temp_dir):
+        """Cache files should depend on the image, method and parameters."""
+        path = cache_path(temp_dir, sample_image)
+
+        assert path.parent == temp_dir
+        assert path == cache_path(temp_dir, sample_image.copy())
+        assert path != cache_path(temp_dir, sample_image[::-1].copy())
+        assert path != cache_path(temp_dir, sample_image, "felzenszwalb")
+        assert path != cache_path(temp_dir, sample_image, segment_size=12)
+
+    def test_precompute(self, sample_image, temp_dir):
+        """Precomputation should run in another process and fill the cache."""
+        assert SuperpixelIndex.open(sample_image, temp_dir, "felzenszwalb") is None
+
+        path = precompute(sample_image, temp_dir, "felzenszwalb").result(timeout=60)
+
+        assert path.exists()
+        assert list(temp_dir.iterdir()) == [path]
+        index = SuperpixelIndex.open(sample_image, temp_dir, "felzenszwalb")
+        np.testing.assert_array_equal(
+            index.labels, compute_superpixels(sample_image, "felzenszwalb")
+        )
+
+    def test_precompute_daemon(self, sample_image, temp_dir):
+        """The worker should not keep the interpreter alive at exit."""
+        future = precompute(sample_image, temp_dir, "felzenszwalb")
+
+        assert all(process.daemon for process in multiprocessing.active_children())
+        future.result(timeout=60)
+
+    def test_precompute_cached(self, sample_image, temp_dir):
+        """Cached segmentations should not be recomputed."""
+        path = cache_path(temp_dir, sample_image)
+        SuperpixelIndex(np.zeros(sample_image.shape[:2], dtype=np.int32)).save(path)
+
+        future = precompute(sample_image, temp_dir)
+
+        assert future.done()
+        assert future.result() == path
@@ -9,6 +9,7 @@ Tests verify the Inkscape-compatible SVG format matching RockRidge_No_Overlay.sv
 
 import re
 from pathlib import Path
+from unittest.mock import patch
 
 import pytest
 from shapely.geometry import Polygon
@@ -115,6 +116,87 @@ class TestSVGGenerator:
         # Should have relative coordinates (commas separate x,y)
         assert "," in path
     
+    def test_polygon_to_path_relative_deltas(self):
+        generator = SVGGenerator()
+        polygon = Polygon([(1, 2), (11, 2), (11, 12)])
+        
+        path = generator._polygon_to_path(polygon)
+        
+        assert path == (
+            "m 1.0000,2.0000 10.0000,0.0000 0.0000,10.0000 -10.0000,-10.0000 z"
+        )
+    
+    def test_polygon_to_path_precision(self):
+        generator = SVGGenerator(precision=1)
+        polygon = Polygon([(1, 2), (11, 2), (11, 12)])
+        
+        path = generator._polygon_to_path(polygon)
+        
+        assert path == "m 1.0,2.0 10.0,0.0 0.0,10.0 -10.0,-10.0 z"
+    
+    def test_polygon_to_path_absolute(self):
+        generator = SVGGenerator(precision=0, path_mode="absolute")
+        polygon = Polygon([(1, 2), (11, 2), (11, 12)])
+        
+        path = generator._polygon_to_path(polygon)
+        
+        assert path == "M 1,2 11,2 11,12 1,2 Z"
+    
+    def test_polygon_to_path_auto_picks_shorter(self):
+        polygon = Polygon([(1000, 2000), (1001, 2000), (1001, 2001)])
+        
+        auto = SVGGenerator(path_mode="auto")._polygon_to_path(polygon)
+        relative = SVGGenerator()._polygon_to_path(polygon)
+        absolute = SVGGenerator(path_mode="absolute")._polygon_to_path(polygon)
+        
+        assert auto == min(relative, absolute, key=len)
+        assert auto == relative
+    
+    def test_polygon_to_path_with_interior(self):
+        generator = SVGGenerator(precision=0)
+        polygon = Polygon(
+            [(0, 0), (10, 0), (10, 10), (0, 10)],
+            holes=[[(2, 2), (4, 2), (4, 4)]],
+        )
+        
+        path = generator._polygon_to_path(polygon)
+        
+        assert path.count("m ") == 2
+        assert path.endswith("m 2,2 2,0 0,2 -2,-2 z")
+    
+    def test_polygon_to_path_curves(self):
+        from shapely.geometry import Point
+        
+        generator = SVGGenerator(curve_tolerance=1.0)
+        circle = Point(500, 500).buffer(200, quad_segs=256)
+        
+        path = generator._polygon_to_path(circle)
+        
+        assert path.startswith("m ")
+        assert " c " in path
+        assert path.endswith(" z")
+    
+    def test_polygon_to_path_curves_fall_back_to_lines(self):
+        polygon = Polygon([(0, 0), (10, 0), (10, 10), (0, 10)])
+        
+        path = SVGGenerator(curve_tolerance=1.0)._polygon_to_path(polygon)
+        
+        assert path == SVGGenerator()._polygon_to_path(polygon)
+    
+    def test_polygon_to_path_curves_smaller(self):
+        from shapely.geometry import Point
+        
+        circle = Point(500, 500).buffer(200, quad_segs=256)
+        
+        lines = SVGGenerator()._polygon_to_path(circle)
+        curves = SVGGenerator(curve_tolerance=0.5)._polygon_to_path(circle)
+        
+        assert len(curves) < len(lines) / 5
+    
+    def test_invalid_path_mode(self):
+        with pytest.raises(ValueError):
+            SVGGenerator(path_mode="curvy")
+    
     def test_generate_basic(self, sample_assignments):
         generator = SVGGenerator(width=512, height=512)
         
@@ -189,6 +271,133 @@ class TestSVGGenerator:
         content = SVGGenerator.load(output_path)
         
         assert 'inkscape:label="Hole1"' in content
+    
+    def test_write_streams_same_content_as_generate(self, sample_assignments):
+        import io
+        
+        generator = SVGGenerator()
+        buffer = io.StringIO()
+        
+        generator.write(sample_assignments, buffer)
+        
+        assert buffer.getvalue() == generator.generate(sample_assignments)
+    
+    def test_save_matches_generate(self, sample_assignments, temp_dir):
+        generator = SVGGenerator()
+        output_path = temp_dir / "course.svg"
+        
+        generator.save(sample_assignments, output_path)
+        
+        assert output_path.read_text() == generator.generate(
+            sample_assignments, document_name="course.svg"
+        )
+    
+    def test_write_skips_empty_layers(self, sample_assignments):
+        import io
+        
+        generator = SVGGenerator()
+        assignments = {**sample_assignments, 5: []}
+        buffer = io.StringIO()
+        
+        generator.write(assignments, buffer)
+        
+        assert 'inkscape:label="Hole5"' not in buffer.getvalue()
+        assert buffer.getvalue().endswith("  </g>\n</svg>")
+
+
+class TestSVGGeneratorLayerCache:
+    """Tests for per-hole layer caching."""
+    
+    @staticmethod
+    def _move_bunker(assignments, dx):
+        edited = dict(assignments)
+        edited[1] = [
+            assignments[1][0],
+            HoleAssignment(
+                polygon=make_polygon_feature(
+                    "bunker_1", "bunker",
+                    [(160 + dx, 120), (190 + dx, 120), (190 + dx, 140), (160 + dx, 140)]
+                ),
+                hole=1,
+            ),
+        ]
+        return edited
+    
+    def test_cached_output_matches_uncached(self, sample_assignments):
+        cached = SVGGenerator(cache_layers=True)
+        plain = SVGGenerator()
+        
+        for assignments in [
+            sample_assignments,
+            self._move_bunker(sample_assignments, 20),
+            {1: sample_assignments[1], 98: sample_assignments[98]},
+            {**sample_assignments, 5: []},
+        ]:
+            assert cached.generate(assignments) == plain.generate(assignments)
+    
+    def test_only_changed_layers_are_rebuilt(self, sample_assignments):
+        generator = SVGGenerator(cache_layers=True)
+        generator.generate(sample_assignments)
+        assert generator.dirty_holes == [1, 2, 98]
+        
+        with patch.object(
+            generator, "_polygon_to_path", wraps=generator._polygon_to_path
+        ) as encode:
+            generator.generate(self._move_bunker(sample_assignments, 20))
+        
+        assert generator.dirty_holes == [1]
+        assert encode.call_count == 2  # Only hole 1's green and bunker
+        
+        generator.generate(self._move_bunker(sample_assignments, 20))
+        assert generator.dirty_holes == []
+    
+    def test_dirty_bounds_cover_old_and_new_geometry(self, sample_assignments):
+        generator = SVGGenerator(cache_layers=True)
+        generator.generate(sample_assignments)
+        generator.take_dirty_bounds()
+        
+        generator.generate(self._move_bunker(sample_assignments, 100))
+        
+        # Hole 1 layer before (100..190) and after (100..290)
+        assert generator.take_dirty_bounds() == (100.0, 100.0, 290.0, 150.0)
+        assert generator.take_dirty_bounds() is None
+    
+    def test_removed_hole_is_dirty(self, sample_assignments):
+        generator = SVGGenerator(cache_layers=True)
+        generator.generate(sample_assignments)
+        generator.take_dirty_bounds()
+        
+        without_two = {k: v for k, v in sample_assignments.items() if k != 2}
+        generator.generate(without_two)
+        
+        assert generator.dirty_holes == [2]
+        assert generator.take_dirty_bounds() == (200.0, 50.0, 300.0, 100.0)
+    
+    def test_settings_change_invalidates_cache(self, sample_assignments):
+        generator = SVGGenerator(cache_layers=True)
+        generator.generate(sample_assignments)
+        
+        generator.opacity = 0.8
+        content = generator.generate(sample_assignments)
+        
+        assert generator.dirty_holes == [1, 2, 98]
+        assert "opacity:0.5" not in content
+    
+    def test_dirty_region_png_matches_full_render(self, sample_assignments):
+        from phase1a.pipeline.export import RasterExporter
+        
+        generator = SVGGenerator(width=512, height=256, cache_layers=True)
+        exporter = RasterExporter.from_generator(generator)
+        
+        generator.generate(sample_assignments)
+        image = exporter.render(sample_assignments)
+        generator.take_dirty_bounds()
+        
+        edited = self._move_bunker(sample_assignments, 100)
+        generator.generate(edited)
+        exporter.rerender(image, edited, generator.take_dirty_bounds())
+        
+        assert (image == exporter.render(edited)).all()
 
 
 class TestSVGGeneratorColors:
@@ -322,6 +531,63 @@ class TestSVGCleaner:
         
         # Should preserve both
         assert len(cleaned[1]) == 2
+    
+    def test_clean_keeps_disjoint_same_class_separate(self):
+        """Non-touching shapes of the same class are not unioned."""
+        assignments = {
+            1: [
+                HoleAssignment(
+                    polygon=make_polygon_feature(
+                        "bunker_a", "bunker",
+                        [(0, 0), (20, 0), (20, 20), (0, 20)]
+                    ),
+                    hole=1,
+                ),
+                HoleAssignment(
+                    polygon=make_polygon_feature(
+                        "bunker_b", "bunker",
+                        [(100, 100), (120, 100), (120, 120), (100, 120)]
+                    ),
+                    hole=1,
+                ),
+            ],
+        }
+        
+        cleaned = SVGCleaner().clean(assignments)
+        
+        assert [a.polygon.id for a in cleaned[1]] == ["bunker_a", "bunker_b"]
+    
+    def test_clean_unions_transitive_clusters(self):
+        """A overlaps B and B overlaps C: all three form one cluster."""
+        assignments = {
+            1: [
+                HoleAssignment(
+                    polygon=make_polygon_feature(
+                        f"fairway_{i}", "fairway",
+                        [(x, 0), (x + 20, 0), (x + 20, 20), (x, 20)]
+                    ),
+                    hole=1,
+                )
+                for i, x in enumerate([0, 30, 15, 200])
+            ],
+        }
+        
+        cleaned = SVGCleaner(simplify_tolerance=0).clean(assignments)
+        
+        assert len(cleaned[1]) == 2
+        merged = cleaned[1][0].polygon
+        assert merged.properties["merged_count"] == 3
+        assert merged.geometry.area == pytest.approx(50 * 20)
+        assert cleaned[1][1].polygon.id == "fairway_3"
+    
+    def test_clean_parallel_matches_serial(self, sample_assignments):
+        serial = SVGCleaner(max_workers=1).clean(sample_assignments)
+        parallel = SVGCleaner(max_workers=4).clean(sample_assignments)
+        
+        for hole in serial:
+            assert [a.polygon.geometry.wkt for a in serial[hole]] == [
+                a.polygon.geometry.wkt for a in parallel[hole]
+            ]
 
 
 class TestSVGGeneratorEdgeCases:
@@ -0,0 +1,198 @@
+"""
+Tests for mask overlay compositing and the display pyramid.
+"""
+
+import numpy as np
+import pytest
+
+from phase1a.pipeline.masks import MaskData
+from phase1a.pipeline.visualize import (
+    DisplayPyramid,
+    MaskOverlayCompositor,
+    _mask_color,
+    create_mask_overlay,
+)
+
+
+def _mask(mask_id, y0, y1, x0, x1, shape=(256, 256)):
+    mask = np.zeros(shape, dtype=bool)
+    mask[y0:y1, x0:x1] = True
+    return MaskData(
+        id=mask_id, mask=mask, area=int(mask.sum()), bbox=(x0, y0, x1 - x0, y1 - y0),
+        predicted_iou=0.9, stability_score=0.9,
+    )
+
+
+def _reference_overlay(image, masks, selected_ids, alpha=0.5):
+    """Full-image blend of every mask, channel by channel."""
+    overlay = image.copy().astype(float)
+    for mask_data in masks:
+        color, mask_alpha = _mask_color(mask_data.id, mask_data.id in selected_ids, alpha)
+        for c in range(3):
+            overlay[:, :, c][mask_data.mask] = (
+                overlay[:, :, c][mask_data.mask] * (1 - mask_alpha) + color[c] * mask_alpha
+            )
+    return overlay.astype(np.uint8)
+
+
+@pytest.fixture
+def masks():
+    """Three overlapping masks of different feature types."""
+    return [
+        _mask("green_1_0000", 20, 120, 20, 120),
+        _mask("bunker_1_0001", 100, 160, 100, 200),
+        _mask("fairway_1_0002", 0, 40, 0, 256),
+    ]
+
+
+@pytest.fixture
+def compositor(sample_image, masks):
+    """Compositor that has already drawn the masks."""
+    compositor = MaskOverlayCompositor(sample_image)
+    compositor.update(masks, ["bunker_1_0001"])
+    return compositor
+
+
+def _record_composites(compositor, monkeypatch):
+    boxes = []
+    composite = compositor._composite
+
+    def record(bbox):
+        boxes.append(bbox)
+        composite(bbox)
+
+    monkeypatch.setattr(compositor, "_composite", record)
+    return boxes
+
+
+class TestMaskOverlayCompositor:
+    """Tests for MaskOverlayCompositor."""
+
+    def test_matches_full_blend(self, sample_image, masks):
+        """The overlay should equal blending every mask over the whole image."""
+        overlay = create_mask_overlay(sample_image, masks, ["bunker_1_0001"])
+
+        expected = _reference_overlay(sample_image, masks, {"bunker_1_0001"})
+        np.testing.assert_array_equal(overlay, expected)
+
+    def test_selection_toggle(self, compositor, sample_image, masks, monkeypatch):
+        """Toggling a selection should re-blend only that mask's bounding box."""
+        boxes = _record_composites(compositor, monkeypatch)
+
+        overlay = compositor.update(masks, ["green_1_0000"])
+
+        assert sorted(boxes) == [(20, 120, 20, 120), (100, 160, 100, 200)]
+        expected = _reference_overlay(sample_image, masks, {"green_1_0000"})
+        np.testing.assert_array_equal(overlay, expected)
+
+    def test_unchanged(self, compositor, masks, monkeypatch):
+        """Redrawing without changes should not blend anything."""
+        boxes = _record_composites(compositor, monkeypatch)
+
+        compositor.update(masks, ["bunker_1_0001"])
+
+        assert boxes == []
+
+    def test_add_and_remove(self, compositor, sample_image, masks, monkeypatch):
+        """Added and removed masks should only touch their own bounding boxes."""
+        boxes = _record_composites(compositor, monkeypatch)
+        masks = masks[1:] + [_mask("tee_1_0003", 200, 220, 10, 30)]
+
+        overlay = compositor.update(masks, ["bunker_1_0001"])
+
+        assert sorted(boxes) == [(20, 120, 20, 120), (200, 220, 10, 30)]
+        expected = _reference_overlay(sample_image, masks, {"bunker_1_0001"})
+        np.testing.assert_array_equal(overlay, expected)
+
+    def test_replaced_mask(self, compositor, sample_image, masks):
+        """A new mask array under an existing ID should replace the old layer."""
+        masks[0] = _mask("green_1_0000", 50, 90, 50, 90)
+
+        overlay = compositor.update(masks, ["bunker_1_0001"])
+
+        expected = _reference_overlay(sample_image, masks, {"bunker_1_0001"})
+        np.testing.assert_array_equal(overlay, expected)
+
+    def test_reordered(self, compositor, sample_image, masks):
+        """A different blend order should recomposite the overlay."""
+        masks = masks[::-1]
+
+        overlay = compositor.update(masks, ["bunker_1_0001"])
+
+        expected = _reference_overlay(sample_image, masks, {"bunker_1_0001"})
+        np.testing.assert_array_equal(overlay, expected)
+
+    def test_empty_mask(self, sample_image):
+        """Empty masks should be ignored."""
+        empty = MaskData(
+            id="green_1_0000", mask=np.zeros((256, 256), dtype=bool), area=0,
+            bbox=(0, 0, 0, 0), predicted_iou=0.9, stability_score=0.9,
+        )
+
+        overlay = create_mask_overlay(sample_image, [empty])
+
+        np.testing.assert_array_equal(overlay, sample_image)
+
+    def test_dirty(self, compositor, masks):
+        """The compositor should report the boxes it re-blended."""
+        compositor.update(masks, ["bunker_1_0001", "green_1_0000"])
+
+        assert compositor.dirty == [(20, 120, 20, 120)]
+
+
+class TestDisplayPyramid:
+    """Tests for the level-of-detail display pyramid."""
+
+    @pytest.fixture
+    def image(self):
+        return np.random.default_rng(0).integers(0, 256, (1000, 1500, 3), dtype=np.uint8)
+
+    def test_levels(self, image):
+        """Each level should halve the previous one down to min_size."""
+        pyramid = DisplayPyramid(image, min_size=200)
+
+        shapes = [level.shape[:2] for level in pyramid.levels]
+        assert shapes == [(1000, 1500), (500, 750), (250, 375), (125, 188)]
+        assert pyramid.levels[1][0, 0, 0] == (
+            int(image[:2, :2, 0].astype(int).sum()) + 2
+        ) // 4
+
+    def test_update_matches_rebuild(self, image):
+        """Updating a changed region should give the same levels as a rebuild."""
+        pyramid = DisplayPyramid(image, min_size=200)
+        image[301:457, 999:1500] = 7
+
+        pyramid.update([(301, 457, 999, 1500)])
+
+        for level, expected in zip(pyramid.levels, DisplayPyramid(image, min_size=200).levels):
+            np.testing.assert_array_equal(level, expected)
+
+    def test_view_full(self, image):
+        """The whole image on a small screen should use a coarse level."""
+        pyramid = DisplayPyramid(image, min_size=200)
+
+        level, window, extent = pyramid.view((0, 1500), (1000, 0), (400, 300))
+
+        assert level == 1
+        assert window.shape[:2] == (500, 750)
+        assert extent == (0, 1500, 1000, 0)
+
+    def test_view_zoomed(self, image):
+        """Zoomed in, only the visible full-resolution window is returned."""
+        pyramid = DisplayPyramid(image, min_size=200)
+
+        level, window, extent = pyramid.view((100.5, 300.2), (250, 50), (800, 800))
+
+        assert level == 0
+        np.testing.assert_array_equal(window, image[50:250, 100:301])
+        assert extent == (100, 301, 250, 50)
+
+    def test_view_clamped(self, image):
+        """Limits beyond the image should be clamped to it."""
+        pyramid = DisplayPyramid(image, min_size=200)
+
+        level, window, extent = pyramid.view((-500, 3000), (2000, -500), (100, 100))
+
+        assert level == len(pyramid.levels) - 1
+        assert window.shape[:2] == pyramid.levels[-1].shape[:2]
+        assert extent == (0, 1500, 1000, 0)
@@ -0,0 +1,100 @@
+"""
+Tests for background worker module.
+"""
+
+import threading
+
+import pytest
+
+from phase1a.pipeline.worker import MaskWorker
+
+
+@pytest.fixture
+def worker():
+    worker = MaskWorker()
+    yield worker
+    worker.close()
+
+
+class TestMaskWorker:
+    """Tests for MaskWorker."""
+
+    def test_runs_in_order_off_thread(self, worker):
+        """Jobs should run in submission order on the worker thread."""
+        ran = []
+        results = []
+
+        for i in range(3):
+            worker.submit(
+                lambda i=i: ran.append((i, threading.current_thread().name)) or i,
+                on_done=results.append,
+            )
+        assert worker.wait(timeout=5)
+
+        assert [i for i, _ in ran] == [0, 1, 2]
+        assert all(name == "mask-worker" for _, name in ran)
+        # Callbacks only run when polled
+        assert results == []
+        assert worker.poll() == 3
+        assert results == [0, 1, 2]
+        assert not worker.busy
+
+    def test_coalesces_queued_jobs(self, worker):
+        """A keyed job should replace a queued job with the same key."""
+        release = threading.Event()
+        results = []
+
+        worker.submit(release.wait, 5, on_done=lambda _: results.append("blocker"))
+        first = worker.submit(lambda: "first", key="preview", on_done=results.append)
+        worker.submit(lambda: "second", key="preview", on_done=results.append)
+        worker.submit(lambda: "other", key="other", on_done=results.append)
+        assert first.cancelled
+        assert worker.pending == 3
+
+        release.set()
+        assert worker.wait(timeout=5)
+        worker.poll()
+
+        assert results == ["blocker", "second", "other"]
+
+    def test_cancels_running_job(self, worker):
+        """A running keyed job's result should be dropped once superseded."""
+        started = threading.Event()
+        release = threading.Event()
+        results = []
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "stale"
+
+        worker.submit(slow, key="preview", on_done=results.append)
+        assert started.wait(5)
+        worker.submit(lambda: "fresh", key="preview", on_done=results.append)
+        release.set()
+
+        assert worker.wait(timeout=5)
+        assert worker.poll() == 1
+        assert results == ["fresh"]
+
+    def test_errors(self, worker):
+        """Exceptions should be delivered to on_error on the polling thread."""
+        errors = []
+
+        def fail():
+            raise ValueError("boom")
+
+        worker.submit(fail, on_error=errors.append)
+        worker.submit(fail)  # Logged only
+        worker.wait(timeout=5)
+
+        assert worker.poll() == 2
+        assert len(errors) == 1
+        assert isinstance(errors[0], ValueError)
+
+    def test_close(self, worker):
+        """A closed worker should refuse new jobs."""
+        worker.close()
+
+        with pytest.raises(RuntimeError, match="closed"):
+            worker.submit(lambda: None)
@@ -0,0 +1,836 @@
+"""
+Web Annotation for the Python Agent.
+
+Browser-based counterpart of ``phase1a select``. The matplotlib selector
+has to run on the machine holding the GPU and redraws the full frame on
+every event; here the browser fetches image tiles once, sends point and
+outline prompts, and gets each resulting mask back as a run-length
+encoding or polygons cropped to the mask's bounding box instead of a
+full-frame raster.
+
+Each session wraps a Phase 1A PointBasedSelector on one image. Every
+operation is journaled under ``<output_dir>/session/<image key>`` (see
+phase1a/pipeline/session.py), so reopening the image resumes the
+session. Sessions on the same SAM model configuration share one
+MaskGenerator (see SharedGenerator), which keeps image embeddings in
+memory and in each session's embedding directory, so only the first
+prompt on an image runs the encoder.
+
+Endpoints (under /api/v1/annotate):
+- POST /sessions - Open (or resume) a session on an image
+- GET /sessions/{id} - Session info and tile pyramid
+- DELETE /sessions/{id} - Close a session
+- GET /sessions/{id}/tiles/{level}/{col}/{row}.{png|jpg} - Image tile
+- GET /sessions/{id}/masks/{mask_id}/tiles/{level}/{col}/{row}.png - Mask tile
+- POST /sessions/{id}/click - Point prompt
+- POST /sessions/{id}/outline - Outline prompt
+- POST /sessions/{id}/undo, /sessions/{id}/redo - Edit history
+- GET /sessions/{id}/selections - Selections and mask metadata
+- POST /sessions/{id}/save - Write selections, masks and centers
+"""
+
+import asyncio
+import functools
+import io
+import math
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Literal, Optional, Tuple
+import logging
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request, Response
+from PIL import Image
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Side of the square image and mask tiles, in pixels
+TILE_SIZE = 256
+
+# Encoded image tiles kept per session
+TILE_CACHE_SIZE = 512
+
+# Open sessions; opening another closes the least recently used
+MAX_SESSIONS = 4
+
+Encoding = Literal["rle", "polygon"]
+
+
+# =============================================================================
+# Mask Encodings
+# =============================================================================
+
+def _bbox(mask: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
+    """(y0, y1, x0, x1) of the mask's pixels, exclusive ends; None if empty."""
+    rows = np.flatnonzero(mask.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(mask[rows[0]:rows[-1] + 1].any(axis=0))
+    return int(rows[0]), int(rows[-1]) + 1, int(cols[0]), int(cols[-1]) + 1
+
+
+def encode_rle(mask: np.ndarray) -> Dict[str, Any]:
+    """
+    Run-length encode a mask within its bounding box.
+    
+    Runs cover the box in row-major order and alternate between
+    background and foreground, starting with background (so the first
+    count is 0 when the box starts with a mask pixel).
+    
+    Args:
+        mask: Binary mask (H, W)
+    
+    Returns:
+        {"bbox": [x, y, w, h], "counts": [...]}
+    """
+    box = _bbox(mask)
+    if box is None:
+        return {"bbox": [0, 0, 0, 0], "counts": []}
+    
+    y0, y1, x0, x1 = box
+    flat = mask[y0:y1, x0:x1].ravel()
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    counts = np.diff(np.concatenate([[0], changes, [flat.size]]))
+    if flat[0]:
+        counts = np.concatenate([[0], counts])
+    return {"bbox": [x0, y0, x1 - x0, y1 - y0], "counts": counts.tolist()}
+
+
+def decode_rle(rle: Dict[str, Any], shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Decode encode_rle() output back to a full-frame mask.
+    
+    Args:
+        rle: {"bbox": [x, y, w, h], "counts": [...]}
+        shape: (height, width) of the frame
+    """
+    mask = np.zeros(shape, dtype=bool)
+    x, y, w, h = rle["bbox"]
+    counts = rle["counts"]
+    if w and h:
+        values = np.arange(len(counts)) % 2 == 1
+        mask[y:y + h, x:x + w] = np.repeat(values, counts).reshape(h, w)
+    return mask
+
+
+def encode_polygons(mask: np.ndarray, tolerance: float = 1.0) -> List[List[List[int]]]:
+    """
+    Outer boundaries of a mask's regions as polygons.
+    
+    Holes are not represented; use the RLE encoding where they matter.
+    
+    Args:
+        mask: Binary mask (H, W)
+        tolerance: Douglas-Peucker tolerance in pixels (0 = exact contours)
+    
+    Returns:
+        List of polygons, each a list of [x, y] vertices
+    """
+    import cv2
+    
+    box = _bbox(mask)
+    if box is None:
+        return []
+    
+    y0, y1, x0, x1 = box
+    contours, _ = cv2.findContours(
+        mask[y0:y1, x0:x1].astype(np.uint8),
+        cv2.RETR_EXTERNAL,
+        cv2.CHAIN_APPROX_SIMPLE,
+        offset=(x0, y0),
+    )
+    
+    polygons = []
+    for contour in contours:
+        if tolerance > 0:
+            contour = cv2.approxPolyDP(contour, tolerance, True)
+        if len(contour) >= 3:
+            polygons.append(contour.reshape(-1, 2).tolist())
+    return polygons
+
+
+# =============================================================================
+# Tiles
+# =============================================================================
+
+class TilePyramid:
+    """
+    Image tiles at power-of-two zoom levels.
+    
+    Level 0 is full resolution and each level halves the previous one;
+    the top level fits in a single tile. Downscaled levels are built on
+    first use, and encoded tiles are kept in an LRU cache.
+    """
+    
+    def __init__(
+        self,
+        image: np.ndarray,
+        tile_size: int = TILE_SIZE,
+        cache_size: int = TILE_CACHE_SIZE,
+    ):
+        """
+        Initialize the pyramid.
+        
+        Args:
+            image: RGB image (H, W, 3)
+            tile_size: Tile side in pixels
+            cache_size: Encoded tiles to keep
+        """
+        self.height, self.width = image.shape[:2]
+        self.tile_size = tile_size
+        self.levels = max(1, math.ceil(math.log2(max(self.height, self.width) / tile_size)) + 1)
+        self.cache_size = cache_size
+        self._images: List[Image.Image] = [Image.fromarray(image)]
+        self._cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def info(self) -> Dict[str, int]:
+        return {
+            "width": self.width,
+            "height": self.height,
+            "tile_size": self.tile_size,
+            "levels": self.levels,
+        }
+    
+    def _window(self, level: int, col: int, row: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) of a tile in level pixels."""
+        if not 0 <= level < self.levels:
+            raise IndexError(f"No level {level}")
+        scale = 2 ** level
+        width = math.ceil(self.width / scale)
+        height = math.ceil(self.height / scale)
+        x0, y0 = col * self.tile_size, row * self.tile_size
+        if col < 0 or row < 0 or x0 >= width or y0 >= height:
+            raise IndexError(f"No tile {col}/{row} at level {level}")
+        return x0, y0, min(x0 + self.tile_size, width), min(y0 + self.tile_size, height)
+    
+    def _level_image(self, level: int) -> Image.Image:
+        while len(self._images) <= level:
+            self._images.append(self._images[-1].reduce(2))
+        return self._images[level]
+    
+    def tile(self, level: int, col: int, row: int, fmt: str = "png") -> bytes:
+        """
+        Encoded image tile.
+        
+        Args:
+            level: Zoom level (0 = full resolution)
+            col: Tile column
+            row: Tile row
+            fmt: "png" or "jpg"
+        
+        Raises:
+            IndexError: If the tile does not exist
+            ValueError: If the format is unknown
+        """
+        if fmt not in ("png", "jpg"):
+            raise ValueError(f"Unknown tile format: {fmt}")
+        key = (level, col, row, fmt)
+        with self._lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+                return data
+            
+            window = self._window(level, col, row)
+            tile = self._level_image(level).crop(window)
+            buffer = io.BytesIO()
+            tile.save(buffer, format="PNG" if fmt == "png" else "JPEG", quality=90)
+            data = buffer.getvalue()
+            
+            self._cache[key] = data
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return data
+    
+    def mask_tile(
+        self,
+        mask: np.ndarray,
+        level: int,
+        col: int,
+        row: int,
+        color: Tuple[int, int, int, int] = (255, 255, 0, 128),
+    ) -> bytes:
+        """
+        PNG overlay tile of a mask, transparent outside it.
+        
+        Args:
+            mask: Full-resolution binary mask (H, W)
+            level: Zoom level (0 = full resolution)
+            col: Tile column
+            row: Tile row
+            color: RGBA of mask pixels
+        
+        Raises:
+            IndexError: If the tile does not exist
+        """
+        x0, y0, x1, y1 = self._window(level, col, row)
+        scale = 2 ** level
+        crop = mask[y0 * scale:y1 * scale:scale, x0 * scale:x1 * scale:scale]
+        rgba = np.zeros(crop.shape + (4,), dtype=np.uint8)
+        rgba[crop] = color
+        buffer = io.BytesIO()
+        Image.fromarray(rgba, "RGBA").save(buffer, format="PNG")
+        return buffer.getvalue()
+
+
+# =============================================================================
+# Sessions
+# =============================================================================
+
+class OpenSessionRequest(BaseModel):
+    """Request to open an annotation session."""
+    image: str
+    output_dir: str = "output"
+    checkpoint: Optional[str] = None
+    model_type: str = "vit_h"
+    device: str = "cuda"
+    backend: str = "torch"
+    onnx_dir: Optional[str] = None
+    quantized: bool = False
+    undo_memory: int = 64  # MB, 0 disables undo
+    fresh: bool = False
+
+
+class ClickRequest(BaseModel):
+    """Point prompt, in full-resolution image pixels."""
+    x: int
+    y: int
+    hole: int
+    feature: str
+    use_sam: bool = False
+    encoding: Encoding = "rle"
+
+
+class OutlineRequest(BaseModel):
+    """
+    Outline prompt, in full-resolution image pixels.
+    
+    Modes: "sam" refines the outline with SAM, "fill" fills it as drawn,
+    "grow" grows outward from it by color.
+    """
+    points: List[Tuple[int, int]]
+    hole: int
+    feature: str
+    mode: Literal["sam", "fill", "grow"] = "sam"
+    color_sensitivity: float = 0.6
+    growth_limit: int = 50
+    encoding: Encoding = "rle"
+
+
+class HistoryRequest(BaseModel):
+    """Undo or redo request."""
+    encoding: Encoding = "rle"
+
+
+def _phase1a_path() -> None:
+    """Make the phase1a package next to python-agent importable."""
+    root = Path(__file__).parent.parent.parent
+    if (root / "phase1a").is_dir() and str(root) not in sys.path:
+        sys.path.insert(0, str(root))
+
+
+def _default_generator(options: OpenSessionRequest):
+    """MaskGenerator for a SAM model configuration (loads the model lazily)."""
+    from phase1a.pipeline.masks import MaskGenerator
+    
+    return MaskGenerator(
+        model_type=options.model_type,
+        checkpoint_path=options.checkpoint,
+        device=options.device,
+        backend=options.backend,
+        onnx_dir=options.onnx_dir,
+        quantized=options.quantized,
+    )
+
+
+def _generator_key(options: OpenSessionRequest) -> Tuple:
+    """Sessions whose options give the same key can share a MaskGenerator."""
+    return (
+        options.backend,
+        options.model_type,
+        options.checkpoint,
+        options.onnx_dir,
+        options.device,
+        options.quantized,
+    )
+
+
+class SharedGenerator:
+    """
+    A session's view of a MaskGenerator shared with other sessions.
+    
+    Calls are serialized by the generator's lock, since its predictor
+    holds the current image, and persist embeddings in the session's own
+    embedding directory.
+    """
+    
+    def __init__(self, generator, lock: threading.Lock, embedding_dir: Path):
+        self.generator = generator
+        self.lock = lock
+        self.embedding_dir = str(embedding_dir)
+    
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.generator, name)
+        if not callable(attribute):
+            return attribute
+        
+        @functools.wraps(attribute)
+        def call(*args, **kwargs):
+            with self.lock:
+                self.generator.embedding_dir = self.embedding_dir
+                return attribute(*args, **kwargs)
+        return call
+
+
+class AnnotationSession:
+    """
+    Annotation of one image: a PointBasedSelector, its journal and tiles.
+    
+    Operations on the selector are serialized by a lock; tile requests
+    do not wait for them.
+    """
+    
+    def __init__(self, session_id: str, selector, journal, output_dir: Path):
+        """
+        Initialize the session.
+        
+        Args:
+            session_id: Session ID (the image key)
+            selector: PointBasedSelector, already resumed from the journal
+            journal: SessionJournal the selector writes to
+            output_dir: Where save() writes its outputs
+        """
+        self.id = session_id
+        self.selector = selector
+        self.journal = journal
+        self.output_dir = Path(output_dir)
+        self.tiles = TilePyramid(selector.image)
+        self.lock = threading.Lock()
+    
+    def info(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.id,
+            **self.tiles.info(),
+            "masks": len(self.selector.generated_masks),
+            "can_undo": self.selector.history.can_undo,
+            "can_redo": self.selector.history.can_redo,
+            "completed": sorted(self.journal.completed),
+        }
+    
+    def _feature(self, feature: str):
+        from phase1a.pipeline.interactive import FeatureType
+        
+        try:
+            return FeatureType(feature)
+        except ValueError:
+            raise ValueError(f"Unknown feature: {feature}") from None
+    
+    def _run(self, operation: Callable[[], Any], encoding: str) -> Dict[str, Any]:
+        """
+        Run a selector operation and describe what it changed.
+        
+        Returns:
+            {"masks": [...], "removed": [...], "selections": {...}} with the
+            added or changed masks encoded
+        """
+        with self.lock:
+            before = dict(self.selector.generated_masks)
+            result = operation()
+            after = self.selector.generated_masks
+            changed = [mask for mask_id, mask in after.items() if before.get(mask_id) is not mask]
+            removed = [mask_id for mask_id in before if mask_id not in after]
+            return {
+                "result": result,
+                "masks": [self._mask_response(mask, encoding) for mask in changed],
+                "removed": removed,
+                "selections": self._selections(),
+            }
+    
+    def _mask_response(self, mask_data, encoding: str) -> Dict[str, Any]:
+        response = {
+            "id": mask_data.id,
+            "area": int(mask_data.area),
+            "bbox": [int(v) for v in mask_data.bbox],
+            "predicted_iou": float(mask_data.predicted_iou),
+            "stability_score": float(mask_data.stability_score),
+        }
+        if encoding == "polygon":
+            response["polygons"] = encode_polygons(mask_data.mask)
+        else:
+            response["rle"] = encode_rle(mask_data.mask)
+        return response
+    
+    def _selections(self) -> Dict[str, Any]:
+        return {
+            str(hole): selection.to_dict()
+            for hole, selection in self.selector.get_all_selections().items()
+        }
+    
+    def click(self, request: ClickRequest) -> Dict[str, Any]:
+        """Apply a point prompt."""
+        feature = self._feature(request.feature)
+        response = self._run(
+            lambda: self.selector.click_to_mask(
+                request.x, request.y, request.hole, feature, use_sam=request.use_sam,
+            ),
+            request.encoding,
+        )
+        mask_data = response.pop("result")
+        response["mask_id"] = mask_data.id if mask_data is not None else None
+        return response
+    
+    def outline(self, request: OutlineRequest) -> Dict[str, Any]:
+        """Apply an outline prompt."""
+        feature = self._feature(request.feature)
+        points = [tuple(point) for point in request.points]
+        if request.mode == "fill":
+            operation = lambda: self.selector.fill_polygon_to_mask(points, request.hole, feature)
+        elif request.mode == "grow":
+            operation = lambda: self.selector.grow_from_polygon(
+                points, request.hole, feature,
+                color_sensitivity=request.color_sensitivity,
+                growth_limit=request.growth_limit,
+            )
+        else:
+            operation = lambda: self.selector.draw_to_mask(points, request.hole, feature)
+        
+        response = self._run(operation, request.encoding)
+        mask_data = response.pop("result")
+        response["mask_id"] = mask_data.id if mask_data is not None else None
+        return response
+    
+    def undo(self, request: HistoryRequest, redo: bool = False) -> Dict[str, Any]:
+        """Undo (or redo) the last operation."""
+        response = self._run(self.selector.redo if redo else self.selector.undo, request.encoding)
+        edit = response.pop("result")
+        response["label"] = edit.label if edit is not None else None
+        return response
+    
+    def selections(self) -> Dict[str, Any]:
+        """Selections and the metadata of every generated mask."""
+        with self.lock:
+            return {
+                "selections": self._selections(),
+                "masks": [
+                    {"id": mask.id, "area": int(mask.area), "bbox": [int(v) for v in mask.bbox]}
+                    for mask in self.selector.generated_masks.values()
+                ],
+            }
+    
+    def mask_tile(self, mask_id: str, level: int, col: int, row: int) -> bytes:
+        """
+        Overlay tile of a generated mask.
+        
+        Raises:
+            KeyError: If there is no such mask
+            IndexError: If the tile does not exist
+        """
+        mask_data = self.selector.generated_masks[mask_id]
+        return self.tiles.mask_tile(mask_data.mask, level, col, row)
+    
+    def save(self) -> Dict[str, str]:
+        """
+        Write selections, masks and green/tee centers like ``phase1a select``.
+        
+        Returns:
+            Paths written, by kind
+        """
+        from phase1a.pipeline import serialization
+        
+        with self.lock:
+            metadata_dir = self.output_dir / "metadata"
+            metadata_dir.mkdir(parents=True, exist_ok=True)
+            written = {}
+            
+            path = metadata_dir / "interactive_selections.json"
+            serialization.dump({"selections": self._selections()}, path)
+            written["selections"] = str(path)
+            
+            if self.selector.generated_masks:
+                masks_dir = self.output_dir / "masks"
+                self.selector.mask_generator.save_masks(
+                    list(self.selector.generated_masks.values()), masks_dir
+                )
+                written["masks"] = str(masks_dir)
+            
+            for kind, centers in (
+                ("green_centers", self.selector.extract_green_centers()),
+                ("tee_centers", self.selector.extract_tee_centers()),
+            ):
+                if centers:
+                    path = metadata_dir / f"{kind}.json"
+                    serialization.dump(centers, path)
+                    written[kind] = str(path)
+        
+        logger.info(f"Saved annotation session {self.id} to {self.output_dir}")
+        return written
+    
+    def close(self) -> None:
+        with self.lock:
+            self.journal.close()
+
+
+class AnnotationManager:
+    """
+    Open annotation sessions, keyed by image content.
+    
+    Opening an image that already has a session returns it; otherwise the
+    session is resumed from its journal (or started fresh). Past
+    ``max_sessions`` the least recently used session is closed; its
+    journal and persisted embeddings stay on disk.
+    
+    Sessions with the same model configuration share one MaskGenerator,
+    so at most one copy of each SAM model is loaded. Generators live as
+    long as the manager.
+    """
+    
+    def __init__(
+        self,
+        generator_factory: Callable[[OpenSessionRequest], Any] = _default_generator,
+        max_sessions: int = MAX_SESSIONS,
+    ):
+        """
+        Initialize the manager.
+        
+        Args:
+            generator_factory: Builds the MaskGenerator for an open request's
+                model configuration (called once per configuration)
+            max_sessions: Sessions kept open
+        """
+        self.generator_factory = generator_factory
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, AnnotationSession]" = OrderedDict()
+        # Guards _sessions and _opening only; never held while loading
+        self._lock = threading.Lock()
+        # Per image key, so concurrent opens of one image build it once
+        self._opening: Dict[str, threading.Lock] = {}
+        # Shared generators and their call locks, by _generator_key()
+        self._generators: Dict[Tuple, Tuple[Any, threading.Lock]] = {}
+        self._generators_lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def open(self, request: OpenSessionRequest) -> AnnotationSession:
+        """
+        Open or resume a session.
+        
+        Raises:
+            FileNotFoundError: If the image does not exist
+            ValueError: If the session journal cannot be resumed
+        """
+        _phase1a_path()
+        from phase1a.pipeline.point_selector import PointBasedSelector
+        from phase1a.pipeline.session import SessionJournal
+        
+        image_path = Path(request.image)
+        if not image_path.exists():
+            raise FileNotFoundError(f"Image not found: {image_path}")
+        image = np.array(Image.open(image_path).convert("RGB"))
+        output_dir = Path(request.output_dir)
+        journal = SessionJournal.for_image(output_dir, image)
+        
+        with self._lock:
+            opening = self._opening.setdefault(journal.image_key, threading.Lock())
+        
+        with opening:
+            with self._lock:
+                session = self._sessions.get(journal.image_key)
+                if session is not None and not request.fresh:
+                    self._sessions.move_to_end(session.id)
+                    return session
+                if session is not None:
+                    del self._sessions[session.id]
+            if session is not None:
+                self._close(session)
+            
+            # Loading the image state and replaying the journal can take a
+            # while; other sessions stay usable meanwhile
+            if request.fresh:
+                journal.clear()
+            generator = self._generator(request, journal.embedding_dir)
+            selector = PointBasedSelector(
+                image, generator, history_bytes=request.undo_memory * 1024 * 1024
+            )
+            resumed = selector.resume(journal)
+            session = AnnotationSession(journal.image_key, selector, journal, output_dir)
+            
+            evicted = []
+            with self._lock:
+                self._sessions[session.id] = session
+                while len(self._sessions) > self.max_sessions:
+                    evicted.append(self._sessions.popitem(last=False)[1])
+        
+        for old in evicted:
+            self._close(old)
+        
+        logger.info(f"Opened annotation session {session.id} on {image_path} "
+                    f"({resumed} operations resumed)")
+        return session
+    
+    def _generator(self, request: OpenSessionRequest, embedding_dir: Path) -> SharedGenerator:
+        """The shared generator for the request's model configuration."""
+        key = _generator_key(request)
+        with self._generators_lock:
+            if key not in self._generators:
+                self._generators[key] = (self.generator_factory(request), threading.Lock())
+            generator, lock = self._generators[key]
+        return SharedGenerator(generator, lock, embedding_dir)
+    
+    def get(self, session_id: str) -> AnnotationSession:
+        """
+        Look up an open session.
+        
+        Raises:
+            KeyError: If there is no such session
+        """
+        with self._lock:
+            session = self._sessions[session_id]
+            self._sessions.move_to_end(session_id)
+            return session
+    
+    def close(self, session_id: str) -> None:
+        """
+        Close a session; its journal stays on disk for resuming.
+        
+        Raises:
+            KeyError: If there is no such session
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id)
+        self._close(session)
+    
+    def _close(self, session: AnnotationSession) -> None:
+        """Close a session already removed from _sessions (waits for its work)."""
+        session.close()
+        logger.info(f"Closed annotation session {session.id}")
+    
+    def close_all(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            self._close(session)
+
+
+# =============================================================================
+# Endpoints
+# =============================================================================
+
+router = APIRouter(prefix="/api/v1/annotate", tags=["annotation"])
+
+
+async def _session(request: Request, session_id: str) -> AnnotationSession:
+    """Look up a session off the event loop (the manager lock may be contended)."""
+    try:
+        return await asyncio.to_thread(request.app.state.annotations.get, session_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Session not found: {session_id}")
+
+
+async def _call(function: Callable, *args) -> Any:
+    """Run blocking session work in a thread, mapping errors to HTTP statuses."""
+    try:
+        return await asyncio.to_thread(function, *args)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=f"Not found: {e.args[0]}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/sessions")
+async def open_session(request: Request, body: OpenSessionRequest) -> Dict[str, Any]:
+    """Open (or resume) an annotation session on an image."""
+    session = await _call(request.app.state.annotations.open, body)
+    return session.info()
+
+
+@router.get("/sessions/{session_id}")
+async def get_session(request: Request, session_id: str) -> Dict[str, Any]:
+    """Session info and tile pyramid."""
+    session = await _session(request, session_id)
+    return session.info()
+
+
+@router.delete("/sessions/{session_id}")
+async def close_session(request: Request, session_id: str) -> Dict[str, Any]:
+    """Close a session (it can be resumed by opening the image again)."""
+    session = await _session(request, session_id)
+    await _call(request.app.state.annotations.close, session.id)
+    return {"session_id": session.id, "closed": True}
+
+
+@router.get("/sessions/{session_id}/tiles/{level}/{col}/{row}.{fmt}")
+async def image_tile(
+    request: Request, session_id: str, level: int, col: int, row: int, fmt: str
+) -> Response:
+    """Image tile; tiles never change for a session, so they may be cached."""
+    session = await _session(request, session_id)
+    data = await _call(session.tiles.tile, level, col, row, fmt)
+    return Response(
+        content=data,
+        media_type="image/png" if fmt == "png" else "image/jpeg",
+        headers={"Cache-Control": "private, max-age=86400"},
+    )
+
+
+@router.get("/sessions/{session_id}/masks/{mask_id}/tiles/{level}/{col}/{row}.png")
+async def mask_tile(
+    request: Request, session_id: str, mask_id: str, level: int, col: int, row: int
+) -> Response:
+    """Mask overlay tile; masks can change under the same ID, so no caching."""
+    session = await _session(request, session_id)
+    data = await _call(session.mask_tile, mask_id, level, col, row)
+    return Response(content=data, media_type="image/png", headers={"Cache-Control": "no-cache"})
+
+
+@router.post("/sessions/{session_id}/click")
+async def click(request: Request, session_id: str, body: ClickRequest) -> Dict[str, Any]:
+    """Point prompt; returns the new or changed masks, encoded."""
+    session = await _session(request, session_id)
+    return await _call(session.click, body)
+
+
+@router.post("/sessions/{session_id}/outline")
+async def outline(request: Request, session_id: str, body: OutlineRequest) -> Dict[str, Any]:
+    """Outline prompt; returns the new or changed masks, encoded."""
+    session = await _session(request, session_id)
+    return await _call(session.outline, body)
+
+
+@router.post("/sessions/{session_id}/undo")
+async def undo(
+    request: Request, session_id: str, body: Optional[HistoryRequest] = None
+) -> Dict[str, Any]:
+    """Undo the last operation."""
+    session = await _session(request, session_id)
+    return await _call(session.undo, body or HistoryRequest())
+
+
+@router.post("/sessions/{session_id}/redo")
+async def redo(
+    request: Request, session_id: str, body: Optional[HistoryRequest] = None
+) -> Dict[str, Any]:
+    """Redo the last undone operation."""
+    session = await _session(request, session_id)
+    return await _call(session.undo, body or HistoryRequest(), True)
+
+
+@router.get("/sessions/{session_id}/selections")
+async def selections(request: Request, session_id: str) -> Dict[str, Any]:
+    """Selections and mask metadata."""
+    session = await _session(request, session_id)
+    return await _call(session.selections)
+
+
+@router.post("/sessions/{session_id}/save")
+async def save(request: Request, session_id: str) -> Dict[str, Any]:
+    """Write selections, masks and centers to the session's output directory."""
+    session = await _session(request, session_id)
+    return await _call(session.save)
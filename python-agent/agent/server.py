@@ -5,6 +5,9 @@ Implements the embabel-agent-remote REST API:
 - GET /api/v1/actions - List available actions
 - GET /api/v1/types - List domain types  
 - POST /api/v1/actions/execute - Execute an action
+
+and, with the phase1a extra installed, the web annotation endpoints
+under /api/v1/annotate (see annotation.py).
 """
 
 import logging
@@ -42,14 +45,18 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     logger.info("Python Agent shutting down...")
+    if hasattr(app.state, "annotations"):
+        app.state.annotations.close_all()
 
 
-def create_app(registry: ActionRegistry = None) -> FastAPI:
+def create_app(registry: ActionRegistry = None, annotations=None) -> FastAPI:
     """
     Create the FastAPI application.
     
     Args:
         registry: Optional custom registry. If None, uses the global registry.
+        annotations: Optional AnnotationManager for the web annotation
+            endpoints. If None, a default one is created.
     
     Returns:
         Configured FastAPI application
@@ -74,6 +81,15 @@ def create_app(registry: ActionRegistry = None) -> FastAPI:
     if registry is not None:
         app.state.registry = registry
     
+    # Web annotation needs the phase1a extra (numpy, pillow)
+    try:
+        from .annotation import AnnotationManager, router as annotation_router
+    except ImportError as e:
+        logger.info(f"Web annotation unavailable: {e}")
+    else:
+        app.state.annotations = annotations if annotations is not None else AnnotationManager()
+        app.include_router(annotation_router)
+    
     def get_registry_for_app() -> ActionRegistry:
         """Get the registry for this app instance."""
         if hasattr(app.state, 'registry'):
@@ -83,14 +99,17 @@ def create_app(registry: ActionRegistry = None) -> FastAPI:
     @app.get("/")
     async def root():
         """Root endpoint with API information."""
+        endpoints = {
+            "actions": "/api/v1/actions",
+            "types": "/api/v1/types",
+            "execute": "/api/v1/actions/execute",
+        }
+        if hasattr(app.state, "annotations"):
+            endpoints["annotate"] = "/api/v1/annotate/sessions"
         return {
             "name": "Course Builder Python Agent",
             "version": "0.1.0",
-            "endpoints": {
-                "actions": "/api/v1/actions",
-                "types": "/api/v1/types",
-                "execute": "/api/v1/actions/execute",
-            }
+            "endpoints": endpoints,
         }
     
     @app.get("/health")
@@ -0,0 +1,347 @@
+"""Tests for the web annotation sessions and endpoints."""
+
+import io
+import threading
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from agent.annotation import (
+    AnnotationManager,
+    TilePyramid,
+    _phase1a_path,
+    decode_rle,
+    encode_polygons,
+    encode_rle,
+)
+from agent.server import create_app
+
+_phase1a_path()
+from phase1a.pipeline.masks import MaskData
+
+
+@pytest.fixture
+def image_file(tmp_path):
+    """A 300x200 image with a few flat color regions."""
+    image = np.full((200, 300, 3), (60, 120, 60), dtype=np.uint8)
+    image[50:100, 50:120] = (90, 180, 90)
+    image[120:180, 200:280] = (210, 200, 160)
+    path = tmp_path / "course.png"
+    Image.fromarray(image).save(path)
+    return path
+
+
+@pytest.fixture
+def generator():
+    """Mask generator returning a 20x20 square around each click."""
+    def generate(image, point, label=1):
+        x, y = point
+        mask = np.zeros(image.shape[:2], dtype=bool)
+        mask[y - 10:y + 10, x - 10:x + 10] = True
+        return MaskData("clicked", mask, int(mask.sum()), (x - 10, y - 10, 20, 20), 0.9, 0.95)
+    
+    def fill(image, outline_points, smooth_edges=True):
+        mask = np.zeros(image.shape[:2], dtype=np.uint8)
+        cv2.fillPoly(mask, [np.array(outline_points, dtype=np.int32)], 1)
+        mask = mask.astype(bool)
+        ys, xs = np.nonzero(mask)
+        bbox = (int(xs.min()), int(ys.min()), int(np.ptp(xs)), int(np.ptp(ys)))
+        return MaskData("filled", mask, int(mask.sum()), bbox, 1.0, 1.0)
+    
+    generator = Mock()
+    generator.generate_from_point = Mock(side_effect=generate)
+    generator.generate_filled_polygon = Mock(side_effect=fill)
+    return generator
+
+
+@pytest.fixture
+def annotate(registry, generator):
+    """Test client whose sessions use the fake generator."""
+    manager = AnnotationManager(generator_factory=lambda options: generator)
+    return TestClient(create_app(registry, manager))
+
+
+def open_session(client, image_file, tmp_path, **options):
+    response = client.post(
+        "/api/v1/annotate/sessions",
+        json={"image": str(image_file), "output_dir": str(tmp_path / "output"), **options},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+class TestEncodings:
+    """Tests for the RLE and polygon mask encodings."""
+    
+    def test_rle_round_trip(self):
+        """RLE should decode to the same mask."""
+        rng = np.random.default_rng(0)
+        mask = np.zeros((80, 100), dtype=bool)
+        mask[10:50, 20:70] = rng.random((40, 50)) > 0.5
+        
+        rle = encode_rle(mask)
+        
+        np.testing.assert_array_equal(decode_rle(rle, mask.shape), mask)
+        x, y, w, h = rle["bbox"]
+        assert sum(rle["counts"]) == w * h
+    
+    def test_rle_square(self):
+        """A filled box should be a single foreground run."""
+        mask = np.zeros((50, 50), dtype=bool)
+        mask[5:15, 20:30] = True
+        
+        assert encode_rle(mask) == {"bbox": [20, 5, 10, 10], "counts": [0, 100]}
+        assert encode_rle(np.zeros((5, 5), dtype=bool))["counts"] == []
+    
+    def test_polygons(self):
+        """A box should give its four corners in image coordinates."""
+        mask = np.zeros((50, 50), dtype=bool)
+        mask[5:15, 20:30] = True
+        
+        (polygon,) = encode_polygons(mask)
+        
+        assert sorted(map(tuple, polygon)) == [(20, 5), (20, 14), (29, 5), (29, 14)]
+        assert encode_polygons(np.zeros((5, 5), dtype=bool)) == []
+
+
+class TestTilePyramid:
+    """Tests for TilePyramid."""
+    
+    def test_levels(self):
+        """Levels should halve the image until it fits one tile."""
+        pyramid = TilePyramid(np.zeros((300, 600, 3), dtype=np.uint8))
+        
+        assert pyramid.levels == 3
+        top = Image.open(io.BytesIO(pyramid.tile(2, 0, 0)))
+        assert top.size == (150, 75)
+        edge = Image.open(io.BytesIO(pyramid.tile(0, 2, 1, "jpg")))
+        assert edge.size == (600 - 512, 300 - 256)
+    
+    def test_out_of_range(self):
+        """Tiles outside the pyramid should raise IndexError."""
+        pyramid = TilePyramid(np.zeros((300, 600, 3), dtype=np.uint8))
+        
+        with pytest.raises(IndexError):
+            pyramid.tile(0, 3, 0)
+        with pytest.raises(IndexError):
+            pyramid.tile(3, 0, 0)
+        with pytest.raises(ValueError, match="Unknown tile format"):
+            pyramid.tile(0, 0, 0, "gif")
+    
+    def test_cached(self):
+        """Encoded tiles should be reused."""
+        pyramid = TilePyramid(np.zeros((300, 600, 3), dtype=np.uint8))
+        
+        assert pyramid.tile(1, 0, 0) is pyramid.tile(1, 0, 0)
+    
+    def test_mask_tile(self):
+        """Mask tiles should be transparent outside the mask."""
+        pyramid = TilePyramid(np.zeros((300, 600, 3), dtype=np.uint8))
+        mask = np.zeros((300, 600), dtype=bool)
+        mask[0:100, 0:50] = True
+        
+        tile = np.array(Image.open(io.BytesIO(pyramid.mask_tile(mask, 1, 0, 0))))
+        
+        assert tile.shape == (150, 256, 4)
+        assert tile[:50, :25, 3].all()
+        assert not tile[50:, :, 3].any()
+
+
+class TestAnnotationEndpoints:
+    """Tests for the /api/v1/annotate endpoints."""
+    
+    def test_open_session(self, annotate, image_file, tmp_path):
+        """Opening an image should describe its tile pyramid."""
+        info = open_session(annotate, image_file, tmp_path)
+        
+        assert info["width"] == 300
+        assert info["height"] == 200
+        assert info["levels"] == 2
+        assert info["masks"] == 0
+        assert open_session(annotate, image_file, tmp_path)["session_id"] == info["session_id"]
+    
+    def test_missing_image(self, annotate, tmp_path):
+        """Unknown images and sessions should give 404."""
+        response = annotate.post("/api/v1/annotate/sessions", json={"image": str(tmp_path / "none.png")})
+        assert response.status_code == 404
+        assert annotate.get("/api/v1/annotate/sessions/nope").status_code == 404
+    
+    def test_image_tiles(self, annotate, image_file, tmp_path):
+        """Tiles should be served as images."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        
+        response = annotate.get(f"/api/v1/annotate/sessions/{session}/tiles/0/1/0.png")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/png"
+        assert Image.open(io.BytesIO(response.content)).size == (300 - 256, 200)
+        assert annotate.get(f"/api/v1/annotate/sessions/{session}/tiles/0/5/0.png").status_code == 404
+    
+    def test_click(self, annotate, image_file, tmp_path):
+        """Clicks should return the new mask as RLE or polygons."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        
+        response = annotate.post(
+            f"/api/v1/annotate/sessions/{session}/click",
+            json={"x": 80, "y": 70, "hole": 1, "feature": "green"},
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        (mask,) = data["masks"]
+        assert mask["id"] == data["mask_id"]
+        expected = np.zeros((200, 300), dtype=bool)
+        expected[60:80, 70:90] = True
+        np.testing.assert_array_equal(decode_rle(mask["rle"], (200, 300)), expected)
+        assert data["selections"]["1"]["greens"] == [mask["id"]]
+        
+        response = annotate.post(
+            f"/api/v1/annotate/sessions/{session}/click",
+            json={"x": 240, "y": 150, "hole": 1, "feature": "bunker", "encoding": "polygon"},
+        )
+        (mask,) = response.json()["masks"]
+        assert len(mask["polygons"]) == 1
+        assert "rle" not in mask
+    
+    def test_bad_prompt(self, annotate, image_file, tmp_path):
+        """Unknown features and encodings should be rejected."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        url = f"/api/v1/annotate/sessions/{session}/click"
+        
+        response = annotate.post(url, json={"x": 80, "y": 70, "hole": 1, "feature": "lake"})
+        assert response.status_code == 400
+        
+        response = annotate.post(url, json={"x": 80, "y": 70, "hole": 1, "feature": "green", "encoding": "png"})
+        assert response.status_code == 422
+    
+    def test_outline_and_history(self, annotate, image_file, tmp_path):
+        """Outlines should add masks that undo removes and redo restores."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        base = f"/api/v1/annotate/sessions/{session}"
+        
+        response = annotate.post(f"{base}/outline", json={
+            "points": [[50, 50], [120, 50], [120, 100], [50, 100]],
+            "hole": 2,
+            "feature": "fairway",
+            "mode": "fill",
+        })
+        mask_id = response.json()["mask_id"]
+        assert mask_id is not None
+        
+        undone = annotate.post(f"{base}/undo").json()
+        assert undone["removed"] == [mask_id]
+        assert undone["masks"] == []
+        
+        redone = annotate.post(f"{base}/redo", json={"encoding": "polygon"}).json()
+        assert [mask["id"] for mask in redone["masks"]] == [mask_id]
+        assert redone["selections"]["2"]["fairways"] == [mask_id]
+    
+    def test_mask_tiles(self, annotate, image_file, tmp_path):
+        """Mask tiles should cover the mask and 404 for unknown masks."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        base = f"/api/v1/annotate/sessions/{session}"
+        mask_id = annotate.post(f"{base}/click", json={"x": 80, "y": 70, "hole": 1, "feature": "green"}).json()["mask_id"]
+        
+        response = annotate.get(f"{base}/masks/{mask_id}/tiles/0/0/0.png")
+        
+        assert response.status_code == 200
+        tile = np.array(Image.open(io.BytesIO(response.content)))
+        assert tile[60:80, 70:90, 3].all()
+        assert tile[:, :, 3].sum() == 400 * 128
+        assert annotate.get(f"{base}/masks/nope/tiles/0/0/0.png").status_code == 404
+    
+    def test_resume(self, annotate, generator, image_file, tmp_path):
+        """A closed session should come back from its journal without SAM."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        base = f"/api/v1/annotate/sessions/{session}"
+        annotate.post(f"{base}/click", json={"x": 80, "y": 70, "hole": 1, "feature": "green"})
+        
+        assert annotate.delete(base).status_code == 200
+        assert annotate.get(base).status_code == 404
+        
+        info = open_session(annotate, image_file, tmp_path)
+        assert info["masks"] == 1
+        assert info["can_undo"]
+        assert generator.generate_from_point.call_count == 1
+        
+        assert open_session(annotate, image_file, tmp_path, fresh=True)["masks"] == 0
+    
+    def test_save(self, annotate, image_file, tmp_path):
+        """Saving should write selections and green centers."""
+        session = open_session(annotate, image_file, tmp_path)["session_id"]
+        base = f"/api/v1/annotate/sessions/{session}"
+        annotate.post(f"{base}/click", json={"x": 80, "y": 70, "hole": 1, "feature": "green"})
+        
+        written = annotate.post(f"{base}/save").json()
+        
+        assert set(written) == {"selections", "masks", "green_centers"}
+        assert (tmp_path / "output" / "metadata" / "green_centers.json").exists()
+    
+    def test_session_limit(self, registry, generator, image_file, tmp_path):
+        """Past the limit the least recently used session should close."""
+        manager = AnnotationManager(lambda options: generator, max_sessions=1)
+        client = TestClient(create_app(registry, manager))
+        other = tmp_path / "other.png"
+        Image.fromarray(np.zeros((64, 64, 3), dtype=np.uint8)).save(other)
+        
+        first = open_session(client, image_file, tmp_path)["session_id"]
+        open_session(client, other, tmp_path)
+        
+        assert len(manager) == 1
+        assert client.get(f"/api/v1/annotate/sessions/{first}").status_code == 404
+
+    def test_open_does_not_block(self, registry, generator, image_file, tmp_path):
+        """Opening a slow image should not hold up other sessions."""
+        loading = threading.Event()
+        release = threading.Event()
+        
+        def factory(options):
+            if options.model_type == "vit_b":
+                loading.set()
+                release.wait(10)
+            return generator
+        
+        manager = AnnotationManager(factory)
+        client = TestClient(create_app(registry, manager))
+        first = open_session(client, image_file, tmp_path)["session_id"]
+        other = tmp_path / "other.png"
+        Image.fromarray(np.zeros((64, 64, 3), dtype=np.uint8)).save(other)
+        
+        thread = threading.Thread(
+            target=open_session, args=(client, other, tmp_path), kwargs={"model_type": "vit_b"}
+        )
+        thread.start()
+        try:
+            assert loading.wait(10)
+            assert client.get(f"/api/v1/annotate/sessions/{first}").status_code == 200
+            assert len(manager) == 1
+        finally:
+            release.set()
+            thread.join(10)
+        assert len(manager) == 2
+
+    def test_shared_generator(self, registry, generator, image_file, tmp_path):
+        """Sessions on one model configuration should share a generator."""
+        factory = Mock(return_value=generator)
+        client = TestClient(create_app(registry, AnnotationManager(factory)))
+        other = tmp_path / "other.png"
+        Image.fromarray(np.zeros((64, 64, 3), dtype=np.uint8)).save(other)
+        
+        open_session(client, image_file, tmp_path)
+        session = open_session(client, other, tmp_path)["session_id"]
+        assert factory.call_count == 1
+        
+        client.post(
+            f"/api/v1/annotate/sessions/{session}/click",
+            json={"x": 30, "y": 30, "hole": 1, "feature": "green"},
+        )
+        assert Path(generator.embedding_dir).parent.name == session
+        
+        open_session(client, other, tmp_path, model_type="vit_b", fresh=True)
+        assert factory.call_count == 2